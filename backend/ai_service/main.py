@@ -1,23 +1,26 @@
+import asyncio
 import logging
 import os
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-import torch
-import uvicorn
+from fastapi.responses import JSONResponse
 import sys
-import numpy as np
 
 # Ajout du répertoire parent au PYTHONPATH
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ai_service.config import PORT, LOG_LEVEL, MODEL_CONFIG
-from ai_service.services.blocky_service import BlockyService
+from ai_service.config import (
+    PORT, LOG_LEVEL, MODEL_CONFIG, REDIS_URL, NUM_WORKERS, BRICKLINK_API_URL, LEGO_API_URL
+)
 from ai_service.services.blocky_resource_manager import BlockyResourceManager
-from ai_service.services.blocky_optimizer import BlockyOptimizer
 from ai_service.services.cache_service import CacheService
-from ai_service.services.lego_learner import LegoModelLearner
+from ai_service.services.catalog_refresh import CatalogRefresher
+from ai_service.services.catalog_store import CATALOG_DB_PATH, LEGACY_JSON_FILES, CatalogStore
+from utils.job_queue import JobQueue, QueueFullError, create_job_backend, report_progress
+from utils.cpu_budget import CpuBudget, init_worker_process
+from utils.warmup import Warmup, WarmupError
 
 # Configuration des logs
 logging.basicConfig(
@@ -57,48 +60,144 @@ resource_manager = BlockyResourceManager(
 
 cache_service = CacheService(
     cache_dir=Path(os.getenv("CACHE_DIR", "cache")),
-    max_age_days=int(os.getenv("CACHE_MAX_AGE_DAYS", "30"))
+    max_age_days=int(os.getenv("CACHE_MAX_AGE_DAYS", "30")),
+    max_disk_mb=int(os.getenv("CACHE_MAX_DISK_MB", "2048")),
+    max_memory_mb=int(os.getenv("CACHE_MAX_MEMORY_MB", "64"))
+)
+
+# Catalogues LEGO et Bricklink, rafraîchis en tâche de fond et lus par les optimisations
+# Les anciens catalogues JSON sont importés par la tâche de fond, pas au chargement du module
+catalog_store = CatalogStore(CATALOG_DB_PATH)
+catalog_refresher = CatalogRefresher(
+    catalog_store,
+    bricklink_api_url=BRICKLINK_API_URL,
+    lego_api_url=LEGO_API_URL,
+    interval=float(os.getenv("CATALOG_REFRESH_INTERVAL", "86400")),
+    retry_interval=float(os.getenv("CATALOG_RETRY_INTERVAL", "900")),
+    concurrency=int(os.getenv("CATALOG_CONCURRENCY", "8")),
+    legacy_json_files=LEGACY_JSON_FILES
 )
 
-optimizer = BlockyOptimizer(config=MODEL_CONFIG["optimizer"])
-lego_learner = LegoModelLearner(config=MODEL_CONFIG["training"])
+# torch et les modèles sont chargés par une tâche de fond après le démarrage
+warmup = Warmup()
+
+@warmup.component("blocky")
+def load_blocky_service():
+    from ai_service.services.blocky_service import BlockyService
+    from ai_service.services.blocky_optimizer import BlockyOptimizer
+    
+    return BlockyService(
+        resource_manager=resource_manager,
+        optimizer=BlockyOptimizer(),
+        cache_service=cache_service
+    )
+
+@warmup.component("lego_learner")
+def load_lego_learner():
+    from ai_service.services.lego_learner import LegoModelLearner
+    
+    return LegoModelLearner(config=MODEL_CONFIG["training"])
+
+# Cœurs de la machine répartis entre les workers uvicorn
+cpu_budget = CpuBudget(
+    total_cores=int(os.getenv("CPU_CORES", "0")) or None,
+    server_workers=NUM_WORKERS,
+    stage_threads=int(os.getenv("STAGE_THREADS", "0")) or None
+)
+cpu_budget.apply()
 
-blocky_service = BlockyService(
-    resource_manager=resource_manager,
-    optimizer=optimizer,
-    cache_service=cache_service
+# File des optimisations ; le calcul s'exécute dans un pool de processus.
+# REDIS_URL a une valeur par défaut : Redis n'est utilisé que si JOB_BACKEND=redis.
+job_queue = JobQueue(
+    backend=create_job_backend(REDIS_URL if os.getenv("JOB_BACKEND", "local") == "redis" else None),
+    max_workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_pending=int(os.getenv("JOB_MAX_PENDING", "32")),
+    process_workers=int(os.getenv("JOB_PROCESS_WORKERS", "0")) or cpu_budget.process_pool_workers,
+    process_initializer=init_worker_process
 )
 
-@app.post("/optimize")
+@job_queue.task("optimize")
+async def optimize_job(voxels, colors, model_id):
+    """Tâche d'optimisation exécutée par la file."""
+    from ai_service.services.blocky_optimizer import optimize_voxels
+    
+    await report_progress(0.1, "Optimisation du maillage")
+    # Les processus du pool sont monothreads : un cœur par optimisation
+    async with cpu_budget.reserve(1):
+        return await job_queue.run_in_process(optimize_voxels, voxels, colors, model_id)
+
+@app.on_event("startup")
+async def startup_event():
+    warmup.start()
+    await job_queue.start()
+    catalog_refresher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await catalog_refresher.stop()
+    await job_queue.stop()
+    await warmup.stop()
+
+@app.post("/optimize", status_code=202)
 async def optimize_model(model_data: dict):
-    """Optimise un modèle 3D en briques LEGO."""
+    """
+    Soumet l'optimisation d'un modèle 3D en briques LEGO.
+    
+    Le résultat est consultable via /jobs/{job_id}.
+    """
     try:
-        voxels = np.array(model_data.get("voxels", []))
-        colors = np.array(model_data.get("colors", [])) if "colors" in model_data else None
-        model_id = model_data.get("model_id")
-        
-        result = await optimizer.optimize_mesh(voxels, colors, model_id)
-        return result
+        job = await job_queue.submit(
+            "optimize",
+            model_data.get("voxels", []),
+            model_data.get("colors"),
+            model_data.get("model_id")
+        )
+        return job.public_dict()
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         logger.error(f"Erreur lors de l'optimisation: {str(e)}")
         raise
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Retourne l'état, l'avancement et le résultat d'une tâche."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    return {**job.public_dict(), "result": job.result}
+
 @app.post("/learn")
 async def learn_from_model(model_data: dict):
     """Apprend à partir d'un modèle LEGO existant."""
     try:
+        lego_learner = await warmup.get("lego_learner")
         result = await lego_learner.learn_from_model(model_data)
         return result
+    except WarmupError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Erreur lors de l'apprentissage: {str(e)}")
         raise
 
+@app.get("/ready")
+async def readiness_check():
+    """Point de terminaison de readiness : 503 tant que les modèles ne sont pas chargés."""
+    report = warmup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+@app.get("/catalog")
+async def catalog_status():
+    """Ancienneté, taille et état du rafraîchissement des catalogues."""
+    return await asyncio.to_thread(catalog_refresher.report)
+
 @app.get("/health")
 async def health_check():
     """Point de terminaison pour vérifier la santé du service."""
     return {"status": "healthy"}
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
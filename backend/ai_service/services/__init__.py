@@ -1,7 +1,23 @@
-from .blocky_service import BlockyService
-from .blocky_resource_manager import BlockyResourceManager
-from .blocky_optimizer import BlockyOptimizer
+"""
+Services du service d'IA, importés à la demande (voir services/__init__.py du backend).
+"""
 
-__all__ = ['BlockyService', 'BlockyResourceManager', 'BlockyOptimizer']
+import importlib
 
-# Ce fichier est intentionnellement vide pour marquer le dossier comme un module Python 
\ No newline at end of file
+_SERVICES = {
+    'BlockyService': '.blocky_service',
+    'BlockyResourceManager': '.blocky_resource_manager',
+    'BlockyOptimizer': '.blocky_optimizer',
+}
+
+__all__ = list(_SERVICES)
+
+def __getattr__(name):
+    if name in _SERVICES:
+        value = getattr(importlib.import_module(_SERVICES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -2,12 +2,17 @@ import logging
 import torch
 import numpy as np
 from typing import List, Tuple, Optional, Dict
-from .blocky_service import Brick
+from .blocky_service import Brick, BRICK_SIZES
+from .brick_placement import BrickPlacementEngine
+from .brick_index import LayerOccupancyIndex
+from .brick_layout import BrickLayout
+from .catalog_index import CatalogIndex
+from .catalog_store import CATALOG_DB_PATH, LEGACY_JSON_FILES, CatalogStore
+from .color_palette import ColorPalette, region_means
+from .layer_merger import LayerMergeEngine
 from dataclasses import dataclass
-import json
-import os
-import requests
-from datetime import datetime
+from functools import cached_property
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -24,31 +29,33 @@ class BlockyOptimizer:
         self.MAX_OVERHANG = 0.5
         self.MIN_SUPPORT = 0.3
         self.MERGE_THRESHOLD = 0.8
+        self.MIN_OVERLAP = 0.25
+        
+        # Catalogue des tailles utilisées pour les fusions dans une couche
+        self.BRICK_SIZES = list(BRICK_SIZES)
+        self.layer_merger = LayerMergeEngine(
+            self.BRICK_SIZES,
+            connection_score=self._calculate_connection_score,
+            merge=self._merge_bricks
+        )
         
         # Paramètres d'apprentissage
         self.LEARNING_RATE = 0.01
-        self.MODEL_DB_PATH = "models/lego_models.json"
-        self.BRICKLINK_DB_PATH = "models/bricklink_models.json"
-        self.LEGO_DB_PATH = "models/lego_official_models.json"
-        self.BRICKLINK_COLORS_PATH = "models/bricklink_colors.json"
-        self.LEGO_COLORS_PATH = "models/lego_colors.json"
-        self.BRICKLINK_PARTS_PATH = "models/bricklink_parts.json"
-        self.LEGO_PARTS_PATH = "models/lego_parts.json"
-        
-        # Chargement des bases de données
-        self.successful_models = self._load_successful_models()
-        self.bricklink_models = self._load_bricklink_models()
-        self.lego_models = self._load_lego_models()
-        self.bricklink_colors = self._load_bricklink_colors()
-        self.lego_colors = self._load_lego_colors()
-        self.bricklink_parts = self._load_bricklink_parts()
-        self.lego_parts = self._load_lego_parts()
-        
-        # Paramètres API
-        self.BRICKLINK_API_URL = "https://api.bricklink.com/api/v2"
-        self.LEGO_API_URL = "https://api.lego.com/v1"
-        self.UPDATE_INTERVAL = 86400  # 24 heures en secondes
-        self.last_update = self._load_last_update_time()
+        self.MODEL_DB_PATH = LEGACY_JSON_FILES['successful_models']
+        self.BRICKLINK_DB_PATH = LEGACY_JSON_FILES['bricklink_models']
+        self.LEGO_DB_PATH = LEGACY_JSON_FILES['lego_models']
+        self.BRICKLINK_COLORS_PATH = LEGACY_JSON_FILES['bricklink_colors']
+        self.LEGO_COLORS_PATH = LEGACY_JSON_FILES['lego_colors']
+        self.BRICKLINK_PARTS_PATH = LEGACY_JSON_FILES['bricklink_parts']
+        self.LEGO_PARTS_PATH = LEGACY_JSON_FILES['lego_parts']
+        self.CATALOG_DB_PATH = CATALOG_DB_PATH
+        
+        # Les catalogues sont lus dans la base SQLite au premier accès (voir les propriétés ci-dessous)
+        self._color_palette = None
+        self._color_palette_key = None
+        self._catalog_index = None
+        self._catalog_index_lock = threading.Lock()
+        # Les catalogues sont rafraîchis en tâche de fond (CatalogRefresher), hors des requêtes
         
         # Formats de briques supportés
         self.brick_formats = {
@@ -59,210 +66,184 @@ class BlockyOptimizer:
             'special': ['round', 'curved', 'arch', 'window', 'door']
         }
 
-    def _load_lego_models(self) -> Dict:
-        """Charge les modèles officiels LEGO."""
-        if os.path.exists(self.LEGO_DB_PATH):
-            with open(self.LEGO_DB_PATH, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _load_lego_colors(self) -> Dict:
-        """Charge les couleurs officielles LEGO."""
-        if os.path.exists(self.LEGO_COLORS_PATH):
-            with open(self.LEGO_COLORS_PATH, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _load_lego_parts(self) -> Dict:
-        """Charge les pièces officielles LEGO."""
-        if os.path.exists(self.LEGO_PARTS_PATH):
-            with open(self.LEGO_PARTS_PATH, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _update_catalogs(self):
-        """Met à jour les catalogues LEGO et Bricklink."""
-        try:
-            current_time = datetime.now().timestamp()
-            if current_time - self.last_update < self.UPDATE_INTERVAL:
-                return
-
-            # Mise à jour Bricklink
-            self._update_bricklink_catalog()
-            
-            # Mise à jour LEGO
-            self._update_lego_catalog()
-            
-            self._save_last_update_time()
-            self.last_update = current_time
-                
-        except Exception as e:
-            logger.error(f"Erreur lors de la mise à jour des catalogues: {str(e)}")
-
-    def _update_lego_catalog(self):
-        """Met à jour le catalogue officiel LEGO."""
-        try:
-            # Récupère les couleurs LEGO
-            colors_response = requests.get(f"{self.LEGO_API_URL}/colors")
-            if colors_response.status_code == 200:
-                self.lego_colors = colors_response.json()
-                with open(self.LEGO_COLORS_PATH, 'w') as f:
-                    json.dump(self.lego_colors, f)
-
-            # Récupère les pièces LEGO
-            parts_response = requests.get(f"{self.LEGO_API_URL}/parts")
-            if parts_response.status_code == 200:
-                self.lego_parts = parts_response.json()
-                with open(self.LEGO_PARTS_PATH, 'w') as f:
-                    json.dump(self.lego_parts, f)
-
-            # Récupère les sets LEGO
-            sets_response = requests.get(f"{self.LEGO_API_URL}/sets")
-            if sets_response.status_code == 200:
-                all_sets = sets_response.json()
-                
-                for set_info in all_sets:
-                    set_id = set_info['set_id']
-                    if set_id not in self.lego_models:
-                        set_details = requests.get(f"{self.LEGO_API_URL}/sets/{set_id}/parts")
-                        if set_details.status_code == 200:
-                            self.lego_models[set_id] = {
-                                'parts': set_details.json(),
-                                'year': set_info.get('year', 0),
-                                'theme': set_info.get('theme', ''),
-                                'last_updated': datetime.now().timestamp()
-                            }
-                
-                with open(self.LEGO_DB_PATH, 'w') as f:
-                    json.dump(self.lego_models, f)
-                    
-        except Exception as e:
-            logger.error(f"Erreur lors de la mise à jour du catalogue LEGO: {str(e)}")
+    @cached_property
+    def catalog_store(self) -> CatalogStore:
+        """Base des catalogues ; les anciens fichiers JSON y sont importés à la première ouverture."""
+        store = CatalogStore(self.CATALOG_DB_PATH)
+        store.import_json_files({
+            'successful_models': self.MODEL_DB_PATH,
+            'bricklink_models': self.BRICKLINK_DB_PATH,
+            'lego_models': self.LEGO_DB_PATH,
+            'bricklink_colors': self.BRICKLINK_COLORS_PATH,
+            'lego_colors': self.LEGO_COLORS_PATH,
+            'bricklink_parts': self.BRICKLINK_PARTS_PATH,
+            'lego_parts': self.LEGO_PARTS_PATH,
+        })
+        return store
+
+    # Collections lues à la demande dans la base ; une affectation d'un dict remplace la valeur en cache
+    @cached_property
+    def successful_models(self) -> Dict:
+        return self.catalog_store.collection('successful_models')
+
+    @cached_property
+    def bricklink_models(self) -> Dict:
+        return self.catalog_store.collection('bricklink_models')
+
+    @cached_property
+    def lego_models(self) -> Dict:
+        return self.catalog_store.collection('lego_models')
+
+    @cached_property
+    def bricklink_colors(self) -> Dict:
+        return self.catalog_store.collection('bricklink_colors')
+
+    @cached_property
+    def lego_colors(self) -> Dict:
+        return self.catalog_store.collection('lego_colors')
+
+    @cached_property
+    def bricklink_parts(self) -> Dict:
+        return self.catalog_store.collection('bricklink_parts')
+
+    @cached_property
+    def lego_parts(self) -> Dict:
+        return self.catalog_store.collection('lego_parts')
 
     def _update_brick_scores(self, bricks: List[Brick]):
         """Met à jour les scores des briques en tenant compte de LEGO et Bricklink."""
-        self._update_catalogs()
+        index = self._get_catalog_index()
+        
+        # (format, taille) du catalogue correspondant à chaque empreinte de brique
+        candidates = {}
         
         for brick in bricks:
-            # Cherche des briques similaires dans les deux sources
-            similar_parts = []
+            # Totaux des pièces similaires des deux sources, par fabricant
+            totals = {'lego': [0.0, 0], 'bricklink': [0.0, 0]}
+            brick_format = None
+            
+            footprint = tuple(brick.size[:2])
+            if footprint not in candidates:
+                candidates[footprint] = [
+                    (format_name, size)
+                    for format_name, sizes in self.brick_formats.items()
+                    for size in sizes
+                    if self._matches_brick_size(brick.size, size)
+                ]
             
             # Vérifie chaque format de brique
-            for format_name, sizes in self.brick_formats.items():
-                for size in sizes:
-                    if self._matches_brick_size(brick.size, size):
-                        # Cherche dans les sets LEGO
-                        for set_id, set_data in self.lego_models.items():
-                            for part in set_data['parts']:
-                                if (part['size'] == size and 
-                                    part['format'] == format_name and
-                                    abs(part['stability_score'] - brick.stability_score) < 0.1):
-                                    similar_parts.append({
-                                        'part': part,
-                                        'format': format_name,
-                                        'theme': set_data['theme'],
-                                        'year': set_data['year'],
-                                        'manufacturer': 'lego'
-                                    })
-                        
-                        # Cherche dans les sets Bricklink
-                        for set_id, set_data in self.bricklink_models.items():
-                            for part in set_data['parts']:
-                                if (part['size'] == size and 
-                                    part['format'] == format_name and
-                                    abs(part['stability_score'] - brick.stability_score) < 0.1):
-                                    similar_parts.append({
-                                        'part': part,
-                                        'format': format_name,
-                                        'theme': set_data['theme'],
-                                        'year': set_data['year'],
-                                        'manufacturer': 'bricklink'
-                                    })
+            for format_name, size in candidates[footprint]:
+                for manufacturer, (score, count) in index.score_totals(
+                    size, format_name, brick.stability_score
+                ).items():
+                    totals[manufacturer][0] += score
+                    totals[manufacturer][1] += count
+                    if count and brick_format is None:
+                        brick_format = format_name
             
-            if similar_parts:
-                # Calcule les scores séparément pour LEGO et Bricklink
-                lego_score = 0
-                bricklink_score = 0
-                lego_count = 0
-                bricklink_count = 0
-                
-                current_year = datetime.now().year
-                
-                for part in similar_parts:
-                    # Score de base
-                    base_score = 1.0
-                    
-                    # Bonus pour les formats techniques
-                    if part['format'] == 'technic':
-                        base_score *= 1.2
-                    
-                    # Bonus pour les thèmes populaires
-                    if part['theme'] in ['City', 'Star Wars', 'Architecture']:
-                        base_score *= 1.1
-                    
-                    # Bonus pour les pièces récentes
-                    age_factor = 1.0 - (current_year - part['year']) / 100
-                    base_score *= max(0.5, age_factor)
-                    
-                    # Ajoute au score approprié
-                    if part['manufacturer'] == 'lego':
-                        lego_score += base_score
-                        lego_count += 1
-                    else:
-                        bricklink_score += base_score
-                        bricklink_count += 1
-                
+            if brick_format is not None:
                 # Calcule les scores moyens
+                lego_score, lego_count = totals['lego']
+                bricklink_score, bricklink_count = totals['bricklink']
                 if lego_count > 0:
                     brick.lego_score = lego_score / lego_count
                 if bricklink_count > 0:
                     brick.bricklink_score = bricklink_score / bricklink_count
                 
-                # Détermine le fabricant final
-                if brick.lego_score > brick.bricklink_score:
+                # Détermine le fabricant final (une Brick simple n'a pas de score par défaut)
+                if getattr(brick, 'lego_score', 0.0) > getattr(brick, 'bricklink_score', 0.0):
                     brick.manufacturer = 'lego'
                 else:
                     brick.manufacturer = 'bricklink'
                 
-                brick.brick_format = similar_parts[0]['format']
+                brick.brick_format = brick_format
+
+    def _get_catalog_index(self) -> CatalogIndex:
+        """
+        Index des pièces des sets, reconstruit quand un catalogue change.
+
+        Le nouvel index est construit entièrement avant de remplacer l'ancien :
+        une optimisation en cours garde l'index qu'elle a obtenu.
+        """
+        key = self._catalogs_key(self.lego_models, self.bricklink_models)
+        with self._catalog_index_lock:
+            if self._catalog_index is None or self._catalog_index[0] != key:
+                self._catalog_index = (key, CatalogIndex(self.lego_models, self.bricklink_models))
+            return self._catalog_index[1]
+
+    @staticmethod
+    def _catalogs_key(*catalogs) -> Tuple:
+        """Clé de cache des données dérivées des catalogues : change quand l'un d'eux est remplacé ou modifié."""
+        return tuple((id(catalog), len(catalog), getattr(catalog, 'version', None)) for catalog in catalogs)
+
+    @staticmethod
+    def _matches_brick_size(brick_size: Tuple, size: str) -> bool:
+        """Vérifie si l'empreinte d'une brique correspond à une taille du catalogue ('2x4'), dans un sens ou l'autre."""
+        try:
+            width, length = (float(v) for v in size.split('x'))
+        except ValueError:
+            return False
+        return sorted((float(brick_size[0]), float(brick_size[1]))) == sorted((width, length))
 
     def _assign_colors(self, bricks: List[Brick], colors: torch.Tensor) -> List[Brick]:
-        """Assigne les couleurs les plus proches aux briques en utilisant les deux catalogues."""
-        for brick in bricks:
-            x, y, z = brick.position
-            w, h, d = brick.size
-            
-            # Calcule la couleur moyenne de la région
-            region_colors = colors[x:x+w, y:y+h, z:z+d]
-            avg_color = torch.mean(region_colors, dim=(0,1,2))
-            
-            # Cherche la meilleure couleur dans les deux catalogues
-            best_color = None
-            min_distance = float('inf')
-            
-            # Vérifie les couleurs LEGO
-            for color_id, color_info in self.lego_colors.items():
-                color_rgb = color_info['rgb']
-                distance = torch.sum((torch.tensor(color_rgb) - avg_color) ** 2)
-                if distance < min_distance:
-                    min_distance = distance
-                    best_color = color_rgb
-            
-            # Vérifie les couleurs Bricklink
-            for color_id, color_info in self.bricklink_colors.items():
-                color_rgb = color_info['rgb']
-                distance = torch.sum((torch.tensor(color_rgb) - avg_color) ** 2)
-                if distance < min_distance:
-                    min_distance = distance
-                    best_color = color_rgb
-                    
-            brick.color = best_color
-            
+        """
+        Assigne les couleurs les plus proches aux briques en utilisant les deux catalogues.
+
+        Les couleurs moyennes de toutes les briques sont calculées d'un coup
+        (table de sommes cumulées) puis associées à la palette fusionnée des
+        catalogues par une seule recherche du plus proche voisin dans CIELAB.
+        Sans catalogue de couleurs, chaque brique garde sa couleur moyenne.
+        """
+        if not len(bricks):
+            return bricks
+        if isinstance(colors, torch.Tensor):
+            colors = colors.detach().cpu().numpy()
+
+        layout = bricks if isinstance(bricks, BrickLayout) else None
+        if layout is not None:
+            positions, sizes = layout.positions, layout.sizes
+        else:
+            positions = np.array([b.position for b in bricks], dtype=np.float64)
+            sizes = np.array([b.size for b in bricks], dtype=np.float64)
+
+        means, valid = region_means(colors, positions, sizes)
+        palette = self._get_color_palette()
+        if len(palette):
+            indices = palette.nearest(means[valid])
+            assigned = palette.colors
+        else:
+            indices = np.arange(int(valid.sum()))
+            assigned = [tuple(float(c) for c in color) for color in means[valid]]
+
+        rows = np.flatnonzero(valid)
+        if layout is not None:
+            # Seules les couleurs utilisées entrent dans la palette de la disposition
+            used = np.unique(indices)
+            lut = np.full(len(assigned), -1, dtype=np.int32)
+            lut[used] = [layout.color_index(assigned[i]) for i in used]
+            layout.data['color'][rows] = lut[indices]
+        else:
+            for row, index in zip(rows, indices):
+                bricks[row].color = assigned[index]
+
         return bricks
 
-    def optimize_mesh(self, voxels: np.ndarray, colors: Optional[np.ndarray] = None, model_id: Optional[str] = None) -> List[Brick]:
-        """Optimise un maillage voxelisé en briques LEGO avec apprentissage."""
-        self.logger.info("Début de l'optimisation du maillage avec apprentissage")
+    def _get_color_palette(self) -> ColorPalette:
+        """Palette fusionnée des catalogues, reconstruite quand l'un d'eux est remplacé."""
+        key = self._catalogs_key(self.lego_colors, self.bricklink_colors)
+        if self._color_palette is None or self._color_palette_key != key:
+            self._color_palette = ColorPalette.from_catalogs(self.lego_colors, self.bricklink_colors)
+            self._color_palette_key = key
+        return self._color_palette
+
+    def optimize_mesh(self, voxels: np.ndarray, colors: Optional[np.ndarray] = None, model_id: Optional[str] = None) -> BrickLayout:
+        """
+        Optimise un maillage voxelisé en briques LEGO avec apprentissage.
+        
+        Returns:
+            BrickLayout: Disposition des briques ; itérer dessus donne des vues compatibles avec Brick
+        """
+        logger.info("Début de l'optimisation du maillage avec apprentissage")
         
         # Convertit en tenseur PyTorch
         voxel_tensor = torch.from_numpy(voxels).to(self.device)
@@ -273,7 +254,7 @@ class BlockyOptimizer:
         critical_regions = self._identify_critical_regions(voxel_tensor)
         
         # Génère la disposition initiale
-        bricks = self._generate_initial_layout(voxels)
+        bricks = BrickLayout.from_bricks(self._generate_initial_layout(voxels, self.BRICK_SIZES))
         
         # Met à jour les scores d'apprentissage
         if model_id:
@@ -283,21 +264,21 @@ class BlockyOptimizer:
         self._update_brick_scores(bricks)
         
         # Optimise la stabilité en tenant compte des scores d'apprentissage
-        bricks = self._optimize_stability(bricks, critical_regions)
+        bricks = BrickLayout.from_bricks(self._optimize_stability(bricks, critical_regions))
         
         # Optimise les connexions
-        bricks = self._optimize_connections(bricks)
+        bricks = BrickLayout.from_bricks(self._optimize_connections(bricks))
         
         # Assigne les couleurs si disponibles
         if colors is not None:
-            bricks = self._assign_colors(bricks, color_tensor)
+            self._assign_colors(bricks, color_tensor)
         
         # Sauvegarde le modèle si les métriques sont satisfaisantes
         if model_id and self._evaluate_model_quality(bricks):
             metrics = self._calculate_model_metrics(bricks)
             self._save_successful_model(model_id, bricks, metrics)
         
-        self.logger.info(f"Optimisation terminée : {len(bricks)} briques générées")
+        logger.info(f"Optimisation terminée : {len(bricks)} briques générées")
         return bricks
 
     def _evaluate_model_quality(self, bricks: List[Brick]) -> bool:
@@ -338,13 +319,6 @@ class BlockyOptimizer:
             distribution[brick.manufacturer] += 1
         return distribution
 
-    def _load_successful_models(self) -> Dict:
-        """Charge les modèles réussis depuis la base de données."""
-        if os.path.exists(self.MODEL_DB_PATH):
-            with open(self.MODEL_DB_PATH, 'r') as f:
-                return json.load(f)
-        return {}
-
     def _save_successful_model(self, model_id: str, bricks: List[Brick], metrics: Dict):
         """Sauvegarde un modèle réussi dans la base de données."""
         model_data = {
@@ -364,89 +338,6 @@ class BlockyOptimizer:
         }
         
         self.successful_models[model_id] = model_data
-        
-        os.makedirs(os.path.dirname(self.MODEL_DB_PATH), exist_ok=True)
-        with open(self.MODEL_DB_PATH, 'w') as f:
-            json.dump(self.successful_models, f)
-
-    def _load_bricklink_models(self) -> Dict:
-        """Charge les modèles Bricklink depuis la base de données."""
-        if os.path.exists(self.BRICKLINK_DB_PATH):
-            with open(self.BRICKLINK_DB_PATH, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _load_bricklink_colors(self) -> Dict:
-        """Charge toutes les couleurs disponibles sur Bricklink."""
-        if os.path.exists(self.BRICKLINK_COLORS_PATH):
-            with open(self.BRICKLINK_COLORS_PATH, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _load_bricklink_parts(self) -> Dict:
-        """Charge tous les types de pièces disponibles sur Bricklink."""
-        if os.path.exists(self.BRICKLINK_PARTS_PATH):
-            with open(self.BRICKLINK_PARTS_PATH, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _load_last_update_time(self) -> float:
-        """Charge la dernière mise à jour de Bricklink."""
-        try:
-            with open("models/bricklink_last_update.txt", 'r') as f:
-                return float(f.read().strip())
-        except:
-            return 0.0
-
-    def _save_last_update_time(self):
-        """Sauvegarde le temps de dernière mise à jour de Bricklink."""
-        os.makedirs(os.path.dirname(self.BRICKLINK_DB_PATH), exist_ok=True)
-        with open("models/bricklink_last_update.txt", 'w') as f:
-            f.write(str(datetime.now().timestamp()))
-
-    def _update_bricklink_catalog(self):
-        """Met à jour le catalogue complet de Bricklink."""
-        try:
-            # Récupère toutes les couleurs
-            colors_response = requests.get(f"{self.BRICKLINK_API_URL}/colors")
-            if colors_response.status_code == 200:
-                self.bricklink_colors = colors_response.json()
-                with open(self.BRICKLINK_COLORS_PATH, 'w') as f:
-                    json.dump(self.bricklink_colors, f)
-
-            # Récupère tous les types de pièces
-            parts_response = requests.get(f"{self.BRICKLINK_API_URL}/parts")
-            if parts_response.status_code == 200:
-                self.bricklink_parts = parts_response.json()
-                with open(self.BRICKLINK_PARTS_PATH, 'w') as f:
-                    json.dump(self.bricklink_parts, f)
-
-            # Récupère tous les sets (pas seulement les populaires)
-            sets_response = requests.get(f"{self.BRICKLINK_API_URL}/sets")
-            if sets_response.status_code == 200:
-                all_sets = sets_response.json()
-                
-                for set_info in all_sets:
-                    set_id = set_info['set_id']
-                    if set_id not in self.bricklink_models:
-                        # Récupère les détails du set
-                        set_details = requests.get(f"{self.BRICKLINK_API_URL}/sets/{set_id}/parts")
-                        if set_details.status_code == 200:
-                            self.bricklink_models[set_id] = {
-                                'parts': set_details.json(),
-                                'year': set_info.get('year', 0),
-                                'theme': set_info.get('theme', ''),
-                                'last_updated': datetime.now().timestamp()
-                            }
-                
-                # Sauvegarde les modèles mis à jour
-                with open(self.BRICKLINK_DB_PATH, 'w') as f:
-                    json.dump(self.bricklink_models, f)
-                
-                self._save_last_update_time()
-                
-        except Exception as e:
-            logger.error(f"Erreur lors de la mise à jour du catalogue Bricklink: {str(e)}")
 
     def _update_learning_scores(self, bricks: List[Brick], model_id: str):
         """Met à jour les scores d'apprentissage basés sur les modèles réussis."""
@@ -457,7 +348,7 @@ class BlockyOptimizer:
                 # Trouve les briques similaires dans les modèles réussis
                 similar_bricks = [
                     sb for sb in successful_bricks
-                    if sb['size'] == brick.size and
+                    if tuple(sb['size']) == tuple(brick.size) and
                     abs(sb['stability_score'] - brick.stability_score) < 0.1
                 ]
                 
@@ -484,101 +375,14 @@ class BlockyOptimizer:
 
     def _generate_initial_layout(self, voxels: np.ndarray, brick_sizes: List[Tuple[int, int, int]]) -> List[Brick]:
         """Génère une disposition initiale des briques."""
-        bricks = []
-        visited = np.zeros_like(voxels, dtype=bool)
-        
-        # Trie les tailles de briques par volume décroissant
-        sorted_sizes = sorted(brick_sizes, key=lambda s: s[0] * s[1] * s[2], reverse=True)
-        
-        # Parcours chaque couche
-        for z in range(voxels.shape[0]):
-            layer = voxels[z]
-            layer_visited = visited[z]
-            
-            # Parcours chaque position dans la couche
-            for y in range(layer.shape[0]):
-                for x in range(layer.shape[1]):
-                    if layer[y, x] and not layer_visited[y, x]:
-                        # Trouve la meilleure brique pour cette position
-                        brick = self._find_best_brick_fit(voxels, visited, x, y, z, sorted_sizes)
-                        if brick:
-                            bricks.append(brick)
-                            self._mark_brick_space(visited, brick)
-        
-        return bricks
-
-    def _find_best_brick_fit(self, voxels: np.ndarray, visited: np.ndarray, 
-                            x: int, y: int, z: int, sizes: List[Tuple[int, int, int]]) -> Brick:
-        """Trouve la meilleure brique qui s'adapte à une position donnée."""
-        best_brick = None
-        max_score = -1
-        
-        for size in sizes:
-            if self._can_place_brick(voxels, visited, x, y, z, size):
-                # Calcule un score basé sur le volume et la stabilité
-                volume_score = size[0] * size[1] * size[2]
-                stability_score = self._calculate_preliminary_stability(voxels, x, y, z, size)
-                total_score = volume_score * stability_score
-                
-                if total_score > max_score:
-                    max_score = total_score
-                    best_brick = Brick(
-                        position=(x, y, z),
-                        size=size,
-                        stability_score=stability_score
-                    )
-        
-        return best_brick
-
-    def _can_place_brick(self, voxels: np.ndarray, visited: np.ndarray, 
-                        x: int, y: int, z: int, size: Tuple[int, int, int]) -> bool:
-        """Vérifie si une brique peut être placée à une position donnée."""
-        w, l, h = size
-        
-        # Vérifie les limites
-        if (x + w > voxels.shape[2] or y + l > voxels.shape[1] or 
-            z + h > voxels.shape[0]):
-            return False
-        
-        # Vérifie que l'espace est disponible et rempli de voxels
-        for dz in range(h):
-            for dy in range(l):
-                for dx in range(w):
-                    if (not voxels[z + dz, y + dy, x + dx] or 
-                        visited[z + dz, y + dy, x + dx]):
-                        return False
-        
-        return True
-
-    def _calculate_preliminary_stability(self, voxels: np.ndarray, 
-                                      x: int, y: int, z: int, 
-                                      size: Tuple[int, int, int]) -> float:
-        """Calcule un score de stabilité préliminaire pour une brique."""
-        w, l, h = size
-        if z == 0:  # Brique au sol
-            return 1.0
-        
-        # Vérifie le support en dessous
-        support_count = 0
-        total_area = w * l
-        
-        for dy in range(l):
-            for dx in range(w):
-                if z > 0 and voxels[z - 1, y + dy, x + dx]:
-                    support_count += 1
-        
-        return support_count / total_area
-
-    def _mark_brick_space(self, visited: np.ndarray, brick: Brick):
-        """Marque l'espace occupé par une brique comme visité."""
-        x, y, z = brick.position
-        w, l, h = brick.size
-        
-        visited[z:z+h, y:y+l, x:x+w] = True
+        # Les tests de placement sont des requêtes O(1) sur un volume intégral
+        return BrickPlacementEngine(brick_sizes).place(voxels)
 
     def _optimize_stability(self, bricks: List[Brick], critical_regions: torch.Tensor) -> List[Brick]:
         """Optimise la stabilité de la structure."""
         optimized = []
+        # Index des briques déjà traitées, par couche de sommet
+        support_index = LayerOccupancyIndex()
         
         # Trie les briques par hauteur croissante
         sorted_bricks = sorted(bricks, key=lambda b: b.position[2])
@@ -587,10 +391,9 @@ class BlockyOptimizer:
             # Vérifie si la brique est dans une région critique
             if self._is_in_critical_region(brick, critical_regions):
                 # Ajoute des supports supplémentaires si nécessaire
-                reinforced_brick = self._reinforce_brick(brick, optimized)
-                optimized.append(reinforced_brick)
-            else:
-                optimized.append(brick)
+                brick = self._reinforce_brick(brick, optimized, support_index)
+            optimized.append(brick)
+            support_index.add(brick, layer=brick.position[2] + brick.size[2])
         
         return optimized
 
@@ -603,10 +406,11 @@ class BlockyOptimizer:
         region = critical_regions[z:z+h, y:y+l, x:x+w]
         return region.any().item()
 
-    def _reinforce_brick(self, brick: Brick, existing_bricks: List[Brick]) -> Brick:
+    def _reinforce_brick(self, brick: Brick, existing_bricks: List[Brick],
+                         support_index: Optional[LayerOccupancyIndex] = None) -> Brick:
         """Renforce une brique si nécessaire."""
         # Calcule le support actuel
-        support_score = self._calculate_support_score(brick, existing_bricks)
+        support_score = self._calculate_support_score(brick, existing_bricks, support_index)
         
         if support_score < self.MIN_SUPPORT:
             # Ajuste la taille de la brique pour améliorer la stabilité
@@ -622,8 +426,14 @@ class BlockyOptimizer:
         
         return brick
 
-    def _calculate_support_score(self, brick: Brick, supporting_bricks: List[Brick]) -> float:
-        """Calcule le score de support pour une brique."""
+    def _calculate_support_score(self, brick: Brick, supporting_bricks: List[Brick],
+                                 support_index: Optional[LayerOccupancyIndex] = None) -> float:
+        """
+        Calcule le score de support pour une brique.
+        
+        Si un index par couche de sommet est fourni, seules les briques situées
+        sous l'empreinte sont examinées.
+        """
         if brick.position[2] == 0:  # Brique au sol
             return 1.0
             
@@ -632,15 +442,19 @@ class BlockyOptimizer:
         total_area = w * l
         supported_area = 0
         
-        for support in supporting_bricks:
-            if support.position[2] + support.size[2] == z:  # Brique juste en dessous
-                # Calcule la zone de chevauchement
-                sx, sy, _ = support.position
-                sw, sl, _ = support.size
-                
-                overlap_x = max(0, min(x + w, sx + sw) - max(x, sx))
-                overlap_y = max(0, min(y + l, sy + sl) - max(y, sy))
-                supported_area += overlap_x * overlap_y
+        if support_index is not None:
+            candidates = support_index.query(z, x, y, w, l)
+        else:
+            candidates = [s for s in supporting_bricks if s.position[2] + s.size[2] == z]
+        
+        for support in candidates:  # Briques juste en dessous
+            # Calcule la zone de chevauchement
+            sx, sy, _ = support.position
+            sw, sl, _ = support.size
+            
+            overlap_x = max(0, min(x + w, sx + sw) - max(x, sx))
+            overlap_y = max(0, min(y + l, sy + sl) - max(y, sy))
+            supported_area += overlap_x * overlap_y
         
         return supported_area / total_area
 
@@ -669,32 +483,14 @@ class BlockyOptimizer:
         return optimized
 
     def _optimize_layer_connections(self, layer: List[Brick]) -> List[Brick]:
-        """Optimise les connexions dans une couche spécifique."""
-        optimized = []
-        while layer:
-            best_pair = None
-            best_score = -1
-            
-            # Cherche la meilleure paire de briques à fusionner
-            for i, brick1 in enumerate(layer):
-                for j, brick2 in enumerate(layer[i+1:], i+1):
-                    if self._can_merge(brick1, brick2):
-                        score = self._calculate_connection_score(brick1, brick2)
-                        if score > best_score:
-                            best_score = score
-                            best_pair = (i, j)
-                            
-            if best_pair is not None:
-                i, j = best_pair
-                merged = self._merge_bricks(layer[i], layer[j])
-                layer.pop(j)
-                layer.pop(i)
-                layer.append(merged)
-            else:
-                # Plus de fusion possible, ajoute la brique restante
-                optimized.append(layer.pop(0))
-                
-        return optimized
+        """
+        Optimise les connexions dans une couche spécifique.
+        
+        Les fusions sont choisies par score de connexion décroissant sur le
+        graphe d'adjacence de la couche ; seules les fusions qui donnent une
+        taille du catalogue sont retenues.
+        """
+        return self.layer_merger.merge_layer(layer)
 
     def _calculate_connection_score(self, brick1: Brick, brick2: Brick) -> float:
         """Calcule un score de connexion entre deux briques."""
@@ -710,23 +506,6 @@ class BlockyOptimizer:
                         
         return overlap * size_score
 
-    def _can_merge(self, brick1: Brick, brick2: Brick) -> bool:
-        """Vérifie si deux briques peuvent être fusionnées."""
-        x1, y1, z1 = brick1.position
-        x2, y2, z2 = brick2.position
-        w1, h1, d1 = brick1.size
-        w2, h2, d2 = brick2.size
-        
-        # Vérifie si les briques sont sur le même niveau
-        if z1 != z2 or d1 != d2:
-            return False
-            
-        # Vérifie si les briques sont adjacentes
-        touching_x = (x1 + w1 == x2) or (x2 + w2 == x1)
-        touching_y = (y1 + h1 == y2) or (y2 + h2 == y1)
-        
-        return touching_x or touching_y
-
     def _calculate_overlap(self, brick1: Brick, brick2: Brick) -> float:
         """Calcule le chevauchement entre deux briques."""
         x1, y1, z1 = brick1.position
@@ -776,4 +555,35 @@ class BlockyOptimizer:
         for brick in bricks:
             size_str = str(brick.size)
             distribution[size_str] = distribution.get(size_str, 0) + 1
-        return distribution 
\ No newline at end of file
+        return distribution 
+
+
+# Optimiseur propre à chaque processus du pool de tâches, créé au premier appel
+_process_optimizer: Optional[BlockyOptimizer] = None
+
+def optimize_voxels(voxels, colors=None, model_id: Optional[str] = None) -> Dict:
+    """
+    Optimise une grille de voxels depuis un processus du pool de tâches.
+    
+    Args:
+        voxels: Grille de voxels (listes imbriquées ou tableau)
+        colors: Couleurs des voxels
+        model_id: ID du modèle
+        
+    Returns:
+        Dict: Nombre de briques et briques sérialisables en JSON
+    """
+    global _process_optimizer
+    if _process_optimizer is None:
+        _process_optimizer = BlockyOptimizer()
+    
+    layout = _process_optimizer.optimize_mesh(
+        np.asarray(voxels, dtype=bool),
+        np.asarray(colors, dtype=np.float32) if colors is not None else None,
+        model_id
+    )
+    return {
+        "model_id": model_id,
+        "brick_count": len(layout),
+        "bricks": layout.to_records()
+    }
@@ -7,9 +7,31 @@ import pymeshlab
 from dataclasses import dataclass
 from typing import Tuple, List, Dict, Optional, Set
 import os
+import time
+import asyncio
+
+from metrics import CONVERSION_CACHE_REQUESTS, CONVERSION_CACHE_TIME_SAVED
+
+from .brick_layout import BrickLayout, normalize_dimension
 
 logger = logging.getLogger(__name__)
 
+# Tailles de briques LEGO disponibles (largeur, longueur, hauteur)
+BRICK_SIZES = [
+    # Briques standard
+    (1, 1, 1), (1, 2, 1), (1, 3, 1), (1, 4, 1), (1, 6, 1), (1, 8, 1),
+    (2, 2, 1), (2, 3, 1), (2, 4, 1), (2, 6, 1), (2, 8, 1),
+    # Briques hautes
+    (1, 1, 2), (1, 2, 2), (2, 2, 2), (2, 3, 2),
+    # Plaques
+    (1, 1, 0.5), (1, 2, 0.5), (1, 3, 0.5), (1, 4, 0.5),
+    (2, 2, 0.5), (2, 3, 0.5), (2, 4, 0.5),
+]
+
+# Version de l'algorithme de conversion, incluse dans la clé de cache :
+# à incrémenter quand un changement modifie le résultat d'une conversion
+CONVERSION_VERSION = 1
+
 @dataclass
 class Brick:
     position: Tuple[int, int, int]  # x, y, z
@@ -18,9 +40,10 @@ class Brick:
     stability_score: float = 0.0
 
 class BlockyService:
-    def __init__(self, resource_manager=None, optimizer=None):
+    def __init__(self, resource_manager=None, optimizer=None, cache_service=None):
         self.resource_manager = resource_manager
         self.optimizer = optimizer
+        self.cache_service = cache_service
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         logger.info(f"Using device: {self.device}")
         
@@ -43,27 +66,85 @@ class BlockyService:
         self.BRICK_HEIGHT = 1.2
         
         # Tailles de briques LEGO disponibles (largeur, longueur, hauteur)
-        self.BRICK_SIZES = [
-            # Briques standard
-            (1, 1, 1), (1, 2, 1), (1, 3, 1), (1, 4, 1), (1, 6, 1), (1, 8, 1),
-            (2, 2, 1), (2, 3, 1), (2, 4, 1), (2, 6, 1), (2, 8, 1),
-            # Briques hautes
-            (1, 1, 2), (1, 2, 2), (2, 2, 2), (2, 3, 2),
-            # Plaques
-            (1, 1, 0.5), (1, 2, 0.5), (1, 3, 0.5), (1, 4, 0.5),
-            (2, 2, 0.5), (2, 3, 0.5), (2, 4, 0.5),
-        ]
+        self.BRICK_SIZES = BRICK_SIZES
         
         # Seuils de stabilité
         self.MIN_OVERLAP = 0.25  # Chevauchement minimum pour la stabilité
         self.MIN_SUPPORT = 0.5   # Support minimum requis
 
-    async def convert_to_lego(self, model_path: str):
+    async def convert_to_lego(self, model_path: str, content_hash: Optional[str] = None,
+                              resolution: int = 32):
         """
         Convertit un modèle 3D en LEGO.
         
+        Si un service de cache est configuré, le résultat est indexé par
+        l'empreinte du contenu du fichier et les paramètres de conversion ;
+        un résultat en cache est retourné sans charger le maillage.
+        
+        Args:
+            model_path: Chemin vers le fichier modèle 3D
+            content_hash: Empreinte SHA-256 du fichier, si déjà calculée
+            resolution: Résolution de la grille de voxels
+            
+        Returns:
+            Dict contenant les informations de conversion
+        """
+        # Vérifie le format du fichier
+        file_ext = Path(model_path).suffix.lower()
+        if file_ext not in self.SUPPORTED_FORMATS:
+            raise ValueError(f"Format non supporté: {file_ext}. Formats supportés: {', '.join(self.SUPPORTED_FORMATS.keys())}")
+        
+        if self.cache_service is None:
+            return self._run_conversion(model_path, resolution)
+        
+        if content_hash is None:
+            content_hash = await asyncio.to_thread(self.cache_service.compute_content_hash, Path(model_path))
+        settings = self._conversion_settings(resolution)
+        cache_key = self.cache_service.make_key(content_hash, settings)
+        
+        cached = await self.cache_service.get(cache_key)
+        if cached is not None:
+            info = self.cache_service.entry_info(cache_key) or {}
+            CONVERSION_CACHE_REQUESTS.labels(result='hit').inc()
+            CONVERSION_CACHE_TIME_SAVED.inc(info.get('compute_seconds', 0.0))
+            logger.info(f"Conversion trouvée en cache pour {model_path}")
+            return cached
+        
+        # Les requêtes identiques concurrentes attendent la même conversion
+        info = {'file_name': Path(model_path).name, 'params': settings}
+        computed = False
+        
+        async def compute():
+            nonlocal computed
+            computed = True
+            start_time = time.perf_counter()
+            result = await asyncio.to_thread(self._run_conversion, model_path, resolution)
+            info['compute_seconds'] = time.perf_counter() - start_time
+            return result
+        
+        result = await self.cache_service.get_or_compute(cache_key, compute, info)
+        CONVERSION_CACHE_REQUESTS.labels(result='miss' if computed else 'coalesced').inc()
+        return result
+
+    def _conversion_settings(self, resolution: int) -> Dict:
+        """Paramètres qui déterminent le résultat d'une conversion."""
+        return {
+            'version': CONVERSION_VERSION,
+            'resolution': resolution,
+            'brick_sizes': [list(size) for size in self.BRICK_SIZES],
+            'brick_height': self.BRICK_HEIGHT,
+            'min_overlap': self.MIN_OVERLAP,
+            'min_support': self.MIN_SUPPORT,
+            'optimizer': type(self.optimizer).__name__ if self.optimizer else None
+        }
+
+    def _run_conversion(self, model_path: str, resolution: int):
+        """
+        Exécute la conversion complète d'un modèle.
+        
         Args:
             model_path: Chemin vers le fichier modèle 3D
+            resolution: Résolution de la grille de voxels
             
         Returns:
             Dict contenant les informations de conversion
@@ -71,19 +152,14 @@ class BlockyService:
         try:
             logger.info(f"Starting conversion of model: {model_path}")
             
-            # Vérifie le format du fichier
-            file_ext = Path(model_path).suffix.lower()
-            if file_ext not in self.SUPPORTED_FORMATS:
-                raise ValueError(f"Format non supporté: {file_ext}. Formats supportés: {', '.join(self.SUPPORTED_FORMATS.keys())}")
-            
             # Charge le modèle avec le loader approprié
+            file_ext = Path(model_path).suffix.lower()
             mesh = self.SUPPORTED_FORMATS[file_ext](model_path)
             
             # 2. Normalisation et centrage
             mesh = self._normalize_mesh(mesh)
             
             # 3. Voxelisation
-            resolution = 32  # Résolution de la grille de voxels
             voxels = self._voxelize_mesh(mesh, resolution)
             
             # 4. Optimisation pour les briques LEGO
@@ -138,7 +214,7 @@ class BlockyService:
     def _optimize_brick_layout(self, voxels):
         """Optimise la disposition des briques LEGO."""
         if self.optimizer:
-            return self.optimizer.optimize_mesh(voxels, self.BRICK_SIZES)
+            return self.optimizer.optimize_mesh(voxels)
         
         # Création de la liste des briques
         bricks = []
@@ -206,10 +282,20 @@ class BlockyService:
         
         return True
 
+    def _mark_brick_visited(self, visited, x, y, size):
+        """Marque l'empreinte d'une brique comme occupée dans la couche."""
+        w, l, _ = size
+        visited[y:y + l, x:x + w] = True
+
     def _optimize_vertical_layout(self, bricks):
         """Optimise la disposition verticale des briques."""
+        # Import local : brick_index dépend de Brick, défini dans ce module
+        from .brick_index import LayerOccupancyIndex
+
         optimized = []
         layers = {}
+        # Index des briques retenues, par couche de base
+        layer_index = LayerOccupancyIndex()
         
         # Groupe les briques par couche
         for brick in bricks:
@@ -228,36 +314,41 @@ class BlockyService:
                 # Essaie de fusionner verticalement
                 merged = False
                 if i > 0:  # S'il y a une couche en dessous
-                    merged = self._try_merge_vertical(brick, optimized)
+                    merged = self._try_merge_vertical(brick, optimized, layer_index)
                 
                 if not merged:
                     # Calcule le score de stabilité
                     if i > 0:
-                        brick.stability_score = self._calculate_stability(brick, optimized)
+                        brick.stability_score = self._calculate_stability(brick, optimized, layer_index)
                     optimized.append(brick)
+                    layer_index.add(brick, layer=brick.position[2])
         
         return optimized
 
-    def _try_merge_vertical(self, brick, existing_bricks):
+    def _try_merge_vertical(self, brick, existing_bricks, layer_index=None):
         """Essaie de fusionner une brique verticalement avec les briques existantes."""
         x, y, z = brick.position
         w, l, h = brick.size
         
         # Cherche une brique compatible en dessous
-        for existing in existing_bricks:
-            if existing.position[2] == z - 1:  # Brique dans la couche inférieure
-                ex, ey, _ = existing.position
-                ew, el, eh = existing.size
-                
-                # Vérifie si les briques sont alignées et de même taille
-                if (x == ex and y == ey and w == ew and l == el):
-                    # Fusionne les briques
-                    existing.size = (w, l, h + eh)
-                    return True
+        if layer_index is not None:
+            candidates = layer_index.query(z - 1, x, y, w, l)
+        else:
+            candidates = [e for e in existing_bricks if e.position[2] == z - 1]
+        
+        for existing in candidates:  # Briques dans la couche inférieure
+            ex, ey, _ = existing.position
+            ew, el, eh = existing.size
+            
+            # Vérifie si les briques sont alignées et de même taille
+            if (x == ex and y == ey and w == ew and l == el):
+                # Fusionne les briques
+                existing.size = (w, l, h + eh)
+                return True
         
         return False
 
-    def _calculate_stability(self, brick, supporting_bricks):
+    def _calculate_stability(self, brick, supporting_bricks, layer_index=None):
         """Calcule le score de stabilité d'une brique."""
         x, y, z = brick.position
         w, l, _ = brick.size
@@ -265,55 +356,56 @@ class BlockyService:
         brick_area = w * l
         
         # Vérifie le support des briques en dessous
-        for support in supporting_bricks:
-            if support.position[2] == z - 1:  # Brique dans la couche inférieure
-                sx, sy, _ = support.position
-                sw, sl, _ = support.size
-                
-                # Calcule la zone de chevauchement
-                overlap_x = max(0, min(x + w, sx + sw) - max(x, sx))
-                overlap_y = max(0, min(y + l, sy + sl) - max(y, sy))
-                support_area += overlap_x * overlap_y
+        if layer_index is not None:
+            candidates = layer_index.query(z - 1, x, y, w, l)
+        else:
+            candidates = [s for s in supporting_bricks if s.position[2] == z - 1]
+        
+        for support in candidates:  # Briques dans la couche inférieure
+            sx, sy, _ = support.position
+            sw, sl, _ = support.size
+            
+            # Calcule la zone de chevauchement
+            overlap_x = max(0, min(x + w, sx + sw) - max(x, sx))
+            overlap_y = max(0, min(y + l, sy + sl) - max(y, sy))
+            support_area += overlap_x * overlap_y
         
         return support_area / brick_area if brick_area > 0 else 0
 
     def _generate_building_instructions(self, bricks):
         """Génère les instructions de construction détaillées."""
+        layout = bricks if isinstance(bricks, BrickLayout) else BrickLayout.from_bricks(bricks)
         instructions = []
-        current_layer = -1
-        layer_bricks = []
-        
-        # Trie les briques par hauteur (z) croissante
-        sorted_bricks = sorted(bricks, key=lambda b: (b.position[2], b.position[1], b.position[0]))
-        
-        for brick in sorted_bricks:
-            z = brick.position[2]
-            
-            # Nouvelle couche
-            if z != current_layer:
-                if layer_bricks:
-                    instructions.append({
-                        "layer": current_layer,
-                        "height": z * self.BRICK_HEIGHT,
-                        "bricks": layer_bricks,
-                        "stability_tips": self._generate_stability_tips(layer_bricks)
-                    })
-                current_layer = z
-                layer_bricks = []
-            
-            # Ajoute la brique à la couche courante
-            layer_bricks.append({
-                "position": brick.position[:2],  # x, y uniquement
-                "size": brick.size[:2],         # largeur, longueur
-                "height": brick.size[2],
-                "stability": brick.stability_score
-            })
-        
-        # Ajoute la dernière couche
-        if layer_bricks:
+        if not len(layout):
+            return instructions
+        
+        # Trie les briques par hauteur (z) croissante, puis y et x
+        data = layout.data
+        order = np.lexsort((data['x'], data['y'], data['z']))
+        data = data[order]
+        
+        # Découpe en couches contiguës
+        layers, starts = np.unique(data['z'], return_index=True)
+        ends = np.append(starts[1:], len(data))
+        
+        for z, start, end in zip(layers.tolist(), starts.tolist(), ends.tolist()):
+            rows = data[start:end]
+            layer_bricks = [
+                {
+                    "position": (x, y),  # x, y uniquement
+                    "size": (normalize_dimension(w), normalize_dimension(l)),  # largeur, longueur
+                    "height": normalize_dimension(h),
+                    "stability": stability
+                }
+                for x, y, w, l, h, stability in zip(
+                    rows['x'].tolist(), rows['y'].tolist(),
+                    rows['w'].tolist(), rows['l'].tolist(), rows['h'].tolist(),
+                    rows['stability'].tolist()
+                )
+            ]
             instructions.append({
-                "layer": current_layer,
-                "height": current_layer * self.BRICK_HEIGHT,
+                "layer": z,
+                "height": z * self.BRICK_HEIGHT,
                 "bricks": layer_bricks,
                 "stability_tips": self._generate_stability_tips(layer_bricks)
             })
@@ -350,7 +442,8 @@ class BlockyService:
 
     def _calculate_model_stats(self, bricks):
         """Calcule les statistiques du modèle."""
-        if not bricks:
+        layout = bricks if isinstance(bricks, BrickLayout) else BrickLayout.from_bricks(bricks)
+        if not len(layout):
             return {
                 "total_bricks": 0,
                 "dimensions": (0, 0, 0),
@@ -358,26 +451,11 @@ class BlockyService:
                 "brick_types": {}
             }
         
-        # Dimensions du modèle
-        max_x = max(b.position[0] + b.size[0] for b in bricks)
-        max_y = max(b.position[1] + b.size[1] for b in bricks)
-        max_z = max(b.position[2] + b.size[2] for b in bricks)
-        
-        # Compte des types de briques
-        brick_types = {}
-        for brick in bricks:
-            size_key = f"{brick.size[0]}x{brick.size[1]}x{brick.size[2]}"
-            brick_types[size_key] = brick_types.get(size_key, 0) + 1
-        
-        # Score de stabilité moyen
-        stability_scores = [b.stability_score for b in bricks]
-        avg_stability = sum(stability_scores) / len(stability_scores) if stability_scores else 0
-        
         return {
-            "total_bricks": len(bricks),
-            "dimensions": (max_x, max_y, max_z),
-            "stability_score": avg_stability,
-            "brick_types": brick_types
+            "total_bricks": len(layout),
+            "dimensions": layout.extents(),
+            "stability_score": float(layout.data['stability'].mean()),
+            "brick_types": layout.size_counts()
         }
 
     def _load_obj(self, path: str) -> trimesh.Trimesh:
@@ -0,0 +1,201 @@
+import logging
+import math
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+
+from .blocky_service import Brick
+
+logger = logging.getLogger(__name__)
+
+
+class LayerOccupancyIndex:
+    """
+    Index spatial des briques, couche par couche.
+
+    Chaque couche est une grille 2D qui stocke, pour chaque cellule, l'identifiant
+    de la brique qui l'occupe. La recherche des briques sous une empreinte coûte
+    donc un temps proportionnel à l'empreinte, et non au nombre de briques.
+
+    La couche d'une brique est choisie par l'appelant : sa base (position z)
+    pour l'empilement, ou son sommet (z + hauteur) pour le calcul du support.
+    """
+
+    EMPTY = -1
+
+    def __init__(self):
+        self._grids: Dict[Hashable, np.ndarray] = {}
+        # Cellules revendiquées par plusieurs briques qui se chevauchent
+        self._stacked: Dict[Hashable, Dict[Tuple[int, int], List[int]]] = {}
+        self._bricks: Dict[int, Brick] = {}
+        self._footprints: Dict[int, Tuple[Hashable, int, int, int, int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._bricks)
+
+    def add(self, brick: Brick, layer: Hashable) -> int:
+        """
+        Ajoute une brique à l'index.
+
+        Args:
+            brick: Brique à indexer
+            layer: Couche dans laquelle l'empreinte de la brique est enregistrée
+
+        Returns:
+            int: Identifiant de la brique dans l'index
+
+        Raises:
+            ValueError: Si la brique a une position négative
+        """
+        brick_id = self._next_id
+        self._next_id += 1
+
+        x0, y0, x1, y1 = self._cells(brick.position[0], brick.position[1], brick.size[0], brick.size[1])
+        if x0 < 0 or y0 < 0:
+            raise ValueError(f"Position de brique négative: {brick.position}")
+
+        self._bricks[brick_id] = brick
+        self._footprints[brick_id] = (layer, x0, y0, x1, y1)
+
+        if x1 <= x0 or y1 <= y0:
+            return brick_id
+
+        grid = self._grid_for(layer, y1, x1)
+        region = grid[y0:y1, x0:x1]
+        occupied = region != self.EMPTY
+
+        if occupied.any():
+            stacked = self._stacked.setdefault(layer, {})
+            for dy, dx in zip(*np.nonzero(occupied)):
+                stacked.setdefault((x0 + int(dx), y0 + int(dy)), []).append(brick_id)
+
+        region[~occupied] = brick_id
+        return brick_id
+
+    def remove(self, brick_id: int):
+        """
+        Retire une brique de l'index.
+
+        Args:
+            brick_id: Identifiant retourné par add
+        """
+        layer, x0, y0, x1, y1 = self._footprints.pop(brick_id)
+        del self._bricks[brick_id]
+
+        if x1 <= x0 or y1 <= y0:
+            return
+
+        grid = self._grids[layer]
+        region = grid[y0:y1, x0:x1]
+        stacked = self._stacked.get(layer)
+
+        if not stacked:
+            region[region == brick_id] = self.EMPTY
+            return
+
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                claims = stacked.get((x, y))
+                if grid[y, x] == brick_id:
+                    # Une brique empilée reprend la cellule
+                    grid[y, x] = claims.pop(0) if claims else self.EMPTY
+                elif claims and brick_id in claims:
+                    claims.remove(brick_id)
+                if claims is not None and not claims:
+                    del stacked[(x, y)]
+
+    def query_ids(self, layer: Hashable, x: float, y: float, width: float, length: float) -> List[int]:
+        """
+        Retourne les identifiants des briques qui recouvrent une empreinte.
+
+        Args:
+            layer: Couche interrogée
+            x, y: Position de l'empreinte
+            width, length: Dimensions de l'empreinte
+
+        Returns:
+            List[int]: Identifiants triés par ordre d'insertion
+        """
+        grid = self._grids.get(layer)
+        if grid is None:
+            return []
+
+        x0, y0, x1, y1 = self._cells(x, y, width, length)
+        x0, y0 = max(0, x0), max(0, y0)
+        region = grid[y0:y1, x0:x1]
+        occupied = region != self.EMPTY
+        ids = set(np.unique(region[occupied]).tolist())
+
+        # Seules les cellules occupées de l'empreinte peuvent être revendiquées par plusieurs briques
+        stacked = self._stacked.get(layer)
+        if stacked:
+            for dy, dx in zip(*np.nonzero(occupied)):
+                claims = stacked.get((x0 + int(dx), y0 + int(dy)))
+                if claims:
+                    ids.update(claims)
+
+        return sorted(ids)
+
+    def query(self, layer: Hashable, x: float, y: float, width: float, length: float) -> List[Brick]:
+        """
+        Retourne les briques qui recouvrent une empreinte.
+
+        Args:
+            layer: Couche interrogée
+            x, y: Position de l'empreinte
+            width, length: Dimensions de l'empreinte
+
+        Returns:
+            List[Brick]: Briques triées par ordre d'insertion
+        """
+        return [self._bricks[brick_id] for brick_id in self.query_ids(layer, x, y, width, length)]
+
+    def bricks_under(self, brick: Brick, layer: Hashable) -> List[Brick]:
+        """
+        Retourne les briques d'une couche situées sous l'empreinte d'une brique.
+
+        Args:
+            brick: Brique dont on cherche les supports
+            layer: Couche interrogée
+
+        Returns:
+            List[Brick]: Briques triées par ordre d'insertion
+        """
+        x, y, _ = brick.position
+        w, l, _ = brick.size
+        return self.query(layer, x, y, w, l)
+
+    def get(self, brick_id: int) -> Brick:
+        """Retourne la brique associée à un identifiant."""
+        return self._bricks[brick_id]
+
+    @staticmethod
+    def _cells(x: float, y: float, width: float, length: float) -> Tuple[int, int, int, int]:
+        """Cellules de la grille couvertes par une empreinte."""
+        return (
+            int(math.floor(x)),
+            int(math.floor(y)),
+            int(math.ceil(x + width)),
+            int(math.ceil(y + length))
+        )
+
+    def _grid_for(self, layer: Hashable, height: int, width: int) -> np.ndarray:
+        """Retourne la grille d'une couche, agrandie si nécessaire."""
+        grid = self._grids.get(layer)
+        if grid is not None and grid.shape[0] >= height and grid.shape[1] >= width:
+            return grid
+
+        if grid is None:
+            new_shape = (height, width)
+        else:
+            new_shape = (
+                max(height, grid.shape[0] * 2 if height > grid.shape[0] else grid.shape[0]),
+                max(width, grid.shape[1] * 2 if width > grid.shape[1] else grid.shape[1])
+            )
+
+        new_grid = np.full(new_shape, self.EMPTY, dtype=np.int64)
+        if grid is not None:
+            new_grid[:grid.shape[0], :grid.shape[1]] = grid
+        self._grids[layer] = new_grid
+        return new_grid
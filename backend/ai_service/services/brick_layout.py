@@ -0,0 +1,411 @@
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Une ligne par brique : ~70 octets au lieu d'un objet Python et de ses tuples.
+# Les scores restent en float64 pour être restitués tels qu'ils ont été calculés.
+BRICK_DTYPE = np.dtype([
+    ('x', np.int32), ('y', np.int32), ('z', np.int32),
+    ('w', np.float32), ('l', np.float32), ('h', np.float32),
+    ('color', np.int32),            # Index dans la palette, -1 sans couleur
+    ('stability', np.float64),
+    ('connection', np.float64),
+    ('learning', np.float64),
+    ('lego', np.float64),
+    ('bricklink', np.float64),
+    ('manufacturer', np.uint8),     # Index dans MANUFACTURERS
+    ('format', np.uint8),           # Index dans la table des formats de la disposition
+])
+
+MANUFACTURERS = ('', 'lego', 'bricklink')
+
+# Attributs de Brick (et ceux ajoutés par BlockyOptimizer) -> colonnes
+_SCORE_COLUMNS = {
+    'stability_score': 'stability',
+    'connection_score': 'connection',
+    'learning_score': 'learning',
+    'lego_score': 'lego',
+    'bricklink_score': 'bricklink',
+}
+
+
+def normalize_dimension(value) -> float:
+    """Convertit une dimension en entier Python si elle est entière (1.0 -> 1, 0.5 -> 0.5)."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class BrickView:
+    """
+    Vue sur une ligne d'une BrickLayout, compatible avec Brick.
+
+    Les lectures et écritures d'attributs passent directement par les colonnes
+    de la disposition ; aucune donnée n'est copiée.
+    """
+
+    __slots__ = ('_layout', '_row')
+
+    def __init__(self, layout: 'BrickLayout', row: int):
+        object.__setattr__(self, '_layout', layout)
+        object.__setattr__(self, '_row', row)
+
+    def _record(self):
+        return self._layout._data[self._row]
+
+    @property
+    def position(self) -> Tuple[int, int, int]:
+        record = self._record()
+        return (int(record['x']), int(record['y']), int(record['z']))
+
+    @position.setter
+    def position(self, value):
+        record = self._record()
+        record['x'], record['y'], record['z'] = value
+
+    @property
+    def size(self) -> Tuple[float, float, float]:
+        record = self._record()
+        return (normalize_dimension(record['w']), normalize_dimension(record['l']), normalize_dimension(record['h']))
+
+    @size.setter
+    def size(self, value):
+        record = self._record()
+        record['w'], record['l'], record['h'] = value
+
+    @property
+    def color(self) -> Optional[Tuple[float, float, float]]:
+        return self._layout.color_of(int(self._record()['color']))
+
+    @color.setter
+    def color(self, value):
+        self._record()['color'] = self._layout.color_index(value) if value is not None else -1
+
+    @property
+    def manufacturer(self) -> str:
+        return MANUFACTURERS[self._record()['manufacturer']]
+
+    @manufacturer.setter
+    def manufacturer(self, value):
+        self._record()['manufacturer'] = MANUFACTURERS.index(value or '')
+
+    @property
+    def brick_format(self) -> str:
+        return self._layout.formats[self._record()['format']]
+
+    @brick_format.setter
+    def brick_format(self, value):
+        self._record()['format'] = self._layout.format_index(value)
+
+    def __getattr__(self, name):
+        column = _SCORE_COLUMNS.get(name)
+        if column is None:
+            raise AttributeError(name)
+        return float(self._layout._data[self._row][column])
+
+    def __setattr__(self, name, value):
+        column = _SCORE_COLUMNS.get(name)
+        if column is not None:
+            self._layout._data[self._row][column] = value
+        else:
+            object.__setattr__(self, name, value)
+
+    def __eq__(self, other):
+        if isinstance(other, BrickView):
+            return self._layout is other._layout and self._row == other._row
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._layout), self._row))
+
+    def __repr__(self):
+        return f"BrickView(position={self.position}, size={self.size}, stability_score={self.stability_score:.3f})"
+
+
+class BrickLayout:
+    """
+    Disposition de briques stockée dans un tableau structuré NumPy.
+
+    Chaque brique est une ligne de BRICK_DTYPE : position, taille, index de
+    couleur, scores, fabricant et format. Les traitements de masse (filtre
+    par couche, surfaces, chevauchements) se font sur les colonnes ; l'itération
+    et l'indexation retournent des BrickView compatibles avec Brick.
+    """
+
+    def __init__(self, capacity: int = 0, palette: Optional[Sequence[Tuple[float, float, float]]] = None,
+                 formats: Optional[Sequence[str]] = None):
+        """
+        Initialise une disposition vide.
+
+        Args:
+            capacity: Nombre de briques pré-alloué
+            palette: Couleurs RGB référencées par la colonne color
+            formats: Formats de briques référencés par la colonne format
+        """
+        self._data = np.zeros(max(capacity, 0), dtype=BRICK_DTYPE)
+        self._size = 0
+        self.palette: List[Tuple[float, float, float]] = []
+        self._palette_index: Dict[Tuple[float, float, float], int] = {}
+        for color in palette or ():
+            self.color_index(color)
+        self.formats: List[str] = ['']
+        for name in formats or ():
+            self.format_index(name)
+
+    @classmethod
+    def from_bricks(cls, bricks: Iterable, palette: Optional[Sequence[Tuple[float, float, float]]] = None) -> 'BrickLayout':
+        """
+        Construit une disposition à partir d'objets Brick (ou de vues).
+
+        Args:
+            bricks: Briques à copier
+            palette: Palette initiale
+
+        Returns:
+            BrickLayout: Nouvelle disposition
+        """
+        if isinstance(bricks, BrickLayout):
+            return bricks.copy()
+
+        bricks = list(bricks)
+        if bricks and palette is None and all(isinstance(b, BrickView) for b in bricks):
+            sources = {id(b._layout) for b in bricks}
+            if len(sources) == 1:
+                # Vues d'une même disposition : simple sélection de lignes
+                return bricks[0]._layout.select([b._row for b in bricks])
+
+        layout = cls(len(bricks), palette=palette)
+        layout._size = len(bricks)
+        if not bricks:
+            return layout
+
+        # Remplissage colonne par colonne : une seule conversion par champ
+        data = layout._data
+        data['x'], data['y'], data['z'] = np.array([b.position for b in bricks], dtype=np.int32).T
+        data['w'], data['l'], data['h'] = np.array([b.size for b in bricks], dtype=np.float32).T
+        data['color'] = [
+            layout.color_index(color) if color is not None else -1
+            for color in (getattr(b, 'color', None) for b in bricks)
+        ]
+        for attribute, column in _SCORE_COLUMNS.items():
+            data[column] = [getattr(b, attribute, 0.0) for b in bricks]
+        data['manufacturer'] = [MANUFACTURERS.index(getattr(b, 'manufacturer', '') or '') for b in bricks]
+        data['format'] = [layout.format_index(getattr(b, 'brick_format', '')) for b in bricks]
+        return layout
+
+    @property
+    def data(self) -> np.ndarray:
+        """Lignes utilisées du tableau structuré."""
+        return self._data[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[BrickView]:
+        for row in range(self._size):
+            yield BrickView(self, row)
+
+    def __getitem__(self, row: int) -> BrickView:
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError(row)
+        return BrickView(self, row)
+
+    def append(self, brick) -> BrickView:
+        """
+        Ajoute une brique en fin de disposition.
+
+        Args:
+            brick: Objet exposant position et size, et éventuellement scores, couleur, fabricant et format
+
+        Returns:
+            BrickView: Vue sur la brique ajoutée
+        """
+        if self._size == len(self._data):
+            self._grow(max(16, 2 * len(self._data)))
+
+        record = self._data[self._size]
+        record['x'], record['y'], record['z'] = brick.position
+        record['w'], record['l'], record['h'] = brick.size
+        color = getattr(brick, 'color', None)
+        record['color'] = self.color_index(color) if color is not None else -1
+        for attribute, column in _SCORE_COLUMNS.items():
+            record[column] = getattr(brick, attribute, 0.0)
+        record['manufacturer'] = MANUFACTURERS.index(getattr(brick, 'manufacturer', '') or '')
+        record['format'] = self.format_index(getattr(brick, 'brick_format', ''))
+
+        self._size += 1
+        return BrickView(self, self._size - 1)
+
+    def extend(self, bricks: Iterable):
+        """Ajoute plusieurs briques."""
+        for brick in bricks:
+            self.append(brick)
+
+    def copy(self) -> 'BrickLayout':
+        """Copie indépendante de la disposition."""
+        return self.select(np.ones(self._size, dtype=bool))
+
+    def select(self, mask: np.ndarray) -> 'BrickLayout':
+        """
+        Retourne une nouvelle disposition avec les lignes sélectionnées.
+
+        Args:
+            mask: Masque booléen ou tableau d'indices
+
+        Returns:
+            BrickLayout: Disposition partageant la palette et les formats
+        """
+        rows = self.data[mask]
+        layout = BrickLayout(0)
+        layout._data = rows.copy()
+        layout._size = len(rows)
+        layout.palette = list(self.palette)
+        layout._palette_index = dict(self._palette_index)
+        layout.formats = list(self.formats)
+        return layout
+
+    def to_bricks(self) -> List:
+        """Convertit la disposition en objets Brick."""
+        from .blocky_service import Brick
+
+        bricks = []
+        for view in self:
+            brick = Brick(position=view.position, size=view.size, color=view.color)
+            # Tous les scores, y compris ceux ajoutés par BlockyOptimizer
+            for attribute in _SCORE_COLUMNS:
+                setattr(brick, attribute, getattr(view, attribute))
+            brick.manufacturer = view.manufacturer
+            brick.brick_format = view.brick_format
+            bricks.append(brick)
+        return bricks
+
+    def to_records(self) -> List[Dict]:
+        """Convertit la disposition en dictionnaires sérialisables en JSON."""
+        return [
+            {
+                "position": [int(v) for v in view.position],
+                "size": [float(v) for v in view.size],
+                "color": [float(v) for v in view.color] if view.color is not None else None,
+                "stability_score": float(view.stability_score)
+            }
+            for view in self
+        ]
+
+    # Colonnes ------------------------------------------------------------
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Positions (N, 3) en int32."""
+        data = self.data
+        return np.stack([data['x'], data['y'], data['z']], axis=1)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """Tailles (N, 3) en float32."""
+        data = self.data
+        return np.stack([data['w'], data['l'], data['h']], axis=1)
+
+    def areas(self) -> np.ndarray:
+        """Surface au sol de chaque brique."""
+        data = self.data
+        return data['w'] * data['l']
+
+    def volumes(self) -> np.ndarray:
+        """Volume de chaque brique."""
+        data = self.data
+        return data['w'] * data['l'] * data['h']
+
+    def layers(self) -> np.ndarray:
+        """Couches (z) distinctes, triées."""
+        return np.unique(self.data['z'])
+
+    def layer_mask(self, z: int) -> np.ndarray:
+        """Masque des briques posées sur la couche z."""
+        return self.data['z'] == z
+
+    def layer(self, z: int) -> 'BrickLayout':
+        """Briques posées sur la couche z."""
+        return self.select(self.layer_mask(z))
+
+    def overlap_mask(self, x: float, y: float, width: float, length: float,
+                     z: Optional[int] = None) -> np.ndarray:
+        """
+        Masque des briques dont l'empreinte recoupe un rectangle.
+
+        Args:
+            x, y: Position du rectangle
+            width, length: Dimensions du rectangle
+            z: Si fourni, limite la recherche à cette couche
+
+        Returns:
+            np.ndarray: Masque booléen de longueur N
+        """
+        return self.overlap_areas(x, y, width, length, z) > 0
+
+    def overlap_areas(self, x: float, y: float, width: float, length: float,
+                      z: Optional[int] = None) -> np.ndarray:
+        """Surface de recouvrement de chaque brique avec un rectangle."""
+        data = self.data
+        overlap_x = np.clip(np.minimum(data['x'] + data['w'], x + width) - np.maximum(data['x'], x), 0, None)
+        overlap_y = np.clip(np.minimum(data['y'] + data['l'], y + length) - np.maximum(data['y'], y), 0, None)
+        areas = overlap_x * overlap_y
+        if z is not None:
+            areas = np.where(data['z'] == z, areas, 0)
+        return areas
+
+    def extents(self) -> Tuple[float, float, float]:
+        """Dimensions de la boîte englobante depuis l'origine (max x+w, y+l, z+h)."""
+        if not self._size:
+            return (0, 0, 0)
+        data = self.data
+        return (
+            normalize_dimension((data['x'] + data['w']).max()),
+            normalize_dimension((data['y'] + data['l']).max()),
+            normalize_dimension((data['z'] + data['h']).max())
+        )
+
+    def size_counts(self) -> Dict[str, int]:
+        """Nombre de briques par taille, clé 'LxlxH'."""
+        if not self._size:
+            return {}
+        sizes, counts = np.unique(self.sizes, axis=0, return_counts=True)
+        return {
+            f"{normalize_dimension(w)}x{normalize_dimension(l)}x{normalize_dimension(h)}": int(count)
+            for (w, l, h), count in zip(sizes, counts)
+        }
+
+    # Tables --------------------------------------------------------------
+
+    def color_index(self, color) -> int:
+        """Index d'une couleur dans la palette, ajoutée si nécessaire."""
+        key = tuple(float(c) for c in color)
+        index = self._palette_index.get(key)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(key)
+            self._palette_index[key] = index
+        return index
+
+    def color_of(self, index: int) -> Optional[Tuple[float, float, float]]:
+        """Couleur RGB associée à un index de palette, None pour une brique sans couleur (-1)."""
+        return self.palette[index] if index >= 0 else None
+
+    def format_index(self, name: Optional[str]) -> int:
+        """Index d'un format de brique, ajouté si nécessaire."""
+        name = name or ''
+        try:
+            return self.formats.index(name)
+        except ValueError:
+            if len(self.formats) > np.iinfo(np.uint8).max:
+                raise ValueError(f"Trop de formats de briques distincts: {name}")
+            self.formats.append(name)
+            return len(self.formats) - 1
+
+    def _grow(self, capacity: int):
+        data = np.zeros(capacity, dtype=BRICK_DTYPE)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
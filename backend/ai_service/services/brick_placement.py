@@ -0,0 +1,173 @@
+import logging
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .blocky_service import Brick
+
+logger = logging.getLogger(__name__)
+
+
+class BrickPlacementEngine:
+    """
+    Placement glouton des briques sur une grille de voxels.
+
+    Produit la même disposition que l'ancien parcours couche par couche de
+    BlockyOptimizer._generate_initial_layout. Au début de chaque couche, un
+    volume intégral (somme préfixe 3D) des voxels pleins et non visités donne
+    en une passe vectorisée les tailles qui tiennent à chaque ancre ; le
+    parcours glouton n'a plus qu'à consulter ce résultat.
+    """
+
+    def __init__(self, brick_sizes: Sequence[Tuple[float, float, float]]):
+        """
+        Initialise le moteur de placement.
+
+        Args:
+            brick_sizes: Tailles de briques disponibles (largeur, longueur, hauteur)
+        """
+        # Même ordre de préférence que l'ancien parcours : volume décroissant
+        self.sizes = sorted(brick_sizes, key=lambda s: s[0] * s[1] * s[2], reverse=True)
+        self._volumes = [s[0] * s[1] * s[2] for s in self.sizes]
+        # Empreinte en voxels de chaque taille (les plaques occupent un voxel)
+        self._extents = [tuple(int(math.ceil(d)) for d in s) for s in self.sizes]
+        self._max_height = max((e[2] for e in self._extents), default=1)
+
+    def place(self, voxels: np.ndarray) -> List[Brick]:
+        """
+        Place les briques sur une grille de voxels.
+
+        Args:
+            voxels: Grille booléenne indexée en [z, y, x]
+
+        Returns:
+            Liste des briques placées, dans l'ordre de parcours
+        """
+        voxels = np.asarray(voxels, dtype=bool)
+        depth, height, width = voxels.shape
+        visited = np.zeros_like(voxels)
+        bricks = []
+
+        if not self.sizes:
+            return bricks
+
+        for z in range(depth):
+            # Voxels pleins et encore libres dans la tranche de couches concernée
+            free = voxels[z:z + self._max_height] & ~visited[z:z + self._max_height]
+            if not free[0].any():
+                continue
+
+            scores, stabilities, fits = self._layer_candidates(voxels, free, z)
+            # Ordre de préférence par ancre : score décroissant, puis ordre des tailles
+            order = np.argsort(-scores, axis=0, kind="stable")
+
+            ys, xs = np.nonzero(free[0])
+            for y, x in zip(ys.tolist(), xs.tolist()):
+                if visited[z, y, x]:
+                    continue
+
+                best = self._best_fit(order[:, y, x], scores[:, y, x], fits[:, y, x], visited[z], x, y)
+                if best is None:
+                    continue
+
+                w, l, h = self._extents[best]
+                bricks.append(Brick(
+                    position=(x, y, z),
+                    size=self.sizes[best],
+                    stability_score=float(stabilities[best, y, x])
+                ))
+
+                visited[z:z + h, y:y + l, x:x + w] = True
+
+        return bricks
+
+    def _layer_candidates(self, voxels: np.ndarray, free: np.ndarray,
+                          z: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcule, pour toutes les ancres d'une couche, les tailles qui tiennent et leur score.
+
+        Args:
+            voxels: Grille de voxels complète
+            free: Voxels pleins et libres des couches z à z + hauteur max
+            z: Couche courante
+
+        Returns:
+            Tuple (scores, stabilités, tailles possibles), de forme (tailles, y, x)
+        """
+        slab_depth, height, width = free.shape
+        integral = self._integral_volume(free)
+        support = self._integral_area(voxels[z - 1]) if z > 0 else None
+
+        scores = np.full((len(self.sizes), height, width), -np.inf)
+        stabilities = np.ones((len(self.sizes), height, width))
+        fits = np.zeros((len(self.sizes), height, width), dtype=bool)
+
+        for i, (w, l, h) in enumerate(self._extents):
+            if h > slab_depth or l > height or w > width:
+                continue
+
+            anchors = (slice(0, height - l + 1), slice(0, width - w + 1))
+            fit = self._box_sums(integral, h, l, w) == w * l * h
+            fits[i][anchors] = fit
+
+            # Même calcul que l'ancien parcours glouton : voxels supports / surface
+            if support is not None:
+                size = self.sizes[i]
+                stabilities[i][anchors] = self._area_sums(support, l, w) / (size[0] * size[1])
+            scores[i][anchors] = np.where(fit, self._volumes[i] * stabilities[i][anchors], -np.inf)
+
+        return scores, stabilities, fits
+
+    def _best_fit(self, order: np.ndarray, scores: np.ndarray, fits: np.ndarray,
+                  taken: np.ndarray, x: int, y: int) -> Optional[int]:
+        """
+        Retourne la meilleure taille qui tient encore à une ancre.
+
+        Les tailles possibles ont été calculées en début de couche ; depuis,
+        seules les briques placées dans cette même couche ont pu consommer des
+        voxels. Comme elles commencent toutes à la hauteur z, il suffit de
+        vérifier que l'empreinte au sol ne recoupe pas la couche occupée.
+        """
+        for index in order.tolist():
+            if scores[index] == -np.inf:
+                return None
+            w, l, _ = self._extents[index]
+            if fits[index] and not taken[y:y + l, x:x + w].any():
+                return index
+        return None
+
+    @staticmethod
+    def _integral_volume(cells: np.ndarray) -> np.ndarray:
+        """Somme préfixe 3D avec une bordure nulle."""
+        depth, height, width = cells.shape
+        integral = np.zeros((depth + 1, height + 1, width + 1), dtype=np.int32)
+        integral[1:, 1:, 1:] = cells.cumsum(axis=0, dtype=np.int32).cumsum(axis=1).cumsum(axis=2)
+        return integral
+
+    @staticmethod
+    def _integral_area(cells: np.ndarray) -> np.ndarray:
+        """Somme préfixe 2D avec une bordure nulle."""
+        height, width = cells.shape
+        integral = np.zeros((height + 1, width + 1), dtype=np.int32)
+        integral[1:, 1:] = cells.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+        return integral
+
+    @staticmethod
+    def _box_sums(integral: np.ndarray, h: int, l: int, w: int) -> np.ndarray:
+        """Somme des boîtes (h, l, w) ancrées en chaque (y, x) de la couche 0."""
+        y1, x1 = slice(l, None), slice(w, None)
+        y0 = slice(0, integral.shape[1] - l)
+        x0 = slice(0, integral.shape[2] - w)
+        return (integral[h, y1, x1] - integral[0, y1, x1]
+                - integral[h, y0, x1] + integral[0, y0, x1]
+                - integral[h, y1, x0] + integral[0, y1, x0]
+                + integral[h, y0, x0] - integral[0, y0, x0])
+
+    @staticmethod
+    def _area_sums(integral: np.ndarray, l: int, w: int) -> np.ndarray:
+        """Somme des rectangles (l, w) ancrés en chaque (y, x)."""
+        y1, x1 = slice(l, None), slice(w, None)
+        y0 = slice(0, integral.shape[0] - l)
+        x0 = slice(0, integral.shape[1] - w)
+        return integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
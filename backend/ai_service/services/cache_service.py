@@ -1,163 +1,455 @@
+import asyncio
 import logging
 import json
 import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from datetime import datetime
 import aiofiles
 import aiofiles.os
 
+from utils.upload_stream import hash_file
+
 logger = logging.getLogger(__name__)
 
 class CacheService:
-    def __init__(self, cache_dir: Path, max_age_days: int = 30):
+    """
+    Cache des résultats de conversion à deux niveaux.
+
+    - Mémoire : LRU borné en octets, devant le disque.
+    - Disque : un fichier JSON par entrée, borné en octets ; les entrées les
+      moins récemment utilisées sont évincées en premier.
+
+    L'index des entrées est une base SQLite : chaque écriture ne touche que la
+    ligne concernée. Les calculs concurrents d'une même clé sont regroupés
+    (get_or_compute) : un seul calcul, attendu par tous les appelants.
+    """
+
+    def __init__(self, cache_dir: Path, max_age_days: int = 30,
+                 max_disk_mb: int = 2048, max_memory_mb: int = 64):
+        """
+        Initialise le cache.
+
+        Args:
+            cache_dir: Répertoire du cache
+            max_age_days: Âge maximal d'une entrée
+            max_disk_mb: Budget disque des résultats
+            max_memory_mb: Budget du cache mémoire
+        """
         self.cache_dir = cache_dir
         self.max_age_days = max_age_days
+        self.max_disk_bytes = max_disk_mb * 1024 * 1024
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Niveau mémoire : clé -> (résultat, taille sérialisée)
+        self._memory: "OrderedDict[str, Tuple[Dict, int]]" = OrderedDict()
+        self._memory_bytes = 0
+
+        # Calculs en cours, partagés entre appelants concurrents
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.index_file = self.cache_dir / "cache_index.sqlite3"
         self.metadata_file = self.cache_dir / "cache_metadata.json"
-        self.metadata: Dict[str, Dict] = {}
-        self._load_metadata()
-        
-    def _load_metadata(self):
-        """Charge les métadonnées du cache."""
-        try:
-            if self.metadata_file.exists():
-                with open(self.metadata_file, 'r') as f:
-                    self.metadata = json.load(f)
-            else:
-                self.metadata = {}
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement des métadonnées: {str(e)}")
-            self.metadata = {}
-            
-    async def _save_metadata(self):
-        """Sauvegarde les métadonnées du cache."""
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.index_file), check_same_thread=False)
+        self._init_index()
+        self._migrate_metadata()
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()[0]
+
+    def _init_index(self):
+        """Crée l'index SQLite si nécessaire."""
+        with self._db_lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    size_bytes INTEGER NOT NULL,
+                    info TEXT NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+
+    def _migrate_metadata(self):
+        """Importe l'ancien index cache_metadata.json dans SQLite."""
+        if not self.metadata_file.exists():
+            return
+
         try:
-            async with aiofiles.open(self.metadata_file, 'w') as f:
-                await f.write(json.dumps(self.metadata, indent=2))
+            with open(self.metadata_file, 'r') as f:
+                metadata = json.load(f)
+
+            rows = []
+            for key, info in metadata.items():
+                cache_file = self.cache_dir / f"{key}.json"
+                if not cache_file.exists():
+                    continue
+                created_at = datetime.fromisoformat(info.pop('created_at')).timestamp()
+                rows.append((key, created_at, created_at, cache_file.stat().st_size, json.dumps(info)))
+
+            with self._db_lock, self._db:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO entries (key, created_at, last_access, size_bytes, info) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+            self.metadata_file.rename(self.metadata_file.with_suffix(".json.migrated"))
+            logger.info(f"{len(rows)} entrées de cache migrées vers {self.index_file}")
         except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde des métadonnées: {str(e)}")
-            
-    def _compute_hash(self, file_path: Path, model_params: Dict[str, Any]) -> str:
-        """Calcule un hash unique pour un modèle et ses paramètres."""
+            logger.error(f"Erreur lors de la migration des métadonnées: {str(e)}")
+
+    @staticmethod
+    def compute_content_hash(file_path: Path) -> str:
+        """
+        Calcule l'empreinte SHA-256 du contenu d'un fichier.
+
+        Lecture par projection mémoire et grands blocs : à appeler dans un
+        thread, jamais directement sur la boucle d'événements.
+
+        Args:
+            file_path: Chemin du fichier
+
+        Returns:
+            L'empreinte hexadécimale du contenu
+        """
+        return hash_file(file_path)
+
+    @staticmethod
+    def make_key(content_hash: str, model_params: Dict[str, Any]) -> str:
+        """
+        Construit la clé de cache d'un contenu et de ses paramètres.
+
+        Args:
+            content_hash: Empreinte du contenu du fichier modèle
+            model_params: Paramètres de conversion
+
+        Returns:
+            La clé de cache
+        """
         hasher = hashlib.sha256()
-        
-        # Hash du contenu du fichier
-        with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
-                hasher.update(chunk)
-                
-        # Hash des paramètres
-        params_str = json.dumps(model_params, sort_keys=True)
-        hasher.update(params_str.encode())
-        
+        hasher.update(content_hash.encode())
+        hasher.update(json.dumps(model_params, sort_keys=True).encode())
         return hasher.hexdigest()
-        
-    async def get_cached_result(self, 
-                              file_path: Path, 
-                              model_params: Dict[str, Any]) -> Optional[Dict]:
+
+    async def _compute_hash(self, file_path: Path, model_params: Dict[str, Any],
+                            content_hash: Optional[str] = None) -> str:
         """
-        Récupère un résultat en cache.
-        
+        Calcule un hash unique pour un modèle et ses paramètres.
+
+        Le fichier n'est relu que si l'empreinte de son contenu n'est pas fournie.
+        """
+        if content_hash is None:
+            content_hash = await asyncio.to_thread(self.compute_content_hash, file_path)
+        return self.make_key(content_hash, model_params)
+
+    def entry_info(self, cache_key: str) -> Optional[Dict]:
+        """Retourne les métadonnées d'une entrée, ou None si elle n'existe pas."""
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT created_at, hits, size_bytes, info FROM entries WHERE key = ?", (cache_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        created_at, hits, size_bytes, info = row
+        return {
+            'created_at': datetime.fromtimestamp(created_at).isoformat(),
+            'hits': hits,
+            'size_bytes': size_bytes,
+            **json.loads(info)
+        }
+
+    async def get(self, cache_key: str) -> Optional[Dict]:
+        """
+        Récupère un résultat en cache par sa clé.
+
+        Le résultat retourné par le niveau mémoire est partagé : il ne doit pas
+        être modifié par l'appelant.
+
         Args:
-            file_path: Chemin du fichier modèle
-            model_params: Paramètres de conversion
-            
+            cache_key: Clé construite par make_key
+
         Returns:
             Le résultat en cache ou None si non trouvé
         """
-        cache_key = self._compute_hash(file_path, model_params)
-        
-        if cache_key not in self.metadata:
+        with self._db_lock:
+            row = self._db.execute("SELECT created_at FROM entries WHERE key = ?", (cache_key,)).fetchone()
+        if row is None:
+            self._memory_discard(cache_key)
             return None
-            
-        cache_info = self.metadata[cache_key]
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        
+
         # Vérifie si le cache est expiré
-        created_at = datetime.fromisoformat(cache_info['created_at'])
-        if datetime.now() - created_at > timedelta(days=self.max_age_days):
+        if time.time() - row[0] > self.max_age_days * 86400:
             await self._remove_cache_entry(cache_key)
             return None
-            
-        # Charge le résultat
+
+        self._touch(cache_key)
+
+        cached = self._memory.get(cache_key)
+        if cached is not None:
+            self._memory.move_to_end(cache_key)
+            return cached[0]
+
+        # Charge le résultat depuis le disque
+        cache_file = self.cache_dir / f"{cache_key}.json"
         try:
-            if await aiofiles.os.path.exists(cache_file):
-                async with aiofiles.open(cache_file, 'r') as f:
-                    content = await f.read()
-                    return json.loads(content)
+            async with aiofiles.open(cache_file, 'r') as f:
+                content = await f.read()
+            result = json.loads(content)
+        except FileNotFoundError:
+            await self._remove_cache_entry(cache_key)
+            return None
         except Exception as e:
             logger.error(f"Erreur lors de la lecture du cache: {str(e)}")
             return None
-            
-        return None
-        
-    async def save_result(self, 
-                         file_path: Path, 
-                         model_params: Dict[str, Any], 
-                         result: Dict):
+
+        self._memory_put(cache_key, result, len(content))
+        return result
+
+    async def set(self, cache_key: str, result: Dict, info: Optional[Dict[str, Any]] = None):
         """
-        Sauvegarde un résultat dans le cache.
-        
+        Sauvegarde un résultat dans le cache sous une clé.
+
         Args:
-            file_path: Chemin du fichier modèle
-            model_params: Paramètres de conversion
+            cache_key: Clé construite par make_key
             result: Résultat à mettre en cache
+            info: Métadonnées supplémentaires de l'entrée
         """
-        cache_key = self._compute_hash(file_path, model_params)
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        
         try:
-            # Sauvegarde le résultat
-            async with aiofiles.open(cache_file, 'w') as f:
-                await f.write(json.dumps(result, indent=2))
-                
-            # Met à jour les métadonnées
-            self.metadata[cache_key] = {
-                'created_at': datetime.now().isoformat(),
-                'file_name': file_path.name,
-                'params': model_params
-            }
-            
-            await self._save_metadata()
-            
+            # Sérialisation, écriture et index hors de la boucle d'événements
+            size, previous = await asyncio.to_thread(self._store, cache_key, result, info)
+            self._disk_bytes += size - previous
+
+            self._memory_put(cache_key, result, size)
+            await self._evict_disk()
+
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde dans le cache: {str(e)}")
-            
+
+    def _store(self, cache_key: str, result: Dict, info: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Écrit un résultat sur disque et l'enregistre dans l'index.
+
+        Le fichier est écrit à côté puis renommé : une lecture concurrente, ou
+        une écriture interrompue, ne laisse jamais un fichier tronqué sous la clé.
+
+        Returns:
+            Tuple[int, int]: Taille du fichier écrit et taille de l'entrée remplacée (0 sinon)
+        """
+        content = json.dumps(result).encode()
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{cache_key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, cache_file)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        now = time.time()
+        with self._db_lock, self._db:
+            previous = self._db.execute("SELECT size_bytes FROM entries WHERE key = ?", (cache_key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, created_at, last_access, hits, size_bytes, info) "
+                "VALUES (?, ?, ?, 0, ?, ?)",
+                (cache_key, now, now, len(content), json.dumps(info or {}))
+            )
+        return len(content), previous[0] if previous else 0
+
+    async def get_or_compute(self, cache_key: str, compute: Callable[[], Awaitable[Dict]],
+                             info: Optional[Dict[str, Any]] = None) -> Dict:
+        """
+        Retourne le résultat en cache, ou le calcule une seule fois.
+
+        Les appels concurrents pour une même clé attendent le calcul en cours
+        au lieu d'en lancer un nouveau.
+
+        Args:
+            cache_key: Clé construite par make_key
+            compute: Coroutine qui produit le résultat
+            info: Métadonnées de l'entrée, lues après le calcul
+
+        Returns:
+            Le résultat
+        """
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        result = await self.get(cache_key)
+        if result is not None:
+            return result
+
+        # Un autre appelant a pu lancer le calcul pendant la lecture
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        # Le calcul tourne dans sa propre tâche : l'annulation d'un appelant,
+        # y compris celui qui l'a lancé, n'interrompt pas les autres
+        task = asyncio.create_task(self._compute_and_store(cache_key, compute, info))
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda done: self._computed(cache_key, done))
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(self, cache_key: str, compute: Callable[[], Awaitable[Dict]],
+                                 info: Optional[Dict[str, Any]]) -> Dict:
+        """Calcule le résultat et le met en cache."""
+        result = await compute()
+        await self.set(cache_key, result, info)
+        return result
+
+    def _computed(self, cache_key: str, task: asyncio.Task):
+        """Retire un calcul terminé des calculs en cours."""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        # Évite l'avertissement si aucun appelant n'attendait plus le calcul
+        if not task.cancelled():
+            task.exception()
+
+    def is_computing(self, cache_key: str) -> bool:
+        """Indique si un calcul est en cours pour une clé."""
+        return cache_key in self._inflight
+
+    async def get_cached_result(self,
+                              file_path: Path,
+                              model_params: Dict[str, Any],
+                              content_hash: Optional[str] = None) -> Optional[Dict]:
+        """
+        Récupère un résultat en cache.
+
+        Args:
+            file_path: Chemin du fichier modèle
+            model_params: Paramètres de conversion
+            content_hash: Empreinte du fichier calculée pendant la réception, si disponible
+
+        Returns:
+            Le résultat en cache ou None si non trouvé
+        """
+        return await self.get(await self._compute_hash(file_path, model_params, content_hash))
+
+    async def save_result(self,
+                         file_path: Path,
+                         model_params: Dict[str, Any],
+                         result: Dict,
+                         content_hash: Optional[str] = None):
+        """
+        Sauvegarde un résultat dans le cache.
+
+        Args:
+            file_path: Chemin du fichier modèle
+            model_params: Paramètres de conversion
+            result: Résultat à mettre en cache
+            content_hash: Empreinte du fichier calculée pendant la réception, si disponible
+        """
+        await self.set(
+            await self._compute_hash(file_path, model_params, content_hash),
+            result,
+            {'file_name': file_path.name, 'params': model_params}
+        )
+
     async def _remove_cache_entry(self, cache_key: str):
         """Supprime une entrée du cache."""
         try:
+            self._memory_discard(cache_key)
+            with self._db_lock, self._db:
+                row = self._db.execute("SELECT size_bytes FROM entries WHERE key = ?", (cache_key,)).fetchone()
+                self._db.execute("DELETE FROM entries WHERE key = ?", (cache_key,))
+            if row:
+                self._disk_bytes -= row[0]
             cache_file = self.cache_dir / f"{cache_key}.json"
             if await aiofiles.os.path.exists(cache_file):
                 await aiofiles.os.remove(cache_file)
-            if cache_key in self.metadata:
-                del self.metadata[cache_key]
-                await self._save_metadata()
         except Exception as e:
             logger.error(f"Erreur lors de la suppression du cache: {str(e)}")
-            
+
+    async def _evict_disk(self):
+        """Évince les entrées les moins récemment utilisées au-delà du budget disque."""
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+
+        with self._db_lock:
+            rows = self._db.execute("SELECT key, size_bytes FROM entries ORDER BY last_access").fetchall()
+
+        excess = self._disk_bytes - self.max_disk_bytes
+        evicted = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            evicted.append(key)
+            excess -= size
+
+        for key in evicted:
+            await self._remove_cache_entry(key)
+        logger.info(f"{len(evicted)} entrées évincées du cache disque")
+
+    def _touch(self, cache_key: str):
+        """Met à jour la date de dernier accès d'une entrée."""
+        with self._db_lock, self._db:
+            self._db.execute(
+                "UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), cache_key)
+            )
+
+    def _memory_put(self, cache_key: str, result: Dict, size: int):
+        """Ajoute un résultat au niveau mémoire et évince les plus anciens."""
+        if size > self.max_memory_bytes:
+            return
+        self._memory_discard(cache_key)
+        self._memory[cache_key] = (result, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def _memory_discard(self, cache_key: str):
+        """Retire une entrée du niveau mémoire."""
+        cached = self._memory.pop(cache_key, None)
+        if cached is not None:
+            self._memory_bytes -= cached[1]
+
     async def cleanup(self):
         """Nettoie les entrées expirées du cache."""
-        now = datetime.now()
-        keys_to_remove = []
-        
-        for key, info in self.metadata.items():
-            created_at = datetime.fromisoformat(info['created_at'])
-            if now - created_at > timedelta(days=self.max_age_days):
-                keys_to_remove.append(key)
-                
+        limit = time.time() - self.max_age_days * 86400
+        with self._db_lock:
+            keys_to_remove = [
+                row[0] for row in
+                self._db.execute("SELECT key FROM entries WHERE created_at < ?", (limit,)).fetchall()
+            ]
+
         for key in keys_to_remove:
             await self._remove_cache_entry(key)
-            
+
     async def get_cache_stats(self) -> Dict:
         """Retourne des statistiques sur le cache."""
-        total_size = 0
-        for cache_file in self.cache_dir.glob("*.json"):
-            total_size += cache_file.stat().st_size
-            
+        with self._db_lock:
+            total_entries, total_hits = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM entries"
+            ).fetchone()
+
         return {
-            "total_entries": len(self.metadata),
-            "total_size_mb": total_size / (1024 * 1024),
+            "total_entries": total_entries,
+            "total_hits": total_hits,
+            "total_size_mb": self._disk_bytes / (1024 * 1024),
+            "max_size_mb": self.max_disk_bytes / (1024 * 1024),
+            "memory_entries": len(self._memory),
+            "memory_size_mb": self._memory_bytes / (1024 * 1024),
+            "computing": len(self._inflight),
             "cache_dir": str(self.cache_dir),
             "max_age_days": self.max_age_days
-        } 
\ No newline at end of file
+        }
+
+    def close(self):
+        """Ferme l'index SQLite."""
+        with self._db_lock:
+            self._db.close()
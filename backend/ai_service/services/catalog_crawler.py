@@ -0,0 +1,218 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+from utils.rate_limiter import RateLimiter
+from .catalog_store import CatalogStore
+
+logger = logging.getLogger(__name__)
+
+# Réponse 304 : le document n'a pas changé depuis la dernière récupération
+NOT_MODIFIED = object()
+
+
+class CatalogRefreshError(RuntimeError):
+    """Exception levée lorsqu'une liste du catalogue ne peut pas être récupérée"""
+    pass
+
+
+class CatalogCrawler:
+    """
+    Récupération asynchrone des catalogues LEGO et Bricklink.
+
+    Pour chaque source, les listes (couleurs, pièces, sets) sont demandées avec
+    If-None-Match / If-Modified-Since : une réponse 304 évite de les
+    retélécharger. Les pièces des sets absents du catalogue sont ensuite
+    demandées en parallèle (au plus `concurrency` requêtes par source, sur
+    des connexions réutilisées), sous le contrôle du limiteur de débit de la
+    source.
+
+    Chaque set récupéré est enregistré au fur et à mesure dans une collection
+    d'attente ({source}_models_pending) : un parcours interrompu reprend là où
+    il s'était arrêté. Le catalogue servi n'est modifié qu'à la fin, en une
+    seule transaction (sets en attente, listes et validateurs HTTP).
+    """
+
+    VALIDATORS = 'http_validators'
+
+    def __init__(
+        self,
+        store: CatalogStore,
+        sources: Mapping[str, Tuple[str, Optional[RateLimiter]]],
+        concurrency: int = 8,
+        request_timeout: float = 30,
+        batch_size: int = 50
+    ):
+        """
+        Args:
+            store: Base des catalogues
+            sources: {nom: (URL de l'API, limiteur de débit ou None)}
+            concurrency: Nombre maximal de requêtes simultanées par source
+            request_timeout: Délai maximal d'une requête HTTP (secondes)
+            batch_size: Nombre de sets récupérés enregistrés ensemble
+        """
+        self.store = store
+        self.sources = dict(sources)
+        self.concurrency = concurrency
+        self.request_timeout = request_timeout
+        self.batch_size = batch_size
+
+    async def crawl(self) -> Dict[str, Dict[str, int]]:
+        """
+        Parcourt toutes les sources puis publie le nouveau catalogue.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Statistiques par source (listes inchangées, sets récupérés, échecs)
+
+        Raises:
+            CatalogRefreshError: Si une liste est indisponible ; le catalogue servi n'est pas modifié
+        """
+        connector = aiohttp.TCPConnector(limit_per_host=self.concurrency, keepalive_timeout=60)
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=ClientTimeout(total=self.request_timeout)
+        ) as session:
+            # Chaque source va au bout : les sets récupérés restent en attente même si une autre échoue
+            results = await asyncio.gather(*(
+                self._crawl_source(session, name, api_url, limiter)
+                for name, (api_url, limiter) in self.sources.items()
+            ), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        replacements, upserts, stats = {}, {self.VALIDATORS: {}}, {}
+        for name, (source_replacements, new_sets, validators, source_stats) in zip(self.sources, results):
+            replacements.update(source_replacements)
+            replacements[self._pending_name(name)] = {}
+            upserts[f'{name}_models'] = new_sets
+            upserts[self.VALIDATORS].update(validators)
+            stats[name] = source_stats
+        await asyncio.to_thread(self.store.commit_snapshot, replacements, upserts)
+        return stats
+
+    async def _crawl_source(
+        self, session: aiohttp.ClientSession, name: str, api_url: str, limiter: Optional[RateLimiter]
+    ) -> Tuple[Dict, Dict, Dict, Dict[str, int]]:
+        validators: Dict[str, Dict] = {}
+        replacements = {}
+        stats = {'not_modified': 0, 'fetched_sets': 0, 'failed_sets': 0}
+
+        for kind in ('colors', 'parts', 'sets'):
+            data = await self._get_list(session, f"{api_url}/{kind}", limiter, validators)
+            if data is NOT_MODIFIED:
+                stats['not_modified'] += 1
+            elif kind == 'sets':
+                replacements[f'{name}_sets'] = {str(set_info['set_id']): set_info for set_info in data}
+            else:
+                replacements[f'{name}_{kind}'] = data
+
+        # Liste inchangée : celle du dernier parcours publié fait foi
+        set_index = replacements.get(f'{name}_sets')
+        if set_index is None:
+            set_index = await asyncio.to_thread(lambda: dict(self.store.collection(f'{name}_sets').items()))
+
+        # Les lectures et écritures SQLite s'exécutent hors de la boucle d'événements
+        pending = self.store.collection(self._pending_name(name))
+        known_models, pending_ids = await asyncio.to_thread(
+            lambda: (set(self.store.collection(f'{name}_models')), set(pending))
+        )
+        known = known_models | pending_ids
+        missing = [set_info for set_id, set_info in set_index.items() if set_id not in known]
+        if missing:
+            logger.info(f"Catalogue {name}: {len(missing)} sets à récupérer ({len(pending_ids)} déjà en attente)")
+            stats['fetched_sets'], stats['failed_sets'] = await self._fetch_sets(
+                session, api_url, limiter, missing, pending
+            )
+
+        return replacements, await asyncio.to_thread(lambda: dict(pending.items())), validators, stats
+
+    async def _fetch_sets(
+        self, session: aiohttp.ClientSession, api_url: str, limiter: Optional[RateLimiter],
+        missing: List[Dict], pending
+    ) -> Tuple[int, int]:
+        """Récupère les pièces des sets manquants et les enregistre par lots dans la collection d'attente."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(set_info: Dict) -> Tuple[str, Optional[Dict]]:
+            set_id = str(set_info['set_id'])
+            async with semaphore:
+                if limiter is not None:
+                    await limiter.acquire()
+                try:
+                    async with session.get(f"{api_url}/sets/{set_id}/parts") as response:
+                        if response.status != 200:
+                            logger.warning(f"Set {set_id} ignoré: HTTP {response.status}")
+                            return set_id, None
+                        parts = await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.warning(f"Set {set_id} ignoré: {str(e)}")
+                    return set_id, None
+            return set_id, {
+                'parts': parts,
+                'year': set_info.get('year', 0),
+                'theme': set_info.get('theme', ''),
+                'last_updated': datetime.now().timestamp()
+            }
+
+        fetched = failed = 0
+        batch = {}
+        try:
+            for task in asyncio.as_completed([fetch(set_info) for set_info in missing]):
+                set_id, set_data = await task
+                if set_data is None:
+                    failed += 1
+                    continue
+                batch[set_id] = set_data
+                fetched += 1
+                if len(batch) >= self.batch_size:
+                    await asyncio.to_thread(pending.update, batch)
+                    batch = {}
+        finally:
+            # Parcours interrompu (arrêt du service) : les sets déjà reçus sont conservés
+            if batch:
+                await asyncio.to_thread(pending.update, batch)
+        return fetched, failed
+
+    async def _get_list(
+        self, session: aiohttp.ClientSession, url: str, limiter: Optional[RateLimiter], validators: Dict
+    ):
+        """
+        Requête conditionnelle d'une liste du catalogue.
+
+        Returns:
+            Le document JSON, ou NOT_MODIFIED sur une réponse 304
+
+        Raises:
+            CatalogRefreshError: Si la réponse n'est ni 200 ni 304
+        """
+        headers = {}
+        previous = await asyncio.to_thread(self.store.collection(self.VALIDATORS).get, url) or {}
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return NOT_MODIFIED
+                if response.status != 200:
+                    raise CatalogRefreshError(f"{url}: HTTP {response.status}")
+                data = await response.json(content_type=None)
+                validators[url] = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+                return data
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise CatalogRefreshError(f"{url}: {str(e) or type(e).__name__}") from e
+
+    @staticmethod
+    def _pending_name(name: str) -> str:
+        return f'{name}_models_pending'
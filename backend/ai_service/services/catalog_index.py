@@ -0,0 +1,137 @@
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Thèmes dont les pièces reçoivent un bonus
+POPULAR_THEMES = ('City', 'Star Wars', 'Architecture')
+
+MANUFACTURERS = ('lego', 'bricklink')
+
+
+def part_base_score(format_name: str, theme: str, year: int, current_year: int) -> float:
+    """Score d'une pièce du catalogue : format, popularité du thème et ancienneté."""
+    base_score = 1.0
+    # Bonus pour les formats techniques
+    if format_name == 'technic':
+        base_score *= 1.2
+    # Bonus pour les thèmes populaires
+    if theme in POPULAR_THEMES:
+        base_score *= 1.1
+    # Bonus pour les pièces récentes
+    age_factor = 1.0 - (current_year - year) / 100
+    return base_score * max(0.5, age_factor)
+
+
+class _Bucket:
+    """Pièces d'une même taille et d'un même format, triées par score de stabilité."""
+
+    __slots__ = ('scores', 'parts', 'totals')
+
+    def __init__(self, entries: List[Tuple[float, Dict]]):
+        entries.sort(key=lambda entry: entry[0])
+        self.scores = [score for score, _ in entries]
+        self.parts = [part for _, part in entries]
+        # Sommes cumulées (score, nombre) par fabricant pour les requêtes par intervalle
+        self.totals = {
+            manufacturer: (
+                [0.0] + list(accumulate(
+                    p['base_score'] if p['manufacturer'] == manufacturer else 0.0 for p in self.parts
+                )),
+                [0] + list(accumulate(int(p['manufacturer'] == manufacturer) for p in self.parts))
+            )
+            for manufacturer in MANUFACTURERS
+        }
+
+    def range(self, stability: float, tolerance: float) -> Tuple[int, int]:
+        """Indices des pièces dont |score - stability| < tolerance."""
+        lo = bisect_left(self.scores, stability - tolerance)
+        hi = bisect_right(self.scores, stability + tolerance)
+        # Bornes exactes, malgré les arrondis de stability ± tolerance
+        while lo < hi and abs(self.scores[lo] - stability) >= tolerance:
+            lo += 1
+        while hi > lo and abs(self.scores[hi - 1] - stability) >= tolerance:
+            hi -= 1
+        return lo, hi
+
+
+class CatalogIndex:
+    """
+    Index inversé des pièces des sets LEGO et Bricklink.
+
+    Les pièces sont regroupées par (taille, format) et triées par score de
+    stabilité : les pièces proches d'une brique s'obtiennent par une recherche
+    dichotomique, et la somme de leurs scores par fabricant par différence de
+    sommes cumulées, sans parcourir le catalogue. L'index est immuable ; un
+    catalogue mis à jour donne un nouvel index.
+    """
+
+    TOLERANCE = 0.1
+
+    def __init__(self, lego_models: Dict, bricklink_models: Dict, current_year: Optional[int] = None):
+        """
+        Args:
+            lego_models: Sets officiels LEGO ({set_id: {'parts', 'theme', 'year'}})
+            bricklink_models: Sets Bricklink, même format
+            current_year: Année de référence pour l'ancienneté des pièces
+        """
+        self.current_year = current_year or datetime.now().year
+        grouped: Dict[Tuple[str, str], List[Tuple[float, Dict]]] = {}
+        for manufacturer, models in (('lego', lego_models), ('bricklink', bricklink_models)):
+            for set_data in models.values():
+                for part in set_data.get('parts', ()):
+                    try:
+                        key = (part['size'], part['format'])
+                        score = float(part['stability_score'])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    grouped.setdefault(key, []).append((score, {
+                        'part': part,
+                        'format': part['format'],
+                        'theme': set_data.get('theme', ''),
+                        'year': set_data.get('year', 0),
+                        'manufacturer': manufacturer,
+                        'base_score': part_base_score(
+                            part['format'], set_data.get('theme', ''), set_data.get('year', 0),
+                            self.current_year
+                        )
+                    }))
+
+        self._buckets = {key: _Bucket(entries) for key, entries in grouped.items()}
+        self.part_count = sum(len(bucket.scores) for bucket in self._buckets.values())
+        logger.info(f"Index du catalogue construit: {self.part_count} pièces, {len(self._buckets)} groupes")
+
+    def __len__(self) -> int:
+        return self.part_count
+
+    def similar_parts(self, size: str, format_name: str, stability: float) -> List[Dict]:
+        """
+        Pièces de même taille et de même format dont le score de stabilité est proche.
+
+        Returns:
+            List[Dict]: Pièces ({'part', 'format', 'theme', 'year', 'manufacturer', 'base_score'})
+        """
+        bucket = self._buckets.get((size, format_name))
+        if bucket is None:
+            return []
+        lo, hi = bucket.range(stability, self.TOLERANCE)
+        return bucket.parts[lo:hi]
+
+    def score_totals(self, size: str, format_name: str, stability: float) -> Dict[str, Tuple[float, int]]:
+        """
+        Somme des scores et nombre des pièces proches, par fabricant.
+
+        Returns:
+            Dict[str, Tuple[float, int]]: {fabricant: (somme des scores, nombre de pièces)}
+        """
+        bucket = self._buckets.get((size, format_name))
+        if bucket is None:
+            return {manufacturer: (0.0, 0) for manufacturer in MANUFACTURERS}
+        lo, hi = bucket.range(stability, self.TOLERANCE)
+        return {
+            manufacturer: (scores[hi] - scores[lo], counts[hi] - counts[lo])
+            for manufacturer, (scores, counts) in bucket.totals.items()
+        }
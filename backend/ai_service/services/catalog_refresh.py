@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from metrics import (
+    CATALOG_REFRESH_DURATION, CATALOG_REFRESHES, CATALOG_SNAPSHOT_AGE, CATALOG_SNAPSHOT_SIZE
+)
+from utils.rate_limiter import bricklink_limiter
+from .catalog_crawler import CatalogCrawler
+from .catalog_store import CatalogStore
+
+logger = logging.getLogger(__name__)
+
+# Collections servies par le rafraîchissement, pour les métriques de taille
+CATALOG_COLLECTIONS = (
+    'bricklink_models', 'bricklink_colors', 'bricklink_parts',
+    'lego_models', 'lego_colors', 'lego_parts',
+)
+
+
+class CatalogRefresher:
+    """
+    Rafraîchissement périodique des catalogues LEGO et Bricklink, en tâche de fond.
+
+    Le nouveau catalogue (couleurs, pièces et sets ajoutés depuis le dernier
+    passage) est récupéré par un CatalogCrawler, hors du chemin des requêtes,
+    puis publié dans la base en une seule transaction : les optimisations
+    lisent l'ancien catalogue ou le nouveau, jamais un mélange. En cas
+    d'échec, rien n'est publié : l'ancien catalogue reste servi et un nouvel
+    essai a lieu après retry_interval, en reprenant les sets déjà récupérés.
+    La date du dernier rafraîchissement et un verrou sont partagés par les
+    workers via la base : un seul d'entre eux rafraîchit. Les accès à la base
+    de la tâche de fond s'exécutent dans un thread, hors de la boucle
+    d'événements ; la taille des collections est relevée après chaque
+    rafraîchissement et conservée pour report().
+    """
+
+    LAST_REFRESH_KEY = "catalog_refreshed_at"
+    LEASE_KEY = "catalog_refresh_lease"
+
+    def __init__(
+        self,
+        store: CatalogStore,
+        bricklink_api_url: str,
+        lego_api_url: str,
+        interval: float = 86400,
+        retry_interval: float = 900,
+        lease_seconds: float = 4 * 3600,
+        request_timeout: float = 30,
+        concurrency: int = 8,
+        legacy_timestamp_path: Optional[str] = "models/bricklink_last_update.txt",
+        legacy_json_files: Optional[Dict[str, Union[str, Path]]] = None
+    ):
+        """
+        Args:
+            store: Base des catalogues
+            bricklink_api_url: URL de l'API Bricklink
+            lego_api_url: URL de l'API LEGO
+            interval: Intervalle entre deux rafraîchissements (secondes)
+            retry_interval: Délai avant un nouvel essai après un échec (secondes)
+            lease_seconds: Durée maximale d'un rafraîchissement avant qu'un autre worker ne le reprenne
+            request_timeout: Délai maximal d'une requête HTTP (secondes)
+            concurrency: Nombre maximal de requêtes simultanées par API
+            legacy_timestamp_path: Ancien fichier de date de mise à jour, importé s'il existe
+            legacy_json_files: Anciens catalogues JSON ({collection: chemin}), importés par la tâche de fond
+        """
+        self.store = store
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self.lease_seconds = lease_seconds
+        self.legacy_json_files = dict(legacy_json_files or {})
+        self.crawler = CatalogCrawler(
+            store,
+            {'bricklink': (bricklink_api_url, bricklink_limiter), 'lego': (lego_api_url, None)},
+            concurrency=concurrency,
+            request_timeout=request_timeout
+        )
+        self.last_stats: Optional[Dict] = None
+        self.sizes: Dict[str, int] = {}
+
+        self.refreshing = False
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+        if legacy_timestamp_path:
+            self._import_legacy_timestamp(Path(legacy_timestamp_path))
+
+    @property
+    def refreshed_at(self) -> Optional[float]:
+        """Date (timestamp) du dernier rafraîchissement réussi, tous workers confondus."""
+        return self.store.get_meta(self.LAST_REFRESH_KEY)
+
+    def age(self) -> float:
+        """Ancienneté du catalogue servi en secondes (NaN s'il n'a jamais été rafraîchi)."""
+        refreshed_at = self.refreshed_at
+        return time.time() - refreshed_at if refreshed_at else math.nan
+
+    def seconds_until_due(self) -> float:
+        return (self.refreshed_at or 0) + self.interval - time.time()
+
+    async def refresh(self) -> bool:
+        """
+        Rafraîchit les catalogues.
+
+        Returns:
+            bool: True si le nouveau catalogue a été écrit, False si l'ancien reste servi
+        """
+        self.refreshing = True
+        start = time.perf_counter()
+        try:
+            self.last_stats = await self.crawler.crawl()
+            await asyncio.to_thread(self.store.set_meta, self.LAST_REFRESH_KEY, time.time())
+        except Exception as e:
+            logger.error(f"Erreur lors du rafraîchissement des catalogues, ancien catalogue conservé: {str(e)}")
+            CATALOG_REFRESHES.labels(status='error').inc()
+            self.last_error = str(e)
+            self.consecutive_failures += 1
+            return False
+        finally:
+            self.refreshing = False
+            self.last_duration = round(time.perf_counter() - start, 3)
+            CATALOG_REFRESH_DURATION.observe(self.last_duration)
+
+        CATALOG_REFRESHES.labels(status='success').inc()
+        self.last_error = None
+        self.consecutive_failures = 0
+        await asyncio.to_thread(self.update_size_metrics)
+        logger.info(f"Catalogues rafraîchis en {self.last_duration}s")
+        return True
+
+    def update_size_metrics(self) -> Dict[str, int]:
+        """Relève la taille des collections servies (une requête COUNT par collection)."""
+        sizes = {name: len(self.store.collection(name)) for name in CATALOG_COLLECTIONS}
+        for name, size in sizes.items():
+            CATALOG_SNAPSHOT_SIZE.labels(collection=name).set(size)
+        self.sizes = sizes
+        return sizes
+
+    def report(self) -> Dict:
+        """État du catalogue servi et du dernier rafraîchissement."""
+        age = self.age()
+        return {
+            "refreshed_at": self.refreshed_at,
+            "age_seconds": None if math.isnan(age) else round(age, 1),
+            "stale": math.isnan(age) or age > self.interval,
+            "refreshing": self.refreshing,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "last_stats": self.last_stats,
+            "sizes": dict(self.sizes)
+        }
+
+    def start(self):
+        """Lance la tâche de fond ; sans effet si elle est déjà lancée."""
+        if self._task is None:
+            CATALOG_SNAPSHOT_AGE.set_function(self.age)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        await self._import_legacy_json()
+        await asyncio.to_thread(self.update_size_metrics)
+        while True:
+            delay = await asyncio.to_thread(self.seconds_until_due)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if not await asyncio.to_thread(self.store.try_lease, self.LEASE_KEY, self.lease_seconds):
+                # Un autre worker rafraîchit le catalogue
+                await asyncio.sleep(self.retry_interval)
+                continue
+            try:
+                refreshed = await self.refresh()
+            finally:
+                await asyncio.to_thread(self.store.release_lease, self.LEASE_KEY)
+            if not refreshed:
+                await asyncio.sleep(self.retry_interval)
+
+    async def _import_legacy_json(self):
+        """
+        Importe les anciens catalogues JSON, hors de la boucle d'événements.
+
+        Les fichiers peuvent peser plusieurs Go : un seul worker les importe,
+        sous le verrou du rafraîchissement ; ils sont ensuite renommés et ne
+        sont plus relus.
+        """
+        if not any(Path(path).exists() for path in self.legacy_json_files.values()):
+            return
+        if not await asyncio.to_thread(self.store.try_lease, self.LEASE_KEY, self.lease_seconds):
+            # Un autre worker importe ou rafraîchit le catalogue
+            return
+        try:
+            await asyncio.to_thread(self.store.import_json_files, self.legacy_json_files)
+        finally:
+            await asyncio.to_thread(self.store.release_lease, self.LEASE_KEY)
+
+    def _import_legacy_timestamp(self, path: Path):
+        """Reprend la date de l'ancien fichier de mise à jour pour ne pas tout recharger au déploiement."""
+        if self.refreshed_at is not None or not path.exists():
+            return
+        try:
+            self.store.set_meta(self.LAST_REFRESH_KEY, float(path.read_text().strip()))
+            path.rename(path.with_suffix(".txt.migrated"))
+        except (OSError, ValueError) as e:
+            logger.error(f"Erreur lors de l'import de {path}: {str(e)}")
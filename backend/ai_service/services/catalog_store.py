@@ -0,0 +1,293 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Base des catalogues et anciens fichiers JSON importés à sa première ouverture
+CATALOG_DB_PATH = "models/catalog.sqlite3"
+LEGACY_JSON_FILES = {
+    'successful_models': "models/lego_models.json",
+    'bricklink_models': "models/bricklink_models.json",
+    'lego_models': "models/lego_official_models.json",
+    'bricklink_colors': "models/bricklink_colors.json",
+    'lego_colors': "models/lego_colors.json",
+    'bricklink_parts': "models/bricklink_parts.json",
+    'lego_parts': "models/lego_parts.json",
+}
+
+# Projection mémoire de la base : les pages lues sont partagées par les
+# processus via le cache du système au lieu d'être copiées dans chacun
+MMAP_SIZE = 1024 * 1024 * 1024
+
+
+class CatalogCollection(MutableMapping):
+    """
+    Vue dictionnaire d'une collection du catalogue.
+
+    Chaque entrée est lue dans la base à l'accès et chaque écriture est une
+    mise à jour d'une seule ligne : la collection n'est jamais chargée en
+    entier en mémoire. L'ordre d'itération est celui d'insertion.
+    """
+
+    def __init__(self, store: 'CatalogStore', name: str):
+        self.store = store
+        self.name = name
+
+    def __getitem__(self, key) -> Any:
+        row = self.store._execute(
+            "SELECT data FROM documents WHERE collection = ? AND key = ?", (self.name, str(key))
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key, value):
+        self.store.upsert(self.name, {key: value})
+
+    def __delitem__(self, key):
+        with self.store._transaction() as db:
+            cursor = db.execute(
+                "DELETE FROM documents WHERE collection = ? AND key = ?", (self.name, str(key))
+            )
+            if cursor.rowcount == 0:
+                raise KeyError(key)
+            self.store._touch(db, self.name)
+
+    def __contains__(self, key) -> bool:
+        return self.store._execute(
+            "SELECT 1 FROM documents WHERE collection = ? AND key = ?", (self.name, str(key))
+        ).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (key,) in self.store._execute(
+            "SELECT key FROM documents WHERE collection = ? ORDER BY id", (self.name,)
+        ):
+            yield key
+
+    def __len__(self) -> int:
+        return self.store._execute(
+            "SELECT COUNT(*) FROM documents WHERE collection = ?", (self.name,)
+        ).fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Parcourt les entrées en une seule requête, décodées une à une."""
+        for key, data in self.store._execute(
+            "SELECT key, data FROM documents WHERE collection = ? ORDER BY id", (self.name,)
+        ):
+            yield key, json.loads(data)
+
+    def values(self) -> Iterator[Any]:
+        for _, value in self.items():
+            yield value
+
+    def update(self, entries: Mapping = (), **kwargs):
+        """Insère ou remplace plusieurs entrées dans une seule transaction."""
+        self.store.upsert(self.name, {**dict(entries), **kwargs})
+
+    def replace(self, entries: Mapping):
+        """Remplace tout le contenu de la collection, de façon atomique."""
+        self.store.replace(self.name, entries)
+
+    @property
+    def version(self) -> int:
+        """Numéro de version, incrémenté par chaque écriture de n'importe quel processus."""
+        return self.store.version(self.name)
+
+    def __repr__(self) -> str:
+        return f"CatalogCollection({self.name!r}, {len(self)} entrées)"
+
+
+class CatalogStore:
+    """
+    Catalogues LEGO et Bricklink dans une base SQLite.
+
+    Chaque collection (sets, couleurs, pièces, modèles réussis) est une suite
+    de documents JSON indexés par leur clé. Les mises à jour sont des
+    insertions ou remplacements ligne par ligne ; en mode WAL, les lecteurs
+    d'autres processus ne sont pas bloqués et voient chaque transaction en
+    entier. Les anciens fichiers JSON s'importent avec import_json.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Fichier de la base, créé si nécessaire
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Une connexion par thread : sqlite3 ne partage pas une connexion entre threads
+        self._local = threading.local()
+        with self._transaction() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    collection TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    UNIQUE (collection, key)
+                )
+            """)
+            # Version et date de dernière écriture de chaque collection
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS collections (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Valeurs partagées par les processus (date de rafraîchissement, verrous)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value REAL NOT NULL
+                )
+            """)
+
+    def collection(self, name: str) -> CatalogCollection:
+        return CatalogCollection(self, name)
+
+    def upsert(self, name: str, entries: Mapping):
+        """Insère ou remplace des entrées d'une collection, dans une seule transaction."""
+        self.commit_snapshot(upserts={name: entries})
+
+    def replace(self, name: str, entries: Mapping):
+        """Remplace tout le contenu d'une collection, dans une seule transaction."""
+        self.commit_snapshot(replacements={name: entries})
+
+    def commit_snapshot(self, replacements: Mapping[str, Mapping] = None, upserts: Mapping[str, Mapping] = None):
+        """
+        Applique plusieurs collections dans une seule transaction.
+
+        Les lecteurs voient toutes les collections avant ou toutes après : un
+        catalogue rafraîchi remplace l'ancien d'un bloc.
+
+        Args:
+            replacements: Collections remplacées entièrement ({nom: entrées})
+            upserts: Entrées insérées ou remplacées ({nom: entrées})
+        """
+        replacements = {
+            name: [(name, str(key), json.dumps(value)) for key, value in entries.items()]
+            for name, entries in (replacements or {}).items()
+        }
+        upserts = {
+            name: [(name, str(key), json.dumps(value)) for key, value in entries.items()]
+            for name, entries in (upserts or {}).items()
+        }
+        with self._transaction() as db:
+            for name, rows in replacements.items():
+                db.execute("DELETE FROM documents WHERE collection = ?", (name,))
+                db.executemany("INSERT INTO documents (collection, key, data) VALUES (?, ?, ?)", rows)
+                self._touch(db, name)
+            for name, rows in upserts.items():
+                db.executemany(
+                    "INSERT INTO documents (collection, key, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT (collection, key) DO UPDATE SET data = excluded.data",
+                    rows
+                )
+                self._touch(db, name)
+
+    def version(self, name: str) -> int:
+        """Numéro de version d'une collection (0 si elle n'a jamais été écrite)."""
+        row = self._execute("SELECT version FROM collections WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def updated_at(self, name: str) -> Optional[float]:
+        """Date (timestamp) de la dernière écriture d'une collection."""
+        row = self._execute("SELECT updated_at FROM collections WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def get_meta(self, key: str, default: Optional[float] = None) -> Optional[float]:
+        row = self._execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: float):
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    def try_lease(self, key: str, seconds: float) -> bool:
+        """
+        Prend un verrou partagé par les processus, valable `seconds` secondes.
+
+        Returns:
+            bool: True si le verrou était libre ou expiré
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, 0)", (key,))
+            cursor = db.execute(
+                "UPDATE meta SET value = ? WHERE key = ? AND value < ?", (now + seconds, key, now)
+            )
+        return cursor.rowcount == 1
+
+    def release_lease(self, key: str):
+        self.set_meta(key, 0)
+
+    def import_json(self, name: str, json_path: Union[str, Path]) -> int:
+        """
+        Importe un ancien fichier JSON ({clé: document}) dans une collection.
+
+        Le fichier importé est renommé en .json.migrated pour n'être importé
+        qu'une fois.
+
+        Returns:
+            int: Nombre d'entrées importées (0 si le fichier n'existe pas)
+        """
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        with open(json_path, 'r') as f:
+            entries = json.load(f)
+        self.upsert(name, entries)
+        json_path.rename(json_path.with_suffix(".json.migrated"))
+        logger.info(f"{len(entries)} entrées de {json_path} importées dans {self.path} ({name})")
+        return len(entries)
+
+    def import_json_files(self, files: Dict[str, Union[str, Path]]):
+        """Importe les fichiers JSON existants ({collection: chemin}) ; les erreurs sont journalisées."""
+        for name, json_path in files.items():
+            try:
+                self.import_json(name, json_path)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'import de {json_path}: {str(e)}")
+
+    def close(self):
+        """Ferme la connexion du thread courant."""
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    @staticmethod
+    def _touch(db: sqlite3.Connection, name: str):
+        db.execute(
+            "INSERT INTO collections (name, version, updated_at) VALUES (?, 1, ?) "
+            "ON CONFLICT (name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+            (name, time.time())
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(str(self.path), timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._local.db = db
+        return db
+
+    def _execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        return self._connection().execute(sql, params)
+
+    def _transaction(self) -> sqlite3.Connection:
+        """Connexion utilisable comme gestionnaire de contexte (commit ou rollback)."""
+        return self._connection()
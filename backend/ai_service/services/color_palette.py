@@ -0,0 +1,149 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+# Blanc de référence D65 de la conversion XYZ -> CIELAB
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    Convertit des couleurs sRGB (composantes entre 0 et 1) en CIELAB.
+
+    Les distances euclidiennes dans CIELAB suivent mieux les différences
+    perçues que dans l'espace RGB.
+
+    Args:
+        rgb: Tableau (..., 3)
+
+    Returns:
+        np.ndarray: Tableau (..., 3) des composantes L*, a*, b*
+    """
+    rgb = np.clip(np.asarray(rgb, dtype=np.float64), 0.0, 1.0)
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    xyz = linear @ _RGB_TO_XYZ.T / _D65_WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+def normalize_rgb(rgb: np.ndarray) -> np.ndarray:
+    """Ramène des couleurs codées sur 0-255 entre 0 et 1 ; les autres sont inchangées."""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    if rgb.size and rgb.max() > 1.0:
+        return rgb / 255.0
+    return rgb
+
+
+def region_means(colors: np.ndarray, positions: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Couleur moyenne de chaque région d'un volume de couleurs.
+
+    Une table de sommes cumulées 3D (summed-area table) est construite une
+    fois ; la somme d'une région s'obtient ensuite avec ses 8 coins, quelle que
+    soit sa taille. Les régions sont tronquées aux bornes du volume, comme
+    l'était le découpage colors[x:x+w, y:y+h, z:z+d].
+
+    Args:
+        colors: Volume (X, Y, Z, C)
+        positions: Coins des régions (N, 3)
+        sizes: Tailles des régions (N, 3), arrondies à la cellule supérieure
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Moyennes (N, C) et masque (N,) des
+        régions non vides
+    """
+    colors = np.asarray(colors, dtype=np.float64)
+    shape = np.array(colors.shape[:3])
+
+    table = np.zeros(tuple(shape + 1) + colors.shape[3:], dtype=np.float64)
+    table[1:, 1:, 1:] = colors.cumsum(0).cumsum(1).cumsum(2)
+
+    start = np.clip(np.floor(positions).astype(np.int64), 0, shape)
+    end = np.clip(np.ceil(np.asarray(positions) + np.asarray(sizes)).astype(np.int64), start, shape)
+
+    x0, y0, z0 = start.T
+    x1, y1, z1 = end.T
+    sums = (
+        table[x1, y1, z1] - table[x0, y1, z1] - table[x1, y0, z1] - table[x1, y1, z0]
+        + table[x0, y0, z1] + table[x0, y1, z0] + table[x1, y0, z0] - table[x0, y0, z0]
+    )
+
+    counts = np.prod(end - start, axis=1)
+    valid = counts > 0
+    means = np.zeros_like(sums)
+    means[valid] = sums[valid] / counts[valid, None]
+    return means, valid
+
+
+class ColorPalette:
+    """
+    Palette de couleurs du catalogue, indexée pour la recherche du plus proche voisin.
+
+    Les couleurs sont converties une fois en CIELAB et rangées dans un arbre
+    k-d : l'attribution de N couleurs coûte une seule requête vectorisée au
+    lieu de N parcours de la palette.
+    """
+
+    def __init__(self, colors: Iterable[Tuple[float, float, float]]):
+        """
+        Args:
+            colors: Couleurs RGB, telles qu'elles figurent dans les catalogues
+        """
+        unique: Dict[Tuple[float, ...], None] = {}
+        for color in colors:
+            unique.setdefault(tuple(float(c) for c in color), None)
+
+        self.colors: List[Tuple[float, ...]] = list(unique)
+        self._rgb = np.array(self.colors, dtype=np.float64).reshape(-1, 3)
+        self._lab = rgb_to_lab(normalize_rgb(self._rgb))
+        self._tree: Optional[cKDTree] = cKDTree(self._lab) if self.colors else None
+
+    @classmethod
+    def from_catalogs(cls, *catalogs: Dict) -> 'ColorPalette':
+        """
+        Fusionne des catalogues de couleurs ({id: {'rgb': [r, g, b], ...}}).
+
+        Les entrées sans composante 'rgb' sont ignorées, les doublons fusionnés.
+        """
+        return cls(
+            info['rgb']
+            for catalog in catalogs
+            for info in catalog.values()
+            if isinstance(info, dict) and info.get('rgb') is not None
+        )
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def nearest(self, rgb: np.ndarray) -> np.ndarray:
+        """
+        Index de la couleur de la palette la plus proche de chaque couleur.
+
+        Args:
+            rgb: Couleurs (N, 3), sur 0-1 ou 0-255
+
+        Returns:
+            np.ndarray: Index (N,) dans self.colors
+
+        Raises:
+            ValueError: Si la palette est vide
+        """
+        if self._tree is None:
+            raise ValueError("Palette de couleurs vide")
+        rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3)
+        _, indices = self._tree.query(rgb_to_lab(normalize_rgb(rgb)))
+        return indices
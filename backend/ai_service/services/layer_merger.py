@@ -0,0 +1,171 @@
+import heapq
+import logging
+from typing import Callable, Dict, Iterable, List, Sequence, Set, Tuple
+
+from .blocky_service import Brick
+from .brick_index import LayerOccupancyIndex
+
+logger = logging.getLogger(__name__)
+
+
+class LayerMergeEngine:
+    """
+    Fusion des briques d'une couche sur un graphe d'adjacence explicite.
+
+    Les paires de briques voisines fusionnables sont rangées dans une file de
+    priorité par score de connexion décroissant. Après une fusion, seules les
+    arêtes des voisins des deux briques fusionnées sont mises à jour ; les
+    entrées de la file qui référencent une brique disparue sont ignorées au
+    moment où elles sont dépilées.
+
+    Une fusion n'est acceptée que si les deux briques partagent une arête
+    complète et si la taille obtenue (ou sa rotation) existe dans le catalogue.
+    """
+
+    def __init__(self, brick_sizes: Sequence[Tuple[float, float, float]],
+                 connection_score: Callable[[Brick, Brick], float],
+                 merge: Callable[[Brick, Brick], Brick]):
+        """
+        Initialise le moteur de fusion.
+
+        Args:
+            brick_sizes: Catalogue des tailles autorisées (largeur, longueur, hauteur)
+            connection_score: Score de connexion d'une paire de briques
+            merge: Construit la brique issue de la fusion d'une paire
+        """
+        self.catalogue = set()
+        for w, l, h in brick_sizes:
+            self.catalogue.add((w, l, h))
+            self.catalogue.add((l, w, h))
+        self.connection_score = connection_score
+        self.merge = merge
+
+    def merge_layer(self, layer: List[Brick]) -> List[Brick]:
+        """
+        Fusionne les briques d'une couche tant qu'une fusion autorisée existe.
+
+        Args:
+            layer: Briques d'une même couche
+
+        Returns:
+            List[Brick]: Briques restantes, les briques d'origine avant les briques fusionnées
+        """
+        bricks: Dict[int, Brick] = dict(enumerate(layer))
+        graph = self._build_graph(bricks)
+        next_id = len(layer)
+
+        heap = []
+        seq = 0
+        for a, neighbours in graph.items():
+            for b in neighbours:
+                if a < b:
+                    seq = self._push(heap, bricks, a, b, seq)
+
+        merges = 0
+        while heap:
+            _, _, _, a, b = heapq.heappop(heap)
+            if a not in bricks or b not in bricks:
+                continue  # Entrée périmée
+
+            merged = self.merge(bricks.pop(a), bricks.pop(b))
+            c = next_id
+            next_id += 1
+            bricks[c] = merged
+            merges += 1
+
+            # Le voisinage de la brique fusionnée est l'union des deux voisinages
+            neighbours = (graph.pop(a) | graph.pop(b)) - {a, b}
+            graph[c] = neighbours
+            for n in neighbours:
+                graph[n].discard(a)
+                graph[n].discard(b)
+                graph[n].add(c)
+                seq = self._push(heap, bricks, c, n, seq)
+
+        logger.debug(f"Fusion de couche : {len(layer)} briques, {merges} fusions")
+        return [bricks[i] for i in sorted(bricks)]
+
+    def can_merge(self, brick1: Brick, brick2: Brick) -> bool:
+        """
+        Vérifie que deux briques partagent une arête complète et que leur fusion est au catalogue.
+
+        Args:
+            brick1: Première brique
+            brick2: Seconde brique
+
+        Returns:
+            bool: True si la fusion est autorisée
+        """
+        x1, y1, z1 = brick1.position
+        x2, y2, z2 = brick2.position
+        w1, l1, h1 = brick1.size
+        w2, l2, h2 = brick2.size
+
+        if z1 != z2 or h1 != h2:
+            return False
+
+        if x1 == x2 and w1 == w2 and (y1 + l1 == y2 or y2 + l2 == y1):
+            size = (w1, l1 + l2, h1)
+        elif y1 == y2 and l1 == l2 and (x1 + w1 == x2 or x2 + w2 == x1):
+            size = (w1 + w2, l1, h1)
+        else:
+            return False
+
+        return size in self.catalogue
+
+    def _push(self, heap: list, bricks: Dict[int, Brick], a: int, b: int, seq: int) -> int:
+        """Ajoute la paire (a, b) à la file si elle est fusionnable."""
+        brick1, brick2 = bricks[a], bricks[b]
+        if not self.can_merge(brick1, brick2):
+            return seq
+
+        score = self.connection_score(brick1, brick2)
+        area = brick1.size[0] * brick1.size[1] + brick2.size[0] * brick2.size[1]
+        # À score égal, les fusions les plus grandes puis les plus anciennes d'abord
+        heapq.heappush(heap, (-score, -area, seq, a, b))
+        return seq + 1
+
+    @staticmethod
+    def _build_graph(bricks: Dict[int, Brick]) -> Dict[int, Set[int]]:
+        """
+        Construit le graphe des briques qui se touchent par une arête.
+
+        Args:
+            bricks: Briques indexées par identifiant
+
+        Returns:
+            Dict[int, Set[int]]: Voisins de chaque brique
+        """
+        # Décalage pour que l'index ne voie que des positions positives
+        min_x = min((b.position[0] for b in bricks.values()), default=0)
+        min_y = min((b.position[1] for b in bricks.values()), default=0)
+        ox, oy = 1 - min_x, 1 - min_y
+
+        index = LayerOccupancyIndex()
+        index_to_brick = {}
+        for brick_id, brick in bricks.items():
+            x, y, _ = brick.position
+            index_to_brick[index.add(Brick(position=(x + ox, y + oy, 0), size=brick.size), layer=0)] = brick_id
+
+        graph: Dict[int, Set[int]] = {brick_id: set() for brick_id in bricks}
+        for brick_id, brick in bricks.items():
+            for strip in LayerMergeEngine._side_strips(brick, ox, oy):
+                for other in index.query_ids(0, *strip):
+                    neighbour = index_to_brick[other]
+                    if neighbour != brick_id:
+                        graph[brick_id].add(neighbour)
+                        graph[neighbour].add(brick_id)
+        return graph
+
+    @staticmethod
+    def _side_strips(brick: Brick, ox: float, oy: float) -> Iterable[Tuple[float, float, float, float]]:
+        """Bandes d'une cellule le long des quatre côtés d'une brique, coins exclus."""
+        x, y, _ = brick.position
+        w, l, _ = brick.size
+        x, y = x + ox, y + oy
+        return (
+            (x - 1, y, 1, l),   # -x
+            (x + w, y, 1, l),   # +x
+            (x, y - 1, w, 1),   # -y
+            (x, y + l, w, 1),   # +y
+        )
@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+from services.blocky_optimizer import BlockyOptimizer
+from services.blocky_service import Brick, BlockyService
+from services.brick_index import LayerOccupancyIndex
+
+class TestLayerOccupancyIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = LayerOccupancyIndex()
+
+    def test_query_returns_bricks_under_footprint(self):
+        """Seules les briques recouvrant l'empreinte sont retournées."""
+        a = Brick(position=(0, 0, 0), size=(2, 2, 1))
+        b = Brick(position=(4, 0, 0), size=(2, 4, 1))
+        self.index.add(a, layer=1)
+        self.index.add(b, layer=1)
+
+        self.assertEqual(self.index.query(1, 1, 1, 2, 2), [a])
+        self.assertEqual(self.index.query(1, 0, 0, 6, 1), [a, b])
+        self.assertEqual(self.index.query(1, 2, 0, 2, 4), [])
+        self.assertEqual(self.index.query(0, 0, 0, 6, 4), [])
+
+    def test_overlapping_bricks_and_removal(self):
+        """Les briques qui se chevauchent restent visibles après un retrait."""
+        a = Brick(position=(0, 0, 0), size=(2, 2, 1))
+        b = Brick(position=(1, 1, 0), size=(2, 2, 1))
+        id_a = self.index.add(a, layer=0)
+        id_b = self.index.add(b, layer=0)
+
+        self.assertEqual(self.index.query_ids(0, 1, 1, 1, 1), [id_a, id_b])
+
+        self.index.remove(id_a)
+        self.assertEqual(self.index.query(0, 1, 1, 1, 1), [b])
+        self.assertEqual(self.index.query(0, 0, 0, 1, 1), [])
+        self.assertEqual(len(self.index), 1)
+
+    def test_stacked_claims_outside_footprint_ignored(self):
+        """Les cellules revendiquées hors de l'empreinte ne sont pas retournées."""
+        ids = [self.index.add(Brick(position=(x, 0, 0), size=(1, 1, 1)), layer=0) for x in range(10)]
+        stacked_ids = [self.index.add(Brick(position=(x, 0, 0), size=(1, 1, 1)), layer=0) for x in range(10)]
+
+        self.assertEqual(self.index.query_ids(0, 3, 0, 2, 1), [ids[3], ids[4], stacked_ids[3], stacked_ids[4]])
+        self.assertEqual(self.index.query_ids(0, 0, 1, 10, 1), [])
+
+    def test_plates_use_covered_cells(self):
+        """Les dimensions fractionnaires couvrent les cellules entamées."""
+        plate = Brick(position=(0, 0, 0), size=(1, 1.5, 0.5))
+        self.index.add(plate, layer=0)
+        self.assertEqual(self.index.query(0, 0, 1, 1, 1), [plate])
+
+    def test_negative_position_rejected(self):
+        with self.assertRaises(ValueError):
+            self.index.add(Brick(position=(-1, 0, 0), size=(1, 1, 1)), layer=0)
+
+class TestIndexedSupportQueries(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = BlockyOptimizer()
+        self.service = BlockyService()
+        rng = np.random.default_rng(3)
+        self.bricks = [
+            Brick(
+                position=(int(rng.integers(0, 12)), int(rng.integers(0, 12)), int(rng.integers(0, 5))),
+                size=(int(rng.integers(1, 3)), int(rng.integers(1, 5)), int(rng.integers(1, 3)))
+            )
+            for _ in range(200)
+        ]
+
+    def test_support_score_matches_linear_scan(self):
+        """Le score de support indexé est identique au parcours complet."""
+        index = LayerOccupancyIndex()
+        for brick in self.bricks:
+            index.add(brick, layer=brick.position[2] + brick.size[2])
+
+        for brick in self.bricks:
+            expected = self.optimizer._calculate_support_score(brick, self.bricks)
+            actual = self.optimizer._calculate_support_score(brick, self.bricks, index)
+            self.assertAlmostEqual(expected, actual)
+
+    def test_stability_matches_linear_scan(self):
+        """La stabilité indexée est identique au parcours complet."""
+        index = LayerOccupancyIndex()
+        for brick in self.bricks:
+            index.add(brick, layer=brick.position[2])
+
+        for brick in self.bricks:
+            expected = self.service._calculate_stability(brick, self.bricks)
+            actual = self.service._calculate_stability(brick, self.bricks, index)
+            self.assertAlmostEqual(expected, actual)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import numpy as np
+from services.blocky_service import Brick, BlockyService
+from services.brick_layout import BrickLayout, BRICK_DTYPE
+
+class TestBrickLayout(unittest.TestCase):
+    def setUp(self):
+        self.bricks = [
+            Brick(position=(0, 0, 0), size=(2, 4, 1), stability_score=1.0),
+            Brick(position=(2, 0, 0), size=(1, 1, 0.5), color=(1.0, 0.0, 0.0), stability_score=0.8),
+            Brick(position=(0, 0, 1), size=(2, 2, 1), stability_score=0.5),
+        ]
+        self.layout = BrickLayout.from_bricks(self.bricks)
+
+    def test_round_trip(self):
+        """Les vues exposent les mêmes valeurs que les briques d'origine."""
+        self.assertEqual(len(self.layout), 3)
+        self.assertEqual(self.layout.data.dtype, BRICK_DTYPE)
+        for brick, view in zip(self.bricks, self.layout):
+            self.assertEqual(view.position, brick.position)
+            self.assertEqual(view.size, brick.size)
+            self.assertEqual(view.color, brick.color)
+            self.assertEqual(view.stability_score, brick.stability_score)
+        self.assertEqual(self.layout.to_bricks()[1].size, (1, 1, 0.5))
+
+    def test_view_writes_go_to_columns(self):
+        """Les attributs ajoutés par l'optimiseur sont stockés dans les colonnes."""
+        view = self.layout[0]
+        view.lego_score = 0.75
+        view.manufacturer = 'bricklink'
+        view.brick_format = 'technic'
+        view.size = (2, 4, 2)
+
+        row = self.layout.data[0]
+        self.assertAlmostEqual(float(row['lego']), 0.75)
+        self.assertEqual(self.layout[0].manufacturer, 'bricklink')
+        self.assertEqual(self.layout[0].brick_format, 'technic')
+        self.assertEqual(float(row['h']), 2.0)
+        with self.assertRaises(AttributeError):
+            view.unknown_attribute
+
+    def test_bulk_operations(self):
+        """Filtre par couche, surfaces et masques de chevauchement."""
+        np.testing.assert_array_equal(self.layout.layers(), [0, 1])
+        self.assertEqual(len(self.layout.layer(0)), 2)
+        np.testing.assert_array_equal(self.layout.areas(), [8, 1, 4])
+        np.testing.assert_array_equal(self.layout.overlap_mask(1, 0, 2, 1), [True, True, True])
+        np.testing.assert_array_equal(self.layout.overlap_mask(1, 0, 2, 1, z=0), [True, True, False])
+        np.testing.assert_array_equal(self.layout.overlap_mask(3, 0, 1, 1), [False, False, False])
+        self.assertEqual(self.layout.extents(), (3, 4, 2))
+        self.assertEqual(self.layout.size_counts(), {"2x4x1": 1, "1x1x0.5": 1, "2x2x1": 1})
+
+    def test_to_records_is_json_serializable(self):
+        """Les enregistrements exportés passent par json (résultats de tâches)."""
+        import json
+        records = json.loads(json.dumps(self.layout.to_records()))
+        self.assertEqual(records[1]["size"], [1, 1, 0.5])
+        self.assertEqual(records[1]["color"], [1.0, 0.0, 0.0])
+        self.assertEqual(records[2]["position"], [0, 0, 1])
+
+    def test_scores_are_kept_exactly(self):
+        """Les scores sortent tels qu'ils sont entrés, et to_bricks les conserve tous."""
+        brick = Brick(position=(0, 0, 0), size=(1, 2, 1), stability_score=0.3)
+        brick.connection_score = 0.1
+        brick.learning_score = 0.2
+        brick.lego_score = 0.7
+        brick.bricklink_score = 0.9
+        brick.manufacturer = 'lego'
+        layout = BrickLayout.from_bricks([brick])
+
+        self.assertEqual(layout.to_records()[0]["stability_score"], 0.3)
+        restored = layout.to_bricks()[0]
+        for attribute in ('stability_score', 'connection_score', 'learning_score', 'lego_score', 'bricklink_score'):
+            self.assertEqual(getattr(restored, attribute), getattr(brick, attribute))
+        self.assertEqual(restored.manufacturer, 'lego')
+
+    def test_uncolored_bricks_stay_uncolored(self):
+        """Une brique sans couleur (-1) le reste après un nouveau passage par la disposition."""
+        layout = BrickLayout.from_bricks([Brick(position=(0, 0, 0), size=(1, 1, 1), color=None)])
+        self.assertIsNone(layout[0].color)
+        self.assertIsNone(layout.to_records()[0]["color"])
+
+        rewrapped = BrickLayout.from_bricks(layout.to_bricks())
+        self.assertEqual(int(rewrapped.data[0]['color']), -1)
+        self.assertEqual(rewrapped.palette, [])
+
+        rewrapped[0].color = (1.0, 0.0, 0.0)
+        rewrapped[0].color = None
+        self.assertIsNone(rewrapped[0].color)
+
+    def test_append_grows(self):
+        layout = BrickLayout()
+        for i in range(100):
+            layout.append(Brick(position=(i, 0, 0), size=(1, 1, 1)))
+        self.assertEqual(len(layout), 100)
+        self.assertEqual(layout[-1].position, (99, 0, 0))
+
+class TestBlockyServiceLayout(unittest.TestCase):
+    def setUp(self):
+        self.service = BlockyService()
+        self.bricks = [
+            Brick(position=(1, 0, 1), size=(1, 2, 1), stability_score=0.9),
+            Brick(position=(0, 0, 0), size=(2, 2, 1), stability_score=1.0),
+            Brick(position=(0, 0, 1), size=(1, 1, 1), stability_score=0.2),
+        ]
+
+    def test_instructions_layer_heights(self):
+        """Chaque couche porte la hauteur de sa propre cote z."""
+        instructions = self.service._generate_building_instructions(self.bricks)
+        self.assertEqual([step["layer"] for step in instructions], [0, 1])
+        self.assertEqual(instructions[0]["height"], 0)
+        self.assertAlmostEqual(instructions[1]["height"], self.service.BRICK_HEIGHT)
+        self.assertEqual([b["position"] for b in instructions[1]["bricks"]], [(0, 0), (1, 0)])
+        self.assertEqual(instructions[1]["bricks"][1]["size"], (1, 2))
+
+    def test_model_stats(self):
+        stats = self.service._calculate_model_stats(BrickLayout.from_bricks(self.bricks))
+        self.assertEqual(stats["total_bricks"], 3)
+        self.assertEqual(stats["dimensions"], (2, 2, 2))
+        self.assertAlmostEqual(stats["stability_score"], 0.7, places=5)
+        self.assertEqual(stats["brick_types"], {"1x1x1": 1, "1x2x1": 1, "2x2x1": 1})
+        self.assertEqual(self.service._calculate_model_stats([])["total_bricks"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
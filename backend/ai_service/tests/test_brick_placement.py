@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+from services.blocky_service import Brick
+from services.brick_placement import BrickPlacementEngine
+
+BRICK_SIZES = [
+    (1, 1, 1), (1, 2, 1), (1, 3, 1), (1, 4, 1), (2, 2, 1), (2, 3, 1), (2, 4, 1),
+    (1, 1, 2), (1, 2, 2), (2, 2, 2), (2, 3, 2),
+]
+
+
+def legacy_layout(voxels: np.ndarray, brick_sizes) -> list:
+    """Ancien parcours glouton : chaque cellule de l'empreinte est testée une à une."""
+    def can_place(x, y, z, size):
+        w, l, h = size
+        if x + w > voxels.shape[2] or y + l > voxels.shape[1] or z + h > voxels.shape[0]:
+            return False
+        for dz in range(h):
+            for dy in range(l):
+                for dx in range(w):
+                    if not voxels[z + dz, y + dy, x + dx] or visited[z + dz, y + dy, x + dx]:
+                        return False
+        return True
+
+    def preliminary_stability(x, y, z, size):
+        w, l, _ = size
+        if z == 0:
+            return 1.0
+        support = sum(1 for dy in range(l) for dx in range(w) if voxels[z - 1, y + dy, x + dx])
+        return support / (w * l)
+
+    bricks = []
+    visited = np.zeros_like(voxels, dtype=bool)
+    sorted_sizes = sorted(brick_sizes, key=lambda s: s[0] * s[1] * s[2], reverse=True)
+    for z in range(voxels.shape[0]):
+        for y in range(voxels.shape[1]):
+            for x in range(voxels.shape[2]):
+                if not voxels[z, y, x] or visited[z, y, x]:
+                    continue
+                best, best_score = None, -1
+                for size in sorted_sizes:
+                    if can_place(x, y, z, size):
+                        stability = preliminary_stability(x, y, z, size)
+                        score = size[0] * size[1] * size[2] * stability
+                        if score > best_score:
+                            best_score = score
+                            best = Brick(position=(x, y, z), size=size, stability_score=stability)
+                if best:
+                    bricks.append(best)
+                    w, l, h = best.size
+                    visited[z:z + h, y:y + l, x:x + w] = True
+    return bricks
+
+
+class TestBrickPlacementEngine(unittest.TestCase):
+    def test_same_layout_as_legacy(self):
+        """Teste que le moteur produit exactement la disposition de l'ancien parcours."""
+        rng = np.random.default_rng(42)
+        for shape in [(4, 5, 6), (6, 8, 8), (3, 10, 7)]:
+            voxels = rng.random(shape) < 0.7
+            expected = legacy_layout(voxels, BRICK_SIZES)
+            result = BrickPlacementEngine(BRICK_SIZES).place(voxels)
+            
+            self.assertEqual(
+                [(b.position, b.size, b.stability_score) for b in result],
+                [(b.position, b.size, b.stability_score) for b in expected]
+            )
+            
+    def test_full_cube_uses_largest_bricks(self):
+        """Teste qu'un bloc plein est couvert par les plus grandes briques."""
+        voxels = np.ones((2, 3, 2), dtype=bool)
+        bricks = BrickPlacementEngine(BRICK_SIZES).place(voxels)
+        
+        self.assertEqual(len(bricks), 1)
+        self.assertEqual(bricks[0].size, (2, 3, 2))
+        
+    def test_missing_unit_brick_leaves_gaps(self):
+        """Teste qu'aucune brique n'est placée là où aucune taille ne tient."""
+        voxels = np.zeros((1, 1, 3), dtype=bool)
+        voxels[0, 0, :] = True
+        bricks = BrickPlacementEngine([(2, 1, 1)]).place(voxels)
+        
+        self.assertEqual([b.position for b in bricks], [(0, 0, 0)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from services.cache_service import CacheService
+
+class TestCacheService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.cache = CacheService(cache_dir=self.tmp_dir)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _payload(self, size):
+        return {"data": "x" * size}
+
+    async def test_set_and_get(self):
+        await self.cache.set("a", {"value": 1}, {"compute_seconds": 2.5})
+        self.assertEqual(await self.cache.get("a"), {"value": 1})
+        self.assertIsNone(await self.cache.get("missing"))
+        self.assertEqual(self.cache.entry_info("a")["compute_seconds"], 2.5)
+
+    async def test_set_replaces_file_atomically(self):
+        """Une écriture est renommée en place, hors de la boucle ; un échec laisse l'ancien fichier intact."""
+        threads = []
+        store = self.cache._store
+
+        def record(*args):
+            threads.append(threading.get_ident())
+            return store(*args)
+
+        self.cache._store = record
+        await self.cache.set("a", {"value": 1})
+        await self.cache.set("a", {"value": 2})
+        # Résultat non sérialisable : l'écriture échoue avant de toucher au fichier en cache
+        await self.cache.set("a", {"value": object()})
+
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertEqual(json.loads((self.tmp_dir / "a.json").read_text()), {"value": 2})
+        self.assertEqual(list(self.tmp_dir.glob("*.tmp")), [])
+        self.cache._memory_discard("a")
+        self.assertEqual(await self.cache.get("a"), {"value": 2})
+
+    async def test_disk_tier_survives_restart(self):
+        """L'index SQLite et les fichiers sont relus par une nouvelle instance."""
+        await self.cache.set("a", {"value": 1})
+        self.cache.close()
+
+        self.cache = CacheService(cache_dir=self.tmp_dir)
+        self.assertEqual(await self.cache.get("a"), {"value": 1})
+        self.assertEqual(self.cache.entry_info("a")["hits"], 1)
+
+    async def test_memory_tier_is_bounded(self):
+        """Le niveau mémoire évince les entrées les moins récentes."""
+        self.cache.max_memory_bytes = 2500
+        for key in ("a", "b", "c"):
+            await self.cache.set(key, self._payload(1000))
+
+        self.assertNotIn("a", self.cache._memory)
+        self.assertIn("c", self.cache._memory)
+        self.assertLessEqual(self.cache._memory_bytes, 2500)
+        # L'entrée évincée de la mémoire reste lisible sur disque
+        self.assertEqual(await self.cache.get("a"), self._payload(1000))
+
+    async def test_disk_budget_evicts_least_recently_used(self):
+        self.cache.max_disk_bytes = 3500
+        await self.cache.set("a", self._payload(1000))
+        await self.cache.set("b", self._payload(1000))
+        await self.cache.set("c", self._payload(1000))
+        time.sleep(0.01)
+        await self.cache.get("a")  # "b" devient la moins récemment utilisée
+        await self.cache.set("d", self._payload(1000))
+
+        self.assertIsNone(await self.cache.get("b"))
+        self.assertFalse((self.tmp_dir / "b.json").exists())
+        self.assertIsNotNone(await self.cache.get("a"))
+        stats = await self.cache.get_cache_stats()
+        self.assertEqual(stats["total_entries"], 3)
+        self.assertLessEqual(stats["total_size_mb"] * 1024 * 1024, 3500)
+
+    async def test_expired_entries_are_removed(self):
+        await self.cache.set("a", {"value": 1})
+        self.cache.max_age_days = 0
+        time.sleep(0.01)
+        self.assertIsNone(await self.cache.get("a"))
+        self.assertFalse((self.tmp_dir / "a.json").exists())
+
+    async def test_single_flight(self):
+        """Les demandes concurrentes d'une même clé partagent un seul calcul."""
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"value": 42}
+
+        results = await asyncio.gather(*(self.cache.get_or_compute("k", compute) for _ in range(5)))
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, [{"value": 42}] * 5)
+        self.assertFalse(self.cache.is_computing("k"))
+
+        await self.cache.get_or_compute("k", compute)
+        self.assertEqual(calls, 1)
+
+    async def test_single_flight_propagates_errors(self):
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError("échec")
+
+        results = await asyncio.gather(
+            *(self.cache.get_or_compute("k", compute) for _ in range(3)),
+            return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertIsNone(await self.cache.get("k"))
+
+    async def test_single_flight_survives_cancelled_leader(self):
+        """L'annulation de l'appelant qui a lancé le calcul ne touche pas les autres."""
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"value": 42}
+
+        leader = asyncio.create_task(self.cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(self.cache.get_or_compute("k", compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        self.assertEqual(await asyncio.gather(*waiters), [{"value": 42}] * 3)
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(calls, 1)
+        self.assertFalse(self.cache.is_computing("k"))
+        self.assertEqual(await self.cache.get("k"), {"value": 42})
+
+    async def test_migrates_json_metadata(self):
+        """L'ancien index cache_metadata.json est importé au démarrage."""
+        self.cache.close()
+        legacy_dir = self.tmp_dir / "legacy"
+        legacy_dir.mkdir()
+        (legacy_dir / "old.json").write_text(json.dumps({"value": 7}))
+        (legacy_dir / "cache_metadata.json").write_text(json.dumps({
+            "old": {"created_at": "2099-01-01T00:00:00", "file_name": "model.obj", "params": {}}
+        }))
+
+        self.cache = CacheService(cache_dir=legacy_dir)
+        self.assertEqual(await self.cache.get("old"), {"value": 7})
+        self.assertEqual(self.cache.entry_info("old")["file_name"], "model.obj")
+        self.assertFalse((legacy_dir / "cache_metadata.json").exists())
+
+if __name__ == '__main__':
+    unittest.main()
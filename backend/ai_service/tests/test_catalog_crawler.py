@@ -0,0 +1,205 @@
+import asyncio
+import socket
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from services.catalog_crawler import CatalogCrawler, CatalogRefreshError
+from services.catalog_store import CatalogStore
+from utils.rate_limiter import RateLimiter
+
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+class FakeCatalogServer:
+    """
+    API de catalogue locale : /colors, /parts, /sets et /sets/{id}/parts.
+
+    Les listes portent un ETag et une date Last-Modified et répondent 304 aux
+    requêtes conditionnelles. Les requêtes reçues sont comptées par chemin.
+    """
+    def __init__(self, sets, port, delay=0.0):
+        self.colors = {'red': {'rgb': [255, 0, 0]}}
+        self.parts = {'3001': {'size': '2x4'}}
+        self.sets = list(sets)
+        self.delay = delay
+        self.failing = set()
+        self.calls = []
+        self.conditional = 0
+        self.in_flight = self.max_in_flight = 0
+        app = web.Application()
+        app.router.add_get('/colors', self.listing)
+        app.router.add_get('/parts', self.listing)
+        app.router.add_get('/sets', self.listing)
+        app.router.add_get('/sets/{set_id}/parts', self.set_parts)
+        # Port fixe : les validateurs HTTP sont enregistrés par URL
+        self.server = TestServer(app, host='127.0.0.1', port=port)
+
+    @property
+    def url(self):
+        return str(self.server.make_url('')).rstrip('/')
+
+    async def listing(self, request):
+        payload = {
+            '/colors': self.colors,
+            '/parts': self.parts,
+            '/sets': [{'set_id': set_id, 'year': 2020, 'theme': 'City'} for set_id in self.sets],
+        }[request.path]
+        self.calls.append(request.path)
+        if request.path in self.failing:
+            return web.Response(status=503)
+        etag = f'"{hash(repr(payload)) & 0xffffffff:x}"'
+        if request.headers.get('If-None-Match') == etag:
+            self.conditional += 1
+            return web.Response(status=304)
+        return web.json_response(payload, headers={'ETag': etag, 'Last-Modified': LAST_MODIFIED})
+
+    async def set_parts(self, request):
+        self.calls.append(request.path)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        set_id = request.match_info['set_id']
+        if set_id in self.failing:
+            return web.Response(status=500)
+        return web.json_response([{'size': '2x4', 'format': 'standard', 'stability_score': 0.5}])
+
+    def set_calls(self):
+        return [path for path in self.calls if path.startswith('/sets/')]
+
+class TestCatalogCrawler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CatalogStore(Path(self.tmp.name) / "catalog.sqlite3")
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def crawl(self, server, limiter=None, concurrency=4, steps=None):
+        """Lance le serveur et un parcours ; `steps` s'exécute à la place du parcours s'il est donné."""
+        async def run():
+            await server.server.start_server()
+            try:
+                crawler = CatalogCrawler(
+                    self.store, {'bricklink': (server.url, limiter)}, concurrency=concurrency, batch_size=2
+                )
+                return await (steps(crawler) if steps else crawler.crawl())
+            finally:
+                await server.server.close()
+        return asyncio.run(run())
+
+    def test_crawl_publishes_catalog(self):
+        """Teste la publication des listes et des sets récupérés."""
+        server = FakeCatalogServer(['1', '2', '3'], self.port)
+        stats = self.crawl(server)
+
+        self.assertEqual(stats['bricklink'], {'not_modified': 0, 'fetched_sets': 3, 'failed_sets': 0})
+        self.assertEqual(sorted(self.store.collection('bricklink_models')), ['1', '2', '3'])
+        self.assertEqual(self.store.collection('bricklink_models')['2']['theme'], 'City')
+        self.assertEqual(dict(self.store.collection('bricklink_colors').items()), server.colors)
+        self.assertEqual(len(self.store.collection('bricklink_models_pending')), 0)
+
+    def test_conditional_requests(self):
+        """Teste que les listes inchangées ne sont pas retéléchargées et que seuls les nouveaux sets sont demandés."""
+        server = FakeCatalogServer(['1', '2'], self.port)
+        self.crawl(server)
+
+        server = FakeCatalogServer(['1', '2', '3'], self.port)
+        server.colors = {'red': {'rgb': [255, 0, 0]}}
+        stats = self.crawl(server)
+
+        # Couleurs et pièces inchangées : 304 ; la liste des sets a changé
+        self.assertEqual(server.conditional, 2)
+        self.assertEqual(stats['bricklink']['not_modified'], 2)
+        self.assertEqual(server.set_calls(), ['/sets/3/parts'])
+        self.assertEqual(sorted(self.store.collection('bricklink_models')), ['1', '2', '3'])
+        self.assertEqual(list(self.store.collection('bricklink_colors')), ['red'])
+
+        server = FakeCatalogServer(['1', '2', '3'], self.port)
+        stats = self.crawl(server)
+        self.assertEqual(stats['bricklink'], {'not_modified': 3, 'fetched_sets': 0, 'failed_sets': 0})
+        self.assertEqual(server.set_calls(), [])
+
+    def test_failed_crawl_resumes(self):
+        """Teste qu'un parcours interrompu ne publie rien et reprend sans redemander les sets récupérés."""
+        server = FakeCatalogServer(['1', '2', '3', '4'], self.port)
+        self.crawl(server, steps=self.interrupted_after_sets)
+
+        self.assertEqual(len(self.store.collection('bricklink_models')), 0)
+        self.assertEqual(len(self.store.collection('bricklink_colors')), 0)
+        self.assertEqual(sorted(self.store.collection('bricklink_models_pending')), ['1', '2', '3', '4'])
+
+        server = FakeCatalogServer(['1', '2', '3', '4', '5'], self.port)
+        stats = self.crawl(server)
+        self.assertEqual(server.set_calls(), ['/sets/5/parts'])
+        self.assertEqual(stats['bricklink']['fetched_sets'], 1)
+        self.assertEqual(sorted(self.store.collection('bricklink_models')), ['1', '2', '3', '4', '5'])
+        self.assertEqual(len(self.store.collection('bricklink_models_pending')), 0)
+
+    async def interrupted_after_sets(self, crawler):
+        """Parcours qui échoue après avoir récupéré les sets, avant la publication."""
+        commit_snapshot = self.store.commit_snapshot
+
+        def publish(replacements=None, upserts=None):
+            if 'bricklink_models_pending' in (replacements or {}):
+                raise CatalogRefreshError("interrompu")
+            commit_snapshot(replacements, upserts)
+
+        with patch.object(self.store, 'commit_snapshot', side_effect=publish):
+            with self.assertRaises(CatalogRefreshError):
+                await crawler.crawl()
+
+    def test_unavailable_list_publishes_nothing(self):
+        """Teste qu'une liste indisponible fait échouer le parcours sans modifier le catalogue servi."""
+        server = FakeCatalogServer(['1'], self.port)
+        self.crawl(server)
+
+        server = FakeCatalogServer(['1', '2'], self.port)
+        server.colors = {'blue': {'rgb': [0, 0, 255]}}
+        server.failing.add('/sets')
+        with self.assertRaises(CatalogRefreshError):
+            self.crawl(server)
+        self.assertEqual(list(self.store.collection('bricklink_colors')), ['red'])
+        self.assertEqual(list(self.store.collection('bricklink_models')), ['1'])
+
+    def test_failed_set_skipped(self):
+        """Teste qu'un set en erreur est ignoré puis redemandé au parcours suivant."""
+        server = FakeCatalogServer(['1', '2'], self.port)
+        server.failing.add('2')
+        stats = self.crawl(server)
+        self.assertEqual(stats['bricklink']['failed_sets'], 1)
+        self.assertEqual(list(self.store.collection('bricklink_models')), ['1'])
+
+        server = FakeCatalogServer(['1', '2'], self.port)
+        self.crawl(server)
+        self.assertEqual(server.set_calls(), ['/sets/2/parts'])
+
+    def test_bounded_concurrency(self):
+        """Teste que le nombre de requêtes simultanées est borné."""
+        server = FakeCatalogServer([str(i) for i in range(20)], self.port, delay=0.02)
+        self.crawl(server, concurrency=3)
+        self.assertEqual(len(server.set_calls()), 20)
+        self.assertGreater(server.max_in_flight, 1)
+        self.assertLessEqual(server.max_in_flight, 3)
+
+    def test_rate_limiter(self):
+        """Teste que le limiteur de débit de la source est respecté."""
+        server = FakeCatalogServer([str(i) for i in range(5)], self.port)
+        limiter = RateLimiter(calls=3, period=0.3)
+        start = time.monotonic()
+        self.crawl(server, limiter=limiter)
+        # 3 listes et 5 sets : deux périodes d'attente au moins
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
+        self.assertEqual(len(server.calls), 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from datetime import datetime
+from services.blocky_optimizer import BlockyOptimizer
+from services.blocky_service import Brick
+from services.catalog_index import CatalogIndex, part_base_score
+
+def make_models(parts_by_set, theme='City', year=2020):
+    return {
+        set_id: {'parts': parts, 'theme': theme, 'year': year}
+        for set_id, parts in parts_by_set.items()
+    }
+
+def part(size, format_name, score):
+    return {'size': size, 'format': format_name, 'stability_score': score}
+
+class TestCatalogIndex(unittest.TestCase):
+    def setUp(self):
+        self.lego = make_models({
+            '1': [part('2x4', 'standard', 0.50), part('2x4', 'standard', 0.65), part('1x2', 'plate', 0.5)],
+            '2': [part('2x4', 'standard', 0.55), part('2x4', 'technic', 0.5)],
+        })
+        self.bricklink = make_models({
+            '9': [part('2x4', 'standard', 0.42), part('2x4', 'standard', 0.9), {'size': '2x4'}],
+        }, theme='Castle', year=1990)
+        self.index = CatalogIndex(self.lego, self.bricklink, current_year=2024)
+
+    def test_similar_parts_range(self):
+        """Teste que la recherche par intervalle applique |score - stabilité| < 0.1."""
+        scores = [0.42, 0.50, 0.55, 0.65, 0.9]
+        for stability in (0.3, 0.45, 0.5, 0.52, 0.55, 0.75, 0.8, 1.0):
+            parts = self.index.similar_parts('2x4', 'standard', stability)
+            self.assertEqual(
+                [p['part']['stability_score'] for p in parts],
+                [score for score in scores if abs(score - stability) < 0.1]
+            )
+        self.assertEqual(self.index.similar_parts('2x2', 'standard', 0.5), [])
+
+    def test_score_totals(self):
+        """Teste les sommes de scores par fabricant."""
+        totals = self.index.score_totals('2x4', 'standard', 0.5)
+        lego_score = part_base_score('standard', 'City', 2020, 2024)
+        bricklink_score = part_base_score('standard', 'Castle', 1990, 2024)
+        self.assertAlmostEqual(totals['lego'][0], 2 * lego_score)
+        self.assertEqual(totals['lego'][1], 2)
+        self.assertAlmostEqual(totals['bricklink'][0], bricklink_score)
+        self.assertEqual(totals['bricklink'][1], 1)
+
+    def test_invalid_parts_skipped(self):
+        """Teste que les pièces incomplètes sont ignorées."""
+        self.assertEqual(len(self.index), 7)
+
+class TestBrickScores(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = BlockyOptimizer()
+        self.optimizer.lego_models = make_models({
+            '1': [part('2x4', 'technic', 0.8), part('2x4', 'technic', 0.85), part('1x2', 'standard', 0.8)],
+        })
+        self.optimizer.bricklink_models = make_models({
+            '2': [part('2x4', 'standard', 0.75)],
+        }, year=1950)
+
+    def reference_scores(self, brick):
+        """Parcours complet du catalogue (implémentation d'origine)."""
+        similar = []
+        for format_name, sizes in self.optimizer.brick_formats.items():
+            for size in sizes:
+                if self.optimizer._matches_brick_size(brick.size, size):
+                    for manufacturer, models in (('lego', self.optimizer.lego_models),
+                                                 ('bricklink', self.optimizer.bricklink_models)):
+                        for set_data in models.values():
+                            for p in set_data['parts']:
+                                if (p['size'] == size and p['format'] == format_name and
+                                        abs(p['stability_score'] - brick.stability_score) < 0.1):
+                                    similar.append((manufacturer, part_base_score(
+                                        format_name, set_data['theme'], set_data['year'], datetime.now().year
+                                    ), format_name))
+        scores = {}
+        for manufacturer in ('lego', 'bricklink'):
+            values = [score for m, score, _ in similar if m == manufacturer]
+            if values:
+                scores[manufacturer] = sum(values) / len(values)
+        return scores, similar[0][2] if similar else None
+
+    def test_scores_match_full_scan(self):
+        """Teste que l'index donne les mêmes scores que le parcours complet."""
+        bricks = [
+            Brick(position=(0, 0, 0), size=(4, 2, 1), stability_score=0.8),
+            Brick(position=(0, 0, 1), size=(1, 2, 1), stability_score=0.75),
+            Brick(position=(0, 0, 2), size=(2, 2, 1), stability_score=0.8),
+        ]
+        expected = [self.reference_scores(brick) for brick in bricks]
+        self.optimizer._update_brick_scores(bricks)
+
+        for brick, (scores, brick_format) in zip(bricks, expected):
+            if 'lego' in scores:
+                self.assertAlmostEqual(brick.lego_score, scores['lego'])
+            if 'bricklink' in scores:
+                self.assertAlmostEqual(brick.bricklink_score, scores['bricklink'])
+            if brick_format:
+                self.assertEqual(brick.brick_format, brick_format)
+        self.assertEqual(bricks[0].manufacturer, 'lego')
+        self.assertEqual(bricks[0].brick_format, 'standard')
+
+    def test_index_rebuilt_when_catalog_changes(self):
+        """Teste que l'index est reconstruit après une mise à jour du catalogue."""
+        first = self.optimizer._get_catalog_index()
+        self.assertIs(self.optimizer._get_catalog_index(), first)
+        self.optimizer.lego_models['3'] = {'parts': [part('1x1', 'plate', 0.5)], 'theme': '', 'year': 2020}
+        second = self.optimizer._get_catalog_index()
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second), len(first) + 1)
+
+    def test_matches_brick_size(self):
+        """Teste la correspondance des tailles dans les deux orientations."""
+        self.assertTrue(self.optimizer._matches_brick_size((4, 2, 1), '2x4'))
+        self.assertTrue(self.optimizer._matches_brick_size((2.0, 4.0, 1), '2x4'))
+        self.assertFalse(self.optimizer._matches_brick_size((2, 2, 1), '2x4'))
+        self.assertFalse(self.optimizer._matches_brick_size((1, 1, 1), 'round'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import asyncio
+import math
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from services.catalog_crawler import CatalogRefreshError
+from services.catalog_refresh import CatalogRefresher
+from services.catalog_store import CatalogStore
+
+class FakeCrawler:
+    """Parcours simulé : publie le catalogue donné, ou échoue si `error` est défini."""
+    def __init__(self, store):
+        self.store = store
+        self.colors = {'red': {'rgb': [255, 0, 0]}}
+        self.sets = ['10']
+        self.error = None
+        self.calls = 0
+
+    async def crawl(self):
+        self.calls += 1
+        if self.error:
+            raise CatalogRefreshError(self.error)
+        self.store.commit_snapshot(
+            {'bricklink_colors': self.colors},
+            {'lego_models': {set_id: {'parts': [], 'year': 2020} for set_id in self.sets}}
+        )
+        return {'lego': {'fetched_sets': len(self.sets)}}
+
+class TestCatalogRefresher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CatalogStore(Path(self.tmp.name) / "catalog.sqlite3")
+        self.refresher = CatalogRefresher(
+            self.store, "http://bricklink", "http://lego", interval=3600, retry_interval=0,
+            legacy_timestamp_path=str(Path(self.tmp.name) / "bricklink_last_update.txt")
+        )
+        self.crawler = self.refresher.crawler = FakeCrawler(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def refresh(self):
+        return asyncio.run(self.refresher.refresh())
+
+    def test_refresh_writes_snapshot(self):
+        """Teste la publication du catalogue et l'état rapporté."""
+        self.assertTrue(self.refresh())
+
+        self.assertEqual(list(self.store.collection('lego_models')), ['10'])
+        self.assertEqual(self.store.collection('bricklink_colors')['red'], {'rgb': [255, 0, 0]})
+        self.assertLess(self.refresher.age(), 5)
+        report = self.refresher.report()
+        self.assertFalse(report['stale'])
+        self.assertEqual(report['sizes']['lego_models'], 1)
+        self.assertEqual(report['last_stats'], {'lego': {'fetched_sets': 1}})
+        self.assertGreater(self.refresher.seconds_until_due(), 3500)
+
+    def test_failed_refresh_keeps_previous_snapshot(self):
+        """Teste qu'un échec laisse l'ancien catalogue servi et la date de rafraîchissement inchangée."""
+        self.refresh()
+        refreshed_at = self.refresher.refreshed_at
+        version = self.store.version('bricklink_colors')
+
+        self.crawler.error = "http://lego/sets: HTTP 503"
+        self.assertFalse(self.refresh())
+
+        self.assertEqual(list(self.store.collection('bricklink_colors')), ['red'])
+        self.assertEqual(self.store.version('bricklink_colors'), version)
+        self.assertEqual(self.refresher.refreshed_at, refreshed_at)
+        report = self.refresher.report()
+        self.assertEqual(report['consecutive_failures'], 1)
+        self.assertIn('503', report['last_error'])
+
+    def test_never_refreshed(self):
+        """Teste l'état d'un catalogue jamais rafraîchi."""
+        self.assertTrue(math.isnan(self.refresher.age()))
+        self.assertLessEqual(self.refresher.seconds_until_due(), 0)
+        self.assertTrue(self.refresher.report()['stale'])
+
+    def test_legacy_timestamp_imported(self):
+        """Teste la reprise de la date de l'ancien fichier de mise à jour."""
+        path = Path(self.tmp.name) / "old_update.txt"
+        path.write_text(str(time.time() - 60))
+        refresher = CatalogRefresher(self.store, "http://bricklink", "http://lego", legacy_timestamp_path=str(path))
+        self.assertAlmostEqual(refresher.age(), 60, delta=5)
+        self.assertFalse(path.exists())
+
+    def test_legacy_json_imported_by_background_task(self):
+        """Teste que les anciens catalogues JSON sont importés par la tâche de fond, sous le verrou."""
+        legacy = Path(self.tmp.name) / "bricklink_colors.json"
+        legacy.write_text('{"blue": {"rgb": [0, 0, 255]}}')
+        refresher = CatalogRefresher(
+            self.store, "http://bricklink", "http://lego", interval=3600, retry_interval=0,
+            legacy_timestamp_path=None, legacy_json_files={'bricklink_colors': str(legacy)}
+        )
+        refresher.crawler = self.crawler
+        # Construire le service ne lit pas les fichiers
+        self.assertTrue(legacy.exists())
+
+        # Un autre worker détient le verrou : il se charge de l'import
+        self.assertTrue(self.store.try_lease(CatalogRefresher.LEASE_KEY, 60))
+        asyncio.run(refresher._import_legacy_json())
+        self.assertTrue(legacy.exists())
+        self.store.release_lease(CatalogRefresher.LEASE_KEY)
+
+        asyncio.run(refresher._import_legacy_json())
+        self.assertFalse(legacy.exists())
+        self.assertEqual(self.store.collection('bricklink_colors')['blue'], {'rgb': [0, 0, 255]})
+        self.assertTrue(self.store.try_lease(CatalogRefresher.LEASE_KEY, 60))
+
+    def test_lease(self):
+        """Teste qu'un seul worker obtient le verrou de rafraîchissement."""
+        self.assertTrue(self.store.try_lease(CatalogRefresher.LEASE_KEY, 60))
+        self.assertFalse(self.store.try_lease(CatalogRefresher.LEASE_KEY, 60))
+        self.store.release_lease(CatalogRefresher.LEASE_KEY)
+        self.assertTrue(self.store.try_lease(CatalogRefresher.LEASE_KEY, 60))
+
+    def test_background_task_retries(self):
+        """Teste que la tâche de fond réessaie après un échec puis attend l'intervalle suivant."""
+        self.crawler.error = "http://lego/colors: HTTP 500"
+
+        async def scenario():
+            self.refresher.start()
+            while self.refresher.consecutive_failures < 2:
+                await asyncio.sleep(0.01)
+            self.crawler.error = None
+            while self.refresher.refreshed_at is None:
+                await asyncio.sleep(0.01)
+            calls = self.crawler.calls
+            await asyncio.sleep(0.05)
+            await self.refresher.stop()
+            return calls
+
+        calls = asyncio.run(asyncio.wait_for(scenario(), 10))
+        self.assertEqual(self.refresher.consecutive_failures, 0)
+        self.assertEqual(list(self.store.collection('lego_models')), ['10'])
+        # À jour : pas de nouveau parcours avant l'intervalle, verrou libéré
+        self.assertEqual(self.crawler.calls, calls)
+        self.assertTrue(self.store.try_lease(CatalogRefresher.LEASE_KEY, 60))
+
+    def test_background_task_keeps_store_off_event_loop(self):
+        """Teste que le verrou, la date et les tailles sont lus et écrits hors de la boucle d'événements."""
+        threads = {}
+        for name in ('try_lease', 'release_lease', 'set_meta'):
+            def record(*args, _name=name, _method=getattr(self.store, name)):
+                threads.setdefault(_name, set()).add(threading.get_ident())
+                return _method(*args)
+            setattr(self.store, name, record)
+
+        async def scenario():
+            loop_thread = threading.get_ident()
+            self.refresher.start()
+            while self.refresher.refreshed_at is None:
+                await asyncio.sleep(0.01)
+            await self.refresher.stop()
+            return loop_thread
+
+        loop_thread = asyncio.run(asyncio.wait_for(scenario(), 10))
+        self.assertEqual(set(threads), {'try_lease', 'release_lease', 'set_meta'})
+        self.assertTrue(all(loop_thread not in idents for idents in threads.values()))
+        # Tailles relevées après le rafraîchissement, servies sans requête par report()
+        self.assertEqual(self.refresher.report()['sizes']['lego_models'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
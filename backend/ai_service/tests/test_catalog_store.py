@@ -0,0 +1,134 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from services.blocky_optimizer import BlockyOptimizer
+from services.blocky_service import Brick
+from services.catalog_store import CatalogStore
+
+class TestCatalogStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "catalog.sqlite3"
+        self.store = CatalogStore(self.path)
+        self.sets = self.store.collection('lego_models')
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_upsert_and_lookup(self):
+        """Teste les insertions, remplacements et lectures d'entrées."""
+        self.sets['10'] = {'year': 2020}
+        self.sets.update({'11': {'year': 2021}, '12': {'year': 2022}})
+        self.sets['10'] = {'year': 2019}
+
+        self.assertEqual(len(self.sets), 3)
+        self.assertIn('11', self.sets)
+        self.assertNotIn('13', self.sets)
+        self.assertEqual(self.sets['10'], {'year': 2019})
+        # L'ordre d'insertion est conservé, même après un remplacement
+        self.assertEqual(list(self.sets), ['10', '11', '12'])
+        self.assertEqual(dict(self.sets.items())['12'], {'year': 2022})
+        with self.assertRaises(KeyError):
+            self.sets['13']
+
+        del self.sets['11']
+        self.assertEqual(list(self.sets), ['10', '12'])
+        with self.assertRaises(KeyError):
+            del self.sets['11']
+
+    def test_collections_are_separate(self):
+        """Teste que les collections ne partagent pas leurs entrées."""
+        self.sets['1'] = {'year': 2020}
+        self.store.collection('bricklink_models')['1'] = {'year': 1990}
+        self.assertEqual(self.sets['1'], {'year': 2020})
+        self.assertEqual(len(self.store.collection('lego_colors')), 0)
+
+    def test_replace(self):
+        """Teste le remplacement complet d'une collection et le numéro de version."""
+        self.sets.update({'1': {}, '2': {}})
+        version = self.sets.version
+        self.sets.replace({'3': {'year': 2000}})
+        self.assertEqual(list(self.sets), ['3'])
+        self.assertGreater(self.sets.version, version)
+
+    def test_replace_is_atomic(self):
+        """Teste qu'un remplacement interrompu laisse la collection intacte."""
+        self.sets.update({'1': {'year': 2020}})
+        with self.assertRaises(TypeError):
+            self.sets.replace({'2': {'year': 2021}, '3': object()})
+        self.assertEqual(list(self.sets), ['1'])
+
+    def test_import_json(self):
+        """Teste l'import d'un ancien fichier JSON, renommé ensuite."""
+        json_path = Path(self.tmp.name) / "lego_official_models.json"
+        json_path.write_text(json.dumps({'1': {'year': 2020}, '2': {'year': 2021}}))
+
+        self.assertEqual(self.store.import_json('lego_models', json_path), 2)
+        self.assertEqual(self.sets['2'], {'year': 2021})
+        self.assertFalse(json_path.exists())
+        self.assertTrue(json_path.with_suffix(".json.migrated").exists())
+        # Déjà importé : rien à faire
+        self.assertEqual(self.store.import_json('lego_models', json_path), 0)
+
+    def test_visible_from_other_connections(self):
+        """Teste qu'une écriture est visible depuis un autre thread et une autre base ouverte."""
+        self.sets['1'] = {'year': 2020}
+
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(self.sets['1']))
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, [{'year': 2020}])
+
+        other = CatalogStore(self.path)
+        try:
+            self.assertEqual(other.collection('lego_models')['1'], {'year': 2020})
+            other.collection('lego_models')['2'] = {'year': 2021}
+            self.assertIn('2', self.sets)
+        finally:
+            other.close()
+
+class TestOptimizerCatalogStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.optimizer = BlockyOptimizer()
+        models = Path(self.tmp.name)
+        self.optimizer.CATALOG_DB_PATH = str(models / "catalog.sqlite3")
+        self.optimizer.LEGO_COLORS_PATH = str(models / "lego_colors.json")
+        self.optimizer.MODEL_DB_PATH = str(models / "lego_models.json")
+
+    def tearDown(self):
+        self.optimizer.catalog_store.close()
+        self.tmp.cleanup()
+
+    def test_json_files_imported(self):
+        """Teste que les anciens fichiers JSON sont importés à la première ouverture."""
+        Path(self.optimizer.LEGO_COLORS_PATH).write_text(json.dumps({'red': {'rgb': [255, 0, 0]}}))
+        self.assertEqual(dict(self.optimizer.lego_colors.items()), {'red': {'rgb': [255, 0, 0]}})
+        self.assertEqual(len(self.optimizer.bricklink_models), 0)
+
+    def test_successful_models_saved(self):
+        """Teste l'enregistrement d'un modèle réussi et son usage pour l'apprentissage."""
+        brick = SimpleNamespace(
+            position=(0, 0, 0), size=(2, 4, 1), stability_score=0.5, connection_score=0.0,
+            learning_score=0.8, bricklink_score=0.0, brick_format='standard'
+        )
+        self.optimizer._save_successful_model('house', [brick], {'stability': 1.0})
+
+        reopened = CatalogStore(self.optimizer.CATALOG_DB_PATH)
+        try:
+            self.assertIn('house', reopened.collection('successful_models'))
+        finally:
+            reopened.close()
+
+        other = Brick(position=(1, 0, 0), size=(2, 4, 1), stability_score=0.55)
+        other.learning_score = 0.4
+        self.optimizer._update_learning_scores([other], 'house')
+        self.assertAlmostEqual(other.learning_score, 0.6)
+
+if __name__ == '__main__':
+    unittest.main()
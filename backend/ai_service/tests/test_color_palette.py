@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+from services.blocky_optimizer import BlockyOptimizer
+from services.blocky_service import Brick
+from services.brick_layout import BrickLayout
+from services.color_palette import ColorPalette, region_means, rgb_to_lab
+
+class TestColorPalette(unittest.TestCase):
+    def test_rgb_to_lab(self):
+        """Teste la conversion sRGB -> CIELAB sur le blanc et le noir de référence."""
+        lab = rgb_to_lab(np.array([[1.0, 1.0, 1.0], [0.0, 0.0, 0.0]]))
+        np.testing.assert_allclose(lab, [[100, 0, 0], [0, 0, 0]], atol=1e-3)
+
+    def test_region_means_match_slices(self):
+        """Teste que la table de sommes cumulées donne les moyennes des découpages."""
+        rng = np.random.default_rng(0)
+        colors = rng.random((6, 5, 4, 3))
+        positions = np.array([[0, 0, 0], [1, 2, 1], [4, 3, 2], [5, 4, 3]])
+        sizes = np.array([[6, 5, 4], [2, 1, 2], [4, 4, 4], [1, 1, 1]])
+
+        means, valid = region_means(colors, positions, sizes)
+
+        self.assertTrue(valid.all())
+        for (x, y, z), (w, h, d), mean in zip(positions, sizes, means):
+            expected = colors[x:x+w, y:y+h, z:z+d].mean(axis=(0, 1, 2))
+            np.testing.assert_allclose(mean, expected)
+
+    def test_region_outside_volume(self):
+        """Teste qu'une région hors du volume est signalée comme vide."""
+        means, valid = region_means(np.ones((2, 2, 2, 3)), np.array([[3, 0, 0]]), np.array([[1, 1, 1]]))
+        self.assertFalse(valid[0])
+
+    def test_palette_merges_catalogs(self):
+        """Teste la fusion des catalogues et la recherche du plus proche voisin."""
+        lego = {'1': {'rgb': [255, 0, 0]}, '2': {'rgb': [0, 0, 255]}}
+        bricklink = {'5': {'rgb': [255, 0, 0]}, '6': {'rgb': [255, 255, 0]}, '7': {'name': 'sans rgb'}}
+        palette = ColorPalette.from_catalogs(lego, bricklink)
+
+        self.assertEqual(len(palette), 3)
+        indices = palette.nearest(np.array([[0.9, 0.1, 0.1], [0.1, 0.1, 0.8], [0.9, 0.9, 0.2]]))
+        self.assertEqual([palette.colors[i] for i in indices],
+                         [(255.0, 0.0, 0.0), (0.0, 0.0, 255.0), (255.0, 255.0, 0.0)])
+
+    def test_empty_palette(self):
+        """Teste qu'une recherche dans une palette vide est refusée."""
+        with self.assertRaises(ValueError):
+            ColorPalette([]).nearest(np.zeros((1, 3)))
+
+class TestAssignColors(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = BlockyOptimizer()
+        self.optimizer.lego_colors = {'red': {'rgb': [1, 0, 0]}, 'green': {'rgb': [0, 1, 0]}}
+        self.optimizer.bricklink_colors = {'blue': {'rgb': [0, 0, 1]}}
+        self.colors = np.zeros((2, 2, 1, 3))
+        self.colors[0, :, 0] = [0.9, 0.1, 0.0]
+        self.colors[1, 0, 0] = [0.1, 0.8, 0.2]
+        self.colors[1, 1, 0] = [0.0, 0.2, 0.7]
+
+    def test_assign_colors_to_layout(self):
+        """Teste l'attribution des couleurs aux briques d'une BrickLayout."""
+        layout = BrickLayout.from_bricks([
+            Brick(position=(0, 0, 0), size=(1, 2, 1)),
+            Brick(position=(1, 0, 0), size=(1, 1, 1)),
+            Brick(position=(1, 1, 0), size=(1, 1, 1)),
+        ])
+        self.optimizer._assign_colors(layout, self.colors)
+
+        self.assertEqual([brick.color for brick in layout], [(1, 0, 0), (0, 1, 0), (0, 0, 1)])
+
+    def test_assign_colors_to_list(self):
+        """Teste l'attribution des couleurs à une liste de briques."""
+        bricks = [Brick(position=(0, 0, 0), size=(2, 1, 1))]
+        self.optimizer._assign_colors(bricks, self.colors)
+        self.assertEqual(bricks[0].color, (1.0, 0.0, 0.0))
+
+    def test_palette_rebuilt_when_catalog_replaced(self):
+        """Teste que la palette suit le remplacement d'un catalogue."""
+        self.assertEqual(len(self.optimizer._get_color_palette()), 3)
+        self.optimizer.bricklink_colors = {}
+        self.assertEqual(len(self.optimizer._get_color_palette()), 2)
+
+    def test_without_catalog_keeps_mean_color(self):
+        """Teste que sans catalogue chaque brique reçoit sa couleur moyenne."""
+        self.optimizer.lego_colors = {}
+        self.optimizer.bricklink_colors = {}
+        bricks = [Brick(position=(0, 0, 0), size=(1, 2, 1))]
+        self.optimizer._assign_colors(bricks, self.colors)
+        np.testing.assert_allclose(bricks[0].color, [0.9, 0.1, 0.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+from services.blocky_service import BlockyService
+from services.cache_service import CacheService
+from metrics import CONVERSION_CACHE_REQUESTS, CONVERSION_CACHE_TIME_SAVED
+
+TEST_MODEL = Path(__file__).parent.parent / "test_models" / "cube.obj"
+
+class TestConversionCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.model_path = self.tmp_dir / "cube.obj"
+        shutil.copy(TEST_MODEL, self.model_path)
+
+        self.cache = CacheService(cache_dir=self.tmp_dir / "cache")
+        self.service = BlockyService(cache_service=self.cache)
+
+        # Compte les chargements de maillage
+        self.loader = MagicMock(side_effect=self.service.SUPPORTED_FORMATS['.obj'])
+        self.service.SUPPORTED_FORMATS['.obj'] = self.loader
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _counter(self, result):
+        return CONVERSION_CACHE_REQUESTS.labels(result=result)._value.get()
+
+    async def test_second_conversion_is_served_from_cache(self):
+        """Un même contenu n'est chargé et converti qu'une fois."""
+        hits, misses = self._counter('hit'), self._counter('miss')
+        saved = CONVERSION_CACHE_TIME_SAVED._value.get()
+
+        first = await self.service.convert_to_lego(str(self.model_path))
+        second = await self.service.convert_to_lego(str(self.model_path))
+
+        self.assertEqual(self.loader.call_count, 1)
+        self.assertEqual(second["model_info"]["brick_count"], first["model_info"]["brick_count"])
+        self.assertEqual(self._counter('miss'), misses + 1)
+        self.assertEqual(self._counter('hit'), hits + 1)
+        self.assertGreater(CONVERSION_CACHE_TIME_SAVED._value.get(), saved)
+
+    async def test_concurrent_conversions_are_coalesced(self):
+        """Des requêtes simultanées pour le même fichier ne convertissent qu'une fois."""
+        results = await asyncio.gather(*(
+            self.service.convert_to_lego(str(self.model_path)) for _ in range(3)
+        ))
+        self.assertEqual(self.loader.call_count, 1)
+        self.assertEqual(len({r["model_info"]["brick_count"] for r in results}), 1)
+
+    async def test_same_content_under_another_name_hits(self):
+        """La clé dépend du contenu, pas du nom du fichier."""
+        copy_path = self.tmp_dir / "renamed.obj"
+        shutil.copy(self.model_path, copy_path)
+
+        await self.service.convert_to_lego(str(self.model_path))
+        await self.service.convert_to_lego(str(copy_path))
+        self.assertEqual(self.loader.call_count, 1)
+
+    async def test_resolution_is_part_of_the_key(self):
+        await self.service.convert_to_lego(str(self.model_path), resolution=16)
+        await self.service.convert_to_lego(str(self.model_path), resolution=24)
+        self.assertEqual(self.loader.call_count, 2)
+
+    async def test_precomputed_hash_skips_hashing(self):
+        """Une empreinte fournie par l'appelant est utilisée telle quelle."""
+        content_hash = CacheService.compute_content_hash(self.model_path)
+        self.cache.compute_content_hash = MagicMock(side_effect=CacheService.compute_content_hash)
+
+        await self.service.convert_to_lego(str(self.model_path), content_hash=content_hash)
+        await self.service.convert_to_lego(str(self.model_path), content_hash=content_hash)
+
+        self.cache.compute_content_hash.assert_not_called()
+        self.assertEqual(self.loader.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from services.blocky_optimizer import BlockyOptimizer
+from services.blocky_service import Brick, BRICK_SIZES
+from services.layer_merger import LayerMergeEngine
+
+class TestLayerMergeEngine(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = BlockyOptimizer()
+        self.engine = LayerMergeEngine(
+            BRICK_SIZES,
+            connection_score=self.optimizer._calculate_connection_score,
+            merge=self.optimizer._merge_bricks
+        )
+
+    def _row(self, count):
+        return [Brick(position=(x, 0, 0), size=(1, 1, 1)) for x in range(count)]
+
+    def test_merges_row_into_catalogue_sizes(self):
+        """Une rangée de 1x1 est fusionnée en briques du catalogue."""
+        result = self.engine.merge_layer(self._row(8))
+        self.assertLess(len(result), 8)
+        for brick in result:
+            self.assertIn(tuple(brick.size), self.engine.catalogue)
+        self.assertEqual(sum(b.size[0] for b in result), 8)
+
+    def test_refuses_sizes_outside_catalogue(self):
+        """Aucune fusion n'est faite si la taille obtenue n'existe pas."""
+        engine = LayerMergeEngine(
+            [(1, 1, 1)],
+            connection_score=self.optimizer._calculate_connection_score,
+            merge=self.optimizer._merge_bricks
+        )
+        result = engine.merge_layer(self._row(4))
+        self.assertEqual(len(result), 4)
+
+    def test_rotated_sizes_are_accepted(self):
+        """Une taille est acceptée dans ses deux orientations."""
+        a = Brick(position=(0, 0, 0), size=(1, 1, 1))
+        b = Brick(position=(1, 0, 0), size=(1, 1, 1))
+        self.assertTrue(self.engine.can_merge(a, b))
+        result = self.engine.merge_layer([a, b])
+        self.assertEqual(len(result), 1)
+        self.assertEqual(tuple(result[0].size), (2, 1, 1))
+
+    def test_misaligned_neighbours_are_not_merged(self):
+        """Des briques qui ne partagent pas une arête complète restent séparées."""
+        a = Brick(position=(0, 0, 0), size=(1, 2, 1))
+        b = Brick(position=(1, 1, 0), size=(1, 2, 1))
+        c = Brick(position=(1, 2, 0), size=(1, 1, 1))  # Contact par un coin avec a
+        self.assertFalse(self.engine.can_merge(a, b))
+        self.assertFalse(self.engine.can_merge(a, c))
+        self.assertEqual(len(self.engine.merge_layer([a, b])), 2)
+
+    def test_different_heights_are_not_merged(self):
+        a = Brick(position=(0, 0, 0), size=(1, 1, 1))
+        b = Brick(position=(1, 0, 0), size=(1, 1, 0.5))
+        self.assertEqual(len(self.engine.merge_layer([a, b])), 2)
+
+    def test_dense_layer_preserves_area(self):
+        """Une couche dense est fusionnée sans perte ni recouvrement."""
+        side = 30
+        layer = [Brick(position=(x, y, 0), size=(1, 1, 1)) for y in range(side) for x in range(side)]
+        result = self.optimizer._optimize_layer_connections(layer)
+
+        covered = set()
+        for brick in result:
+            x, y, _ = brick.position
+            w, l, _ = brick.size
+            cells = {(x + i, y + j) for i in range(w) for j in range(l)}
+            self.assertFalse(covered & cells)
+            covered |= cells
+        self.assertEqual(covered, {(x, y) for x in range(side) for y in range(side)})
+        self.assertLess(len(result), side * side // 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ from fastapi.responses import JSONResponse
 from typing import Dict
 import logging
 from ..services.mobile_service import MobileService
-from ..config.mobile_config import (
+from ..mobile_config import (
     MAX_FILE_SIZE,
     ALLOWED_EXTENSIONS,
     API_TITLE,
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, UploadFile, File
 from fastapi.responses import JSONResponse
 from .models.image_analyzer import ImageAnalyzer
+from utils.warmup import Warmup, WarmupError
 
 app = FastAPI(
     title="Brickify AI API",
@@ -8,8 +9,26 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Initialisation du modèle
+# Le modèle est construit en tâche de fond après le démarrage
 image_analyzer = ImageAnalyzer()
+warmup = Warmup()
+warmup.register("image_analyzer", image_analyzer.load)
+
+@app.on_event("startup")
+async def startup_event():
+    warmup.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await warmup.stop()
+
+@app.get("/ready")
+async def get_readiness():
+    """
+    Endpoint de readiness : 503 tant que le modèle n'est pas chargé
+    """
+    report = warmup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
 
 @app.get("/status")
 async def get_status():
@@ -24,6 +43,9 @@ async def analyze_image(file: UploadFile = File(...)):
     Endpoint pour analyser une image
     """
     try:
+        # Attente du modèle s'il est encore en cours de chargement
+        await warmup.get("image_analyzer")
+        
         # Lecture du fichier
         contents = await file.read()
         
@@ -35,6 +57,11 @@ async def analyze_image(file: UploadFile = File(...)):
             "predictions": results
         })
         
+    except WarmupError as e:
+        return JSONResponse(
+            status_code=503,
+            content={"message": str(e)}
+        )
     except Exception as e:
         return JSONResponse(
             status_code=500,
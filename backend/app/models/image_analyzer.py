@@ -1,24 +1,53 @@
-import tensorflow as tf
 import numpy as np
 from PIL import Image
 import io
+import threading
+
+def _keras_applications():
+    """
+    Retourne tf.keras.applications ; tensorflow n'est importé qu'au premier
+    usage, son import seul prend plusieurs secondes
+    """
+    import tensorflow as tf
+    return tf.keras.applications
 
 class ImageAnalyzer:
     def __init__(self):
         """
-        Initialise le modèle de détection d'objets
+        Prépare l'analyseur ; le modèle est construit au premier usage ou par load()
         """
-        # Chargement du modèle MobileNetV2 pré-entraîné
-        self.model = tf.keras.applications.MobileNetV2(
-            weights='imagenet',
-            include_top=True,
-            input_shape=(224, 224, 3)
-        )
-        
-        # Chargement des classes ImageNet
-        self.classes = tf.keras.applications.mobilenet_v2.decode_predictions(
-            np.zeros((1, 1000)), top=1000
-        )[0]
+        self._model = None
+        self._classes = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Initialise le modèle de détection d'objets s'il ne l'est pas déjà
+        """
+        with self._lock:
+            if self._model is None:
+                # Chargement du modèle MobileNetV2 pré-entraîné
+                self._model = _keras_applications().MobileNetV2(
+                    weights='imagenet',
+                    include_top=True,
+                    input_shape=(224, 224, 3)
+                )
+        return self._model
+
+    @property
+    def model(self):
+        return self._model if self._model is not None else self.load()
+
+    @property
+    def classes(self):
+        """
+        Classes ImageNet
+        """
+        if self._classes is None:
+            self._classes = _keras_applications().mobilenet_v2.decode_predictions(
+                np.zeros((1, 1000)), top=1000
+            )[0]
+        return self._classes
 
     def preprocess_image(self, image_bytes):
         """
@@ -34,7 +63,7 @@ class ImageAnalyzer:
         img_array = np.array(image)
         
         # Prétraitement spécifique à MobileNetV2
-        img_array = tf.keras.applications.mobilenet_v2.preprocess_input(img_array)
+        img_array = _keras_applications().mobilenet_v2.preprocess_input(img_array)
         
         # Ajout d'une dimension pour le batch
         img_array = np.expand_dims(img_array, axis=0)
@@ -52,7 +81,7 @@ class ImageAnalyzer:
         predictions = self.model.predict(processed_image)
         
         # Décodage des prédictions
-        decoded_predictions = tf.keras.applications.mobilenet_v2.decode_predictions(
+        decoded_predictions = _keras_applications().mobilenet_v2.decode_predictions(
             predictions, top=5
         )[0]
         
@@ -0,0 +1,105 @@
+"""
+Benchmark du placement initial des briques (_generate_initial_layout).
+
+Compare l'ancien parcours glouton (test de chaque cellule de l'empreinte)
+au BrickPlacementEngine basé sur un volume intégral, et vérifie que les deux
+produisent la même disposition.
+
+Usage:
+    python benchmarks/bench_brick_placement.py [--sizes 64 128] [--legacy-max 64]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.services.blocky_service import BRICK_SIZES, Brick
+from ai_service.services.brick_placement import BrickPlacementEngine
+
+
+def sphere_voxels(resolution: int) -> np.ndarray:
+    """Boule pleine inscrite dans la grille, indexée en [z, y, x]."""
+    coords = np.linspace(-1.0, 1.0, resolution)
+    z, y, x = np.meshgrid(coords, coords, coords, indexing="ij")
+    return (x ** 2 + y ** 2 + z ** 2) <= 1.0
+
+
+def legacy_layout(voxels: np.ndarray, brick_sizes) -> list:
+    """Reproduit l'ancien parcours de _generate_initial_layout (test de chaque cellule)."""
+    def can_place(x, y, z, size):
+        w, l, h = size
+        if x + w > voxels.shape[2] or y + l > voxels.shape[1] or z + h > voxels.shape[0]:
+            return False
+        for dz in range(h):
+            for dy in range(l):
+                for dx in range(w):
+                    if not voxels[z + dz, y + dy, x + dx] or visited[z + dz, y + dy, x + dx]:
+                        return False
+        return True
+
+    def preliminary_stability(x, y, z, size):
+        w, l, _ = size
+        if z == 0:
+            return 1.0
+        support = sum(1 for dy in range(l) for dx in range(w) if voxels[z - 1, y + dy, x + dx])
+        return support / (w * l)
+
+    bricks = []
+    visited = np.zeros_like(voxels, dtype=bool)
+    sorted_sizes = sorted(brick_sizes, key=lambda s: s[0] * s[1] * s[2], reverse=True)
+    for z in range(voxels.shape[0]):
+        for y in range(voxels.shape[1]):
+            for x in range(voxels.shape[2]):
+                if not voxels[z, y, x] or visited[z, y, x]:
+                    continue
+                best, best_score = None, -1
+                for size in sorted_sizes:
+                    if can_place(x, y, z, size):
+                        stability = preliminary_stability(x, y, z, size)
+                        score = size[0] * size[1] * size[2] * stability
+                        if score > best_score:
+                            best_score = score
+                            best = Brick(position=(x, y, z), size=size, stability_score=stability)
+                if best:
+                    bricks.append(best)
+                    w, l, h = best.size
+                    visited[z:z + h, y:y + l, x:x + w] = True
+    return bricks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--legacy-max", type=int, default=64,
+                        help="Résolution maximale pour l'ancien parcours (très lent au-delà)")
+    args = parser.parse_args()
+
+    # Les plaques (hauteur 0.5) ne sont pas gérées par l'ancien parcours
+    brick_sizes = [s for s in BRICK_SIZES if float(s[2]).is_integer()]
+
+    print(f"{'grille':>8} {'voxels':>9} {'briques':>8} {'moteur (s)':>11} {'ancien (s)':>11} {'accélération':>12}")
+    for resolution in args.sizes:
+        voxels = sphere_voxels(resolution)
+
+        start = time.perf_counter()
+        bricks = BrickPlacementEngine(brick_sizes).place(voxels)
+        engine_time = time.perf_counter() - start
+
+        legacy_time = None
+        if resolution <= args.legacy_max:
+            start = time.perf_counter()
+            expected = legacy_layout(voxels, brick_sizes)
+            legacy_time = time.perf_counter() - start
+            assert [(b.position, b.size) for b in bricks] == [(b.position, b.size) for b in expected]
+
+        legacy_str = f"{legacy_time:11.2f}" if legacy_time is not None else f"{'-':>11}"
+        speedup_str = f"{legacy_time / engine_time:11.1f}x" if legacy_time is not None else f"{'-':>12}"
+        print(f"{resolution:>7}³ {int(voxels.sum()):>9} {len(bricks):>8} {engine_time:11.2f} {legacy_str} {speedup_str}")
+
+
+if __name__ == "__main__":
+    main()
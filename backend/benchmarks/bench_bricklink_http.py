@@ -0,0 +1,166 @@
+"""
+Benchmark de la couche HTTP de BrickLinkClient sur une API locale simulée.
+
+L'API simulée tourne dans son propre thread et répond après --latency
+secondes. --requests appels get_item_details sont lancés simultanément,
+selon trois variantes :
+- requests bloquant : l'ancien appel requests.get dans une coroutine, qui
+  bloque la boucle d'événements (les appels s'exécutent l'un après l'autre) ;
+- session par client : une session aiohttp ouverte puis fermée par bloc
+  `async with` (--calls-per-client appels par client), comme avant le pool ;
+- pool partagé : BrickLinkClient sur le pool de connexions de l'application,
+  pour chaque valeur de --limit-per-host (connexions simultanées par hôte).
+Le limiteur BrickLink n'est pas appliqué, pour mesurer la couche HTTP.
+
+Usage:
+    python benchmarks/bench_bricklink_http.py [--requests 400] [--latency 0.02] [--calls-per-client 4] [--limit-per-host 16 64]
+"""
+import argparse
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+
+import aiohttp
+import requests
+from aiohttp import web
+
+# Le client utilise des imports relatifs au paquet backend
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.bricklink_client import BrickLinkClient
+from backend.services.http_pool import HttpSessionPool
+from backend.utils.rate_limiter import bricklink_limiter
+
+
+class StubServer:
+    """API BrickLink simulée, servie depuis un thread dédié"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self.connections = set()
+        self.port = None
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    async def _item(self, request):
+        self.requests += 1
+        self.connections.add(id(request.transport))
+        await asyncio.sleep(self.latency)
+        return web.json_response({"data": {"no": request.match_info['item_id'], "type": "PART"}})
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/items/{item_id}', self._item)
+        runner = web.AppRunner(app)
+        self._loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(runner.cleanup())
+
+    def start(self) -> str:
+        self._thread.start()
+        self._ready.wait()
+        return f"http://127.0.0.1:{self.port}"
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def reset(self):
+        self.requests = 0
+        self.connections = set()
+
+
+async def blocking_requests(api_url: str, count: int, calls_per_client: int):
+    """Ancienne implémentation : requests.get dans une coroutine"""
+    async def get_item_details(item_id: str):
+        response = requests.get(f"{api_url}/items/{item_id}")
+        response.raise_for_status()
+        return response.json().get("data", {})
+
+    return await asyncio.gather(*(get_item_details(str(i)) for i in range(count)))
+
+
+async def session_per_client(api_url: str, count: int, calls_per_client: int):
+    """Une session aiohttp créée et fermée par bloc `async with` du client"""
+    async def client_block(item_ids):
+        async with aiohttp.ClientSession() as session:
+            async def get_item_details(item_id: str):
+                async with session.get(f"{api_url}/items/{item_id}") as response:
+                    response.raise_for_status()
+                    return (await response.json()).get("data", {})
+            return await asyncio.gather(*(get_item_details(item_id) for item_id in item_ids))
+
+    blocks = [
+        [str(i) for i in range(start, min(start + calls_per_client, count))]
+        for start in range(0, count, calls_per_client)
+    ]
+    results = await asyncio.gather(*(client_block(item_ids) for item_ids in blocks))
+    return [item for block in results for item in block]
+
+
+async def shared_pool(api_url: str, count: int, calls_per_client: int, limit_per_host: int = 16):
+    """BrickLinkClient sur le pool de connexions partagé"""
+    pool = HttpSessionPool(limit_per_host=limit_per_host)
+    try:
+        async def client_block(item_ids):
+            async with BrickLinkClient(pool=pool, api_url=api_url, api_key="bench") as client:
+                return await asyncio.gather(*(client.get_item_details(item_id) for item_id in item_ids))
+
+        blocks = [
+            [str(i) for i in range(start, min(start + calls_per_client, count))]
+            for start in range(0, count, calls_per_client)
+        ]
+        results = await asyncio.gather(*(client_block(item_ids) for item_ids in blocks))
+        return [item for block in results for item in block]
+    finally:
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02, help="latence de l'API simulée (s)")
+    parser.add_argument("--calls-per-client", type=int, default=4, help="appels par bloc `async with` du client")
+    parser.add_argument("--limit-per-host", type=int, nargs="+", default=[16, 64])
+    args = parser.parse_args()
+
+    bricklink_limiter.calls = 10 ** 9
+    server = StubServer(args.latency)
+    api_url = server.start()
+
+    variants = {
+        "requests bloquant": blocking_requests,
+        "session par client": session_per_client,
+        **{
+            f"pool partagé ({limit})": functools.partial(shared_pool, limit_per_host=limit)
+            for limit in args.limit_per_host
+        }
+    }
+    print(f"{args.requests} requêtes simultanées, latence {args.latency * 1000:.0f} ms, "
+          f"{args.calls_per_client} appels par client")
+    print(f"{'variante':>22} | {'temps (s)':>9} | {'requêtes/s':>10} | {'connexions TCP':>14}")
+    print("-" * 66)
+    try:
+        for name, variant in variants.items():
+            server.reset()
+            start = time.perf_counter()
+            results = asyncio.run(variant(api_url, args.requests, args.calls_per_client))
+            seconds = time.perf_counter() - start
+            assert len(results) == args.requests and all(results)
+            print(f"{name:>22} | {seconds:>9.2f} | {args.requests / seconds:>10.0f} | {len(server.connections):>14}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark du parcours des catalogues (CatalogCrawler) sur une API locale simulée.
+
+L'API simulée répond après --latency secondes, comme une API distante. Le
+premier parcours récupère tous les sets : avec --concurrency 1 il reproduit
+l'ancien parcours séquentiel, avec plus il montre le gain des requêtes
+simultanées. Un second parcours, sur le même catalogue, montre l'effet des
+requêtes conditionnelles (304) et des sets déjà connus. Le limiteur de débit
+Bricklink n'est pas appliqué, pour mesurer le parcours lui-même.
+
+Usage:
+    python benchmarks/bench_catalog_crawler.py [--sets 500] [--latency 0.05] [--concurrency 1 8 32]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.services.catalog_crawler import CatalogCrawler
+from ai_service.services.catalog_store import CatalogStore
+
+
+def fake_api(sets: int, latency: float, counter: dict) -> web.Application:
+    colors = {str(i): {'rgb': [i, i, i]} for i in range(200)}
+    parts = {str(i): {'size': '2x4'} for i in range(2000)}
+    set_list = [{'set_id': str(i), 'year': 2020, 'theme': 'City'} for i in range(sets)]
+
+    async def listing(request):
+        counter['requests'] += 1
+        await asyncio.sleep(latency)
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304)
+        payload = {'/colors': colors, '/parts': parts, '/sets': set_list}[request.path]
+        return web.json_response(payload, headers={'ETag': '"v1"'})
+
+    async def set_parts(request):
+        counter['requests'] += 1
+        await asyncio.sleep(latency)
+        return web.json_response([{'size': '2x4', 'format': 'standard', 'stability_score': 0.5}] * 50)
+
+    app = web.Application()
+    for path in ('/colors', '/parts', '/sets'):
+        app.router.add_get(path, listing)
+    app.router.add_get('/sets/{set_id}/parts', set_parts)
+    return app
+
+
+async def measure(sets: int, latency: float, concurrency: int) -> dict:
+    counter = {'requests': 0}
+    runner = web.AppRunner(fake_api(sets, latency, counter))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CatalogStore(Path(tmp) / "catalog.sqlite3")
+            crawler = CatalogCrawler(store, {'bricklink': (f"http://127.0.0.1:{port}", None)}, concurrency=concurrency)
+            result = {}
+            for run in ('premier', 'second'):
+                counter['requests'] = 0
+                start = time.perf_counter()
+                await crawler.crawl()
+                result[run] = (time.perf_counter() - start, counter['requests'])
+            store.close()
+            return result
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sets", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="latence de l'API simulée (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    print(f"{args.sets} sets, latence {args.latency * 1000:.0f} ms")
+    print(f"{'requêtes simultanées':>20} | {'parcours':>8} | {'temps (s)':>9} | {'requêtes':>8}")
+    print("-" * 55)
+    for concurrency in args.concurrency:
+        result = asyncio.run(measure(args.sets, args.latency, concurrency))
+        for run, (seconds, requests) in result.items():
+            print(f"{concurrency:>20} | {run:>8} | {seconds:>9.2f} | {requests:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark du calcul des scores LEGO/Bricklink des briques (_update_brick_scores).
+
+Compare l'ancien parcours de tout le catalogue pour chaque brique (format x
+taille x set x pièce) à l'index des pièces par (taille, format) trié par
+score de stabilité. L'ancien parcours n'est mesuré que sur --legacy-max
+briques et extrapolé.
+
+Usage:
+    python benchmarks/bench_catalog_index.py [--sets 2000] [--parts 50] [--bricks 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.services.blocky_optimizer import BlockyOptimizer
+from ai_service.services.blocky_service import Brick
+
+SIZES = ['1x1', '1x2', '1x4', '2x2', '2x4', '2x6']
+FORMATS = ['standard', 'technic', 'plate']
+
+
+def random_catalog(sets: int, parts: int, rng: random.Random) -> dict:
+    return {
+        str(i): {
+            'parts': [
+                {'size': rng.choice(SIZES), 'format': rng.choice(FORMATS), 'stability_score': rng.random()}
+                for _ in range(parts)
+            ],
+            'theme': rng.choice(['City', 'Castle', 'Technic']),
+            'year': rng.randint(1980, 2024)
+        }
+        for i in range(sets)
+    }
+
+
+def legacy_scores(optimizer: BlockyOptimizer, bricks: list):
+    """Reproduit le parcours complet du catalogue pour chaque brique."""
+    for brick in bricks:
+        similar_parts = []
+        for format_name, sizes in optimizer.brick_formats.items():
+            for size in sizes:
+                if optimizer._matches_brick_size(brick.size, size):
+                    for models in (optimizer.lego_models, optimizer.bricklink_models):
+                        for set_data in models.values():
+                            for part in set_data['parts']:
+                                if (part['size'] == size and part['format'] == format_name and
+                                        abs(part['stability_score'] - brick.stability_score) < 0.1):
+                                    similar_parts.append(part)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sets", type=int, default=2000, help="sets par catalogue")
+    parser.add_argument("--parts", type=int, default=50, help="pièces par set")
+    parser.add_argument("--bricks", type=int, default=5000)
+    parser.add_argument("--legacy-max", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    optimizer = BlockyOptimizer()
+    optimizer.lego_models = random_catalog(args.sets, args.parts, rng)
+    optimizer.bricklink_models = random_catalog(args.sets, args.parts, rng)
+    bricks = [
+        Brick(position=(0, 0, z), size=rng.choice([(1, 2, 1), (2, 2, 1), (2, 4, 1), (4, 2, 1)]),
+              stability_score=rng.random())
+        for z in range(args.bricks)
+    ]
+
+    legacy_count = min(args.legacy_max, args.bricks)
+    start = time.perf_counter()
+    legacy_scores(optimizer, bricks[:legacy_count])
+    legacy = (time.perf_counter() - start) * args.bricks / legacy_count
+
+    start = time.perf_counter()
+    index = optimizer._get_catalog_index()
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    optimizer._update_brick_scores(bricks)
+    scoring = time.perf_counter() - start
+
+    print(f"{len(index)} pièces au catalogue, {args.bricks} briques")
+    print(f"{'étape':>28} | {'temps (s)':>10}")
+    print("-" * 43)
+    print(f"{'parcours complet (extrapolé)':>28} | {legacy:>10.2f}")
+    print(f"{'construction de l index':>28} | {build:>10.2f}")
+    print(f"{'scores avec l index':>28} | {scoring:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
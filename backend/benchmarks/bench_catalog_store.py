@@ -0,0 +1,107 @@
+"""
+Benchmark de la base des catalogues (CatalogStore) face aux fichiers JSON.
+
+Pour un catalogue de sets généré aléatoirement, compare le chargement du
+fichier JSON complet (ancienne version, répété dans chaque worker) à
+l'ouverture de la base SQLite suivie de lectures ponctuelles, puis la
+sauvegarde après l'ajout d'un set : réécriture du fichier entier contre
+insertion d'une ligne. La mémoire est le pic alloué par Python (tracemalloc).
+
+Usage:
+    python benchmarks/bench_catalog_store.py [--sets 20000] [--parts 50] [--lookups 1000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.services.catalog_store import CatalogStore
+
+SIZES = ['1x1', '1x2', '1x4', '2x2', '2x4', '2x6']
+FORMATS = ['standard', 'technic', 'plate']
+
+
+def random_catalog(sets: int, parts: int, rng: random.Random) -> dict:
+    return {
+        str(i): {
+            'parts': [
+                {'size': rng.choice(SIZES), 'format': rng.choice(FORMATS), 'stability_score': rng.random()}
+                for _ in range(parts)
+            ],
+            'theme': rng.choice(['City', 'Castle', 'Technic']),
+            'year': rng.randint(1980, 2024)
+        }
+        for i in range(sets)
+    }
+
+
+def measure(step) -> tuple:
+    """Temps et pic de mémoire Python d'une étape."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = step()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sets", type=int, default=20000)
+    parser.add_argument("--parts", type=int, default=50, help="pièces par set")
+    parser.add_argument("--lookups", type=int, default=1000, help="sets lus après l'ouverture")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    catalog = random_catalog(args.sets, args.parts, rng)
+    keys = [str(rng.randrange(args.sets)) for _ in range(args.lookups)]
+    new_set = random_catalog(1, args.parts, rng)['0']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "lego_official_models.json"
+        json_path.write_text(json.dumps(catalog))
+        store = CatalogStore(Path(tmp) / "catalog.sqlite3")
+        store.replace('lego_models', catalog)
+        store.close()
+        del catalog
+
+        def json_load():
+            with open(json_path) as f:
+                models = json.load(f)
+            return [models[key] for key in keys], models
+
+        def json_save():
+            models['new'] = new_set
+            with open(json_path, 'w') as f:
+                json.dump(models, f)
+
+        def store_load():
+            sets = CatalogStore(Path(tmp) / "catalog.sqlite3").collection('lego_models')
+            return [sets[key] for key in keys], sets
+
+        def store_save():
+            sets['new'] = new_set
+
+        (_, models), json_load_time, json_load_peak = measure(json_load)
+        _, json_save_time, _ = measure(json_save)
+        (_, sets), store_load_time, store_load_peak = measure(store_load)
+        _, store_save_time, _ = measure(store_save)
+        sets.store.close()
+
+    print(f"{args.sets} sets de {args.parts} pièces, {args.lookups} lectures")
+    print(f"{'version':>8} | {'ouverture + lectures (s)':>24} | {'mémoire (Mo)':>12} | {'ajout d un set (s)':>18}")
+    print("-" * 73)
+    print(f"{'JSON':>8} | {json_load_time:>24.3f} | {json_load_peak / 2**20:>12.1f} | {json_save_time:>18.3f}")
+    print(f"{'SQLite':>8} | {store_load_time:>24.3f} | {store_load_peak / 2**20:>12.1f} | {store_save_time:>18.4f}")
+
+
+if __name__ == "__main__":
+    main()
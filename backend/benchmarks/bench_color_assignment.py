@@ -0,0 +1,94 @@
+"""
+Benchmark de l'attribution des couleurs aux briques (_assign_colors).
+
+Compare l'ancienne boucle, qui calculait la moyenne de chaque région puis
+parcourait la palette en créant un tenseur par couleur, à la version
+vectorisée : moyennes par table de sommes cumulées 3D et recherche du plus
+proche voisin dans CIELAB. L'ancienne boucle n'est mesurée que sur
+--legacy-max briques et extrapolée.
+
+Usage:
+    python benchmarks/bench_color_assignment.py [--bricks 50000] [--palette 200] [--legacy-max 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.services.blocky_optimizer import BlockyOptimizer
+from ai_service.services.brick_layout import BRICK_DTYPE, BrickLayout
+
+
+def random_layout(count: int, side: int, rng: np.random.Generator) -> BrickLayout:
+    """Disposition de `count` briques de tailles catalogue à des positions aléatoires."""
+    data = np.zeros(count, dtype=BRICK_DTYPE)
+    sizes = np.array([(1, 1, 1), (1, 2, 1), (2, 2, 1), (2, 4, 1), (1, 4, 1)])[rng.integers(0, 5, count)]
+    data['x'], data['y'], data['z'] = (rng.integers(0, side - 4, count) for _ in range(3))
+    data['w'], data['l'], data['h'] = sizes.T
+    data['color'] = -1
+    layout = BrickLayout(0)
+    layout._data = data
+    layout._size = count
+    return layout
+
+
+def legacy_assign(optimizer: BlockyOptimizer, layout: BrickLayout, colors: torch.Tensor) -> list:
+    """Reproduit l'ancienne boucle sur les briques et les couleurs des catalogues."""
+    assigned = []
+    for brick in layout:
+        x, y, z = brick.position
+        w, h, d = (int(v) for v in brick.size)
+        avg_color = torch.mean(colors[x:x+w, y:y+h, z:z+d], dim=(0, 1, 2))
+        best_color, min_distance = None, float('inf')
+        for catalog in (optimizer.lego_colors, optimizer.bricklink_colors):
+            for color_info in catalog.values():
+                distance = torch.sum((torch.tensor(color_info['rgb']) - avg_color) ** 2)
+                if distance < min_distance:
+                    min_distance, best_color = distance, color_info['rgb']
+        assigned.append(best_color)
+    return assigned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bricks", type=int, default=50000)
+    parser.add_argument("--palette", type=int, default=200)
+    parser.add_argument("--side", type=int, default=128, help="côté du volume de couleurs")
+    parser.add_argument("--legacy-max", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    optimizer = BlockyOptimizer(device=torch.device("cpu"))
+    palette = rng.random((args.palette, 3)).tolist()
+    half = args.palette // 2
+    optimizer.lego_colors = {str(i): {'rgb': rgb} for i, rgb in enumerate(palette[:half])}
+    optimizer.bricklink_colors = {str(i): {'rgb': rgb} for i, rgb in enumerate(palette[half:])}
+
+    colors = rng.random((args.side, args.side, args.side, 3)).astype(np.float32)
+    layout = random_layout(args.bricks, args.side, rng)
+
+    legacy_count = min(args.legacy_max, args.bricks)
+    legacy_layout = layout.select(np.arange(args.bricks) < legacy_count)
+    start = time.perf_counter()
+    legacy_assign(optimizer, legacy_layout, torch.from_numpy(colors))
+    legacy = (time.perf_counter() - start) * args.bricks / legacy_count
+
+    start = time.perf_counter()
+    optimizer._assign_colors(layout, torch.from_numpy(colors))
+    vectorized = time.perf_counter() - start
+
+    print(f"{args.bricks} briques, palette de {args.palette} couleurs, volume {args.side}^3")
+    print(f"{'version':>12} | {'temps (s)':>10}")
+    print("-" * 27)
+    print(f"{'ancienne':>12} | {legacy:>10.2f}  (extrapolé depuis {legacy_count} briques)")
+    print(f"{'vectorisée':>12} | {vectorized:>10.3f}")
+    print(f"accélération: x{legacy / vectorized:.0f}")
+
+
+if __name__ == "__main__":
+    main()
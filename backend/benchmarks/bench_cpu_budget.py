@@ -0,0 +1,97 @@
+"""
+Benchmark du budget CPU (utils/cpu_budget.py).
+
+Lance N conversions simultanées dont l'étape de calcul est une charge torch
+(produits matriciels) exécutée dans un pool de threads, et compare :
+
+- "sans budget" : torch utilise tous les cœurs dans chaque étape et le pool
+  a un thread par requête, comme lorsque chaque requête créait son optimiseur ;
+- "avec budget" : CpuBudget fixe les threads torch et chaque étape réserve
+  ses cœurs avant de s'exécuter.
+
+Le débit et les latences p50/p99 sont mesurés pour chaque niveau de
+concurrence. Sur une machine à un seul cœur, les deux modes sont équivalents.
+
+Usage:
+    python benchmarks/bench_cpu_budget.py [--concurrency 1 2 4 8 16] [--size 384]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from utils.cpu_budget import CpuBudget, available_cores
+
+
+def cpu_stage(size: int, steps: int) -> float:
+    """Étape de calcul représentative : produits matriciels float32."""
+    a = torch.randn(size, size)
+    b = torch.randn(size, size)
+    for _ in range(steps):
+        a = torch.tanh(a @ b)
+    return float(a.sum())
+
+
+async def run(concurrency: int, size: int, steps: int, budget: CpuBudget = None) -> dict:
+    if budget is None:
+        torch.set_num_threads(available_cores())
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+    else:
+        budget.apply()
+        executor = ThreadPoolExecutor(max_workers=budget.thread_pool_workers)
+
+    loop = asyncio.get_running_loop()
+    latencies = []
+
+    async def request():
+        start = time.perf_counter()
+        if budget is None:
+            await loop.run_in_executor(executor, cpu_stage, size, steps)
+        else:
+            async with budget.reserve():
+                await loop.run_in_executor(executor, cpu_stage, size, steps)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(concurrency * 2)))
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--size", type=int, default=384)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--cores", type=int, default=None)
+    args = parser.parse_args()
+
+    cores = args.cores or available_cores()
+    print(f"{cores} cœurs, matrices {args.size}x{args.size}, {args.steps} produits par étape")
+    print(f"{'concurrence':>11} | {'mode':>11} | {'débit (req/s)':>13} | {'p50 (s)':>8} | {'p99 (s)':>8}")
+    print("-" * 64)
+    for concurrency in args.concurrency:
+        for label, budget in (("sans budget", None), ("avec budget", CpuBudget(total_cores=cores))):
+            result = asyncio.run(run(concurrency, args.size, args.steps, budget))
+            print(
+                f"{concurrency:>11} | {label:>11} | {result['throughput']:>13.2f} | "
+                f"{result['p50']:>8.3f} | {result['p99']:>8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
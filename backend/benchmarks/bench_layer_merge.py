@@ -0,0 +1,101 @@
+"""
+Benchmark de la fusion des briques dans une couche (_optimize_layer_connections).
+
+Compare l'ancienne recherche exhaustive des paires, relancée après chaque
+fusion, au LayerMergeEngine basé sur un graphe d'adjacence et une file de
+priorité. Les couches testées sont des carrés pleins de briques 1x1.
+
+Usage:
+    python benchmarks/bench_layer_merge.py [--bricks 1000 10000] [--legacy-max 400]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_service.services.blocky_service import Brick
+from ai_service.services.blocky_optimizer import BlockyOptimizer
+
+
+def square_layer(count: int) -> list:
+    """Couche carrée d'environ `count` briques 1x1."""
+    side = int(math.ceil(math.sqrt(count)))
+    return [
+        Brick(position=(i % side, i // side, 0), size=(1, 1, 1))
+        for i in range(count)
+    ]
+
+
+def legacy_can_merge(brick1: Brick, brick2: Brick) -> bool:
+    """Ancien test d'adjacence de deux briques, utilisé par la recherche exhaustive."""
+    x1, y1, z1 = brick1.position
+    x2, y2, z2 = brick2.position
+    w1, h1, d1 = brick1.size
+    w2, h2, d2 = brick2.size
+    if z1 != z2 or d1 != d2:
+        return False
+    return (x1 + w1 == x2) or (x2 + w2 == x1) or (y1 + h1 == y2) or (y2 + h2 == y1)
+
+
+def legacy_merge(optimizer: BlockyOptimizer, layer: list) -> list:
+    """Reproduit l'ancienne recherche de la meilleure paire après chaque fusion."""
+    optimized = []
+    while layer:
+        best_pair = None
+        best_score = -1
+        for i, brick1 in enumerate(layer):
+            for j, brick2 in enumerate(layer[i + 1:], i + 1):
+                if legacy_can_merge(brick1, brick2):
+                    score = optimizer._calculate_connection_score(brick1, brick2)
+                    if score > best_score:
+                        best_score = score
+                        best_pair = (i, j)
+        if best_pair is not None:
+            i, j = best_pair
+            merged = optimizer._merge_bricks(layer[i], layer[j])
+            layer.pop(j)
+            layer.pop(i)
+            layer.append(merged)
+        else:
+            optimized.append(layer.pop(0))
+    return optimized
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bricks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--legacy-max", type=int, default=400,
+                        help="Nombre maximal de briques pour l'ancienne recherche (cubique)")
+    args = parser.parse_args()
+
+    optimizer = BlockyOptimizer()
+
+    print(f"{'briques':>8} {'résultat':>9} {'moteur (s)':>11} {'ancien (s)':>11} {'accélération':>12}")
+    for count in sorted(set(args.bricks + [args.legacy_max])):
+        layer = square_layer(count)
+
+        start = time.perf_counter()
+        merged = optimizer._optimize_layer_connections(list(layer))
+        engine_time = time.perf_counter() - start
+
+        # Toutes les briques produites doivent exister au catalogue
+        catalogue = optimizer.layer_merger.catalogue
+        assert all(tuple(b.size) in catalogue for b in merged)
+        assert sum(b.size[0] * b.size[1] for b in merged) == count
+
+        legacy_time = None
+        if count <= args.legacy_max:
+            start = time.perf_counter()
+            legacy_merge(optimizer, square_layer(count))
+            legacy_time = time.perf_counter() - start
+
+        legacy_str = f"{legacy_time:11.2f}" if legacy_time is not None else f"{'-':>11}"
+        speedup_str = f"{legacy_time / engine_time:11.1f}x" if legacy_time is not None else f"{'-':>12}"
+        print(f"{count:>8} {len(merged):>9} {engine_time:11.3f} {legacy_str} {speedup_str}")
+
+
+if __name__ == "__main__":
+    main()
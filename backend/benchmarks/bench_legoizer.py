@@ -0,0 +1,120 @@
+"""
+Benchmark de la mosaïque LEGO (Legoizer._create_brick_grid).
+
+Compare le parcours bloc par bloc d'origine (moyenne np.mean puis recherche
+de la couleur la plus proche pour chaque bloc) à la version vectorisée
+(sommes par blocs sur des vues remodelées et table de correspondance RVB
+précalculée), sur des images de plusieurs tailles. La colonne "mosaïque"
+mesure la conversion des pixels seule (_mosaic) ; le reste du temps
+vectorisé est la construction de la liste des briques. Le temps de calcul de
+la table, fait une fois par palette, est indiqué à part.
+
+Avec --tiled, une image de la taille donnée est aussi convertie par
+process_image_tiled (bandes traitées par un pool de processus) ; le temps et
+le pic de mémoire du processus principal sont affichés.
+
+Usage:
+    python benchmarks/bench_legoizer.py [--sizes 800x600 3840x2160] [--brick-size 8] [--tiled 12000x12000]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from legoizer import Legoizer, _palette_lut
+
+
+def legacy_grid(legoizer: Legoizer, image: np.ndarray):
+    """Reproduit le parcours bloc par bloc d'origine."""
+    height, width = image.shape[:2]
+    size = legoizer.brick_size
+    result = np.zeros((height, width, 3), dtype=np.uint8)
+    bricks = []
+    for y in range(0, height, size):
+        for x in range(0, width, size):
+            block = image[y:y+size, x:x+size]
+            closest_color = legoizer._find_closest_color(tuple(map(int, np.mean(block, axis=(0, 1)))))
+            result[y:y+size, x:x+size] = closest_color
+            bricks.append({"position": {"x": x, "y": y}, "size": size, "color": list(closest_color)})
+    return result, bricks
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["800x600", "1920x1080", "3840x2160"])
+    parser.add_argument("--brick-size", type=int, default=8)
+    parser.add_argument("--tiled", default=None, help="taille de l'image du mode par bandes")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    legoizer = Legoizer(brick_size=args.brick_size, max_size=None)
+    print(f"Table de correspondance: {timed(_palette_lut, tuple(legoizer.colors)):.2f}s (une fois par palette)")
+
+    rng = np.random.default_rng(0)
+    print(
+        f"{'image':>10} | {'briques':>8} | {'origine (s)':>11} | {'mosaïque (ms)':>13} | "
+        f"{'vectorisé (s)':>13} | {'process_image (s)':>17}"
+    )
+    print("-" * 89)
+    for size in args.sizes:
+        width, height = (int(v) for v in size.split("x"))
+        image = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (31, 31), 0)
+        _, encoded = cv2.imencode('.png', image)
+
+        legacy = timed(legacy_grid, legoizer, image)
+        mosaic = timed(legoizer._mosaic, image)
+        vectorized = timed(legoizer._create_brick_grid, image)
+        full = timed(legoizer.process_image, encoded.tobytes())
+        bricks = -(-height // args.brick_size) * -(-width // args.brick_size)
+        print(
+            f"{size:>10} | {bricks:>8} | {legacy:>11.2f} | {mosaic * 1000:>13.1f} | "
+            f"{vectorized:>13.3f} | {full:>17.3f}"
+        )
+
+    if args.tiled:
+        run_tiled(legoizer, args.tiled, args.workers)
+
+
+def run_tiled(legoizer: Legoizer, size: str, workers: int):
+    """Convertit une grande image par bandes et affiche temps et mémoire."""
+    width, height = (int(v) for v in size.split("x"))
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.png")
+        # Dégradé : rapide à générer et à compresser
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        image = np.empty((height, width, 3), dtype=np.uint8)
+        image[...] = gradient[None, :, None]
+        image[..., 1] = np.linspace(0, 255, height, dtype=np.uint8)[:, None]
+        cv2.imwrite(source, image)
+        del image
+
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        summary = legoizer.process_image_tiled(
+            source, os.path.join(tmp, "mosaic.png"), os.path.join(tmp, "instructions.json"),
+            max_workers=workers
+        )
+        elapsed = time.perf_counter() - start
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        print(f"\nMode par bandes, {size}: {summary['total_bricks']} briques, {summary['tiles']} bandes")
+        print(f"  temps: {elapsed:.1f}s")
+        print(f"  pic mémoire du processus principal: {peak / 1024:.0f} Mo (avant: {baseline / 1024:.0f} Mo)")
+        print(f"  instructions: {os.path.getsize(os.path.join(tmp, 'instructions.json')) / 1e6:.0f} Mo")
+
+
+if __name__ == "__main__":
+    main()
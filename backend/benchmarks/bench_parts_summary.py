@@ -0,0 +1,129 @@
+"""
+Benchmark du résumé des prix BrickLink (BrickLinkClient.get_parts_summary).
+
+Un serveur local simule l'API BrickLink avec une latence fixe et, avec
+--throttle, une proportion de réponses 429 (Retry-After court). La liste de
+pièces contient des doublons, comme une vraie analyse (--unique paires pour
+--parts pièces). L'ancienne boucle séquentielle, qui abandonnait les pièces
+limitées après une pause, est comparée au moteur concurrent avec
+déduplication. Le limiteur BrickLink (100 appels par minute) est désactivé
+par défaut pour mesurer la latence ; --calls-per-minute le réactive.
+
+Usage:
+    python benchmarks/bench_parts_summary.py [--parts 300] [--unique 120] [--latency 0.05] [--throttle 0.05]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from aiohttp import web
+
+# Le client utilise des imports relatifs au paquet backend
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.exceptions import BrickLinkRateLimitError
+from backend.services.bricklink_client import BrickLinkClient
+from backend.services.http_pool import close_http_pool
+from backend.utils.rate_limiter import bricklink_limiter
+
+
+def stub_api(latency: float, throttle: float, counter: dict) -> web.Application:
+    rng = random.Random(0)
+
+    async def respond(payload: dict) -> web.Response:
+        counter['requests'] += 1
+        await asyncio.sleep(latency)
+        if rng.random() < throttle:
+            counter['throttled'] += 1
+            return web.json_response({"message": "Too many requests"}, status=429, headers={"Retry-After": "0.1"})
+        return web.json_response(payload)
+
+    async def part_info(request):
+        item_id = request.match_info['item_id']
+        return await respond({"name": f"Brick {item_id}", "category_name": "Brick", "image_url": ""})
+
+    async def price_guide(request):
+        return await respond({"avg_price": 0.1})
+
+    app = web.Application()
+    app.router.add_get('/items/{item_id}/colors/{color_id}', part_info)
+    app.router.add_get('/items/{item_id}/colors/{color_id}/price-guide', price_guide)
+    return app
+
+
+async def legacy_summary(client: BrickLinkClient, parts: list, pause: float) -> dict:
+    """Reproduit l'ancienne boucle : deux appels séquentiels par pièce, pièce abandonnée sur 429."""
+    parts_with_prices = []
+    for part in parts:
+        try:
+            price_info = await client.get_price_guide(part["item_id"], part["color_id"])
+            part_info = await client.get_part_info(part["item_id"], part["color_id"])
+            parts_with_prices.append({**part, "price": price_info.get("avg_price", 0), "name": part_info.get("name")})
+        except BrickLinkRateLimitError:
+            await asyncio.sleep(pause)
+    return {"parts": parts_with_prices}
+
+
+async def measure(args, parts: list) -> dict:
+    counter = {'requests': 0, 'throttled': 0}
+    runner = web.AppRunner(stub_api(args.latency, args.throttle, counter))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    results = {}
+    try:
+        async with BrickLinkClient(api_url=f"http://127.0.0.1:{port}", api_key="bench") as client:
+            runs = {
+                "séquentiel": lambda: legacy_summary(client, parts, pause=0.1),
+                "concurrent": lambda: client.get_parts_summary(parts, concurrency=args.concurrency),
+            }
+            for name, run in runs.items():
+                counter.update(requests=0, throttled=0)
+                start = time.perf_counter()
+                summary = await run()
+                results[name] = {
+                    "seconds": time.perf_counter() - start,
+                    "parts": len(summary["parts"]),
+                    **counter,
+                }
+    finally:
+        await close_http_pool()
+        await runner.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=300)
+    parser.add_argument("--unique", type=int, default=120, help="paires (pièce, couleur) distinctes")
+    parser.add_argument("--latency", type=float, default=0.05, help="latence de l'API simulée (s)")
+    parser.add_argument("--throttle", type=float, default=0.05, help="proportion de réponses 429")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--calls-per-minute", type=int, default=0, help="limiteur BrickLink (0 : désactivé)")
+    args = parser.parse_args()
+
+    bricklink_limiter.calls = args.calls_per_minute or 10 ** 9
+    rng = random.Random(1)
+    pairs = [(str(3000 + i), rng.randint(1, 100)) for i in range(args.unique)]
+    parts = [
+        {"item_id": item_id, "color_id": color_id, "quantity": rng.randint(1, 8)}
+        for item_id, color_id in (rng.choice(pairs) for _ in range(args.parts))
+    ]
+
+    results = asyncio.run(measure(args, parts))
+    print(f"{args.parts} pièces ({args.unique} distinctes), latence {args.latency * 1000:.0f} ms, "
+          f"{args.throttle:.0%} de réponses 429")
+    print(f"{'version':>10} | {'temps (s)':>9} | {'requêtes':>8} | {'429':>5} | {'pièces résumées':>15}")
+    print("-" * 60)
+    for name, result in results.items():
+        print(f"{name:>10} | {result['seconds']:>9.2f} | {result['requests']:>8} | "
+              f"{result['throttled']:>5} | {result['parts']:>15}")
+
+
+if __name__ == "__main__":
+    main()
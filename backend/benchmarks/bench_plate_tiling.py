@@ -0,0 +1,101 @@
+"""
+Benchmark du regroupement des cellules de la mosaïque en plaques (merge_plates).
+
+Pour chaque image, compare les instructions de Legoizer.process_image sans
+regroupement (une brique par cellule) et avec : nombre de pièces, nombre de
+lignes de la liste des pièces, taille du JSON et temps de traitement. Sans
+--images, trois images synthétiques sont utilisées : une affiche à aplats,
+un dégradé et une photo simulée (bruit lissé).
+
+Usage:
+    python benchmarks/bench_plate_tiling.py [--images photo.jpg ...] [--brick-size 8] [--max-size 800]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from legoizer import Legoizer
+
+
+def sample_images(size: int = 800) -> dict:
+    """Images synthétiques de différentes complexités, encodées en PNG."""
+    rng = np.random.default_rng(0)
+
+    poster = np.full((size, size, 3), 255, dtype=np.uint8)
+    for _ in range(12):
+        color = tuple(int(c) for c in rng.choice([0, 128, 255], 3))
+        center = tuple(int(c) for c in rng.integers(0, size, 2))
+        cv2.circle(poster, center, int(rng.integers(size // 20, size // 5)), color, -1)
+        x, y = (int(c) for c in rng.integers(0, size, 2))
+        cv2.rectangle(poster, (x, y), (x + size // 6, y + size // 10), color, -1)
+
+    gradient = np.zeros((size, size, 3), dtype=np.uint8)
+    gradient[..., 0] = np.linspace(0, 255, size, dtype=np.uint8)[None, :]
+    gradient[..., 2] = np.linspace(0, 255, size, dtype=np.uint8)[:, None]
+
+    photo = cv2.GaussianBlur(rng.integers(0, 256, (size, size, 3), dtype=np.uint8), (0, 0), size / 40)
+    photo = cv2.normalize(photo, None, 0, 255, cv2.NORM_MINMAX)
+
+    return {
+        name: cv2.imencode('.png', image)[1].tobytes()
+        for name, image in (("affiche", poster), ("dégradé", gradient), ("photo", photo))
+    }
+
+
+def measure(legoizer: Legoizer, data: bytes) -> dict:
+    start = time.perf_counter()
+    _, instructions = legoizer.process_image(data)
+    elapsed = time.perf_counter() - start
+    parsed = json.loads(instructions)
+    return {
+        "pieces": parsed["total_bricks"],
+        # Sans regroupement, chaque brique est une ligne des instructions
+        "lines": len(parsed["parts"]) if "parts" in parsed else len(parsed["bricks"]),
+        "json": len(instructions),
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", nargs="*", default=None)
+    parser.add_argument("--brick-size", type=int, default=8)
+    parser.add_argument("--max-size", type=int, default=800)
+    args = parser.parse_args()
+
+    if args.images:
+        images = {os.path.basename(path): open(path, "rb").read() for path in args.images}
+    else:
+        images = sample_images(args.max_size)
+
+    plain = Legoizer(brick_size=args.brick_size, max_size=args.max_size)
+    merged = Legoizer(brick_size=args.brick_size, max_size=args.max_size, merge_plates=True)
+
+    print(
+        f"{'image':>10} | {'mode':>8} | {'pièces':>7} | {'lignes':>7} | "
+        f"{'JSON (Ko)':>9} | {'temps (s)':>9}"
+    )
+    print("-" * 67)
+    for name, data in images.items():
+        results = {"briques": measure(plain, data), "plaques": measure(merged, data)}
+        for mode, result in results.items():
+            print(
+                f"{name:>10} | {mode:>8} | {result['pieces']:>7} | {result['lines']:>7} | "
+                f"{result['json'] / 1024:>9.0f} | {result['seconds']:>9.3f}"
+            )
+        before, after = results["briques"], results["plaques"]
+        print(
+            f"{'':>10} | {'gain':>8} | {before['pieces'] / after['pieces']:>6.1f}x | "
+            f"{before['lines'] / max(1, after['lines']):>6.0f}x | {before['json'] / after['json']:>8.1f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
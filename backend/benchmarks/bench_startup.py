@@ -0,0 +1,114 @@
+"""
+Benchmark du temps de démarrage des points d'entrée de l'API.
+
+Chaque point d'entrée est importé dans un processus Python neuf ; le temps
+d'import correspond au délai avant que le serveur puisse accepter des
+connexions. Le benchmark indique aussi quelles dépendances lourdes ont été
+chargées pendant l'import et, avec --warmup, la durée du préchauffage
+(chargement en tâche de fond mesuré jusqu'à ce que /ready passe à 200).
+
+Avec --rev, la même mesure est faite sur une autre révision git (par exemple
+celle d'avant le chargement paresseux) pour comparaison.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 3] [--warmup] [--rev HEAD~1]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = ["main", "ai_service.main", "app.main"]
+
+HEAVY_MODULES = ["torch", "pytorch3d", "tensorflow", "sklearn", "firebase_admin"]
+
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+try:
+    module = __import__({module!r}, fromlist=["app"])
+    error = None
+except Exception as e:
+    module, error = None, f"{{type(e).__name__}}: {{e}}"
+result = {{
+    "import_seconds": time.perf_counter() - start,
+    "error": error,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}
+warmup = getattr(module, "warmup", None)
+if {measure_warmup!r} and warmup is not None:
+    async def run():
+        warmup.start()
+        for name in warmup.report()["components"]:
+            try:
+                await warmup.get(name)
+            except Exception:
+                pass
+    start = time.perf_counter()
+    asyncio.run(run())
+    result["warmup_seconds"] = time.perf_counter() - start
+    result["warmup"] = warmup.report()
+print("RESULT " + json.dumps(result))
+"""
+
+
+def probe(backend_dir: Path, module: str, measure_warmup: bool) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(backend_dir))
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES, measure_warmup=measure_warmup)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=backend_dir, env=env,
+        capture_output=True, text=True, timeout=600
+    ).stdout
+    for line in output.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    return {"import_seconds": float("nan"), "error": "aucun résultat", "heavy": []}
+
+
+def export_revision(rev: str, destination: Path) -> Path:
+    """Extrait le répertoire backend d'une révision git."""
+    archive = destination / "backend.tar"
+    subprocess.run(
+        ["git", "archive", "--format=tar", f"--output={archive}", rev, "backend"],
+        cwd=BACKEND_DIR.parent, check=True
+    )
+    with tarfile.open(archive) as tar:
+        tar.extractall(destination)
+    return destination / "backend"
+
+
+def report(label: str, backend_dir: Path, runs: int, measure_warmup: bool):
+    print(f"\n{label}")
+    print(f"{'point d entrée':>16} | {'import (s)':>10} | {'préchauffage (s)':>16} | chargé à l'import / erreur")
+    print("-" * 90)
+    for module in ENTRY_POINTS:
+        results = [probe(backend_dir, module, measure_warmup) for _ in range(runs)]
+        seconds = statistics.median(r["import_seconds"] for r in results)
+        warmup = results[-1].get("warmup_seconds")
+        warmup_text = f"{warmup:>16.2f}" if warmup is not None else f"{'-':>16}"
+        detail = results[-1]["error"] or ", ".join(results[-1]["heavy"]) or "-"
+        print(f"{module:>16} | {seconds:>10.2f} | {warmup_text} | {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--warmup", action="store_true", help="mesure aussi le préchauffage")
+    parser.add_argument("--rev", default=None, help="révision git à comparer")
+    args = parser.parse_args()
+
+    if args.rev:
+        with tempfile.TemporaryDirectory() as tmp:
+            report(f"Révision {args.rev}", export_revision(args.rev, Path(tmp)), args.runs, args.warmup)
+    report("Arbre de travail", BACKEND_DIR, args.runs, args.warmup)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark de la conversion voxels -> maillage LEGO.
+
+Compare l'ancienne implémentation (boucle Python par point et par voxel)
+au constructeur vectorisé VoxelMeshBuilder pour plusieurs résolutions.
+
+Usage:
+    python benchmarks/bench_voxel_mesh.py [--resolutions 32 64 128] [--legacy-max 64]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+import trimesh
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.voxel_mesh_builder import VoxelMeshBuilder
+
+
+def sample_sphere_points(num_samples: int, seed: int = 0) -> torch.Tensor:
+    """Échantillonne des points sur une sphère unité (surface type d'un modèle normalisé)."""
+    generator = torch.Generator().manual_seed(seed)
+    points = torch.randn((1, num_samples, 3), generator=generator)
+    return points / points.norm(dim=-1, keepdim=True)
+
+
+def legacy_convert(points: torch.Tensor, resolution: int, brick_size: float = 1.0) -> trimesh.Trimesh:
+    """Reproduit l'ancienne boucle de BlockyOptimizer._convert_to_lego."""
+    grid = torch.zeros((resolution, resolution, resolution))
+    indices = torch.round((points + 1.0) * 0.5 * (resolution - 1)).long().clamp(0, resolution - 1)
+    for point in indices[0]:
+        x, y, z = point
+        grid[x, y, z] = 1
+
+    vertices_list = []
+    faces_list = []
+    current_vert_idx = 0
+    for x in range(resolution):
+        for y in range(resolution):
+            for z in range(resolution):
+                if grid[x, y, z] > 0:
+                    brick_verts = torch.tensor([
+                        [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                        [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]
+                    ]) * brick_size
+                    brick_verts += torch.tensor([x, y, z]) * brick_size
+                    brick_faces = torch.tensor([
+                        [0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7],
+                        [0, 4, 7], [0, 7, 3], [1, 5, 6], [1, 6, 2],
+                        [0, 1, 5], [0, 5, 4], [3, 2, 6], [3, 6, 7]
+                    ]) + current_vert_idx
+                    vertices_list.append(brick_verts)
+                    faces_list.append(brick_faces)
+                    current_vert_idx += 8
+
+    return trimesh.Trimesh(
+        vertices=torch.cat(vertices_list).numpy(),
+        faces=torch.cat(faces_list).numpy()
+    )
+
+
+def vectorized_convert(builder: VoxelMeshBuilder, points: torch.Tensor,
+                       resolution: int, brick_size: float = 1.0) -> trimesh.Trimesh:
+    grid = builder.voxelize(points, resolution)
+    return builder.build(grid, brick_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--legacy-max", type=int, default=64,
+                        help="Résolution maximale pour l'ancienne implémentation (très lente au-delà)")
+    args = parser.parse_args()
+
+    builder = VoxelMeshBuilder()
+
+    print(f"{'résolution':>10} {'voxels':>8} {'faces':>9} {'vectorisé (s)':>14} {'ancien (s)':>11} {'accélération':>12}")
+    for resolution in args.resolutions:
+        points = sample_sphere_points(resolution ** 3)
+
+        start = time.perf_counter()
+        mesh = vectorized_convert(builder, points, resolution)
+        vectorized_time = time.perf_counter() - start
+
+        voxel_count = int(builder.voxelize(points, resolution).sum())
+        assert np.isclose(mesh.volume, voxel_count)
+
+        legacy_time = None
+        if resolution <= args.legacy_max:
+            start = time.perf_counter()
+            legacy = legacy_convert(points, resolution)
+            legacy_time = time.perf_counter() - start
+            assert np.allclose(legacy.bounds, mesh.bounds)
+
+        legacy_str = f"{legacy_time:11.3f}" if legacy_time is not None else f"{'-':>11}"
+        speedup_str = f"{legacy_time / vectorized_time:11.1f}x" if legacy_time is not None else f"{'-':>12}"
+        print(f"{resolution:>10} {voxel_count:>8} {len(mesh.faces):>9} {vectorized_time:14.3f} {legacy_str} {speedup_str}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,38 @@ class Settings(BaseSettings):
     cleanup_interval_seconds: int = 3600  # 1 hour
     max_temp_files: int = 1000
     max_file_age_hours: int = 24
+    max_upload_mb: int = 500  # Taille maximale d'un modèle 3D reçu
+    
+    # File de tâches de conversion
+    redis_url: Optional[str] = None  # Sans URL, les tâches restent dans le processus
+    job_workers: int = 2
+    job_max_pending: int = 32
+    job_result_ttl_hours: int = 24
+    
+    # Budget CPU : cœurs du service répartis entre les workers du serveur
+    cpu_cores: Optional[int] = None  # None = cœurs disponibles (affinité, quota cgroup)
+    web_concurrency: int = 1  # Nombre de workers uvicorn/gunicorn
+    stage_threads: Optional[int] = None  # Threads torch d'une étape de calcul
+    
+    # Pools d'exécution partagés (None = dimensionné selon le budget CPU)
+    thread_pool_workers: Optional[int] = None
+    process_pool_workers: Optional[int] = None
+    
+    # API BrickLink
+    BRICKLINK_API_URL: str = os.getenv("BRICKLINK_API_URL", "https://api.bricklink.com/api/store/v1")
+    BRICKLINK_API_KEY: str = os.getenv("BRICKLINK_API_KEY", "")
+    
+    # Cache persistant des réponses BrickLink (None = désactivé)
+    bricklink_cache_path: Optional[str] = "data/bricklink_cache.sqlite3"
+    bricklink_catalog_ttl_hours: float = 24 * 30  # Pièces, catalogue et couleurs
+    bricklink_price_ttl_hours: float = 6
+    bricklink_price_stale_hours: float = 48  # Prix périmés servis pendant leur revalidation
+    
+    # Pool de connexions HTTP partagé des clients d'API (BrickLink)
+    http_pool_limit: int = 100
+    http_pool_limit_per_host: int = 16
+    http_dns_cache_seconds: int = 300
+    http_keepalive_seconds: float = 30
     
     # GPU settings
     use_gpu: bool = True
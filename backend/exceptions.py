@@ -4,7 +4,9 @@ class BrickLinkAPIError(Exception):
 
 class BrickLinkRateLimitError(Exception):
     """Exception levée lorsque la limite de taux de l'API est dépassée"""
-    pass
+    def __init__(self, message: str, retry_after: float = 60):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 class BrickLinkAuthenticationError(Exception):
     """Exception levée en cas d'erreur d'authentification avec l'API"""
@@ -3,11 +3,77 @@ import numpy as np
 from PIL import Image
 import io
 import json
-from typing import Tuple, Dict, List
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Tuple, Dict, List, Optional, TextIO
+from utils.plate_tiling import part_counts, tile_plates
+from utils.png_writer import PngStreamWriter
+
+# Format d'une brique dans les instructions, identique à celui de json.dumps
+BRICK_JSON = '{"position": {"x": %d, "y": %d}, "size": %d, "color": [%d, %d, %d]}'
+
+@lru_cache(maxsize=8)
+def _palette_lut(colors: Tuple[Tuple[int, int, int], ...]) -> np.ndarray:
+    """
+    Table de correspondance 256x256x256 -> index de la couleur LEGO la plus proche.
+
+    Calculée une fois par palette (16 Mo) ; en cas d'égalité, la première
+    couleur de la palette l'emporte, comme dans _find_closest_color.
+    """
+    palette = np.array(colors, dtype=np.int32)
+    levels = np.arange(256, dtype=np.int32)
+    # Distances par composante, (256, P), puis combinées plan par plan
+    d0, d1, d2 = ((levels[:, None] - palette[None, :, c]) ** 2 for c in range(3))
+    lut = np.empty((256, 256, 256), dtype=np.uint8 if len(colors) <= 256 else np.uint16)
+    plane = d1[:, None, :] + d2[None, :, :]
+    for c0 in range(256):
+        lut[c0] = np.argmin(plane + d0[c0], axis=-1)
+    return lut
+
+def _mosaic_tile(brick_size: int, colors: Tuple, image_ref: Tuple, lut_ref: Tuple,
+                 blocks_ref: Tuple, y0: int, y1: int):
+    """
+    Calcule les couleurs des blocs d'une bande de l'image (exécuté dans un processus).
+
+    L'image, la table de correspondance et le tableau des couleurs de blocs
+    sont lus et écrits en mémoire partagée ; seuls leurs noms sont transmis.
+    """
+    segments = [shared_memory.SharedMemory(name=ref[0]) for ref in (image_ref, lut_ref, blocks_ref)]
+    try:
+        image, lut, blocks = (
+            np.ndarray(ref[1], dtype=ref[2], buffer=segment.buf)
+            for ref, segment in zip((image_ref, lut_ref, blocks_ref), segments)
+        )
+        legoizer = Legoizer(brick_size, max_size=None)
+        legoizer.colors = list(colors)
+        tile = image[y0:y1]
+        sums = legoizer._block_sums(legoizer._pad(tile))
+        blocks[y0 // brick_size:y0 // brick_size + sums.shape[0]] = legoizer._match_colors(
+            sums, legoizer._block_counts(*tile.shape[:2]), lut
+        )
+        # Les vues doivent être libérées avant de fermer les segments
+        del image, lut, blocks, tile
+    finally:
+        for segment in segments:
+            segment.close()
 
 class Legoizer:
-    def __init__(self, brick_size: int = 8):
+    def __init__(self, brick_size: int = 8, max_size: Optional[int] = 800, merge_plates: bool = False):
+        """
+        Args:
+            brick_size: Côté d'une brique en pixels
+            max_size: Plus grande dimension de l'image traitée (None pour ne pas réduire)
+            merge_plates: Regroupe les cellules de même couleur en plaques dans
+                les instructions de process_image
+        """
         self.brick_size = brick_size
+        self.max_size = max_size
+        self.merge_plates = merge_plates
         self.colors = self._load_lego_colors()
 
     def _load_lego_colors(self) -> List[Tuple[int, int, int]]:
@@ -35,68 +101,394 @@ class Legoizer:
                 
         return closest_color
 
-    def _create_brick_grid(self, image: np.ndarray) -> Tuple[np.ndarray, List[Dict]]:
+    def _pad(self, image: np.ndarray) -> np.ndarray:
+        """Image complétée par des zéros jusqu'à un multiple de la taille d'une brique."""
         height, width = image.shape[:2]
-        bricks = []
-        
-        # Créer une nouvelle image pour le résultat
-        result = np.zeros((height, width, 3), dtype=np.uint8)
-        
-        # Parcourir l'image par blocs de taille brick_size
-        for y in range(0, height, self.brick_size):
-            for x in range(0, width, this.brick_size):
-                # Extraire le bloc
-                block = image[y:y+self.brick_size, x:x+self.brick_size]
-                if block.size == 0:
-                    continue
-                    
-                # Calculer la couleur moyenne du bloc
-                avg_color = np.mean(block, axis=(0, 1))
-                closest_color = self._find_closest_color(tuple(map(int, avg_color)))
-                
-                # Remplir le bloc avec la couleur LEGO la plus proche
-                result[y:y+self.brick_size, x:x+self.brick_size] = closest_color
-                
-                # Ajouter les informations de la brique
-                bricks.append({
-                    "position": {"x": x, "y": y},
-                    "size": self.brick_size,
-                    "color": list(closest_color)
-                })
-        
+        size = self.brick_size
+        padded = np.zeros((-(-height // size) * size, -(-width // size) * size, 3), dtype=np.uint8)
+        padded[:height, :width] = image
+        return padded
+
+    def _block_counts(self, height: int, width: int) -> np.ndarray:
+        """Nombre de pixels de chaque bloc ; les blocs du bord peuvent être incomplets."""
+        size = self.brick_size
+        starts_y = np.arange(0, height, size)
+        starts_x = np.arange(0, width, size)
+        return np.outer(
+            np.minimum(starts_y + size, height) - starts_y,
+            np.minimum(starts_x + size, width) - starts_x
+        ).astype(np.uint32)
+
+    def _match_colors(self, sums: np.ndarray, counts: np.ndarray, lut: Optional[np.ndarray] = None) -> np.ndarray:
+        """Couleur LEGO la plus proche de la moyenne (tronquée à l'entier) de chaque bloc."""
+        avg_colors = sums // counts[..., None]
+        palette = np.array(self.colors, dtype=np.uint8)
+        if lut is None:
+            lut = _palette_lut(tuple(self.colors))
+        return palette[lut[avg_colors[..., 0], avg_colors[..., 1], avg_colors[..., 2]]]
+
+    def _render(self, block_colors: np.ndarray, height: int, width: int) -> np.ndarray:
+        """Remplit chaque bloc avec sa couleur LEGO."""
+        rows, cols = block_colors.shape[:2]
+        size = self.brick_size
+        return np.broadcast_to(
+            block_colors[:, None, :, None, :], (rows, size, cols, size, 3)
+        ).reshape(rows * size, cols * size, 3)[:height, :width].copy()
+
+    def _mosaic(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convertit une image en mosaïque de couleurs LEGO, sans boucle Python.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Image résultat et couleur de chaque
+            bloc (lignes, colonnes, 3)
+        """
+        height, width = image.shape[:2]
+        sums = self._block_sums(self._pad(image))
+        block_colors = self._match_colors(sums, self._block_counts(height, width))
+        return self._render(block_colors, height, width), block_colors
+
+    def _block_sums(self, padded: np.ndarray) -> np.ndarray:
+        """Somme de chaque bloc : d'abord sur les lignes, puis sur les colonnes."""
+        size = self.brick_size
+        rows, cols = padded.shape[0] // size, padded.shape[1] // size
+        sums = padded.reshape(rows, size, cols * size * 3).sum(axis=1, dtype=np.uint32)
+        return sums.reshape(rows, cols, size, 3).sum(axis=2)
+
+    def _changed_block_colors(self, previous: Optional[np.ndarray], padded: np.ndarray,
+                              counts: np.ndarray) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Couleurs LEGO des blocs modifiés depuis l'image précédente.
+
+        Ne dépend que des deux images d'entrée : les images d'une vidéo
+        peuvent donc être traitées en parallèle.
+
+        Returns:
+            Tuple[Optional[np.ndarray], np.ndarray]: Masque (lignes, colonnes)
+            des blocs modifiés, None s'ils le sont tous, et leurs couleurs
+        """
+        if previous is None:
+            return None, self._match_colors(self._block_sums(padded), counts)
+
+        size = self.brick_size
+        rows, cols = padded.shape[0] // size, padded.shape[1] // size
+        changed = (padded != previous).reshape(rows, size, cols, size * 3).any(axis=(1, 3))
+        blocks = padded.reshape(rows, size, cols, size, 3).transpose(0, 2, 1, 3, 4)
+        sums = blocks[changed].sum(axis=(1, 2), dtype=np.uint32)
+        return changed, self._match_colors(sums, counts[changed])
+
+    def _resize(self, image: np.ndarray) -> np.ndarray:
+        """Réduit l'image si sa plus grande dimension dépasse max_size."""
+        height, width = image.shape[:2]
+        if self.max_size and max(height, width) > self.max_size:
+            scale = self.max_size / max(height, width)
+            image = cv2.resize(image, None, fx=scale, fy=scale)
+        return image
+
+    def _create_brick_grid(self, image: np.ndarray) -> Tuple[np.ndarray, List[Dict]]:
+        result, block_colors = self._mosaic(image)
+        size = self.brick_size
+
+        # Informations des briques, ligne par ligne
+        color_lists = block_colors.tolist()
+        xs = list(range(0, image.shape[1], size))
+        bricks = [
+            {
+                "position": {"x": x, "y": y},
+                "size": size,
+                "color": color
+            }
+            for y, row in zip(range(0, image.shape[0], size), color_lists)
+            for x, color in zip(xs, row)
+        ]
+
         return result, bricks
 
     def process_image(self, image_data: bytes) -> Tuple[bytes, str]:
         # Convertir les bytes en image OpenCV
         nparr = np.frombuffer(image_data, np.uint8)
         image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Image illisible")
         
         # Redimensionner l'image si nécessaire
-        max_size = 800
-        height, width = image.shape[:2]
-        if max(height, width) > max_size:
-            scale = max_size / max(height, width)
-            image = cv2.resize(image, None, fx=scale, fy=scale)
+        image = self._resize(image)
         
         # Appliquer le traitement LEGO
-        lego_image, bricks = self._create_brick_grid(image)
+        if self.merge_plates:
+            lego_image, block_colors = self._mosaic(image)
+            instructions = self._plate_instructions(block_colors)
+        else:
+            lego_image, bricks = self._create_brick_grid(image)
+            instructions = {
+                "bricks": bricks,
+                "total_bricks": len(bricks)
+            }
         
         # Convertir l'image en bytes
         _, buffer = cv2.imencode('.png', lego_image)
         image_bytes = buffer.tobytes()
         
         # Créer les instructions de montage
-        instructions = {
-            "bricks": bricks,
-            "total_bricks": len(bricks),
-            "image_size": {
-                "width": lego_image.shape[1],
-                "height": lego_image.shape[0]
-            }
+        instructions["image_size"] = {
+            "width": lego_image.shape[1],
+            "height": lego_image.shape[0]
         }
         
         return image_bytes, json.dumps(instructions)
 
-    def process_video(self, video_data: bytes) -> Tuple[List[bytes], List[str]]:
-        # TODO: Implémenter le traitement vidéo
-        raise NotImplementedError("Le traitement vidéo n'est pas encore implémenté") 
\ No newline at end of file
+    def _plate_instructions(self, block_colors: np.ndarray) -> Dict:
+        """
+        Instructions avec les cellules de même couleur regroupées en plaques.
+
+        Chaque plaque a une position en pixels (comme les briques) et une
+        taille en tenons ; la liste des pièces compte les plaques par taille et
+        par couleur.
+        """
+        size = self.brick_size
+        palette, labels = np.unique(block_colors.reshape(-1, 3), axis=0, return_inverse=True)
+        plates = tile_plates(labels.reshape(block_colors.shape[:2]))
+        colors = palette.tolist()
+
+        return {
+            "plates": [
+                {
+                    "position": {"x": x * size, "y": y * size},
+                    "size": {"width": width, "length": length},
+                    "color": colors[label]
+                }
+                for x, y, width, length, label in plates.tolist()
+            ],
+            "parts": [
+                {
+                    "part": f"plate {part['width']}x{part['length']}",
+                    "color": colors[part['label']],
+                    "quantity": part['quantity']
+                }
+                for part in part_counts(plates)
+            ],
+            "total_bricks": len(plates)
+        }
+
+    def process_image_tiled(self, input_path: str, output_path: str, instructions_path: str,
+                            tile_height: int = 1024, max_workers: Optional[int] = None,
+                            executor: Optional[Executor] = None) -> Dict:
+        """
+        Convertit une très grande image en mosaïque LEGO, par bandes, sans réduction.
+
+        L'image décodée est placée une fois en mémoire partagée ; les bandes,
+        alignées sur les briques, sont traitées en parallèle par un pool de
+        processus qui écrit la couleur de chaque bloc dans un tableau partagé.
+        Le PNG et les instructions (même JSON que process_image) sont ensuite
+        écrits bande par bande : en dehors de l'image source, la mémoire
+        utilisée ne dépend que de la hauteur des bandes.
+
+        Args:
+            input_path: Image source
+            output_path: PNG produit
+            instructions_path: Fichier JSON des instructions
+            tile_height: Hauteur des bandes en pixels (arrondie à un multiple de brick_size)
+            max_workers: Nombre de processus si aucun executor n'est fourni
+            executor: Pool de processus à utiliser (par défaut, créé pour l'appel)
+
+        Returns:
+            Dict: Nombre de briques, taille de l'image et nombre de bandes
+
+        Raises:
+            ValueError: Si l'image est illisible
+        """
+        image = cv2.imread(str(input_path), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Image illisible")
+
+        height, width = image.shape[:2]
+        size = self.brick_size
+        tile_height = max(size, tile_height // size * size)
+        block_shape = (-(-height // size), -(-width // size), 3)
+
+        segments = []
+        try:
+            image_ref = self._share(image, segments)
+            del image
+            lut_ref = self._share(_palette_lut(tuple(self.colors)), segments)
+            blocks_ref = self._share(np.zeros(block_shape, dtype=np.uint8), segments)
+
+            own_executor = executor is None
+            if own_executor:
+                executor = ProcessPoolExecutor(
+                    max_workers=max_workers or os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            try:
+                bands = [(y0, min(y0 + tile_height, height)) for y0 in range(0, height, tile_height)]
+                futures = [
+                    executor.submit(
+                        _mosaic_tile, size, tuple(self.colors), image_ref, lut_ref, blocks_ref, y0, y1
+                    )
+                    for y0, y1 in bands
+                ]
+                self._write_tiles(segments[-1], block_shape, bands, futures, width, height,
+                                  output_path, instructions_path)
+            finally:
+                if own_executor:
+                    executor.shutdown(cancel_futures=True)
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+        return {
+            "total_bricks": block_shape[0] * block_shape[1],
+            "image_size": {
+                "width": width,
+                "height": height
+            },
+            "tiles": len(bands)
+        }
+
+    @staticmethod
+    def _share(array: np.ndarray, segments: List[shared_memory.SharedMemory]) -> Tuple:
+        """Copie un tableau en mémoire partagée et retourne sa référence (nom, forme, type)."""
+        segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        segments.append(segment)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        return (segment.name, array.shape, array.dtype.str)
+
+    def _write_tiles(self, blocks_segment: shared_memory.SharedMemory, block_shape: Tuple,
+                     bands: List[Tuple[int, int]], futures: List, width: int, height: int,
+                     output_path: str, instructions_path: str):
+        """Écrit le PNG et les instructions bande par bande, dans l'ordre, dès qu'une bande est prête."""
+        size = self.brick_size
+        blocks = np.ndarray(block_shape, dtype=np.uint8, buffer=blocks_segment.buf)
+        try:
+            with open(output_path, "wb") as png, open(instructions_path, "w") as instructions:
+                writer = PngStreamWriter(png, width, height)
+                instructions.write('{"bricks": [')
+                for (y0, y1), future in zip(bands, futures):
+                    future.result()
+                    band = blocks[y0 // size:-(-y1 // size)]
+                    # OpenCV travaille en BGR, le PNG en RGB
+                    writer.write_rows(self._render(band, y1 - y0, width)[..., ::-1])
+                    if y0:
+                        instructions.write(", ")
+                    self._write_bricks(instructions, band, y0)
+                writer.close()
+                instructions.write(
+                    f'], "total_bricks": {block_shape[0] * block_shape[1]}, '
+                    f'"image_size": {{"width": {width}, "height": {height}}}}}'
+                )
+        finally:
+            del blocks
+
+    def _write_bricks(self, out: TextIO, block_colors: np.ndarray, y0: int):
+        """Écrit les briques d'une bande au format des instructions de process_image."""
+        size = self.brick_size
+        xs = range(0, block_colors.shape[1] * size, size)
+        out.write(", ".join(
+            BRICK_JSON % (x, y, size, *color)
+            for y, row in zip(range(y0, y0 + block_colors.shape[0] * size, size), block_colors.tolist())
+            for x, color in zip(xs, row)
+        ))
+
+    def process_video_file(self, input_path: str, output_path: str,
+                           max_workers: Optional[int] = None) -> Dict:
+        """
+        Convertit une vidéo en mosaïque LEGO, image par image, en flux continu.
+
+        Les images sont décodées une à une, traitées par un pool de threads et
+        écrites dans l'ordre au fur et à mesure : seules quelques images sont
+        en mémoire à la fois, quelle que soit la durée de la vidéo. Les blocs
+        identiques à ceux de l'image précédente gardent leur couleur.
+
+        Args:
+            input_path: Vidéo source
+            output_path: Vidéo produite (MPEG-4)
+            max_workers: Nombre de threads (par défaut le nombre de cœurs, au plus 4)
+
+        Returns:
+            Dict: Instructions (nombre d'images, taille, briques par image...)
+
+        Raises:
+            ValueError: Si la vidéo est illisible ou ne contient aucune image
+        """
+        capture = cv2.VideoCapture(str(input_path))
+        if not capture.isOpened():
+            raise ValueError("Vidéo illisible")
+
+        fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        max_workers = max_workers or min(4, os.cpu_count() or 1)
+        pending = deque()
+        previous = None
+        writer = None
+        block_colors = None
+        frames = reused = 0
+
+        def write_next():
+            nonlocal block_colors, frames, reused
+            changed, colors = pending.popleft().result()
+            if changed is None:
+                block_colors = colors
+            else:
+                block_colors[changed] = colors
+                reused += int(changed.size - changed.sum())
+            writer.write(self._render(block_colors, height, width))
+            frames += 1
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="legoizer") as executor:
+                while True:
+                    ok, frame = capture.read()
+                    if not ok:
+                        break
+                    frame = self._resize(frame)
+                    if writer is None:
+                        height, width = frame.shape[:2]
+                        counts = self._block_counts(height, width)
+                        writer = cv2.VideoWriter(
+                            str(output_path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height)
+                        )
+
+                    padded = self._pad(frame)
+                    pending.append(executor.submit(self._changed_block_colors, previous, padded, counts))
+                    previous = padded
+
+                    # Fenêtre bornée d'images en cours de traitement
+                    if len(pending) >= 2 * max_workers:
+                        write_next()
+                while pending:
+                    write_next()
+        finally:
+            capture.release()
+            if writer is not None:
+                writer.release()
+
+        if writer is None:
+            raise ValueError("La vidéo ne contient aucune image")
+
+        return {
+            "frames": frames,
+            "fps": fps,
+            "brick_size": self.brick_size,
+            "total_bricks": int(counts.size),
+            "reused_bricks": reused,
+            "image_size": {
+                "width": width,
+                "height": height
+            }
+        }
+
+    def process_video(self, video_data: bytes) -> Tuple[bytes, str]:
+        """
+        Convertit une vidéo en mosaïque LEGO (voir process_video_file).
+
+        Returns:
+            Tuple[bytes, str]: Vidéo MPEG-4 produite et instructions JSON
+        """
+        with tempfile.TemporaryDirectory(prefix="legoizer_") as tmp:
+            input_path = os.path.join(tmp, "input")
+            output_path = os.path.join(tmp, "output.mp4")
+            with open(input_path, "wb") as f:
+                f.write(video_data)
+            instructions = self.process_video_file(input_path, output_path)
+            with open(output_path, "rb") as f:
+                return f.read(), json.dumps(instructions)
@@ -2,19 +2,21 @@ import logging
 import os
 from pathlib import Path
 from fastapi import FastAPI, UploadFile, File, Form
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from typing import Dict, Optional
 import time
-import torch
+import uuid
+from functools import partial
 
-from services.blocky_service import BlockyService
-from services.blocky_resource_manager import BlockyResourceManager
-from services.blocky_optimizer import BlockyOptimizer
-from services.storage_service import StorageService
-from services.database_service import DatabaseService
-from routers import mobile
-from config.mobile_config import LOG_LEVEL, LOG_FORMAT, API_TITLE, API_VERSION, API_DESCRIPTION
+from .services.executor_pools import get_executor_pools, shutdown_executor_pools
+from .routers import mobile
+from .services.blocky_jobs import CONVERT_TASK, register_conversion_task
+from .utils.upload_stream import spool_upload, discard_upload, UploadTooLargeError
+from .utils.job_queue import JobQueue, JobStatus, QueueFullError, create_job_backend
+from .utils.warmup import Warmup, WarmupError
+from .mobile_config import LOG_LEVEL, LOG_FORMAT, API_TITLE, API_VERSION, API_DESCRIPTION
 
 # Configuration des logs
 logging.basicConfig(
@@ -64,38 +66,71 @@ async def health_check():
     """Route de health check pour Render"""
     return {"status": "healthy"}
 
-# Initialisation des services Blocky
-resource_manager = BlockyResourceManager(
-    base_dir=Path(os.getenv("STORAGE_PATH", "storage")),
-    max_memory_mb=int(os.getenv("MAX_MEMORY_MB", "4096")),
-    max_storage_gb=int(os.getenv("MAX_STORAGE_GB", "10")),
-    cleanup_interval_mins=int(os.getenv("CLEANUP_INTERVAL_MINS", "30")),
-    max_temp_files=int(os.getenv("MAX_TEMP_FILES", "100")),
-    max_file_age_hours=int(os.getenv("MAX_FILE_AGE_HOURS", "24"))
-)
+# Chargement des dépendances lourdes (torch, pytorch3d) après le démarrage
+warmup = Warmup()
 
-optimizer = BlockyOptimizer(
-    device=os.getenv("DEVICE", "cuda" if torch.cuda.is_available() else "cpu"),
-    num_workers=int(os.getenv("NUM_WORKERS", "4")),
-    batch_size=int(os.getenv("BATCH_SIZE", "32")),
-    precision=os.getenv("PRECISION", "float32")
+@warmup.component("blocky")
+def load_blocky_service():
+    """Importe et initialise le service Blocky (torch, pytorch3d)."""
+    from .services.blocky_service import BlockyService
+    from .services.storage_service import StorageService
+    
+    storage_path = Path(os.getenv("STORAGE_PATH", "storage"))
+    blocky_service = BlockyService(
+        storage=StorageService(str(storage_path)),
+        database=None,  # L'API mobile ne conserve pas les modèles en base
+        base_dir=storage_path,
+        max_memory_mb=int(os.getenv("MAX_MEMORY_MB", "4096")),
+        max_storage_mb=int(os.getenv("MAX_STORAGE_GB", "10")) * 1024
+    )
+    logger.info(f"Blocky initialisé avec GPU: {blocky_service.optimizer.device}")
+    return blocky_service
+
+@app.get("/ready")
+async def readiness_check():
+    """Route de readiness : 503 tant que les services Blocky ne sont pas chargés"""
+    report = warmup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+# Taille maximale d'un modèle 3D reçu
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_MB", "500")) * 1024 * 1024
+
+# File des conversions exécutées en arrière-plan.
+# Avec Redis, une conversion peut s'exécuter sur un autre pod que celui qui a
+# reçu le fichier, et son résultat être téléchargé depuis un troisième : le
+# fichier reçu et le résultat sont sous STORAGE_PATH, qui doit alors être
+# partagé entre les pods (SHARED_STORAGE=true). Sinon les tâches restent locales.
+redis_url = os.getenv("REDIS_URL")
+if redis_url and os.getenv("SHARED_STORAGE", "false").lower() != "true":
+    logger.warning("REDIS_URL ignorée : STORAGE_PATH n'est pas partagé entre les pods (SHARED_STORAGE)")
+    redis_url = None
+job_queue = JobQueue(
+    backend=create_job_backend(redis_url),
+    max_workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_pending=int(os.getenv("JOB_MAX_PENDING", "32"))
 )
 
-blocky_service = BlockyService(
-    resource_manager=resource_manager,
-    optimizer=optimizer
-)
+# Tâche partagée avec les routes Blocky ; le service vient du warm-up
+register_conversion_task(job_queue, partial(warmup.get, "blocky"))
+
+# L'API mobile n'authentifie pas les utilisateurs
+MOBILE_USER_ID = "mobile"
 
 @app.on_event("startup")
 async def startup_event():
     """Événement de démarrage de l'application"""
     logger.info("Démarrage de l'application...")
-    logger.info(f"Blocky initialisé avec GPU: {settings.BLOCKY_DEVICE}")
+    get_executor_pools()
+    warmup.start()
+    await job_queue.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Événement d'arrêt de l'application"""
     logger.info("Arrêt de l'application...")
+    await job_queue.stop()
+    await warmup.stop()
+    shutdown_executor_pools()
 
 @app.post("/api/blocky/convert")
 async def convert_model(
@@ -103,41 +138,102 @@ async def convert_model(
     settings: Optional[Dict] = Form(default_factory=dict)
 ):
     """
-    Convertit un modèle 3D en LEGO.
+    Soumet la conversion d'un modèle 3D en LEGO.
+    
+    La conversion est exécutée en arrière-plan ; son état est consultable
+    via /api/blocky/jobs/{job_id}.
     
     Args:
         file: Fichier modèle 3D
         settings: Paramètres de conversion
     """
     try:
-        # Sauvegarder le fichier temporairement
-        temp_dir = resource_manager.get_temp_dir("upload")
-        file_path = temp_dir / file.filename
+        blocky_service = await warmup.get("blocky")
         
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-            
-        # Convertir le modèle
-        success, message = await blocky_service.convert_to_lego(
-            model_path=str(file_path),
-            settings=settings
+        # Écrire le fichier par blocs dans un répertoire temporaire propre à la requête
+        upload = await spool_upload(
+            file,
+            resource_manager=blocky_service.resource_manager,
+            prefix="upload",
+            max_size=MAX_UPLOAD_SIZE
         )
-        
-        if not success:
-            return {"success": False, "error": message}
+
+        try:
+            job = await job_queue.submit(
+                CONVERT_TASK,
+                model_path=str(upload.path),
+                user_id=MOBILE_USER_ID,
+                model_id=uuid.uuid4().hex,
+                settings=settings,
+                content_hash=upload.sha256,
+                filename=file.filename
+            )
+        except QueueFullError:
+            await discard_upload(upload)
+            raise
             
-        return {"success": True, "result": message}
+        return JSONResponse(status_code=202, content={"success": True, **job.public_dict()})
         
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"success": False, "error": str(e)})
+    except WarmupError as e:
+        return JSONResponse(status_code=503, content={"success": False, "error": str(e)})
+    except QueueFullError as e:
+        return JSONResponse(
+            status_code=429,
+            content={"success": False, "error": str(e)},
+            headers={"Retry-After": "30"}
+        )
     except Exception as e:
         logger.error(f"Erreur lors de la conversion: {str(e)}")
         return {"success": False, "error": str(e)}
 
+@app.get("/api/blocky/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Récupère l'état et l'avancement d'une conversion.
+    
+    Une fois la conversion terminée, le modèle LEGO se télécharge via
+    result_url ; le chemin du fichier sur le serveur n'est pas exposé.
+    
+    Args:
+        job_id: ID de la tâche
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"success": False, "error": "Tâche non trouvée"})
+    content = {"success": True, **job.public_dict()}
+    if job.status == JobStatus.COMPLETED:
+        content["result_url"] = f"/api/blocky/jobs/{job_id}/result"
+    return content
+
+@app.get("/api/blocky/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Télécharge le modèle LEGO produit par une conversion terminée.
+    
+    Args:
+        job_id: ID de la tâche
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"success": False, "error": "Tâche non trouvée"})
+    if job.status == JobStatus.FAILED:
+        return JSONResponse(status_code=500, content={"success": False, "error": job.error})
+    if job.status != JobStatus.COMPLETED:
+        return JSONResponse(status_code=409, content={"success": False, "error": "Tâche non terminée"})
+    return FileResponse(
+        path=job.result["file"],
+        filename=job.result.get("filename"),
+        media_type="application/octet-stream"
+    )
+
 @app.get("/api/blocky/stats")
 async def get_stats():
     """Récupère les statistiques des ressources."""
     try:
-        return resource_manager.get_resource_stats()
+        blocky_service = await warmup.get("blocky")
+        return await blocky_service.resource_manager.get_resource_stats()
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des stats: {str(e)}")
         return {"error": str(e)}
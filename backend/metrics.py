@@ -39,12 +39,70 @@ BRICKLINK_API_LATENCY = Histogram(
     ['endpoint']
 )
 
+BRICKLINK_CACHE_REQUESTS = Counter(
+    'bricklink_cache_requests_total',
+    'Consultations du cache des réponses BrickLink (hit, stale, miss)',
+    ['endpoint', 'result']
+)
+
+BRICKLINK_CACHE_HIT_RATIO = Gauge(
+    'bricklink_cache_hit_ratio',
+    'Part des consultations du cache BrickLink servies sans attendre l\'API (depuis le démarrage)',
+    ['endpoint']
+)
+
 STORAGE_OPERATIONS = Counter(
     'storage_operations_total',
     'Nombre total d\'opérations de stockage',
     ['operation', 'status']
 )
 
+CONVERSION_CACHE_REQUESTS = Counter(
+    'conversion_cache_requests_total',
+    'Nombre de consultations du cache de conversion',
+    ['result']
+)
+
+CONVERSION_CACHE_TIME_SAVED = Counter(
+    'conversion_cache_time_saved_seconds_total',
+    'Temps de calcul évité grâce au cache de conversion'
+)
+
+EXECUTOR_ACTIVE_TASKS = Gauge(
+    'executor_active_tasks',
+    'Tâches en cours ou en attente dans un pool d\'exécution partagé',
+    ['pool']
+)
+
+EXECUTOR_SATURATION = Gauge(
+    'executor_saturation_ratio',
+    'Tâches en cours ou en attente rapportées au nombre de workers du pool',
+    ['pool']
+)
+
+CATALOG_REFRESH_DURATION = Histogram(
+    'catalog_refresh_duration_seconds',
+    'Durée des rafraîchissements des catalogues LEGO et Bricklink',
+    buckets=(1, 10, 30, 60, 300, 900, 1800, 3600, 7200)
+)
+
+CATALOG_REFRESHES = Counter(
+    'catalog_refreshes_total',
+    'Nombre de rafraîchissements des catalogues',
+    ['status']
+)
+
+CATALOG_SNAPSHOT_AGE = Gauge(
+    'catalog_snapshot_age_seconds',
+    'Ancienneté du catalogue servi (depuis le dernier rafraîchissement réussi)'
+)
+
+CATALOG_SNAPSHOT_SIZE = Gauge(
+    'catalog_snapshot_entries',
+    'Nombre d\'entrées du catalogue servi',
+    ['collection']
+)
+
 class MetricsCollector:
     def __init__(self):
         self.request_times: Dict[str, List[float]] = defaultdict(list)
@@ -1,13 +1,12 @@
 import os
-import torch
 from pathlib import Path
 
 # Chemins
 BASE_DIR = Path(__file__).parent.parent
 MODEL_PATH = Path("models/mobile_model.pt")
 
-# Configuration du dispositif
-DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# Configuration du dispositif : DEVICE est résolu au premier accès (voir __getattr__)
+# pour que l'import de cette configuration ne charge pas torch
 
 # Configuration du prétraitement des images
 IMAGE_SIZE = (224, 224)  # Taille standard pour de nombreux modèles
@@ -19,10 +18,24 @@ API_TITLE = "Brickify Mobile API"
 API_VERSION = "1.0.0"
 API_DESCRIPTION = "API pour l'analyse d'images avec PyTorch"
 
+# Routes de l'API
+API_PREFIX = "/mobile"
+API_TAG = "mobile"
+
 # Limites de l'API
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+SUPPORTED_FORMATS = {"image/jpeg", "image/png"}
 
 # Configuration du logging
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-LOG_LEVEL = "INFO" 
\ No newline at end of file
+LOG_LEVEL = "INFO" 
+
+
+def __getattr__(name):
+    if name == "DEVICE":
+        import torch
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        globals()["DEVICE"] = device
+        return device
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
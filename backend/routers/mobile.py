@@ -1,13 +1,11 @@
 from fastapi import APIRouter, UploadFile, HTTPException
 from PIL import Image
 import io
-import torch
 import logging
 from typing import Dict, Any
-from config.mobile_config import (
+from ..mobile_config import (
     IMAGE_SIZE,
     SUPPORTED_FORMATS,
-    DEVICE,
     API_PREFIX,
     API_TAG,
     NORMALIZE_MEAN,
@@ -60,10 +58,14 @@ async def health_check() -> Dict[str, Any]:
     """
     Endpoint pour vérifier l'état de l'API.
     """
+    # torch n'est chargé qu'au premier appel, pas au démarrage du serveur
+    import torch
+    from ..mobile_config import DEVICE
+    
     return {
         "status": "healthy",
         "device": {
-            "type": DEVICE,
+            "type": str(DEVICE),
             "cuda_available": torch.cuda.is_available(),
             "cuda_version": torch.version.cuda if torch.cuda.is_available() else None
         }
@@ -1,17 +1,23 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from fastapi.responses import FileResponse
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List
 from ..services.blocky_service import BlockyService
+from ..services.executor_pools import get_executor_pools, shutdown_executor_pools
 from ..services.auth_service import AuthService, get_current_user
 from ..models.user import User
 from ..config import get_settings
+from ..utils.upload_stream import spool_upload, discard_upload, UploadTooLargeError
+from ..utils.job_queue import JobQueue
+from ..services.blocky_jobs import CONVERT_TASK, register_conversion_task
+from .job_routes import get_job_queue, job_queue, submit_job
 
 router = APIRouter(prefix="/api/blocky", tags=["blocky"])
 settings = get_settings()
 
+@lru_cache()
 def get_blocky_service():
-    """Dépendance pour obtenir le service Blocky."""
+    """Dépendance pour obtenir le service Blocky, partagé par toutes les requêtes."""
     return BlockyService(
         storage=settings.storage_service,
         database=settings.database_service,
@@ -20,50 +26,74 @@ def get_blocky_service():
         max_storage_mb=settings.max_storage_mb
     )
 
-@router.post("/convert")
+@router.on_event("startup")
+async def start_executor_pools():
+    get_executor_pools()
+
+@router.on_event("shutdown")
+async def stop_executor_pools():
+    shutdown_executor_pools()
+
+async def _get_blocky_service() -> BlockyService:
+    return get_blocky_service()
+
+register_conversion_task(job_queue, _get_blocky_service)
+
+@router.post("/convert", status_code=202)
 async def convert_model(
     file: UploadFile = File(...),
     settings: Dict = {},
     user: User = Depends(get_current_user),
-    blocky: BlockyService = Depends(get_blocky_service)
+    blocky: BlockyService = Depends(get_blocky_service),
+    queue: JobQueue = Depends(get_job_queue)
 ):
     """
-    Convertit un modèle 3D en LEGO.
+    Soumet la conversion d'un modèle 3D en LEGO.
+    
+    La conversion est exécutée en arrière-plan ; la réponse contient l'ID de
+    la tâche et les URLs de suivi et de résultat.
     
     Args:
         file: Fichier modèle 3D
         settings: Paramètres de conversion
         user: Utilisateur authentifié
         blocky: Service Blocky
+        queue: File de tâches
     """
     try:
-        # Sauvegarder le fichier temporairement
-        temp_dir = Path(settings.temp_dir) / f"upload_{file.filename}"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_path = temp_dir / file.filename
-        
-        with temp_path.open("wb") as f:
-            content = await file.read()
-            f.write(content)
+        # Écrire le fichier par blocs dans le répertoire temporaire du service
+        upload = await spool_upload(
+            file,
+            resource_manager=blocky.resource_manager,
+            prefix="upload",
+            max_size=get_settings().max_upload_mb * 1024 * 1024
+        )
+        temp_path = upload.path
             
         # Générer un ID unique pour le modèle
         model_id = f"{user.id}_{file.filename}"
         
-        # Convertir le modèle
-        result_path = await blocky.convert_to_lego(
-            model_path=temp_path,
-            user_id=user.id,
-            model_id=model_id,
-            settings=settings
-        )
-        
-        # Retourner le fichier
-        return FileResponse(
-            path=result_path,
-            filename=f"lego_{file.filename}",
-            media_type="application/octet-stream"
-        )
+        try:
+            return await submit_job(
+                queue,
+                CONVERT_TASK,
+                model_path=str(temp_path),
+                user_id=user.id,
+                model_id=model_id,
+                settings=settings,
+                content_hash=upload.sha256,
+                filename=file.filename,
+                owner=user.id
+            )
+        except HTTPException:
+            # Tâche refusée : le fichier reçu ne sera jamais converti
+            await discard_upload(upload)
+            raise
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
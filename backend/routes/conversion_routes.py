@@ -1,10 +1,9 @@
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 import os
-import tempfile
-import shutil
 
 from ..services.lego_converter_service import LegoConverterService
 from ..services.meshroom_service import MeshroomService
@@ -12,6 +11,10 @@ from ..services.storage_service import StorageService
 from ..models.lego_model import LegoModel
 from ..services.auth_service import AuthService
 from ..models.user import User
+from ..config import get_settings
+from ..utils.upload_stream import spool_upload, discard_upload, UploadTooLargeError
+from ..utils.job_queue import JobQueue, report_progress
+from .job_routes import get_job_queue, job_queue, submit_job
 
 logger = logging.getLogger(__name__)
 router = APIRouter(
@@ -33,7 +36,38 @@ async def get_converter_service(
 ):
     return LegoConverterService(meshroom, storage)
 
-@router.post("/3d-to-lego")
+@job_queue.task("conversion.3d_to_lego")
+async def convert_3d_to_lego_job(model_path: str, user_id: str, **model_fields) -> Dict:
+    """
+    Tâche de conversion exécutée par la file.
+    
+    Le fichier reçu est supprimé une fois la conversion terminée.
+    
+    Returns:
+        Dict: Le modèle Lego créé
+    """
+    try:
+        await report_progress(0.1, "Conversion du modèle")
+        lego_service = await get_converter_service(
+            await get_meshroom_service(),
+            await get_storage_service()
+        )
+        model = await lego_service.convert_to_lego(
+            model_path=model_path,
+            user_id=user_id,
+            **model_fields
+        )
+        
+        if not model:
+            raise RuntimeError("Erreur lors de la conversion du modèle")
+        
+        return jsonable_encoder(model)
+        
+    finally:
+        # Nettoyer le fichier temporaire
+        await discard_upload(model_path)
+
+@router.post("/3d-to-lego", status_code=202)
 async def convert_3d_to_lego(
     file: UploadFile = File(...),
     name: str = Form(...),
@@ -44,10 +78,14 @@ async def convert_3d_to_lego(
     tags: Optional[List[str]] = Form(None),
     current_user: User = Depends(AuthService.get_current_user),
     lego_service: LegoConverterService = Depends(),
-    storage_service: StorageService = Depends()
+    storage_service: StorageService = Depends(),
+    queue: JobQueue = Depends(get_job_queue)
 ):
     """
-    Convertit un fichier 3D en modèle Lego.
+    Soumet la conversion d'un fichier 3D en modèle Lego.
+    
+    La conversion est exécutée en arrière-plan ; le modèle créé est retourné
+    par /api/jobs/{job_id}/result.
     
     Args:
         file: Fichier 3D à convertir
@@ -60,9 +98,10 @@ async def convert_3d_to_lego(
         current_user: Utilisateur actuel
         lego_service: Service de conversion Lego
         storage_service: Service de stockage
+        queue: File de tâches
         
     Returns:
-        Le modèle Lego créé
+        L'ID de la tâche et les URLs de suivi et de résultat
     """
     try:
         # Vérifier le format du fichier
@@ -73,36 +112,36 @@ async def convert_3d_to_lego(
                 detail=f"Format de fichier non supporté. Formats supportés: {', '.join(f['extension'] for f in lego_service.get_supported_formats())}"
             )
         
-        # Créer un fichier temporaire
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
+        # Écrire le fichier par blocs sans bloquer la boucle d'événements
+        upload = await spool_upload(
+            file,
+            prefix="conversion",
+            max_size=get_settings().max_upload_mb * 1024 * 1024
+        )
         
         try:
-            # Convertir le modèle
-            model = await lego_service.convert_to_lego(
-                model_path=temp_path,
+            return await submit_job(
+                queue,
+                "conversion.3d_to_lego",
+                model_path=str(upload.path),
                 user_id=current_user.id,
                 name=name,
                 description=description,
                 category=category,
                 difficulty=difficulty,
                 is_public=is_public,
-                tags=tags
+                tags=tags,
+                owner=current_user.id
             )
+        except HTTPException:
+            # Tâche refusée : le fichier reçu ne sera jamais converti
+            await discard_upload(upload)
+            raise
             
-            if not model:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Erreur lors de la conversion du modèle"
-                )
-            
-            return model
-            
-        finally:
-            # Nettoyer le fichier temporaire
-            os.unlink(temp_path)
-            
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur lors de la conversion: {str(e)}")
         raise HTTPException(
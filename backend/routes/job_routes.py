@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse
+from typing import Dict
+from ..services.auth_service import get_current_user
+from ..models.user import User
+from ..config import get_settings
+from ..utils.job_queue import Job, JobQueue, JobStatus, QueueFullError, create_job_backend
+from ..services.executor_pools import get_executor_pools
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+settings = get_settings()
+
+job_queue = JobQueue(
+    backend=create_job_backend(settings.redis_url, result_ttl=settings.job_result_ttl_hours * 3600),
+    max_workers=settings.job_workers,
+    max_pending=settings.job_max_pending
+)
+
+def get_job_queue() -> JobQueue:
+    """Dépendance pour obtenir la file de tâches."""
+    return job_queue
+
+@router.on_event("startup")
+async def start_job_queue():
+    # Les étapes CPU des tâches partagent le pool de processus des services
+    job_queue.process_pool = get_executor_pools().process_pool
+    await job_queue.start()
+
+@router.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+
+async def submit_job(queue: JobQueue, task: str, *args, owner: str = None, **kwargs) -> JSONResponse:
+    """
+    Soumet une tâche et retourne la réponse 202 des endpoints de conversion.
+
+    Raises:
+        HTTPException: 429 si la file d'attente est pleine
+    """
+    try:
+        job = await queue.submit(task, *args, owner=owner, **kwargs)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return JSONResponse(
+        status_code=202,
+        content={
+            **job.public_dict(),
+            "status_url": f"{router.prefix}/{job.id}",
+            "result_url": f"{router.prefix}/{job.id}/result"
+        }
+    )
+
+async def _get_owned_job(job_id: str, user: User, queue: JobQueue) -> Job:
+    job = await queue.get(job_id)
+    if job is None or job.owner != user.id:
+        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    return job
+
+@router.get("/{job_id}")
+async def get_job_status(
+    job_id: str,
+    user: User = Depends(get_current_user),
+    queue: JobQueue = Depends(get_job_queue)
+) -> Dict:
+    """
+    Retourne l'état et l'avancement d'une tâche.
+    
+    Args:
+        job_id: ID de la tâche
+        user: Utilisateur authentifié
+        queue: File de tâches
+    """
+    job = await _get_owned_job(job_id, user, queue)
+    return job.public_dict()
+
+@router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    user: User = Depends(get_current_user),
+    queue: JobQueue = Depends(get_job_queue)
+):
+    """
+    Retourne le résultat d'une tâche terminée.
+    
+    Les tâches produisant un fichier retournent {"file": ..., "filename": ...}
+    et le fichier est alors téléchargé directement.
+    
+    Args:
+        job_id: ID de la tâche
+        user: Utilisateur authentifié
+        queue: File de tâches
+    """
+    job = await _get_owned_job(job_id, user, queue)
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail="Tâche non terminée")
+    
+    result = job.result
+    if isinstance(result, dict) and "file" in result:
+        return FileResponse(
+            path=result["file"],
+            filename=result.get("filename"),
+            media_type="application/octet-stream"
+        )
+    return jsonable_encoder(result)
@@ -20,6 +20,7 @@ from ..services.subscription_service import SubscriptionService
 from ..services.lego_service import LegoService
 from ..services.auth_service import get_current_user, AuthService
 from ..services.lego_converter_service import LegoConverterService
+from ..services.http_pool import close_http_pool
 from ..models.lego_model import LegoModel
 
 logger = logging.getLogger(__name__)
@@ -34,6 +35,11 @@ MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
 MAX_FILENAME_LENGTH = 255
 
+@router.on_event("shutdown")
+async def close_bricklink_connections():
+    # Les clients BrickLink partagent un pool de connexions pour toute la durée de l'application
+    await close_http_pool()
+
 def validate_file(file: UploadFile) -> None:
     """
     Valide un fichier uploadé
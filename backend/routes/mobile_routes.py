@@ -4,7 +4,7 @@ from typing import Dict, Any
 import logging
 
 from ..services.mobile_service import MobileService
-from ..config.mobile_config import ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+from ..mobile_config import ALLOWED_EXTENSIONS, MAX_FILE_SIZE
 
 router = APIRouter(prefix="/mobile", tags=["mobile"])
 mobile_service = MobileService()
@@ -1,21 +1,28 @@
 """
 Services pour l'application Brickify.
+
+Les services sont importés à la demande : importer un service léger ne
+charge pas torch et pytorch3d via BlockyOptimizer.
 """
 
-from .database_service import DatabaseService
-from .blocky_service import BlockyService
-from .storage_service import StorageService
-from .blocky_resource_manager import BlockyResourceManager
-from .blocky_optimizer import BlockyOptimizer
+import importlib
+
+_SERVICES = {
+    'DatabaseService': '.database_service',
+    'BlockyService': '.blocky_service',
+    'StorageService': '.storage_service',
+    'BlockyResourceManager': '.blocky_resource_manager',
+    'BlockyOptimizer': '.blocky_optimizer',
+}
 
-__all__ = [
-    'DatabaseService',
-    'BlockyService',
-    'StorageService',
-    'BlockyResourceManager',
-    'BlockyOptimizer'
-]
+__all__ = list(_SERVICES)
 
-# Ce fichier est intentionnellement vide pour marquer le répertoire comme un package Python
+def __getattr__(name):
+    if name in _SERVICES:
+        value = getattr(importlib.import_module(_SERVICES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Package services 
\ No newline at end of file
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,58 @@
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+from ..utils.job_queue import JobQueue, report_progress
+from ..utils.upload_stream import discard_upload
+
+logger = logging.getLogger(__name__)
+
+CONVERT_TASK = "blocky.convert"
+
+def register_conversion_task(queue: JobQueue, get_blocky_service: Callable[[], Awaitable[Any]]):
+    """
+    Enregistre la tâche de conversion Blocky sur une file de tâches.
+
+    L'API mobile (main.py) et les routes Blocky partagent cette tâche ; seul
+    l'accès au service diffère (warm-up ou dépendance des routes).
+
+    Args:
+        queue: File de tâches
+        get_blocky_service: Coroutine retournant le BlockyService
+
+    Returns:
+        La coroutine enregistrée
+    """
+    async def convert_model_job(
+        model_path: str,
+        user_id: str,
+        model_id: str,
+        settings: Dict,
+        content_hash: str,
+        filename: str
+    ) -> Dict:
+        """
+        Tâche de conversion exécutée par la file.
+
+        Le fichier reçu (spool_upload) est supprimé une fois la conversion
+        terminée, qu'elle ait réussi ou non.
+
+        Returns:
+            Dict: Fichier converti, téléchargeable via le résultat de la tâche
+        """
+        try:
+            await report_progress(0.1, "Conversion du modèle")
+            blocky_service = await get_blocky_service()
+            result_path = await blocky_service.convert_to_lego(
+                model_path=Path(model_path),
+                user_id=user_id,
+                model_id=model_id,
+                settings=settings,
+                content_hash=content_hash
+            )
+        finally:
+            # Nettoyer le fichier temporaire
+            await discard_upload(Path(model_path))
+        return {"file": str(result_path), "filename": f"lego_{filename}"}
+
+    queue.register(CONVERT_TASK, convert_model_job)
+    return convert_model_job
@@ -6,18 +6,14 @@ import torch.nn as nn
 import torch.optim as optim
 import numpy as np
 import trimesh
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import Executor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 import asyncio
-import psutil
-from pytorch3d.structures import Meshes
-from pytorch3d.ops import sample_points_from_meshes
-from pytorch3d.loss import mesh_edge_loss, mesh_laplacian_smoothing, mesh_normal_consistency
-from pytorch3d.io import load_obj, save_obj
-from pytorch3d.ops.mesh_face_areas_normals import mesh_face_areas_normals
 
 from .blocky_resource_manager import BlockyResourceManager
+from .executor_pools import ExecutorPools, get_executor_pools, get_cpu_budget
+from .voxel_mesh_builder import VoxelMeshBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -25,27 +21,28 @@ class BlockyOptimizer:
     def __init__(
         self,
         device: str = "cuda" if torch.cuda.is_available() else "cpu",
-        num_workers: Optional[int] = None,
         batch_size: int = 32,
-        precision: str = "float16" if torch.cuda.is_available() else "float32"
+        precision: str = "float16" if torch.cuda.is_available() else "float32",
+        executors: Optional[ExecutorPools] = None
     ):
         """
         Initialise l'optimiseur Blocky.
         
         Args:
             device: Device à utiliser (cuda ou cpu)
-            num_workers: Nombre de workers pour le traitement parallèle
             batch_size: Taille des batchs pour le traitement
             precision: Précision des calculs (float16 ou float32)
+            executors: Pools d'exécution (par défaut les pools partagés du processus)
         """
         self.device = torch.device(device)
-        self.num_workers = num_workers or psutil.cpu_count()
         self.batch_size = batch_size
         self.precision = getattr(torch, precision)
         
-        # Initialiser les pools de threads et de processus
-        self.thread_pool = ThreadPoolExecutor(max_workers=self.num_workers)
-        self.process_pool = ProcessPoolExecutor(max_workers=self.num_workers)
+        # Les pools sont partagés : un optimiseur ne crée ni threads ni processus
+        self._executors = executors
+        
+        # Constructeur vectorisé du maillage LEGO
+        self.mesh_builder = VoxelMeshBuilder(device=self.device)
         
         # Optimiser les paramètres CUDA si disponible
         if torch.cuda.is_available():
@@ -53,9 +50,24 @@ class BlockyOptimizer:
             torch.backends.cuda.matmul.allow_tf32 = True
             torch.backends.cudnn.allow_tf32 = True
             
-        logger.info(f"BlockyOptimizer initialisé sur {device} avec {self.num_workers} workers")
+        logger.info(f"BlockyOptimizer initialisé sur {device}")
+        
+    @property
+    def executors(self) -> ExecutorPools:
+        return self._executors or get_executor_pools()
+        
+    @property
+    def thread_pool(self) -> Executor:
+        return self.executors.thread_pool
         
-        self.loop = asyncio.get_event_loop()
+    @property
+    def process_pool(self) -> Executor:
+        return self.executors.process_pool
+        
+    async def _run_cpu_stage(self, func, *args):
+        """Exécute une étape torch dans le pool de threads une fois ses cœurs réservés."""
+        async with get_cpu_budget().reserve():
+            return await asyncio.get_running_loop().run_in_executor(self.thread_pool, func, *args)
         
     async def optimize_mesh(
         self,
@@ -79,7 +91,7 @@ class BlockyOptimizer:
         """
         try:
             # Charger le modèle de manière asynchrone
-            mesh = await self.loop.run_in_executor(
+            mesh = await asyncio.get_running_loop().run_in_executor(
                 self.thread_pool,
                 self._load_mesh,
                 input_path
@@ -89,18 +101,13 @@ class BlockyOptimizer:
                 raise RuntimeError(f"Impossible de charger le modèle: {input_path}")
             
             # Optimiser le modèle
-            optimized = await self.loop.run_in_executor(
-                self.thread_pool,
-                self._optimize_mesh,
-                mesh,
-                settings
-            )
+            optimized = await self._run_cpu_stage(self._optimize_mesh, mesh, settings)
             
             if optimized is None:
                 raise RuntimeError("L'optimisation du modèle a échoué")
             
             # Sauvegarder le résultat
-            result_path = await self.loop.run_in_executor(
+            result_path = await asyncio.get_running_loop().run_in_executor(
                 self.thread_pool,
                 self._save_mesh,
                 optimized,
@@ -135,7 +142,7 @@ class BlockyOptimizer:
         """
         try:
             # Charger le modèle
-            mesh = await self.loop.run_in_executor(
+            mesh = await asyncio.get_running_loop().run_in_executor(
                 self.thread_pool,
                 self._load_mesh,
                 input_path
@@ -145,18 +152,13 @@ class BlockyOptimizer:
                 raise RuntimeError(f"Impossible de charger le modèle: {input_path}")
             
             # Convertir en LEGO
-            lego_mesh = await self.loop.run_in_executor(
-                self.thread_pool,
-                self._convert_to_lego,
-                mesh,
-                settings
-            )
+            lego_mesh = await self._run_cpu_stage(self._convert_to_lego, mesh, settings)
             
             if lego_mesh is None:
                 raise RuntimeError("La conversion en LEGO a échoué")
             
             # Sauvegarder le résultat
-            result_path = await self.loop.run_in_executor(
+            result_path = await asyncio.get_running_loop().run_in_executor(
                 self.thread_pool,
                 self._save_mesh,
                 lego_mesh,
@@ -245,6 +247,9 @@ class BlockyOptimizer:
             Tuple (vertices simplifiés, faces simplifiées)
         """
         try:
+            # pytorch3d est chargé à la première conversion, pas à l'import du module
+            from pytorch3d.structures import Meshes
+            from pytorch3d.ops.mesh_face_areas_normals import mesh_face_areas_normals
             # Créer un objet Meshes PyTorch3D
             mesh = Meshes(
                 verts=[vertices],
@@ -295,6 +300,8 @@ class BlockyOptimizer:
             Vertices lissés
         """
         try:
+            from pytorch3d.structures import Meshes
+            from pytorch3d.loss import mesh_laplacian_smoothing, mesh_normal_consistency
             # Créer un objet Meshes PyTorch3D
             mesh = Meshes(
                 verts=[vertices],
@@ -369,6 +376,8 @@ class BlockyOptimizer:
             Le maillage converti en LEGO ou None si erreur
         """
         try:
+            from pytorch3d.structures import Meshes
+            from pytorch3d.ops import sample_points_from_meshes
             # Paramètres de voxelisation
             resolution = settings.get("resolution", 32)
             brick_size = settings.get("brick_size", 1.0)
@@ -380,9 +389,6 @@ class BlockyOptimizer:
             # Normaliser le maillage
             vertices = self._normalize_mesh(vertices)
             
-            # Créer une grille de voxels
-            grid = torch.zeros((resolution, resolution, resolution), device=self.device)
-            
             # Échantillonner des points sur la surface
             mesh_pytorch3d = Meshes(
                 verts=[vertices],
@@ -394,55 +400,9 @@ class BlockyOptimizer:
                 num_samples=resolution**3
             )
             
-            # Convertir les points en indices de voxels
-            points = (points * (resolution - 1)).long()
-            
-            # Marquer les voxels occupés
-            for point in points[0]:
-                x, y, z = point
-                grid[x, y, z] = 1
-            
-            # Créer les briques LEGO
-            vertices_list = []
-            faces_list = []
-            current_vert_idx = 0
-            
-            for x in range(resolution):
-                for y in range(resolution):
-                    for z in range(resolution):
-                        if grid[x, y, z] > 0:
-                            # Créer une brique à cette position
-                            brick_verts = torch.tensor([
-                                [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
-                                [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]
-                            ], device=self.device) * brick_size
-                            
-                            # Positionner la brique
-                            brick_verts += torch.tensor([x, y, z], device=self.device) * brick_size
-                            
-                            # Ajouter les faces de la brique
-                            brick_faces = torch.tensor([
-                                [0, 1, 2], [0, 2, 3],  # bottom
-                                [4, 5, 6], [4, 6, 7],  # top
-                                [0, 4, 7], [0, 7, 3],  # left
-                                [1, 5, 6], [1, 6, 2],  # right
-                                [0, 1, 5], [0, 5, 4],  # front
-                                [3, 2, 6], [3, 6, 7]   # back
-                            ], device=self.device) + current_vert_idx
-                            
-                            vertices_list.append(brick_verts)
-                            faces_list.append(brick_faces)
-                            current_vert_idx += 8
-            
-            # Combiner toutes les briques
-            all_vertices = torch.cat(vertices_list, dim=0)
-            all_faces = torch.cat(faces_list, dim=0)
-            
-            # Créer le maillage final
-            lego_mesh = trimesh.Trimesh(
-                vertices=all_vertices.cpu().numpy(),
-                faces=all_faces.cpu().numpy()
-            )
+            # Marquer les voxels occupés puis créer les briques LEGO
+            grid = self.mesh_builder.voxelize(points, resolution)
+            lego_mesh = self.mesh_builder.build(grid, brick_size)
             
             return lego_mesh
             
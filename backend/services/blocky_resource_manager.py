@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import shutil
@@ -49,8 +50,19 @@ class BlockyResourceManager:
         for directory in [self.temp_dir, self.cache_dir, self.results_dir]:
             directory.mkdir(parents=True, exist_ok=True)
             
-        # Démarrer la boucle de nettoyage
-        self.cleanup_task = asyncio.create_task(self._cleanup_loop())
+        # Démarrer la boucle de nettoyage ; construit hors boucle d'événements
+        # (warm-up dans un thread), elle démarre à la première utilisation
+        self.cleanup_task: Optional[asyncio.Task] = None
+        self._start_cleanup_loop()
+
+    def _start_cleanup_loop(self):
+        """Démarre la boucle de nettoyage si une boucle d'événements tourne."""
+        if self.cleanup_task is not None:
+            return
+        try:
+            self.cleanup_task = asyncio.get_running_loop().create_task(self._cleanup_loop())
+        except RuntimeError:
+            pass
         
     async def get_temp_dir(self, prefix: str = "") -> Path:
         """
@@ -62,6 +74,7 @@ class BlockyResourceManager:
         Returns:
             Path: Chemin du répertoire temporaire
         """
+        self._start_cleanup_loop()
         await self._check_resources()
         temp_dir = self.temp_dir / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         temp_dir.mkdir(parents=True, exist_ok=True)
@@ -77,6 +90,7 @@ class BlockyResourceManager:
         Returns:
             Path: Chemin du fichier en cache
         """
+        self._start_cleanup_loop()
         await self._check_resources()
         return self.cache_dir / key
         
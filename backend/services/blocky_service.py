@@ -1,19 +1,29 @@
 import logging
 import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 from .blocky_resource_manager import BlockyResourceManager
 from .blocky_optimizer import BlockyOptimizer
-from .storage_service import StorageService
-from .database_service import DatabaseService
+from ..utils.upload_stream import hash_file_async
+
+if TYPE_CHECKING:
+    # Annotations seulement : le service de base de données (Firestore) n'est
+    # pas nécessaire pour convertir un modèle (API mobile, warm-up)
+    from .storage_service import StorageService
+    from .database_service import DatabaseService
 
 logger = logging.getLogger(__name__)
 
 class BlockyService:
     def __init__(
         self,
-        storage: StorageService,
-        database: DatabaseService,
+        storage: "StorageService",
+        database: Optional["DatabaseService"],
         base_dir: Path,
         max_memory_mb: int = 8192,
         max_storage_mb: int = 51200
@@ -23,7 +33,7 @@ class BlockyService:
         
         Args:
             storage: Service de stockage
-            database: Service de base de données
+            database: Service de base de données (None si les modèles ne sont pas conservés en base)
             base_dir: Répertoire de base
             max_memory_mb: Limite mémoire en MB
             max_storage_mb: Limite stockage en MB
@@ -45,21 +55,40 @@ class BlockyService:
         model_path: Path,
         user_id: str,
         model_id: str,
-        settings: Dict
+        settings: Dict,
+        content_hash: Optional[str] = None
     ) -> Path:
         """
         Convertit un modèle 3D en LEGO.
         
+        Le résultat est mis en cache sous l'empreinte du contenu et des
+        paramètres : un même fichier converti avec les mêmes paramètres est
+        copié depuis le cache sans être recalculé.
+        
         Args:
             model_path: Chemin du modèle source
             user_id: ID de l'utilisateur
             model_id: ID du modèle
             settings: Paramètres de conversion
+            content_hash: Empreinte SHA-256 calculée pendant la réception du fichier
             
         Returns:
             Path: Chemin du modèle converti
         """
         try:
+            # L'empreinte n'est recalculée que si l'appelant ne l'a pas fournie
+            if content_hash is None:
+                content_hash = await hash_file_async(Path(model_path))
+            cache_path = await self.resource_manager.get_cache_path(
+                f"{self._result_key(content_hash, settings)}.stl"
+            )
+            result_path = await self.resource_manager.get_result_path(user_id, model_id)
+            
+            if cache_path.exists():
+                logger.info(f"Résultat en cache pour le modèle {model_id}")
+                await asyncio.to_thread(shutil.copyfile, cache_path, result_path)
+                return result_path
+            
             # Créer un dossier temporaire
             temp_dir = await self.resource_manager.get_temp_dir(prefix=f"convert_{model_id}")
             
@@ -71,19 +100,48 @@ class BlockyService:
             )
             
             # Convertir en LEGO
-            result_path = await self.resource_manager.get_result_path(user_id, model_id)
             converted_path = await self.optimizer.convert_to_lego(
                 input_path=optimized_path,
                 output_path=result_path,
                 settings=settings
             )
             
+            await asyncio.to_thread(self._store_in_cache, converted_path, cache_path)
             return converted_path
             
         except Exception as e:
             logger.error(f"Erreur lors de la conversion du modèle {model_id}: {str(e)}")
             raise
             
+    @staticmethod
+    def _store_in_cache(source: Path, cache_path: Path):
+        """
+        Copie un résultat dans le cache de façon atomique.
+        
+        La copie est écrite dans un fichier temporaire du répertoire de cache
+        puis renommée : une conversion concurrente du même modèle ne lit jamais
+        un fichier partiellement écrit.
+        
+        Args:
+            source: Fichier converti
+            cache_path: Chemin du fichier en cache
+        """
+        fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file, open(source, "rb") as source_file:
+                shutil.copyfileobj(source_file, temp_file)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+            
+    @staticmethod
+    def _result_key(content_hash: str, settings: Dict) -> str:
+        """Clé de cache d'un contenu et de ses paramètres de conversion."""
+        hasher = hashlib.sha256(content_hash.encode())
+        hasher.update(json.dumps(settings, sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+            
     async def get_model_info(self, model_id: str, user_id: str) -> Optional[Dict]:
         """
         Récupère les informations d'un modèle.
@@ -0,0 +1,263 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from ..config import settings
+from ..metrics import BRICKLINK_CACHE_HIT_RATIO, BRICKLINK_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Durées de vie par endpoint : (fraîche, périmée mais encore servie)
+DEFAULT_TTLS: Dict[str, Tuple[float, float]] = {
+    "get_catalog_item": (30 * DAY, 30 * DAY),
+    "get_part_info": (30 * DAY, 30 * DAY),
+    "get_color_info": (30 * DAY, 30 * DAY),
+    "get_price_guide": (6 * HOUR, 2 * DAY),
+}
+
+class BrickLinkCache:
+    """
+    Cache persistant des réponses de l'API BrickLink
+
+    Les réponses sont stockées dans une base SQLite, avec une durée de vie
+    propre à chaque endpoint (longue pour le catalogue et les couleurs, plus
+    courte pour les prix). Une réponse fraîche est servie directement. Une
+    réponse périmée, mais dans sa fenêtre stale-while-revalidate, est servie
+    aussitôt et redemandée en arrière-plan. Au-delà, l'API est appelée. Les
+    demandes concurrentes d'une même clé sont regroupées en un seul appel.
+
+    Les accès à la base s'exécutent dans un thread, hors de la boucle
+    d'événements ; les réponses expirées sont supprimées en arrière-plan lors
+    de la première consultation.
+    """
+
+    def __init__(self, db_path: Path, ttls: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Initialise le cache
+
+        Args:
+            db_path: Fichier de la base SQLite
+            ttls: {endpoint: (durée fraîche, fenêtre périmée)} en secondes, DEFAULT_TTLS par défaut
+        """
+        self.db_path = Path(db_path)
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Appels en cours (absence ou revalidation), partagés entre appelants
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._purge_task: Optional[asyncio.Task] = None
+
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._db_lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+            """)
+
+    @staticmethod
+    def make_key(endpoint: str, *args, **kwargs) -> str:
+        """Clé d'une réponse : endpoint et paramètres de l'appel"""
+        return f"{endpoint}:{json.dumps([args, sorted(kwargs.items())], default=str)}"
+
+    async def get_or_fetch(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Retourne la réponse en cache, ou l'obtient par fetch()
+
+        Args:
+            endpoint: Nom de l'endpoint (choix de la durée de vie)
+            key: Clé de la réponse
+            fetch: Appel de l'API
+
+        Returns:
+            Réponse en cache (fraîche ou périmée) ou réponse de l'API
+        """
+        if self._purge_task is None:
+            self._purge_task = asyncio.ensure_future(self.purge())
+            self._purge_task.add_done_callback(self._purged)
+        fresh_ttl, stale_ttl = self.ttls.get(endpoint, (0, 0))
+        cached = await asyncio.to_thread(self._read, key)
+        if cached is not None:
+            payload, age = cached
+            if age < fresh_ttl:
+                self._record(endpoint, "hit")
+                return payload
+            if age < fresh_ttl + stale_ttl:
+                self._record(endpoint, "stale")
+                self._fetch_shared(endpoint, key, fetch)
+                return payload
+
+        self._record(endpoint, "miss")
+        return await asyncio.shield(self._fetch_shared(endpoint, key, fetch))
+
+    def _fetch_shared(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Lance l'appel de l'API pour une clé, sauf s'il est déjà en cours"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(endpoint, key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return task
+
+    def _forget(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Une revalidation en arrière-plan n'est attendue par personne : son erreur est déjà journalisée
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch_and_store(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            payload = await fetch()
+        except Exception as e:
+            logger.warning(f"Réponse BrickLink non mise en cache ({key}): {str(e)}")
+            raise
+        # Les méthodes du client retournent un résultat vide en cas d'erreur
+        if payload:
+            await asyncio.to_thread(self._write, key, endpoint, payload)
+        return payload
+
+    @staticmethod
+    def _purged(task: asyncio.Task):
+        # Purge en arrière-plan : personne ne l'attend, son échec est seulement journalisé
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Purge du cache BrickLink impossible: {str(task.exception())}")
+
+    async def wait_revalidations(self):
+        """Attend la fin des appels en cours (avant la fermeture de la session HTTP)"""
+        pending = list(self._inflight.values())
+        if self._purge_task is not None:
+            pending.append(self._purge_task)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _read(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT payload, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), time.time() - row[1]
+
+    def _write(self, key: str, endpoint: str, payload: Any):
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, stored_at, payload) VALUES (?, ?, ?, ?)",
+                (key, endpoint, time.time(), json.dumps(payload))
+            )
+
+    def _record(self, endpoint: str, result: str):
+        """Met à jour les métriques de consultation du cache"""
+        BRICKLINK_CACHE_REQUESTS.labels(endpoint=endpoint, result=result).inc()
+        counts = self._counts.setdefault(endpoint, {"hit": 0, "stale": 0, "miss": 0})
+        counts[result] += 1
+        BRICKLINK_CACHE_HIT_RATIO.labels(endpoint=endpoint).set(
+            (counts["hit"] + counts["stale"]) / sum(counts.values())
+        )
+
+    async def purge(self) -> int:
+        """
+        Supprime les réponses trop anciennes pour être servies
+
+        Returns:
+            Nombre de réponses supprimées
+        """
+        return await asyncio.to_thread(self._purge)
+
+    def _purge(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._db_lock, self._db:
+            for endpoint, (fresh_ttl, stale_ttl) in self.ttls.items():
+                removed += self._db.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND stored_at < ?",
+                    (endpoint, now - fresh_ttl - stale_ttl)
+                ).rowcount
+        if removed:
+            logger.info(f"Cache BrickLink: {removed} réponses expirées supprimées")
+        return removed
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Retourne le nombre de réponses en cache et les consultations par endpoint"""
+        entries = await asyncio.to_thread(self._count_entries)
+        return {
+            "entries": entries,
+            "requests": {endpoint: dict(counts) for endpoint, counts in self._counts.items()},
+            "db_path": str(self.db_path)
+        }
+
+    def _count_entries(self) -> Dict[str, int]:
+        with self._db_lock:
+            return dict(self._db.execute(
+                "SELECT endpoint, COUNT(*) FROM responses GROUP BY endpoint"
+            ).fetchall())
+
+    def close(self):
+        """Ferme la base SQLite"""
+        with self._db_lock:
+            self._db.close()
+
+def cached_response(endpoint: str):
+    """
+    Décorateur des méthodes de BrickLinkClient servies par le cache
+
+    À placer au-dessus du limiteur de débit et du suivi des appels : une
+    réponse en cache ne consomme pas le quota BrickLink et n'est pas comptée
+    dans BRICKLINK_API_CALLS. Sans cache (client.cache is None), l'appel est
+    fait directement.
+
+    Args:
+        endpoint: Nom de l'endpoint (clé de DEFAULT_TTLS)
+    """
+    def decorator(func: Callable):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if self.cache is None:
+                return await func(self, *args, **kwargs)
+            return await self.cache.get_or_fetch(
+                endpoint,
+                BrickLinkCache.make_key(endpoint, *args, **kwargs),
+                lambda: func(self, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+_shared_cache: Optional[BrickLinkCache] = None
+
+def get_bricklink_cache() -> Optional[BrickLinkCache]:
+    """
+    Cache partagé par les clients du processus, configuré par les settings
+
+    Returns:
+        Le cache, ou None si bricklink_cache_path n'est pas défini
+    """
+    global _shared_cache
+    if _shared_cache is None and settings.bricklink_cache_path:
+        catalog_ttl = settings.bricklink_catalog_ttl_hours * HOUR
+        _shared_cache = BrickLinkCache(
+            Path(settings.bricklink_cache_path),
+            ttls={
+                "get_catalog_item": (catalog_ttl, catalog_ttl),
+                "get_part_info": (catalog_ttl, catalog_ttl),
+                "get_color_info": (catalog_ttl, catalog_ttl),
+                "get_price_guide": (
+                    settings.bricklink_price_ttl_hours * HOUR, settings.bricklink_price_stale_hours * HOUR
+                ),
+            }
+        )
+    return _shared_cache
@@ -1,46 +1,54 @@
 import logging
 import json
-import uuid
-import time
-import hmac
-import hashlib
-import base64
-import urllib.parse
 from typing import Dict, List, Optional, Any
-import requests
-from requests_oauthlib import OAuth1
 from ..config import settings
 import aiohttp
-from aiohttp import ClientTimeout
 from ..exceptions import BrickLinkAPIError, BrickLinkRateLimitError, BrickLinkAuthenticationError
 from ..utils.rate_limiter import bricklink_limiter
+from .bricklink_cache import BrickLinkCache, cached_response
+from .bricklink_summary import PartsSummaryEngine, parse_retry_after
+from .http_pool import HttpSessionPool, get_http_pool
 from ..metrics import track_bricklink_api
-import asyncio
 
 logger = logging.getLogger(__name__)
 
 class BrickLinkClient:
     """Client pour l'API BrickLink"""
     
-    def __init__(self):
-        """Initialise le client BrickLink"""
-        self.api_url = settings.BRICKLINK_API_URL
-        self.api_key = settings.BRICKLINK_API_KEY
-        self.session = None
-        self.timeout = ClientTimeout(total=30)  # 30 secondes timeout
+    def __init__(self, cache: Optional[BrickLinkCache] = None, pool: Optional[HttpSessionPool] = None,
+                 api_url: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        Initialise le client BrickLink
+        
+        Args:
+            cache: Cache persistant des réponses (voir get_bricklink_cache), None pour le désactiver
+            pool: Pool de connexions HTTP (par défaut le pool partagé du processus)
+            api_url: URL de l'API (par défaut settings.BRICKLINK_API_URL)
+            api_key: Clé de l'API (par défaut settings.BRICKLINK_API_KEY)
+        """
+        self.api_url = api_url or settings.BRICKLINK_API_URL
+        self.api_key = api_key or settings.BRICKLINK_API_KEY
+        self.cache = cache
+        self.pool = pool or get_http_pool()
+        self.headers = {"Authorization": f"Bearer {self.api_key}"}
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Session du pool partagé : les connexions sont réutilisées d'un client à l'autre"""
+        return self.pool.session
     
     async def __aenter__(self):
-        """Crée une session HTTP lors de l'entrée dans le contexte"""
-        self.session = aiohttp.ClientSession(
-            headers={"Authorization": f"Bearer {self.api_key}"},
-            timeout=self.timeout
-        )
+        """Entrée dans le contexte ; la session appartient au pool et reste ouverte"""
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Ferme la session HTTP lors de la sortie du contexte"""
-        if self.session:
-            await self.session.close()
+        """Attend les revalidations du cache lancées par ce client"""
+        if self.cache is not None:
+            await self.cache.wait_revalidations()
+    
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None):
+        """Requête GET sur l'API BrickLink, via le pool de connexions"""
+        return self.session.get(f"{self.api_url}{path}", params=params, headers=self.headers)
     
     async def _handle_response(self, response: aiohttp.ClientResponse) -> Dict[str, Any]:
         """
@@ -58,11 +66,8 @@ class BrickLinkClient:
             BrickLinkAuthenticationError: Erreur d'authentification
         """
         try:
+            self._check_rate_limit(response)
             data = await response.json()
-            
-            if response.status == 429:
-                retry_after = int(response.headers.get("Retry-After", 60))
-                raise BrickLinkRateLimitError(f"Rate limit dépassé. Réessayez dans {retry_after} secondes")
                 
             if response.status == 401:
                 raise BrickLinkAuthenticationError("Clé API invalide ou expirée")
@@ -80,6 +85,22 @@ class BrickLinkClient:
             logger.error(f"Erreur de décodage JSON: {str(e)}")
             raise BrickLinkAPIError("Réponse invalide de l'API")
     
+    @staticmethod
+    def _check_rate_limit(response: aiohttp.ClientResponse):
+        """
+        Lève BrickLinkRateLimitError sur une réponse 429, avec le délai Retry-After
+        
+        Raises:
+            BrickLinkRateLimitError: Limite de taux dépassée
+        """
+        if response.status == 429:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            raise BrickLinkRateLimitError(
+                f"Rate limit dépassé. Réessayez dans {retry_after:.0f} secondes",
+                retry_after=retry_after
+            )
+    
+    @cached_response("get_part_info")
     @bricklink_limiter
     @track_bricklink_api("get_part_info")
     async def get_part_info(self, item_id: str, color_id: int) -> Dict[str, Any]:
@@ -97,14 +118,13 @@ class BrickLinkClient:
             BrickLinkAPIError: En cas d'erreur API
         """
         try:
-            async with self.session.get(
-                f"{self.api_url}/items/{item_id}/colors/{color_id}"
-            ) as response:
+            async with self._get(f"/items/{item_id}/colors/{color_id}") as response:
                 return await self._handle_response(response)
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des informations de la pièce: {str(e)}")
             raise
     
+    @cached_response("get_price_guide")
     @bricklink_limiter
     @track_bricklink_api("get_price_guide")
     async def get_price_guide(self, item_id: str, color_id: int) -> Dict[str, Any]:
@@ -119,15 +139,15 @@ class BrickLinkClient:
             Guide des prix
         """
         try:
-            async with self.session.get(
-                f"{self.api_url}/items/{item_id}/colors/{color_id}/price-guide"
-            ) as response:
+            async with self._get(f"/items/{item_id}/colors/{color_id}/price-guide") as response:
+                self._check_rate_limit(response)
                 response.raise_for_status()
                 return await response.json()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du guide des prix: {str(e)}")
             raise
     
+    @cached_response("get_catalog_item")
     @bricklink_limiter
     @track_bricklink_api("get_catalog_item")
     async def get_catalog_item(self, item_id: str) -> Dict[str, Any]:
@@ -141,9 +161,7 @@ class BrickLinkClient:
             Informations du catalogue
         """
         try:
-            async with self.session.get(
-                f"{self.api_url}/catalog-items/{item_id}"
-            ) as response:
+            async with self._get(f"/catalog-items/{item_id}") as response:
                 response.raise_for_status()
                 return await response.json()
         except Exception as e:
@@ -164,16 +182,15 @@ class BrickLinkClient:
             Liste des pièces trouvées
         """
         try:
-            endpoint = f"{self.api_url}/items"
+            endpoint = "/items"
             params = {
                 "query": query,
                 "limit": limit
             }
             
-            response = requests.get(endpoint, auth=self.auth, params=params)
-            response.raise_for_status()
-            
-            return response.json().get("data", [])
+            async with self._get(endpoint, params=params) as response:
+                response.raise_for_status()
+                return (await response.json()).get("data", [])
         except Exception as e:
             logger.error(f"Erreur lors de la recherche BrickLink: {str(e)}")
             return []
@@ -192,16 +209,15 @@ class BrickLinkClient:
             Informations de prix
         """
         try:
-            endpoint = f"{self.api_url}/items/{item_id}/price"
+            endpoint = f"/items/{item_id}/price"
             params = {
                 "color_id": color_id,
                 "guide_type": "sold"  # Prix de vente
             }
             
-            response = requests.get(endpoint, auth=self.auth, params=params)
-            response.raise_for_status()
-            
-            return response.json().get("data", {})
+            async with self._get(endpoint, params=params) as response:
+                response.raise_for_status()
+                return (await response.json()).get("data", {})
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du prix: {str(e)}")
             return {}
@@ -219,16 +235,15 @@ class BrickLinkClient:
             Détails de la pièce
         """
         try:
-            endpoint = f"{self.api_url}/items/{item_id}"
-            
-            response = requests.get(endpoint, auth=self.auth)
-            response.raise_for_status()
-            
-            return response.json().get("data", {})
+            endpoint = f"/items/{item_id}"
+            async with self._get(endpoint) as response:
+                response.raise_for_status()
+                return (await response.json()).get("data", {})
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des détails: {str(e)}")
             return {}
     
+    @cached_response("get_color_info")
     @bricklink_limiter
     @track_bricklink_api("get_color_info")
     async def get_color_info(self, color_id: int) -> Dict[str, Any]:
@@ -242,12 +257,10 @@ class BrickLinkClient:
             Informations de la couleur
         """
         try:
-            endpoint = f"{self.api_url}/colors/{color_id}"
-            
-            response = requests.get(endpoint, auth=self.auth)
-            response.raise_for_status()
-            
-            return response.json().get("data", {})
+            endpoint = f"/colors/{color_id}"
+            async with self._get(endpoint) as response:
+                response.raise_for_status()
+                return (await response.json()).get("data", {})
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des informations de couleur: {str(e)}")
             return {}
@@ -265,50 +278,26 @@ class BrickLinkClient:
         """
         return f"https://www.bricklink.com/v2/catalog/catalogitem.page?P={item_id}&idColor={color_id}"
     
-    async def get_parts_summary(self, parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def get_parts_summary(self, parts: List[Dict[str, Any]], concurrency: int = 8) -> Dict[str, Any]:
         """
         Récupère un résumé des pièces avec leurs prix
         
+        Les paires (pièce, couleur) en double ne sont demandées qu'une fois et
+        les demandes sont faites en parallèle (voir PartsSummaryEngine).
+        
         Args:
             parts: Liste des pièces à résumer
+            concurrency: Nombre maximal de pièces demandées simultanément
             
         Returns:
-            Résumé des pièces avec prix
+            Résumé des pièces avec prix, dans l'ordre de la liste
             
         Raises:
             BrickLinkAPIError: En cas d'erreur API
+            BrickLinkRateLimitError: Si la limite de taux persiste après plusieurs tentatives
         """
         try:
-            total_price = 0
-            parts_with_prices = []
-            
-            for part in parts:
-                try:
-                    price_info = await self.get_price_guide(part["item_id"], part["color_id"])
-                    part_info = await self.get_part_info(part["item_id"], part["color_id"])
-                    
-                    price = price_info.get("avg_price", 0)
-                    total_price += price * part.get("quantity", 1)
-                    
-                    parts_with_prices.append({
-                        **part,
-                        "price": price,
-                        "name": part_info.get("name"),
-                        "category": part_info.get("category_name"),
-                        "image_url": part_info.get("image_url")
-                    })
-                    
-                except BrickLinkRateLimitError:
-                    logger.warning("Rate limit atteint, pause de 60 secondes")
-                    await asyncio.sleep(60)
-                    continue
-                    
-            return {
-                "parts": parts_with_prices,
-                "total_price": total_price,
-                "currency": "USD"
-            }
-            
+            return await PartsSummaryEngine(self, concurrency=concurrency).summarize(parts)
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du résumé des pièces: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
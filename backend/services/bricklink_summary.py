@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ..exceptions import BrickLinkRateLimitError
+
+logger = logging.getLogger(__name__)
+
+def parse_retry_after(value: Optional[str], default: float = 60) -> float:
+    """
+    Convertit un en-tête Retry-After (secondes ou date HTTP) en délai en secondes
+
+    Args:
+        value: Valeur de l'en-tête, None s'il est absent
+        default: Délai utilisé si l'en-tête est absent ou invalide
+
+    Returns:
+        Délai en secondes (jamais négatif)
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+async def gather_or_cancel(*coros):
+    """
+    Comme asyncio.gather, mais annule les autres coroutines dès qu'une échoue
+
+    Args:
+        *coros: Coroutines à exécuter simultanément
+
+    Returns:
+        Résultats, dans l'ordre des coroutines
+
+    Raises:
+        La première exception levée, une fois les autres coroutines annulées
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+class PartsSummaryEngine:
+    """
+    Résumé des prix d'une liste de pièces BrickLink
+
+    Les paires (item_id, color_id) identiques ne sont demandées qu'une fois.
+    Les paires sont traitées en parallèle (au plus `concurrency` à la fois) ;
+    pour chacune, le guide des prix et les informations de la pièce sont
+    demandés simultanément. Les appels passent par les méthodes du client,
+    donc par le limiteur de débit BrickLink. Sur une réponse 429, toutes les
+    requêtes sont suspendues pendant le délai Retry-After, puis la paire est
+    redemandée (au plus max_retries fois) au lieu d'être abandonnée. Dès
+    qu'une paire échoue, les demandes restantes sont annulées.
+    """
+
+    def __init__(self, client, concurrency: int = 8, max_retries: int = 5):
+        """
+        Initialise le moteur
+
+        Args:
+            client: BrickLinkClient ouvert (get_price_guide, get_part_info)
+            concurrency: Nombre maximal de paires traitées simultanément
+            max_retries: Nombre maximal de nouvelles tentatives par paire limitée
+        """
+        self.client = client
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        # Instant (time.monotonic) avant lequel aucune requête n'est envoyée
+        self._paused_until = 0.0
+
+    async def summarize(self, parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Récupère un résumé des pièces avec leurs prix, dans l'ordre des pièces reçues
+
+        Args:
+            parts: Pièces ({"item_id", "color_id", "quantity"})
+
+        Returns:
+            Résumé ({"parts", "total_price", "currency", "lookups"})
+
+        Raises:
+            BrickLinkRateLimitError: Si une paire reste limitée après max_retries tentatives
+            BrickLinkAPIError: En cas d'autre erreur API
+        """
+        keys = list(dict.fromkeys((part["item_id"], part["color_id"]) for part in parts))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def lookup(key: Tuple[str, int]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+            async with semaphore:
+                return await self._lookup(*key)
+
+        lookups = await gather_or_cancel(*(lookup(key) for key in keys))
+        results = dict(zip(keys, lookups))
+
+        total_price = 0
+        parts_with_prices = []
+        for part in parts:
+            price_info, part_info = results[(part["item_id"], part["color_id"])]
+            price = price_info.get("avg_price", 0)
+            total_price += price * part.get("quantity", 1)
+            parts_with_prices.append({
+                **part,
+                "price": price,
+                "name": part_info.get("name"),
+                "category": part_info.get("category_name"),
+                "image_url": part_info.get("image_url")
+            })
+
+        return {
+            "parts": parts_with_prices,
+            "total_price": total_price,
+            "currency": "USD",
+            "lookups": len(keys)
+        }
+
+    async def _lookup(self, item_id: str, color_id: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Guide des prix et informations d'une paire, demandés simultanément"""
+        price_info, part_info = await gather_or_cancel(
+            self._call(self.client.get_price_guide, item_id, color_id),
+            self._call(self.client.get_part_info, item_id, color_id)
+        )
+        return price_info, part_info
+
+    async def _call(self, method, item_id: str, color_id: int) -> Dict[str, Any]:
+        """Appel du client, redemandé après le délai Retry-After sur une réponse 429"""
+        for attempt in range(self.max_retries + 1):
+            await self._wait_if_paused()
+            try:
+                return await method(item_id, color_id)
+            except BrickLinkRateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                retry_after = getattr(e, "retry_after", 60)
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                logger.warning(
+                    f"Rate limit atteint pour {item_id}/{color_id}, nouvel essai dans {retry_after:.1f} secondes"
+                )
+
+    async def _wait_if_paused(self):
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
@@ -0,0 +1,162 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+from ..config import get_settings
+from ..metrics import EXECUTOR_ACTIVE_TASKS, EXECUTOR_SATURATION
+from ..utils.cpu_budget import CpuBudget, init_worker_process
+
+logger = logging.getLogger(__name__)
+
+class MonitoredExecutor(Executor):
+    """
+    Pool d'exécution qui publie son occupation.
+
+    Les tâches soumises et non terminées sont comptées ; rapportées au nombre
+    de workers, elles donnent la saturation du pool (au-delà de 1, des tâches
+    attendent un worker libre).
+    """
+
+    def __init__(self, name: str, executor: Executor, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = executor
+        self._active = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    @property
+    def active_tasks(self) -> int:
+        return self._active
+
+    @property
+    def saturation(self) -> float:
+        return self._active / self.max_workers
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            self._active += 1
+        self._publish()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._task_done(None)
+            raise
+        future.add_done_callback(self._task_done)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def _task_done(self, future: Optional[Future]):
+        with self._lock:
+            self._active -= 1
+        self._publish()
+
+    def _publish(self):
+        EXECUTOR_ACTIVE_TASKS.labels(pool=self.name).set(self._active)
+        EXECUTOR_SATURATION.labels(pool=self.name).set(self.saturation)
+
+class ExecutorPools:
+    """Pools de threads et de processus partagés par tous les services du processus."""
+
+    def __init__(self, thread_workers: Optional[int] = None, process_workers: Optional[int] = None):
+        """
+        Chaque processus de calcul est limité à un thread torch/BLAS.
+
+        Args:
+            thread_workers: Nombre de threads (par défaut celui de ThreadPoolExecutor)
+            process_workers: Nombre de processus (par défaut le nombre de cœurs)
+        """
+        cpu_count = os.cpu_count() or 1
+        self.thread_workers = thread_workers or min(32, cpu_count + 4)
+        self.process_workers = process_workers or cpu_count
+
+        self.thread_pool = MonitoredExecutor(
+            "thread",
+            ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="blocky"),
+            self.thread_workers
+        )
+        # Les processus ne sont lancés qu'à la première tâche soumise ;
+        # spawn car un fork après l'initialisation de torch/CUDA n'est pas sûr
+        self.process_pool = MonitoredExecutor(
+            "process",
+            ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker_process
+            ),
+            self.process_workers
+        )
+
+        logger.info(
+            f"Pools d'exécution créés: {self.thread_workers} threads, "
+            f"{self.process_workers} processus"
+        )
+
+    def shutdown(self, wait: bool = True):
+        """Arrête les pools ; les tâches en attente sont annulées."""
+        self.thread_pool.shutdown(wait=wait, cancel_futures=True)
+        self.process_pool.shutdown(wait=wait, cancel_futures=True)
+        logger.info("Pools d'exécution arrêtés")
+
+    def get_stats(self) -> Dict:
+        return {
+            pool.name: {
+                "workers": pool.max_workers,
+                "active_tasks": pool.active_tasks,
+                "saturation": pool.saturation
+            }
+            for pool in (self.thread_pool, self.process_pool)
+        }
+
+_pools: Optional[ExecutorPools] = None
+_pools_lock = threading.Lock()
+_cpu_budget: Optional[CpuBudget] = None
+
+def get_cpu_budget() -> CpuBudget:
+    """
+    Retourne le budget CPU du worker, créé et appliqué au premier appel.
+
+    Les cœurs (cpu_cores) sont partagés entre les workers du serveur
+    (web_concurrency).
+    """
+    global _cpu_budget
+    with _pools_lock:
+        if _cpu_budget is None:
+            settings = get_settings()
+            _cpu_budget = CpuBudget(
+                total_cores=settings.cpu_cores,
+                server_workers=settings.web_concurrency,
+                stage_threads=settings.stage_threads
+            )
+            _cpu_budget.apply()
+        return _cpu_budget
+
+def get_executor_pools() -> ExecutorPools:
+    """
+    Retourne les pools partagés du processus, créés au premier appel.
+
+    Les tailles sont lues dans la configuration (thread_pool_workers,
+    process_pool_workers) ou, à défaut, déduites du budget CPU.
+    """
+    global _pools
+    budget = get_cpu_budget()
+    with _pools_lock:
+        if _pools is None:
+            settings = get_settings()
+            _pools = ExecutorPools(
+                thread_workers=settings.thread_pool_workers or budget.thread_pool_workers,
+                process_workers=settings.process_pool_workers or budget.process_pool_workers
+            )
+        return _pools
+
+def shutdown_executor_pools(wait: bool = True):
+    """Arrête les pools partagés ; un appel ultérieur à get_executor_pools les recrée."""
+    global _pools
+    with _pools_lock:
+        if _pools is not None:
+            _pools.shutdown(wait=wait)
+            _pools = None
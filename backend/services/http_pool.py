@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+import aiohttp
+from aiohttp import ClientTimeout
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class HttpSessionPool:
+    """
+    Pool de connexions HTTP partagé par les clients d'API du processus.
+
+    Une seule session aiohttp est ouverte pour toute la durée de vie de
+    l'application : les connexions TCP/TLS restent ouvertes entre les appels
+    (keep-alive) et les résolutions DNS sont mises en cache. La session est
+    créée au premier appel, dans la boucle d'événements courante, et
+    recréée si elle a été fermée ou si la boucle a changé.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 16, dns_cache_seconds: int = 300,
+                 keepalive_seconds: float = 30, timeout_seconds: float = 30):
+        """
+        Args:
+            limit: Nombre maximal de connexions simultanées
+            limit_per_host: Nombre maximal de connexions simultanées vers un même hôte
+            dns_cache_seconds: Durée de vie des résolutions DNS en cache
+            keepalive_seconds: Durée de conservation d'une connexion inutilisée
+            timeout_seconds: Délai maximal d'une requête
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_seconds = dns_cache_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout = ClientTimeout(total=timeout_seconds)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Session partagée ; à utiliser depuis une coroutine."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_seconds,
+                keepalive_timeout=self.keepalive_seconds
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._loop = loop
+            logger.info(
+                f"Pool HTTP créé: {self.limit} connexions, {self.limit_per_host} par hôte"
+            )
+        return self._session
+
+    async def close(self):
+        """Ferme la session et ses connexions ; un appel ultérieur à session la recrée."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Pool HTTP fermé")
+        self._session = None
+        self._loop = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "open": self._session is not None and not self._session.closed,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "dns_cache_seconds": self.dns_cache_seconds
+        }
+
+_pool: Optional[HttpSessionPool] = None
+
+def get_http_pool() -> HttpSessionPool:
+    """
+    Retourne le pool HTTP partagé du processus, créé au premier appel.
+
+    Les limites sont lues dans la configuration (http_pool_limit,
+    http_pool_limit_per_host, http_dns_cache_seconds, http_keepalive_seconds).
+    """
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = HttpSessionPool(
+            limit=settings.http_pool_limit,
+            limit_per_host=settings.http_pool_limit_per_host,
+            dns_cache_seconds=settings.http_dns_cache_seconds,
+            keepalive_seconds=settings.http_keepalive_seconds
+        )
+    return _pool
+
+async def close_http_pool():
+    """Ferme le pool partagé (arrêt de l'application)."""
+    if _pool is not None:
+        await _pool.close()
@@ -4,6 +4,7 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from .lumi_client import LumiClient
 from .bricklink_client import BrickLinkClient
+from .bricklink_cache import get_bricklink_cache
 from .storage_service import StorageService
 from .database_service import DatabaseService
 from ..models.lego_models import LegoAnalysis, LegoBrick
@@ -25,7 +26,7 @@ class LegoAnalyzerService:
         self.storage_service = storage_service
         self.db_service = db_service
         self.lumi_client = LumiClient()
-        self.bricklink_client = BrickLinkClient()
+        self.bricklink_client = BrickLinkClient(cache=get_bricklink_cache())
     
     async def process_image(self, image_path: str, user_id: str) -> Dict[str, Any]:
         """
@@ -6,7 +6,7 @@ import logging
 from typing import Dict, Optional
 from pathlib import Path
 
-from ..config.mobile_config import (
+from ..mobile_config import (
     MODEL_PATH,
     DEVICE,
     IMAGE_SIZE,
@@ -0,0 +1,131 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+import torch
+import trimesh
+
+logger = logging.getLogger(__name__)
+
+# Coins de chaque face d'un voxel unitaire, dans l'ordre anti-horaire vu de l'extérieur.
+# Chaque entrée : (axe, décalage du voisin, coins de la face)
+_FACE_DIRECTIONS = (
+    (0, -1, ((0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0))),  # -x
+    (0, 1, ((1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1))),   # +x
+    (1, -1, ((0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1))),  # -y
+    (1, 1, ((0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0))),   # +y
+    (2, -1, ((0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0))),  # -z
+    (2, 1, ((0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1))),   # +z
+)
+
+# Deux triangles par face quadrangulaire
+_QUAD_TRIANGLES = np.array([[0, 1, 2], [0, 2, 3]], dtype=np.int64)
+
+
+class VoxelMeshBuilder:
+    """Construit le maillage LEGO d'une grille de voxels sans boucle Python par voxel."""
+
+    def __init__(self, device: torch.device = torch.device("cpu")):
+        """
+        Initialise le constructeur de maillage.
+
+        Args:
+            device: Device sur lequel la grille de voxels est remplie
+        """
+        self.device = torch.device(device)
+
+    def voxelize(self, points: torch.Tensor, resolution: int) -> torch.Tensor:
+        """
+        Remplit une grille de voxels à partir de points échantillonnés.
+
+        Args:
+            points: Points normalisés dans [-1, 1], de forme (N, 3) ou (1, N, 3)
+            resolution: Résolution de la grille
+
+        Returns:
+            Grille booléenne (resolution, resolution, resolution) indexée en [x, y, z]
+        """
+        points = points.reshape(-1, 3).to(self.device)
+
+        # Convertir les points en indices de voxels
+        indices = torch.round((points.float() + 1.0) * 0.5 * (resolution - 1)).long()
+        indices = indices.clamp_(0, resolution - 1)
+
+        # Marquer tous les voxels occupés en une seule opération d'indexation
+        grid = torch.zeros((resolution, resolution, resolution), dtype=torch.bool, device=self.device)
+        grid[indices[:, 0], indices[:, 1], indices[:, 2]] = True
+
+        return grid
+
+    def build(self, grid: torch.Tensor, brick_size: float = 1.0) -> trimesh.Trimesh:
+        """
+        Génère le maillage des briques d'une grille de voxels.
+
+        Seules les faces exposées sont émises : une face partagée par deux
+        voxels voisins est invisible et n'est pas générée.
+
+        Args:
+            grid: Grille d'occupation indexée en [x, y, z]
+            brick_size: Taille d'une brique
+
+        Returns:
+            Le maillage des briques
+
+        Raises:
+            ValueError: Si la grille ne contient aucun voxel occupé
+        """
+        if isinstance(grid, torch.Tensor):
+            grid = grid.detach().cpu().numpy()
+        occupied = np.asarray(grid) > 0
+
+        if not occupied.any():
+            raise ValueError("La grille ne contient aucun voxel occupé")
+
+        vertices, faces = self._exposed_faces(occupied)
+
+        return trimesh.Trimesh(
+            vertices=vertices * brick_size,
+            faces=faces
+        )
+
+    def _exposed_faces(self, occupied: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcule les sommets et triangles des faces exposées.
+
+        Args:
+            occupied: Grille booléenne d'occupation
+
+        Returns:
+            Tuple (sommets, triangles)
+        """
+        padded = np.pad(occupied, 1, mode="constant", constant_values=False)
+        inner = (slice(1, -1),) * 3
+
+        vertices_list = []
+        faces_list = []
+        vertex_offset = 0
+
+        for axis, step, corners in _FACE_DIRECTIONS:
+            # Voisin dans la direction de la face
+            neighbour = list(inner)
+            neighbour[axis] = slice(1 + step, padded.shape[axis] - 1 + step)
+            exposed = occupied & ~padded[tuple(neighbour)]
+
+            coords = np.argwhere(exposed)
+            if len(coords) == 0:
+                continue
+
+            # (N, 4, 3) : les quatre coins de chaque face exposée
+            quads = coords[:, None, :] + np.asarray(corners, dtype=np.int64)[None, :, :]
+            vertices_list.append(quads.reshape(-1, 3))
+
+            # (N, 2, 3) : deux triangles par face
+            bases = vertex_offset + 4 * np.arange(len(coords), dtype=np.int64)
+            faces_list.append((bases[:, None, None] + _QUAD_TRIANGLES[None]).reshape(-1, 3))
+
+            vertex_offset += 4 * len(coords)
+
+        vertices = np.concatenate(vertices_list).astype(np.float64)
+        faces = np.concatenate(faces_list)
+
+        return vertices, faces
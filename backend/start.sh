@@ -19,6 +19,6 @@ mkdir -p /data/storage/results
 chmod -R 755 /data/storage
 
 # Démarrer l'application
-cd /opt/render/project/src/backend
-export PYTHONPATH=/opt/render/project/src/backend:$PYTHONPATH
-uvicorn main:app --host 0.0.0.0 --port $PORT --workers 4 --log-level info 
\ No newline at end of file
+cd /opt/render/project/src
+export PYTHONPATH=/opt/render/project/src:$PYTHONPATH
+uvicorn backend.main:app --host 0.0.0.0 --port $PORT --workers 4 --log-level info 
\ No newline at end of file
@@ -0,0 +1,89 @@
+import pytest
+from pathlib import Path
+from ..services.blocky_jobs import CONVERT_TASK, register_conversion_task
+from ..utils.job_queue import JobQueue, JobStatus
+
+class FakeBlockyService:
+    """Service simulé : enregistre les arguments de convert_to_lego"""
+    def __init__(self, result_dir: Path, error: Exception = None):
+        self.result_dir = result_dir
+        self.error = error
+        self.calls = []
+
+    async def convert_to_lego(self, model_path, user_id, model_id, settings, content_hash=None):
+        self.calls.append({
+            "model_path": model_path, "user_id": user_id, "model_id": model_id,
+            "settings": settings, "content_hash": content_hash
+        })
+        if self.error is not None:
+            raise self.error
+        return self.result_dir / user_id / f"{model_id}.stl"
+
+def spooled_model(tmp_path: Path) -> Path:
+    """Fichier reçu, dans son répertoire temporaire comme après spool_upload"""
+    upload_dir = tmp_path / "upload"
+    upload_dir.mkdir()
+    model_path = upload_dir / "cube.obj"
+    model_path.write_text("v 0 0 0")
+    return model_path
+
+@pytest.fixture
+async def queue():
+    queue = JobQueue(max_workers=1)
+    yield queue
+    await queue.stop()
+
+@pytest.mark.asyncio
+async def test_conversion_task_calls_service(queue, tmp_path):
+    """Test que la tâche partagée passe tous les arguments requis au service et retourne le fichier converti"""
+    service = FakeBlockyService(tmp_path)
+    model_path = spooled_model(tmp_path)
+
+    async def get_service():
+        return service
+
+    register_conversion_task(queue, get_service)
+    await queue.start()
+    job = await queue.submit(
+        CONVERT_TASK,
+        model_path=str(model_path),
+        user_id="user1",
+        model_id="model1",
+        settings={"brick_size": 1},
+        content_hash="abc",
+        filename="cube.obj"
+    )
+    done = await queue.wait(job.id, timeout=2)
+
+    assert done.status == JobStatus.COMPLETED
+    assert done.result == {"file": str(tmp_path / "user1" / "model1.stl"), "filename": "lego_cube.obj"}
+    assert service.calls == [{
+        "model_path": model_path, "user_id": "user1", "model_id": "model1",
+        "settings": {"brick_size": 1}, "content_hash": "abc"
+    }]
+    assert not model_path.parent.exists()
+
+@pytest.mark.asyncio
+async def test_conversion_task_discards_upload_on_failure(queue, tmp_path):
+    """Test que le fichier reçu est supprimé même si la conversion échoue"""
+    service = FakeBlockyService(tmp_path, error=RuntimeError("échec"))
+    model_path = spooled_model(tmp_path)
+
+    async def get_service():
+        return service
+
+    register_conversion_task(queue, get_service)
+    await queue.start()
+    job = await queue.submit(
+        CONVERT_TASK,
+        model_path=str(model_path),
+        user_id="user1",
+        model_id="model1",
+        settings={},
+        content_hash="abc",
+        filename="cube.obj"
+    )
+    done = await queue.wait(job.id, timeout=2)
+
+    assert done.status == JobStatus.FAILED
+    assert not model_path.parent.exists()
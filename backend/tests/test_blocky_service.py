@@ -0,0 +1,26 @@
+import pytest
+from ..services.blocky_service import BlockyService
+
+def test_store_in_cache_replaces_atomically(tmp_path):
+    """Test que la copie en cache passe par un fichier temporaire renommé"""
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    cache_path = cache_dir / "resultat.stl"
+    cache_path.write_bytes(b"ancien")
+    source = tmp_path / "converti.stl"
+    source.write_bytes(b"solid lego" * 1000)
+
+    BlockyService._store_in_cache(source, cache_path)
+
+    assert cache_path.read_bytes() == source.read_bytes()
+    assert list(cache_dir.iterdir()) == [cache_path]
+
+def test_store_in_cache_leaves_no_partial_file(tmp_path):
+    """Test qu'une copie interrompue ne laisse ni fichier en cache ni fichier temporaire"""
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+
+    with pytest.raises(FileNotFoundError):
+        BlockyService._store_in_cache(tmp_path / "absent.stl", cache_dir / "resultat.stl")
+
+    assert list(cache_dir.iterdir()) == []
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+import pytest
+from ..metrics import BRICKLINK_CACHE_HIT_RATIO, BRICKLINK_CACHE_REQUESTS
+from ..services.bricklink_cache import BrickLinkCache, cached_response
+
+class FakeClient:
+    """Client simulé : compte les appels réels de l'API"""
+    def __init__(self, cache, delay=0.0):
+        self.cache = cache
+        self.delay = delay
+        self.calls = 0
+        self.price = 1.0
+
+    @cached_response("get_price_guide")
+    async def get_price_guide(self, item_id, color_id):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"avg_price": self.price}
+
+    @cached_response("get_part_info")
+    async def get_part_info(self, item_id, color_id):
+        self.calls += 1
+        return {"name": f"Brick {item_id}"}
+
+    @cached_response("get_color_info")
+    async def get_color_info(self, color_id):
+        self.calls += 1
+        return {}
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = BrickLinkCache(tmp_path / "bricklink.sqlite3", ttls={
+        "get_price_guide": (0.2, 0.5),
+        "get_part_info": (3600, 3600),
+        "get_color_info": (3600, 3600),
+    })
+    yield cache
+    cache.close()
+
+def age_entries(cache, seconds):
+    """Vieillit toutes les réponses en cache"""
+    with cache._db:
+        cache._db.execute("UPDATE responses SET stored_at = stored_at - ?", (seconds,))
+
+def requests_count(endpoint, result):
+    return BRICKLINK_CACHE_REQUESTS.labels(endpoint=endpoint, result=result)._value.get()
+
+@pytest.mark.asyncio
+async def test_fresh_response_is_served_from_cache(cache):
+    """Test qu'une réponse fraîche n'appelle pas l'API"""
+    client = FakeClient(cache)
+    hits = requests_count("get_part_info", "hit")
+
+    assert await client.get_part_info("3001", 1) == {"name": "Brick 3001"}
+    assert await client.get_part_info("3001", 1) == {"name": "Brick 3001"}
+    assert await client.get_part_info("3003", 1) == {"name": "Brick 3003"}
+
+    assert client.calls == 2
+    assert requests_count("get_part_info", "hit") == hits + 1
+    assert BRICKLINK_CACHE_HIT_RATIO.labels(endpoint="get_part_info")._value.get() == pytest.approx(1 / 3)
+
+@pytest.mark.asyncio
+async def test_cache_persists_across_instances(tmp_path):
+    """Test que les réponses survivent à un redémarrage"""
+    first = BrickLinkCache(tmp_path / "bricklink.sqlite3")
+    await FakeClient(first).get_part_info("3001", 1)
+    first.close()
+
+    second = BrickLinkCache(tmp_path / "bricklink.sqlite3")
+    client = FakeClient(second)
+    assert await client.get_part_info("3001", 1) == {"name": "Brick 3001"}
+    assert client.calls == 0
+    second.close()
+
+@pytest.mark.asyncio
+async def test_stale_response_is_served_while_revalidating(cache):
+    """Test qu'une réponse périmée est servie aussitôt puis rafraîchie en arrière-plan"""
+    client = FakeClient(cache, delay=0.05)
+    await client.get_price_guide("3001", 1)
+    age_entries(cache, 0.3)
+    client.price = 2.0
+
+    start = time.monotonic()
+    assert await client.get_price_guide("3001", 1) == {"avg_price": 1.0}
+    assert time.monotonic() - start < 0.05
+
+    await cache.wait_revalidations()
+    assert client.calls == 2
+    assert await client.get_price_guide("3001", 1) == {"avg_price": 2.0}
+    assert client.calls == 2
+
+@pytest.mark.asyncio
+async def test_expired_response_is_refetched(cache):
+    """Test qu'au-delà de la fenêtre périmée l'API est appelée et attendue"""
+    client = FakeClient(cache)
+    await client.get_price_guide("3001", 1)
+    age_entries(cache, 1)
+    client.price = 3.0
+
+    assert await client.get_price_guide("3001", 1) == {"avg_price": 3.0}
+    assert client.calls == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced(cache):
+    """Test que des demandes simultanées d'une même réponse n'appellent l'API qu'une fois"""
+    client = FakeClient(cache, delay=0.05)
+    results = await asyncio.gather(*(client.get_price_guide("3001", 1) for _ in range(5)))
+
+    assert results == [{"avg_price": 1.0}] * 5
+    assert client.calls == 1
+
+@pytest.mark.asyncio
+async def test_empty_responses_are_not_cached(cache):
+    """Test que les résultats vides (erreurs absorbées par le client) ne sont pas mis en cache"""
+    client = FakeClient(cache)
+    await client.get_color_info(1)
+    await client.get_color_info(1)
+    assert client.calls == 2
+
+@pytest.mark.asyncio
+async def test_client_without_cache_calls_api(cache):
+    """Test qu'un client sans cache appelle toujours l'API"""
+    client = FakeClient(None)
+    await client.get_part_info("3001", 1)
+    await client.get_part_info("3001", 1)
+    assert client.calls == 2
+
+@pytest.mark.asyncio
+async def test_purge_removes_unservable_responses(cache):
+    """Test du nettoyage des réponses trop anciennes"""
+    client = FakeClient(cache)
+    await client.get_price_guide("3001", 1)
+    await client.get_part_info("3001", 1)
+    age_entries(cache, 1)
+
+    assert await cache.purge() == 1
+    assert (await cache.get_stats())["entries"] == {"get_part_info": 1}
+
+@pytest.mark.asyncio
+async def test_database_is_used_off_event_loop(tmp_path):
+    """Test que la purge, les lectures et les écritures ne s'exécutent pas sur la boucle d'événements"""
+    first = BrickLinkCache(tmp_path / "bricklink.sqlite3", ttls={"get_price_guide": (0.2, 0.5)})
+    await FakeClient(first).get_price_guide("3001", 1)
+    await first.wait_revalidations()
+    age_entries(first, 1)
+    first.close()
+
+    # La construction ne purge pas : la réponse expirée est supprimée à la première consultation
+    cache = BrickLinkCache(tmp_path / "bricklink.sqlite3", ttls={"get_price_guide": (0.2, 0.5)})
+    try:
+        assert (await cache.get_stats())["entries"] == {"get_price_guide": 1}
+        threads = []
+        for name in ("_read", "_write", "_purge"):
+            def record(*args, _method=getattr(cache, name)):
+                threads.append(threading.get_ident())
+                return _method(*args)
+            setattr(cache, name, record)
+
+        client = FakeClient(cache)
+        await client.get_part_info("3001", 1)
+        await cache.wait_revalidations()
+
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+        assert (await cache.get_stats())["entries"] == {"get_part_info": 1}
+    finally:
+        cache.close()
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from email.utils import formatdate
+import pytest
+from ..exceptions import BrickLinkAPIError, BrickLinkRateLimitError
+from ..services.bricklink_summary import PartsSummaryEngine, parse_retry_after
+
+class FakeBrickLinkClient:
+    """Client simulé : prix et nom dérivés de la pièce, 429 programmables par paire"""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.rate_limited = {}
+        self.failing = set()
+        self.in_flight = self.max_in_flight = 0
+
+    async def _call(self, kind, item_id, color_id):
+        self.calls.append((kind, item_id, color_id, time.monotonic()))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if (item_id, color_id) in self.failing:
+            raise BrickLinkAPIError("Erreur API: pièce inconnue")
+        remaining = self.rate_limited.get((item_id, color_id, kind), 0)
+        if remaining:
+            self.rate_limited[(item_id, color_id, kind)] = remaining - 1
+            raise BrickLinkRateLimitError("Rate limit dépassé", retry_after=0.05)
+
+    async def get_price_guide(self, item_id, color_id):
+        await self._call("price", item_id, color_id)
+        return {"avg_price": float(len(item_id)) + color_id / 10}
+
+    async def get_part_info(self, item_id, color_id):
+        await self._call("info", item_id, color_id)
+        return {"name": f"Brick {item_id}", "category_name": "Brick", "image_url": f"{item_id}.png"}
+
+def parts_list():
+    return [
+        {"item_id": "3001", "color_id": 1, "quantity": 4},
+        {"item_id": "3003", "color_id": 5, "quantity": 2},
+        {"item_id": "3001", "color_id": 1, "quantity": 3},
+        {"item_id": "3001", "color_id": 2},
+    ]
+
+@pytest.mark.asyncio
+async def test_summary_in_input_order_with_deduplication():
+    """Test que les pièces sont résumées dans l'ordre reçu et que les doublons ne sont demandés qu'une fois"""
+    client = FakeBrickLinkClient()
+    summary = await PartsSummaryEngine(client).summarize(parts_list())
+
+    assert [(p["item_id"], p["color_id"]) for p in summary["parts"]] == [
+        ("3001", 1), ("3003", 5), ("3001", 1), ("3001", 2)
+    ]
+    assert summary["parts"][1] == {
+        "item_id": "3003", "color_id": 5, "quantity": 2,
+        "price": 4.5, "name": "Brick 3003", "category": "Brick", "image_url": "3003.png"
+    }
+    assert summary["lookups"] == 3
+    assert len(client.calls) == 6
+    assert summary["total_price"] == pytest.approx(4.1 * 4 + 4.5 * 2 + 4.1 * 3 + 4.2)
+    assert summary["currency"] == "USD"
+
+@pytest.mark.asyncio
+async def test_lookups_are_concurrent_and_bounded():
+    """Test que les paires sont demandées en parallèle, au plus `concurrency` à la fois"""
+    client = FakeBrickLinkClient(delay=0.05)
+    parts = [{"item_id": str(i), "color_id": 1} for i in range(12)]
+
+    start = time.monotonic()
+    summary = await PartsSummaryEngine(client, concurrency=3).summarize(parts)
+    elapsed = time.monotonic() - start
+
+    assert len(summary["parts"]) == 12
+    # Deux appels par paire, trois paires à la fois
+    assert client.max_in_flight == 6
+    assert elapsed < 12 * 2 * 0.05 / 2
+
+@pytest.mark.asyncio
+async def test_rate_limited_items_are_retried():
+    """Test qu'une paire limitée est redemandée après Retry-After au lieu d'être abandonnée"""
+    client = FakeBrickLinkClient()
+    client.rate_limited[("3003", 5, "price")] = 2
+    summary = await PartsSummaryEngine(client).summarize(parts_list())
+
+    assert summary["parts"][1]["price"] == 4.5
+    price_calls = [t for kind, item_id, _, t in client.calls if kind == "price" and item_id == "3003"]
+    assert len(price_calls) == 3
+    assert price_calls[1] - price_calls[0] >= 0.045
+    # Les informations de la pièce n'ont pas été redemandées
+    assert sum(1 for kind, item_id, _, _ in client.calls if kind == "info" and item_id == "3003") == 1
+
+@pytest.mark.asyncio
+async def test_rate_limit_pauses_all_lookups():
+    """Test qu'une réponse 429 suspend aussi les requêtes suivantes des autres pièces"""
+    client = FakeBrickLinkClient(delay=0.01)
+    client.rate_limited[("0", 1, "price")] = 1
+    parts = [{"item_id": str(i), "color_id": 1} for i in range(6)]
+    await PartsSummaryEngine(client, concurrency=1).summarize(parts)
+
+    limited_at = client.calls[0][3]
+    later = [t for _, item_id, _, t in client.calls if item_id != "0"]
+    assert min(later) - limited_at >= 0.05
+
+@pytest.mark.asyncio
+async def test_persistent_rate_limit_raises():
+    """Test qu'une limite de taux persistante finit par être signalée"""
+    client = FakeBrickLinkClient()
+    client.rate_limited[("3001", 2, "info")] = 10
+    with pytest.raises(BrickLinkRateLimitError):
+        await PartsSummaryEngine(client, max_retries=2).summarize(parts_list())
+
+@pytest.mark.asyncio
+async def test_api_error_propagates():
+    """Test que les autres erreurs de l'API ne sont pas masquées"""
+    client = FakeBrickLinkClient()
+    client.failing.add(("3003", 5))
+    with pytest.raises(BrickLinkAPIError):
+        await PartsSummaryEngine(client).summarize(parts_list())
+
+@pytest.mark.asyncio
+async def test_failure_cancels_remaining_lookups():
+    """Test qu'une erreur annule les demandes restantes au lieu de les laisser tourner"""
+    client = FakeBrickLinkClient(delay=0.05)
+    client.failing.add(("0", 1))
+    parts = [{"item_id": str(i), "color_id": 1} for i in range(20)]
+    with pytest.raises(BrickLinkAPIError):
+        await PartsSummaryEngine(client, concurrency=4).summarize(parts)
+
+    assert client.in_flight == 0
+    calls = len(client.calls)
+    await asyncio.sleep(0.2)
+    assert len(client.calls) == calls < 2 * len(parts)
+
+def test_parse_retry_after():
+    """Test de la lecture de l'en-tête Retry-After"""
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after(None) == 60
+    assert parse_retry_after("invalide", default=5) == 5
+    assert parse_retry_after(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import pytest
+from utils.cpu_budget import CpuBudget, available_cores, set_thread_count
+
+def test_cores_are_split_between_server_workers():
+    """Test de la répartition des cœurs entre les workers du serveur"""
+    budget = CpuBudget(total_cores=16, server_workers=4, stage_threads=8)
+    assert budget.cores == 4
+    assert budget.stage_threads == 4
+    assert budget.process_pool_workers == 4
+    assert budget.thread_pool_workers == 8
+
+def test_budget_never_drops_below_one_core():
+    budget = CpuBudget(total_cores=2, server_workers=8)
+    assert budget.cores == 1
+    assert budget.stage_threads == 1
+
+def test_available_cores():
+    assert 1 <= available_cores() <= (os.cpu_count() or 1)
+
+def test_set_thread_count():
+    """Test que torch et les bibliothèques BLAS reçoivent le même nombre de threads"""
+    torch = pytest.importorskip("torch")
+    previous = torch.get_num_threads()
+    try:
+        set_thread_count(1)
+        assert torch.get_num_threads() == 1
+        assert os.environ["OMP_NUM_THREADS"] == "1"
+    finally:
+        torch.set_num_threads(previous)
+
+@pytest.mark.asyncio
+async def test_reservations_never_exceed_budget():
+    """Test que les étapes simultanées ne réservent pas plus que la part du worker"""
+    budget = CpuBudget(total_cores=4, stage_threads=2)
+    in_use = 0
+    peak = 0
+
+    async def stage(cores):
+        nonlocal in_use, peak
+        async with budget.reserve(cores) as reserved:
+            in_use += reserved
+            peak = max(peak, in_use)
+            await asyncio.sleep(0.01)
+            in_use -= reserved
+
+    await asyncio.gather(*(stage(c) for c in (2, 2, 3, 1, None, 8)))
+    assert peak <= 4
+    assert budget.available == 4
+
+@pytest.mark.asyncio
+async def test_oversized_request_is_capped():
+    budget = CpuBudget(total_cores=2)
+    async with budget.reserve(16) as reserved:
+        assert reserved == 2
+        assert budget.available == 0
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from ..services.executor_pools import (
+    ExecutorPools, MonitoredExecutor, get_executor_pools, shutdown_executor_pools
+)
+from ..metrics import EXECUTOR_ACTIVE_TASKS, EXECUTOR_SATURATION
+
+def _gauge(gauge, pool):
+    return gauge.labels(pool=pool)._value.get()
+
+def test_saturation_is_published():
+    """Test que les tâches en cours et en attente sont publiées"""
+    release = threading.Event()
+    executor = MonitoredExecutor("test", ThreadPoolExecutor(max_workers=2), 2)
+    try:
+        futures = [executor.submit(release.wait) for _ in range(3)]
+        assert executor.active_tasks == 3
+        assert _gauge(EXECUTOR_ACTIVE_TASKS, "test") == 3
+        assert _gauge(EXECUTOR_SATURATION, "test") == 1.5
+
+        release.set()
+        for future in futures:
+            future.result(timeout=2)
+        assert executor.active_tasks == 0
+        assert _gauge(EXECUTOR_SATURATION, "test") == 0
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_usable_from_event_loop():
+    """Test que le pool s'utilise avec run_in_executor"""
+    pools = ExecutorPools(thread_workers=2, process_workers=1)
+    try:
+        loop = asyncio.get_running_loop()
+        assert await loop.run_in_executor(pools.thread_pool, sum, [1, 2, 3]) == 6
+        assert pools.get_stats()["thread"]["workers"] == 2
+    finally:
+        pools.shutdown()
+
+def test_pools_are_shared():
+    """Test qu'un seul jeu de pools existe par processus"""
+    try:
+        assert get_executor_pools() is get_executor_pools()
+        first = get_executor_pools()
+        shutdown_executor_pools()
+        assert get_executor_pools() is not first
+    finally:
+        shutdown_executor_pools()
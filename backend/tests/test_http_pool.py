@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from ..services.bricklink_client import BrickLinkClient
+from ..services.http_pool import HttpSessionPool
+
+@pytest.fixture
+async def pool():
+    pool = HttpSessionPool(limit=20, limit_per_host=4, dns_cache_seconds=60)
+    yield pool
+    await pool.close()
+
+@pytest.fixture
+async def api():
+    """API BrickLink simulée : compte les requêtes et les connexions"""
+    stats = {"requests": 0, "connections": set(), "headers": []}
+
+    async def respond(request, data):
+        stats["requests"] += 1
+        stats["connections"].add(id(request.transport))
+        stats["headers"].append(request.headers.get("Authorization"))
+        await asyncio.sleep(0.05)
+        return web.json_response({"data": data})
+
+    async def items(request):
+        return await respond(request, [{"no": request.query["query"], "limit": request.query["limit"]}])
+
+    async def item(request):
+        return await respond(request, {"no": request.match_info["item_id"]})
+
+    async def price(request):
+        return await respond(request, {"color_id": request.query["color_id"]})
+
+    async def color(request):
+        return await respond(request, {"color_id": request.match_info["color_id"]})
+
+    app = web.Application()
+    app.router.add_get("/items", items)
+    app.router.add_get("/items/{item_id}", item)
+    app.router.add_get("/items/{item_id}/price", price)
+    app.router.add_get("/colors/{color_id}", color)
+    server = TestServer(app)
+    await server.start_server()
+    yield str(server.make_url("")).rstrip("/"), stats
+    await server.close()
+
+def make_client(pool, api_url):
+    return BrickLinkClient(pool=pool, api_url=api_url, api_key="test")
+
+@pytest.mark.asyncio
+async def test_session_is_shared_and_configured(pool):
+    """Test que le pool ne crée qu'une session, avec les limites demandées"""
+    session = pool.session
+    assert pool.session is session
+    assert session.connector.limit == 20
+    assert session.connector.limit_per_host == 4
+    assert session.connector.use_dns_cache
+
+    await pool.close()
+    assert session.closed
+    assert pool.session is not session
+
+@pytest.mark.asyncio
+async def test_former_blocking_methods_are_async(pool, api):
+    """Test que search_items, get_item_price, get_item_details et get_color_info passent par le pool"""
+    api_url, stats = api
+    client = make_client(pool, api_url)
+
+    assert await client.search_items("3001", limit=5) == [{"no": "3001", "limit": "5"}]
+    assert await client.get_item_price("3001", 11) == {"color_id": "11"}
+    assert await client.get_item_details("3001") == {"no": "3001"}
+    assert await client.get_color_info(11) == {"color_id": "11"}
+    assert all(header.startswith("Bearer") for header in stats["headers"])
+
+@pytest.mark.asyncio
+async def test_calls_do_not_block_event_loop(pool, api):
+    """Test que les appels simultanés se recouvrent au lieu de s'exécuter l'un après l'autre"""
+    api_url, _ = api
+    client = make_client(pool, api_url)
+
+    start = asyncio.get_running_loop().time()
+    results = await asyncio.gather(*(client.get_item_details(str(i)) for i in range(4)))
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert [result["no"] for result in results] == ["0", "1", "2", "3"]
+    assert elapsed < 4 * 0.05
+
+@pytest.mark.asyncio
+async def test_connections_are_reused_across_clients(pool, api):
+    """Test que les clients successifs réutilisent les connexions du pool"""
+    api_url, stats = api
+    for _ in range(3):
+        async with make_client(pool, api_url) as client:
+            await asyncio.gather(*(client.get_item_details(str(i)) for i in range(8)))
+
+    assert not pool.session.closed
+    assert stats["requests"] == 24
+    assert len(stats["connections"]) <= pool.limit_per_host
+
+@pytest.mark.asyncio
+async def test_errors_are_absorbed_like_before(pool, api):
+    """Test que les méthodes de recherche retournent toujours un résultat vide en cas d'erreur"""
+    api_url, _ = api
+    client = make_client(pool, api_url + "/inconnu")
+    assert await client.search_items("3001") == []
+    assert await client.get_item_details("3001") == {}
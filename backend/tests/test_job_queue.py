@@ -0,0 +1,147 @@
+import asyncio
+import pytest
+from utils.job_queue import JobQueue, JobStatus, LocalJobBackend, QueueFullError, report_progress
+
+def square(value):
+    return value * value
+
+@pytest.fixture
+async def queue():
+    queue = JobQueue(max_workers=2, max_pending=4)
+    yield queue
+    await queue.stop()
+
+@pytest.mark.asyncio
+async def test_submit_runs_in_background(queue):
+    """Test que la soumission retourne immédiatement un ID de tâche"""
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    @queue.task("convert")
+    async def convert(name):
+        started.set()
+        await release.wait()
+        return {"name": name}
+
+    await queue.start()
+    job = await queue.submit("convert", "cube.obj", owner="user1")
+    assert job.status == JobStatus.PENDING
+    assert job.owner == "user1"
+
+    await started.wait()
+    assert (await queue.get(job.id)).status == JobStatus.RUNNING
+
+    release.set()
+    done = await queue.wait(job.id, timeout=2)
+    assert done.status == JobStatus.COMPLETED
+    assert done.result == {"name": "cube.obj"}
+    assert done.progress == 1.0
+
+@pytest.mark.asyncio
+async def test_progress_is_reported(queue):
+    """Test que l'avancement publié par la tâche est visible"""
+    reported = asyncio.Event()
+    release = asyncio.Event()
+
+    @queue.task("convert")
+    async def convert():
+        await report_progress(0.5, "Optimisation")
+        reported.set()
+        await release.wait()
+
+    await queue.start()
+    job = await queue.submit("convert")
+    await reported.wait()
+
+    status = (await queue.get(job.id)).public_dict()
+    assert status["progress"] == 0.5
+    assert status["message"] == "Optimisation"
+    release.set()
+    await queue.wait(job.id, timeout=2)
+
+@pytest.mark.asyncio
+async def test_report_progress_outside_job():
+    """Test que l'avancement est ignoré hors d'une tâche"""
+    await report_progress(0.5, "rien")
+
+@pytest.mark.asyncio
+async def test_failure_is_recorded(queue):
+    """Test qu'une erreur de la tâche est conservée dans son état"""
+    @queue.task("convert")
+    async def convert():
+        raise RuntimeError("maillage invalide")
+
+    await queue.start()
+    job = await queue.wait((await queue.submit("convert")).id, timeout=2)
+    assert job.status == JobStatus.FAILED
+    assert job.error == "maillage invalide"
+
+@pytest.mark.asyncio
+async def test_backpressure(queue):
+    """Test que la file refuse les tâches au-delà de sa profondeur maximale"""
+    @queue.task("convert")
+    async def convert():
+        return None
+
+    # Workers non démarrés : les tâches restent en attente
+    for _ in range(4):
+        await queue.submit("convert")
+    with pytest.raises(QueueFullError):
+        await queue.submit("convert")
+
+    await queue.start()
+    for _ in range(50):
+        if await queue.backend.pending_count() == 0:
+            break
+        await asyncio.sleep(0.01)
+    await queue.submit("convert")
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(queue):
+    """Test que le nombre de tâches simultanées ne dépasse pas max_workers"""
+    running = 0
+    peak = 0
+
+    @queue.task("convert")
+    async def convert():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    await queue.start()
+    jobs = [await queue.submit("convert") for _ in range(4)]
+    for job in jobs:
+        await queue.wait(job.id, timeout=2)
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_unknown_task(queue):
+    with pytest.raises(KeyError):
+        await queue.submit("inconnue")
+
+@pytest.mark.asyncio
+async def test_run_in_process():
+    """Test de l'exécution d'une étape dans le pool de processus"""
+    queue = JobQueue(process_workers=1)
+    try:
+        assert await queue.run_in_process(square, 7) == 49
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire():
+    backend = LocalJobBackend(result_ttl=0)
+    queue = JobQueue(backend=backend)
+
+    @queue.task("convert")
+    async def convert():
+        return 1
+
+    await queue.start()
+    first = await queue.wait((await queue.submit("convert")).id, timeout=2)
+    await asyncio.sleep(0.01)
+    await queue.wait((await queue.submit("convert")).id, timeout=2)
+    assert await queue.get(first.id) is None
+    await queue.stop()
@@ -0,0 +1,170 @@
+import json
+import cv2
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from legoizer import Legoizer
+
+def reference_grid(legoizer, image):
+    """Parcours bloc par bloc de référence (implémentation d'origine)."""
+    height, width = image.shape[:2]
+    size = legoizer.brick_size
+    result = np.zeros((height, width, 3), dtype=np.uint8)
+    bricks = []
+    for y in range(0, height, size):
+        for x in range(0, width, size):
+            block = image[y:y+size, x:x+size]
+            avg_color = np.mean(block, axis=(0, 1))
+            closest_color = legoizer._find_closest_color(tuple(map(int, avg_color)))
+            result[y:y+size, x:x+size] = closest_color
+            bricks.append({"position": {"x": x, "y": y}, "size": size, "color": list(closest_color)})
+    return result, bricks
+
+@pytest.mark.parametrize("shape,brick_size", [((64, 48), 8), ((37, 53), 8), ((20, 30), 7), ((5, 3), 8)])
+def test_brick_grid_matches_reference(shape, brick_size):
+    """Test que la mosaïque vectorisée est identique au parcours bloc par bloc"""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, shape + (3,), dtype=np.uint8)
+    legoizer = Legoizer(brick_size=brick_size)
+
+    result, bricks = legoizer._create_brick_grid(image)
+    expected_result, expected_bricks = reference_grid(legoizer, image)
+
+    np.testing.assert_array_equal(result, expected_result)
+    assert bricks == expected_bricks
+
+def test_palette_ties_keep_first_color():
+    """Test qu'à distance égale la première couleur de la palette est retenue"""
+    legoizer = Legoizer(brick_size=1)
+    legoizer.colors = [(0, 0, 0), (2, 0, 0)]
+    _, bricks = legoizer._create_brick_grid(np.full((1, 1, 3), (1, 0, 0), dtype=np.uint8))
+    assert bricks[0]["color"] == [0, 0, 0]
+
+def test_process_image_downscale():
+    """Test que la réduction de l'image suit max_size"""
+    image = np.zeros((100, 60, 3), dtype=np.uint8)
+    _, encoded = cv2.imencode('.png', image)
+
+    _, instructions = Legoizer(max_size=50).process_image(encoded.tobytes())
+    assert json.loads(instructions)["image_size"] == {"width": 30, "height": 50}
+
+    _, instructions = Legoizer(max_size=None).process_image(encoded.tobytes())
+    assert json.loads(instructions)["image_size"] == {"width": 60, "height": 100}
+
+def test_process_image_invalid():
+    """Test qu'une image illisible est refusée"""
+    with pytest.raises(ValueError):
+        Legoizer().process_image(b"pas une image")
+
+def write_video(path, frames, fps=10):
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+def read_video(path):
+    capture = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+def test_changed_blocks_match_full_mosaic():
+    """Test que la réutilisation des blocs inchangés donne la mosaïque complète"""
+    rng = np.random.default_rng(1)
+    legoizer = Legoizer(brick_size=8)
+    first = rng.integers(0, 256, (37, 53, 3), dtype=np.uint8)
+    second = first.copy()
+    second[10:20, 30:40] = 255
+    counts = legoizer._block_counts(37, 53)
+
+    _, colors = legoizer._changed_block_colors(None, legoizer._pad(first), counts)
+    changed, new_colors = legoizer._changed_block_colors(legoizer._pad(first), legoizer._pad(second), counts)
+    colors[changed] = new_colors
+
+    assert 0 < changed.sum() < changed.size
+    np.testing.assert_array_equal(colors, legoizer._mosaic(second)[1])
+
+def test_process_video_file(tmp_path):
+    """Test la conversion d'une vidéo image par image"""
+    frames = [np.full((48, 64, 3), (0, 0, 200), dtype=np.uint8) for _ in range(6)]
+    for frame in frames[3:]:
+        frame[:, 32:] = (200, 0, 0)
+    write_video(tmp_path / "input.mp4", frames)
+
+    instructions = Legoizer(brick_size=8).process_video_file(
+        tmp_path / "input.mp4", tmp_path / "output.mp4", max_workers=2
+    )
+
+    assert instructions["frames"] == 6
+    assert instructions["image_size"] == {"width": 64, "height": 48}
+    assert instructions["total_bricks"] == 48
+    assert instructions["reused_bricks"] > 0
+    output = read_video(tmp_path / "output.mp4")
+    assert len(output) == 6
+    # Rouge puis moitié bleue (BGR), à la compression près
+    assert output[0][24, 48, 2] > 150
+    assert output[5][24, 48, 0] > 150
+
+def test_process_video_bytes(tmp_path):
+    """Test que process_video retourne la vidéo produite et ses instructions"""
+    write_video(tmp_path / "input.mp4", [np.zeros((16, 16, 3), dtype=np.uint8)] * 2)
+
+    video, instructions = Legoizer().process_video((tmp_path / "input.mp4").read_bytes())
+
+    assert video
+    assert json.loads(instructions)["frames"] == 2
+
+def test_process_video_invalid():
+    """Test qu'une vidéo illisible est refusée"""
+    with pytest.raises(ValueError):
+        Legoizer().process_video(b"pas une video")
+
+@pytest.mark.parametrize("executor", ["threads", None])
+def test_process_image_tiled_matches_process_image(tmp_path, executor):
+    """Test que le mode par bandes produit la même mosaïque et les mêmes instructions"""
+    rng = np.random.default_rng(2)
+    image = cv2.GaussianBlur(rng.integers(0, 256, (83, 61, 3), dtype=np.uint8), (9, 9), 0)
+    cv2.imwrite(str(tmp_path / "input.png"), image)
+    legoizer = Legoizer(brick_size=8, max_size=None)
+
+    pool = ThreadPoolExecutor(max_workers=2) if executor else None
+    try:
+        summary = legoizer.process_image_tiled(
+            tmp_path / "input.png", tmp_path / "output.png", tmp_path / "instructions.json",
+            tile_height=20, max_workers=2, executor=pool
+        )
+    finally:
+        if pool:
+            pool.shutdown()
+
+    expected_png, expected_instructions = legoizer.process_image((tmp_path / "input.png").read_bytes())
+    assert summary["tiles"] == 6
+    assert (tmp_path / "instructions.json").read_text() == expected_instructions
+    np.testing.assert_array_equal(
+        cv2.imread(str(tmp_path / "output.png")),
+        cv2.imdecode(np.frombuffer(expected_png, np.uint8), cv2.IMREAD_COLOR)
+    )
+
+def test_process_image_merge_plates():
+    """Test que les cellules de même couleur sont regroupées en plaques"""
+    image = np.zeros((32, 48, 3), dtype=np.uint8)
+    image[:, 24:] = (0, 0, 255)
+    _, encoded = cv2.imencode('.png', image)
+
+    plain_image, plain = Legoizer(brick_size=4).process_image(encoded.tobytes())
+    merged_image, merged = Legoizer(brick_size=4, merge_plates=True).process_image(encoded.tobytes())
+    plain, merged = json.loads(plain), json.loads(merged)
+
+    assert plain_image == merged_image
+    assert merged["image_size"] == plain["image_size"]
+    assert merged["total_bricks"] == len(merged["plates"]) < plain["total_bricks"]
+    assert sum(p["size"]["width"] * p["size"]["length"] for p in merged["plates"]) == plain["total_bricks"]
+    assert sum(part["quantity"] for part in merged["parts"]) == merged["total_bricks"]
+    assert {tuple(part["color"]) for part in merged["parts"]} == {(0, 0, 0), (0, 0, 255)}
+    assert all(part["part"].startswith("plate ") for part in merged["parts"])
@@ -0,0 +1,74 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from .. import main
+from ..services import executor_pools
+from ..utils.job_queue import Job, JobStatus
+from ..utils.warmup import Warmup
+
+def test_main_imports_services_through_package():
+    """Test que main (uvicorn backend.main:app) importe les services via le paquet backend"""
+    assert main.get_executor_pools is executor_pools.get_executor_pools
+    assert main.shutdown_executor_pools is executor_pools.shutdown_executor_pools
+
+def test_main_has_single_import_root():
+    """Test que l'import de backend.main ne charge aucun module de backend/ sous un nom de premier niveau"""
+    code = (
+        "import sys, backend.main; "
+        "print(sorted(name for name in ('config', 'main', 'utils', 'services', 'routers', 'mobile_config') "
+        "if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[2],
+        capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+def test_main_routes():
+    """Test que l'application mobile expose ses routes de conversion et de readiness"""
+    paths = {getattr(route, "path", None) for route in main.app.routes}
+    assert {"/health", "/ready", "/api/blocky/convert", "/api/blocky/jobs/{job_id}", "/api/blocky/jobs/{job_id}/result"} <= paths
+
+@pytest.mark.asyncio
+async def test_blocky_warmup_component_builds(tmp_path, monkeypatch):
+    """Test que le composant "blocky" du warm-up construit le vrai BlockyService"""
+    from ..services.blocky_service import BlockyService
+    monkeypatch.setenv("STORAGE_PATH", str(tmp_path))
+    warmup = Warmup()
+    warmup.register("blocky", main.load_blocky_service)
+    try:
+        blocky_service = await asyncio.wait_for(warmup.get("blocky"), timeout=120)
+    finally:
+        await warmup.stop()
+
+    assert warmup.report()["components"]["blocky"]["status"] == "ready"
+    assert isinstance(blocky_service, BlockyService)
+    assert blocky_service.resource_manager.base_dir == tmp_path
+
+@pytest.mark.asyncio
+async def test_job_status_hides_server_path_and_result_is_downloadable(tmp_path):
+    """Test que le suivi d'une conversion n'expose pas le chemin du fichier, servi par result_url"""
+    result_file = tmp_path / "model1.stl"
+    result_file.write_bytes(b"solid lego")
+    job = Job(
+        id="job-mobile", task="blocky.convert", status=JobStatus.COMPLETED,
+        result={"file": str(result_file), "filename": "lego_cube.obj"}
+    )
+    await main.job_queue.backend.save(job)
+
+    status = await main.get_job(job.id)
+    assert "result" not in status
+    assert str(tmp_path) not in str(status)
+    assert status["result_url"] == "/api/blocky/jobs/job-mobile/result"
+
+    response = await main.get_job_result(job.id)
+    assert response.path == str(result_file)
+    assert "lego_cube.obj" in response.headers["content-disposition"]
+
+    pending = Job(id="job-pending", task="blocky.convert")
+    await main.job_queue.backend.save(pending)
+    assert (await main.get_job_result(pending.id)).status_code == 409
+    assert (await main.get_job_result("inconnu")).status_code == 404
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from utils.plate_tiling import color_rectangles, part_counts, tile_plates
+
+def coverage(plates, shape):
+    """Grille des étiquettes reconstruite à partir des plaques (-1 si non couverte)."""
+    grid = np.full(shape, -1)
+    count = np.zeros(shape, dtype=int)
+    for x, y, width, length, label in plates.tolist():
+        grid[y:y + length, x:x + width] = label
+        count[y:y + length, x:x + width] += 1
+    return grid, count
+
+def test_rectangles_merge_runs():
+    """Test que les plages identiques de lignes consécutives forment un rectangle"""
+    labels = np.array([
+        [0, 0, 1],
+        [0, 0, 1],
+        [2, 2, 1],
+    ])
+    rectangles = color_rectangles(labels)
+    found = sorted(tuple(r) for r in rectangles.tolist())
+    assert found == [(0, 0, 2, 2, 0), (0, 2, 2, 1, 2), (2, 0, 1, 3, 1)]
+
+def test_uniform_grid_uses_large_plates():
+    """Test qu'une zone unie est couverte par les plus grandes plaques"""
+    plates = tile_plates(np.zeros((8, 8), dtype=int))
+    assert len(plates) == 2
+    assert {(int(p['width']), int(p['length'])) for p in plates} <= {(4, 8), (8, 4)}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_plates_cover_each_cell_once(seed):
+    """Test que chaque cellule est couverte exactement une fois, par une plaque de sa couleur"""
+    rng = np.random.default_rng(seed)
+    # Zones de couleur : bruit grossier agrandi, avec quelques cellules isolées
+    labels = np.kron(rng.integers(0, 3, (6, 7)), np.ones((4, 3), dtype=int))
+    labels[rng.integers(0, 24, 10), rng.integers(0, 21, 10)] = 3
+
+    plates = tile_plates(labels)
+    grid, count = coverage(plates, labels.shape)
+
+    np.testing.assert_array_equal(count, 1)
+    np.testing.assert_array_equal(grid, labels)
+    assert len(plates) < labels.size
+
+def test_part_counts():
+    """Test le regroupement des plaques par taille (sans orientation) et par couleur"""
+    plates = tile_plates(np.array([[0, 0, 1, 1], [0, 0, 1, 1]]))
+    assert part_counts(plates) == [{"width": 2, "length": 2, "label": 0, "quantity": 1},
+                                   {"width": 2, "length": 2, "label": 1, "quantity": 1}]
+
+    plates = tile_plates(np.array([[0], [0], [5]]), sizes=[(1, 1), (1, 2)])
+    assert part_counts(plates) == [{"width": 1, "length": 1, "label": 5, "quantity": 1},
+                                   {"width": 1, "length": 2, "label": 0, "quantity": 1}]
+
+def test_requires_unit_plate():
+    """Test qu'un catalogue sans plaque 1x1 est refusé"""
+    with pytest.raises(ValueError):
+        tile_plates(np.zeros((2, 2), dtype=int), sizes=[(2, 2)])
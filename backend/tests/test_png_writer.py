@@ -0,0 +1,35 @@
+import io
+import cv2
+import numpy as np
+import pytest
+from utils.png_writer import PngStreamWriter
+
+def test_png_written_by_bands():
+    """Test qu'une image écrite par bandes se relit à l'identique"""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (50, 37, 3), dtype=np.uint8)
+    output = io.BytesIO()
+
+    writer = PngStreamWriter(output, 37, 50)
+    for y in range(0, 50, 16):
+        writer.write_rows(image[y:y + 16])
+    writer.close()
+
+    decoded = cv2.imdecode(np.frombuffer(output.getvalue(), np.uint8), cv2.IMREAD_COLOR)
+    np.testing.assert_array_equal(decoded[..., ::-1], image)
+
+def test_png_rejects_wrong_rows():
+    """Test que des lignes de mauvaise largeur ou en trop sont refusées"""
+    writer = PngStreamWriter(io.BytesIO(), 4, 2)
+    with pytest.raises(ValueError):
+        writer.write_rows(np.zeros((1, 5, 3), dtype=np.uint8))
+    writer.write_rows(np.zeros((2, 4, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        writer.write_rows(np.zeros((1, 4, 3), dtype=np.uint8))
+
+def test_png_close_requires_all_rows():
+    """Test qu'une image incomplète ne peut pas être terminée"""
+    writer = PngStreamWriter(io.BytesIO(), 4, 2)
+    writer.write_rows(np.zeros((1, 4, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        writer.close()
@@ -0,0 +1,104 @@
+import hashlib
+import io
+import pytest
+from fastapi import UploadFile
+from utils.upload_stream import (
+    save_upload, spool_upload, discard_upload, hash_file, hash_file_async, UploadTooLargeError
+)
+
+@pytest.fixture
+def payload():
+    return bytes(range(256)) * 20000  # ~5 Mo, plusieurs blocs
+
+@pytest.mark.asyncio
+async def test_save_upload_hashes_while_writing(tmp_path, payload):
+    """Test que le fichier est écrit et haché en une seule lecture"""
+    upload = UploadFile(file=io.BytesIO(payload), filename="model.glb")
+    destination = tmp_path / "model.glb"
+
+    stored = await save_upload(upload, destination, chunk_size=64 * 1024)
+
+    assert destination.read_bytes() == payload
+    assert stored.size == len(payload)
+    assert stored.sha256 == hashlib.sha256(payload).hexdigest()
+
+def test_hash_file_matches_hashlib(tmp_path, payload):
+    """Test du hachage de repli par projection mémoire"""
+    path = tmp_path / "model.obj"
+    path.write_bytes(payload)
+
+    assert hash_file(path, buffer_size=1024 * 1024) == hashlib.sha256(payload).hexdigest()
+
+def test_hash_empty_file(tmp_path):
+    """Test qu'un fichier vide a l'empreinte de la chaîne vide"""
+    path = tmp_path / "empty.obj"
+    path.write_bytes(b"")
+
+    assert hash_file(path) == hashlib.sha256(b"").hexdigest()
+
+@pytest.mark.asyncio
+async def test_hash_file_async(tmp_path, payload):
+    """Test du hachage dans un thread"""
+    path = tmp_path / "model.stl"
+    path.write_bytes(payload)
+
+    assert await hash_file_async(path) == hashlib.sha256(payload).hexdigest()
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_oversized_stream(tmp_path, payload):
+    """Test que l'écriture s'arrête dès que la limite est dépassée"""
+    upload = UploadFile(file=io.BytesIO(payload), filename="model.glb")
+    destination = tmp_path / "model.glb"
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(upload, destination, chunk_size=64 * 1024, max_size=1024 * 1024)
+
+    assert not destination.exists()
+    # Le flux n'a pas été lu au-delà de la limite
+    assert upload.file.tell() <= 1024 * 1024 + 64 * 1024
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_declared_size(tmp_path, payload):
+    """Test du refus avant lecture quand la taille est annoncée"""
+    upload = UploadFile(file=io.BytesIO(payload), filename="model.glb", size=len(payload))
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload(upload, tmp_path / "model.glb", max_size=1024)
+
+    assert upload.file.tell() == 0
+
+class FakeResourceManager:
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+
+    async def get_temp_dir(self, prefix=""):
+        temp_dir = self.base_dir / prefix
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        return temp_dir
+
+@pytest.mark.asyncio
+async def test_spool_upload_uses_resource_manager(tmp_path, payload):
+    """Test que les envois simultanés d'un même nom restent séparés"""
+    manager = FakeResourceManager(tmp_path)
+    first = await spool_upload(UploadFile(file=io.BytesIO(payload), filename="../model.glb"), manager)
+    second = await spool_upload(UploadFile(file=io.BytesIO(b"autre"), filename="../model.glb"), manager)
+
+    assert first.path.parent.parent == tmp_path
+    assert first.path.name == "model.glb"
+    assert first.path != second.path
+    assert first.path.read_bytes() == payload
+
+    await discard_upload(first)
+    assert not first.path.parent.exists()
+    assert second.path.exists()
+
+@pytest.mark.asyncio
+async def test_spool_upload_cleans_up_on_overflow(tmp_path, payload):
+    """Test que le répertoire temporaire est supprimé en cas de refus"""
+    manager = FakeResourceManager(tmp_path)
+
+    with pytest.raises(UploadTooLargeError):
+        await spool_upload(UploadFile(file=io.BytesIO(payload), filename="model.glb"), manager,
+                           max_size=1024)
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+import torch
+from services.voxel_mesh_builder import VoxelMeshBuilder
+
+@pytest.fixture
+def builder():
+    return VoxelMeshBuilder()
+
+def test_voxelize_marks_points(builder):
+    """Test le remplissage de la grille en une seule opération"""
+    points = torch.tensor([[[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0], [1.0, 1.0, 1.0]]])
+    grid = builder.voxelize(points, 4)
+    
+    assert grid.shape == (4, 4, 4)
+    assert grid[0, 0, 0]
+    assert grid[3, 3, 3]
+    assert int(grid.sum()) == 2
+
+def test_single_voxel_is_a_cube(builder):
+    """Test qu'un voxel isolé produit un cube complet"""
+    grid = np.zeros((3, 3, 3), dtype=bool)
+    grid[1, 1, 1] = True
+    
+    mesh = builder.build(grid, brick_size=2.0)
+    
+    assert len(mesh.faces) == 12
+    assert mesh.is_watertight
+    assert np.isclose(mesh.volume, 8.0)
+    assert np.allclose(mesh.bounds, [[2, 2, 2], [4, 4, 4]])
+
+def test_shared_faces_are_removed(builder):
+    """Test que les faces entre voxels voisins ne sont pas générées"""
+    grid = np.zeros((2, 2, 2), dtype=bool)
+    grid[:, :, :] = True
+    
+    mesh = builder.build(grid)
+    
+    # 6 côtés de 2x2 faces, 2 triangles chacune
+    assert len(mesh.faces) == 6 * 4 * 2
+    assert mesh.is_watertight
+    assert np.isclose(mesh.volume, 8.0)
+
+def test_empty_grid_raises(builder):
+    """Test qu'une grille vide est refusée"""
+    with pytest.raises(ValueError):
+        builder.build(np.zeros((2, 2, 2), dtype=bool))
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import pytest
+from utils.warmup import Warmup, WarmupError
+
+@pytest.fixture
+async def warmup():
+    warmup = Warmup()
+    yield warmup
+    await warmup.stop()
+
+@pytest.mark.asyncio
+async def test_get_waits_for_component(warmup):
+    """Test qu'une requête attend le chargement du composant dont elle dépend"""
+    release = threading.Event()
+
+    @warmup.component("model")
+    def load_model():
+        release.wait(2)
+        return "model"
+
+    warmup.start()
+    pending = asyncio.create_task(warmup.get("model"))
+    await asyncio.sleep(0.05)
+    assert not pending.done()
+    assert warmup.report()["components"]["model"]["status"] == "loading"
+    assert not warmup.ready
+
+    release.set()
+    assert await pending == "model"
+    assert warmup.ready
+
+@pytest.mark.asyncio
+async def test_get_starts_loading(warmup):
+    """Test que get() lance le chargement s'il n'a pas été démarré"""
+    warmup.register("service", lambda: 42)
+    assert await warmup.get("service") == 42
+
+@pytest.mark.asyncio
+async def test_failed_component(warmup):
+    """Test qu'un échec de chargement est signalé sans bloquer les autres composants"""
+    def fail():
+        raise ImportError("torch absent")
+
+    warmup.register("torch", fail)
+    warmup.register("catalog", lambda: {"3001": "Brick 2 x 4"})
+
+    with pytest.raises(WarmupError, match="torch absent"):
+        await warmup.get("torch")
+    assert await warmup.get("catalog") == {"3001": "Brick 2 x 4"}
+
+    report = warmup.report()
+    assert not report["ready"]
+    assert report["components"]["torch"]["status"] == "failed"
+    assert report["components"]["catalog"]["status"] == "ready"
+    assert report["components"]["catalog"]["seconds"] is not None
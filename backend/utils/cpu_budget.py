@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import os
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Variables lues par les bibliothèques BLAS/OpenMP à leur chargement
+BLAS_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+# Au-delà, les opérations torch de ce service ne gagnent presque plus rien
+DEFAULT_MAX_STAGE_THREADS = 4
+
+
+def available_cores() -> int:
+    """
+    Nombre de cœurs réellement utilisables par le processus.
+
+    Tient compte de l'affinité CPU et du quota cgroup v2 d'un conteneur, que
+    os.cpu_count() ignore.
+    """
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cores = min(cores, max(1, int(int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+
+def set_thread_count(threads: int):
+    """
+    Fixe le nombre de threads de calcul de torch et des bibliothèques BLAS.
+
+    torch n'est pas importé ici : s'il ne l'est pas encore, il lira
+    OMP_NUM_THREADS à son import.
+    """
+    for var in BLAS_THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Non modifiable une fois un calcul parallèle lancé
+        pass
+
+
+def init_worker_process(threads: int = 1):
+    """Initialiseur des processus de calcul : chacun occupe `threads` cœurs."""
+    set_thread_count(threads)
+
+
+class CpuBudget:
+    """
+    Répartition des cœurs d'une machine entre les workers du serveur.
+
+    Un seul nombre de cœurs configuré détermine les threads torch/BLAS, la
+    taille des pools d'exécution et le nombre de cœurs réservables par les
+    étapes de calcul d'un worker. Une étape réserve ses cœurs avec reserve()
+    avant de s'exécuter ; la somme des réservations ne dépasse jamais la part
+    du worker, ce qui évite de multiplier threads torch et requêtes
+    simultanées au-delà des cœurs disponibles.
+    """
+
+    def __init__(self, total_cores: Optional[int] = None, server_workers: int = 1,
+                 stage_threads: Optional[int] = None):
+        """
+        Args:
+            total_cores: Cœurs attribués au service (par défaut ceux disponibles)
+            server_workers: Nombre de workers du serveur se partageant ces cœurs
+            stage_threads: Threads torch d'une étape de calcul
+        """
+        self.total_cores = total_cores or available_cores()
+        self.server_workers = max(1, server_workers)
+        self.cores = max(1, self.total_cores // self.server_workers)
+        self.stage_threads = min(stage_threads or DEFAULT_MAX_STAGE_THREADS, self.cores)
+
+        self._available = self.cores
+        self._condition = asyncio.Condition()
+
+    @property
+    def process_pool_workers(self) -> int:
+        """Un processus monothread par cœur du worker."""
+        return self.cores
+
+    @property
+    def thread_pool_workers(self) -> int:
+        """Threads pour les E/S et les étapes de calcul, ces dernières bornées par reserve()."""
+        return min(32, self.cores + 4)
+
+    @property
+    def available(self) -> int:
+        return self._available
+
+    def apply(self):
+        """Applique le nombre de threads d'une étape à torch et aux bibliothèques BLAS."""
+        set_thread_count(self.stage_threads)
+        logger.info(
+            f"Budget CPU: {self.cores} cœurs sur {self.total_cores} pour ce worker, "
+            f"{self.stage_threads} threads par étape"
+        )
+
+    @asynccontextmanager
+    async def reserve(self, cores: Optional[int] = None):
+        """
+        Réserve des cœurs pour une étape de calcul.
+
+        Attend que les cœurs demandés soient libres. Une demande supérieure à
+        la part du worker est ramenée à cette part.
+
+        Args:
+            cores: Nombre de cœurs (par défaut stage_threads)
+
+        Yields:
+            int: Nombre de cœurs réservés
+        """
+        cores = min(max(1, cores or self.stage_threads), self.cores)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._available >= cores)
+            self._available -= cores
+        try:
+            yield cores
+        finally:
+            async with self._condition:
+                self._available += cores
+                self._condition.notify_all()
+
+    def get_stats(self) -> Dict:
+        return {
+            "total_cores": self.total_cores,
+            "server_workers": self.server_workers,
+            "worker_cores": self.cores,
+            "stage_threads": self.stage_threads,
+            "available_cores": self._available
+        }
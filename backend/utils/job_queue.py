@@ -0,0 +1,379 @@
+import asyncio
+import contextvars
+import json
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Durée de conservation d'une tâche terminée
+JOB_RESULT_TTL_SECONDS = 24 * 3600
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class QueueFullError(RuntimeError):
+    """Exception levée lorsque la file d'attente a atteint sa profondeur maximale"""
+    def __init__(self, max_pending: int):
+        super().__init__(f"File d'attente pleine ({max_pending} tâches en attente)")
+        self.max_pending = max_pending
+
+
+@dataclass
+class Job:
+    """Tâche soumise à la file et son état d'avancement."""
+    id: str
+    task: str
+    args: List = field(default_factory=list)
+    kwargs: Dict = field(default_factory=dict)
+    owner: Optional[str] = None
+    status: JobStatus = JobStatus.PENDING
+    progress: float = 0.0
+    message: Optional[str] = None
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["status"] = self.status.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Job':
+        data = dict(data)
+        data["status"] = JobStatus(data["status"])
+        return cls(**data)
+
+    def public_dict(self) -> Dict:
+        """État exposé par les endpoints de suivi, sans les arguments de la tâche."""
+        return {
+            "job_id": self.id,
+            "task": self.task,
+            "status": self.status.value,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class LocalJobBackend:
+    """Stockage des tâches en mémoire, limité au processus courant."""
+
+    def __init__(self, result_ttl: int = JOB_RESULT_TTL_SECONDS):
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Job] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def save(self, job: Job):
+        if job.finished:
+            self._purge_expired()
+        self._jobs[job.id] = job
+
+    async def load(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def push(self, job_id: str):
+        self._queue.put_nowait(job_id)
+
+    async def pop(self) -> str:
+        return await self._queue.get()
+
+    async def pending_count(self) -> int:
+        return self._queue.qsize()
+
+    async def close(self):
+        pass
+
+    def _purge_expired(self):
+        limit = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < limit
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class RedisJobBackend:
+    """
+    Stockage des tâches dans Redis.
+
+    L'état des tâches et la file sont partagés entre les workers uvicorn : une
+    tâche soumise par un processus peut être exécutée et suivie par un autre.
+    Les arguments et les résultats doivent donc être sérialisables en JSON.
+    """
+
+    def __init__(self, url: str, namespace: str = "brickify:jobs",
+                 result_ttl: int = JOB_RESULT_TTL_SECONDS):
+        import redis.asyncio as redis
+
+        self.result_ttl = result_ttl
+        self.namespace = namespace
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._queue_key = f"{namespace}:queue"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.namespace}:job:{job_id}"
+
+    async def save(self, job: Job):
+        await self._redis.set(self._job_key(job.id), json.dumps(job.to_dict()), ex=self.result_ttl)
+
+    async def load(self, job_id: str) -> Optional[Job]:
+        data = await self._redis.get(self._job_key(job_id))
+        return Job.from_dict(json.loads(data)) if data else None
+
+    async def push(self, job_id: str):
+        await self._redis.lpush(self._queue_key, job_id)
+
+    async def pop(self) -> str:
+        while True:
+            item = await self._redis.brpop(self._queue_key, timeout=1)
+            if item:
+                return item[1]
+
+    async def pending_count(self) -> int:
+        return await self._redis.llen(self._queue_key)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_job_backend(redis_url: Optional[str] = None, result_ttl: int = JOB_RESULT_TTL_SECONDS):
+    """
+    Crée le stockage des tâches.
+
+    Args:
+        redis_url: URL Redis ; sans URL, les tâches restent dans le processus
+        result_ttl: Durée de conservation d'une tâche en secondes
+
+    Returns:
+        Le stockage Redis si une URL est fournie, sinon le stockage local
+    """
+    if redis_url:
+        return RedisJobBackend(redis_url, result_ttl=result_ttl)
+    return LocalJobBackend(result_ttl=result_ttl)
+
+
+# Tâche en cours d'exécution dans le contexte courant
+_current_job: contextvars.ContextVar = contextvars.ContextVar("current_job", default=None)
+
+
+async def report_progress(progress: float, message: Optional[str] = None):
+    """
+    Met à jour l'avancement de la tâche en cours.
+
+    Sans effet lorsque l'appel n'a pas lieu dans une tâche de la file : les
+    services peuvent donc l'appeler sans savoir comment ils sont exécutés.
+
+    Args:
+        progress: Avancement entre 0 et 1
+        message: Étape en cours
+    """
+    current = _current_job.get()
+    if current is None:
+        return
+    queue, job = current
+    job.progress = min(max(float(progress), 0.0), 1.0)
+    job.message = message
+    await queue.backend.save(job)
+
+
+class JobQueue:
+    """
+    File de tâches exécutées en arrière-plan par un nombre borné de workers.
+
+    Les tâches sont des coroutines enregistrées sous un nom ; une soumission
+    ne transporte que ce nom et des arguments sérialisables, ce qui permet de
+    partager la file entre processus via Redis. Les étapes gourmandes en CPU
+    sont déportées dans un pool de processus avec run_in_process.
+    """
+
+    def __init__(self, backend=None, max_workers: int = 2, max_pending: int = 32,
+                 process_workers: int = 0, process_pool: Optional[Executor] = None,
+                 process_initializer: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            backend: Stockage des tâches (local par défaut)
+            max_workers: Nombre de tâches exécutées simultanément
+            max_pending: Profondeur maximale de la file avant refus
+            process_workers: Taille du pool de processus propre à la file (0 = pas de pool)
+            process_pool: Pool de processus partagé à utiliser ; il n'est pas
+                arrêté avec la file
+            process_initializer: Fonction exécutée au démarrage de chaque processus
+                du pool propre à la file
+        """
+        self.backend = backend or LocalJobBackend()
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.process_workers = process_workers
+        self.process_initializer = process_initializer
+
+        self._tasks: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._workers: List[asyncio.Task] = []
+        self.process_pool = process_pool
+        self._own_process_pool: Optional[ProcessPoolExecutor] = None
+        self._running = 0
+
+    def register(self, name: str, func: Callable[..., Awaitable[Any]]):
+        """Enregistre une coroutine exécutable sous le nom donné."""
+        self._tasks[name] = func
+
+    def task(self, name: str):
+        """Décorateur équivalent à register."""
+        def decorator(func):
+            self.register(name, func)
+            return func
+        return decorator
+
+    async def submit(self, task: str, *args, owner: Optional[str] = None, **kwargs) -> Job:
+        """
+        Soumet une tâche.
+
+        Args:
+            task: Nom de la tâche enregistrée
+            owner: Propriétaire de la tâche, vérifié par les endpoints de suivi
+            *args, **kwargs: Arguments sérialisables passés à la tâche
+
+        Returns:
+            Job: Tâche en attente
+
+        Raises:
+            KeyError: Si la tâche n'est pas enregistrée
+            QueueFullError: Si la file a atteint sa profondeur maximale
+        """
+        if task not in self._tasks:
+            raise KeyError(f"Tâche inconnue: {task}")
+        if await self.backend.pending_count() >= self.max_pending:
+            raise QueueFullError(self.max_pending)
+
+        job = Job(id=uuid.uuid4().hex, task=task, args=list(args), kwargs=kwargs, owner=owner)
+        await self.backend.save(job)
+        await self.backend.push(job.id)
+        logger.info(f"Tâche {task} soumise: {job.id}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.backend.load(job_id)
+
+    async def wait(self, job_id: str, poll_interval: float = 0.05,
+                   timeout: Optional[float] = None) -> Job:
+        """Attend la fin d'une tâche en interrogeant son état."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job.finished:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise asyncio.TimeoutError(job_id)
+            await asyncio.sleep(poll_interval)
+
+    async def run_in_process(self, func: Callable, *args) -> Any:
+        """
+        Exécute une fonction dans le pool de processus.
+
+        La fonction et ses arguments doivent être picklables ; sans pool, la
+        fonction est exécutée dans un thread.
+        """
+        loop = asyncio.get_running_loop()
+        if self.process_pool is not None:
+            return await loop.run_in_executor(self.process_pool, func, *args)
+        if self.process_workers <= 0:
+            return await asyncio.to_thread(func, *args)
+        if self._own_process_pool is None:
+            # spawn : un fork après l'initialisation de torch/CUDA n'est pas sûr
+            self._own_process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.process_initializer
+            )
+        return await loop.run_in_executor(self._own_process_pool, func, *args)
+
+    async def start(self):
+        """Démarre les workers."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_workers)
+        ]
+        logger.info(f"File de tâches démarrée avec {self.max_workers} workers")
+
+    async def stop(self):
+        """Arrête les workers et le pool de processus."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._own_process_pool is not None:
+            self._own_process_pool.shutdown(wait=False, cancel_futures=True)
+            self._own_process_pool = None
+        await self.backend.close()
+        logger.info("File de tâches arrêtée")
+
+    async def get_stats(self) -> Dict:
+        return {
+            "workers": self.max_workers,
+            "running": self._running,
+            "pending": await self.backend.pending_count(),
+            "max_pending": self.max_pending
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self.backend.pop()
+            job = await self.backend.load(job_id)
+            if job is None:
+                continue
+            self._running += 1
+            try:
+                await self._run(job)
+            finally:
+                self._running -= 1
+
+    async def _run(self, job: Job):
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        await self.backend.save(job)
+
+        token = _current_job.set((self, job))
+        try:
+            func = self._tasks.get(job.task)
+            if func is None:
+                raise KeyError(f"Tâche inconnue: {job.task}")
+            job.result = await func(*job.args, **job.kwargs)
+            job.status = JobStatus.COMPLETED
+            job.progress = 1.0
+        except asyncio.CancelledError:
+            job.status = JobStatus.FAILED
+            job.error = "Tâche interrompue"
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de l'exécution de la tâche {job.id}: {str(e)}")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        finally:
+            _current_job.reset(token)
+            job.finished_at = time.time()
+            await asyncio.shield(self.backend.save(job))
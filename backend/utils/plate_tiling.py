@@ -0,0 +1,161 @@
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Plaques disponibles (côtés en tenons), utilisées dans les deux orientations
+PLATE_SIZES: Tuple[Tuple[int, int], ...] = (
+    (4, 8), (4, 6), (4, 4), (2, 8), (2, 6), (2, 4), (2, 3), (2, 2),
+    (1, 8), (1, 6), (1, 4), (1, 3), (1, 2), (1, 1),
+)
+
+# Une ligne par plaque : position et taille en cellules, étiquette de couleur
+PLATE_DTYPE = np.dtype([
+    ('x', np.int32), ('y', np.int32),
+    ('width', np.int32), ('length', np.int32),
+    ('label', np.int32),
+])
+
+
+def color_rectangles(labels: np.ndarray) -> np.ndarray:
+    """
+    Décompose une grille d'étiquettes en rectangles de même étiquette.
+
+    Chaque ligne est d'abord découpée en plages de même étiquette ; les plages
+    identiques (mêmes colonnes, même étiquette) de lignes consécutives sont
+    ensuite fusionnées en un rectangle. Aucune boucle Python par cellule.
+
+    Args:
+        labels: Grille (lignes, colonnes) d'étiquettes entières
+
+    Returns:
+        np.ndarray: Rectangles au format PLATE_DTYPE
+    """
+    rows, cols = labels.shape
+    if labels.size == 0:
+        return np.zeros(0, dtype=PLATE_DTYPE)
+
+    # Plages horizontales : une plage commence en début de ligne ou à chaque changement
+    starts = np.ones(labels.shape, dtype=bool)
+    starts[:, 1:] = labels[:, 1:] != labels[:, :-1]
+    ys, xs = np.nonzero(starts)
+    ends = np.full(len(xs), cols)
+    same_row = ys[1:] == ys[:-1]
+    ends[:-1][same_row] = xs[1:][same_row]
+    run_labels = labels[ys, xs]
+
+    # Fusion verticale des plages identiques de lignes consécutives
+    order = np.lexsort((ys, run_labels, ends, xs))
+    ys, xs, ends, run_labels = ys[order], xs[order], ends[order], run_labels[order]
+    new = np.ones(len(xs), dtype=bool)
+    new[1:] = (
+        (xs[1:] != xs[:-1]) | (ends[1:] != ends[:-1])
+        | (run_labels[1:] != run_labels[:-1]) | (ys[1:] != ys[:-1] + 1)
+    )
+    first = np.flatnonzero(new)
+
+    rectangles = np.zeros(len(first), dtype=PLATE_DTYPE)
+    rectangles['x'] = xs[first]
+    rectangles['y'] = ys[first]
+    rectangles['width'] = ends[first] - xs[first]
+    rectangles['length'] = np.diff(np.append(first, len(xs)))
+    rectangles['label'] = run_labels[first]
+    return rectangles
+
+
+@lru_cache(maxsize=4096)
+def _decompose(width: int, length: int, sizes: Tuple[Tuple[int, int], ...]) -> np.ndarray:
+    """
+    Pavage d'un rectangle par les plus grandes plaques qui y entrent.
+
+    La plus grande plaque (dans l'une ou l'autre orientation) est répétée en
+    grille, puis les bandes restantes à droite et en bas sont pavées de la
+    même façon.
+
+    Returns:
+        np.ndarray: Plaques (N, 4) : décalage x, décalage y, largeur, longueur
+    """
+    if width == 0 or length == 0:
+        return np.zeros((0, 4), dtype=np.int32)
+
+    candidates = [
+        (w * l, w, l)
+        for a, b in sizes
+        for w, l in ((a, b), (b, a))
+        if w <= width and l <= length
+    ]
+    _, w, l = max(candidates)
+    nx, ny = width // w, length // l
+    grid_y, grid_x = np.mgrid[0:ny * l:l, 0:nx * w:w]
+    plates = np.stack([
+        grid_x.ravel(), grid_y.ravel(),
+        np.full(nx * ny, w), np.full(nx * ny, l)
+    ], axis=1)
+
+    right = _decompose(width - nx * w, ny * l, sizes) + (nx * w, 0, 0, 0)
+    bottom = _decompose(width, length - ny * l, sizes) + (0, ny * l, 0, 0)
+    return np.concatenate([plates, right, bottom]).astype(np.int32)
+
+
+def tile_plates(labels: np.ndarray, sizes: Sequence[Tuple[int, int]] = PLATE_SIZES) -> np.ndarray:
+    """
+    Couvre une grille d'étiquettes de couleur par des plaques de même couleur.
+
+    Les rectangles de même étiquette (color_rectangles) sont pavés par les plus
+    grandes plaques disponibles ; les rectangles de même taille sont traités
+    ensemble.
+
+    Args:
+        labels: Grille (lignes, colonnes) d'étiquettes entières
+        sizes: Plaques disponibles ; (1, 1) doit en faire partie
+
+    Returns:
+        np.ndarray: Plaques au format PLATE_DTYPE, triées par ligne puis colonne
+
+    Raises:
+        ValueError: Si la plaque 1x1 n'est pas disponible
+    """
+    sizes = tuple(sorted({tuple(sorted(size)) for size in sizes}, reverse=True))
+    if (1, 1) not in sizes:
+        raise ValueError("La plaque 1x1 est nécessaire pour couvrir toutes les cellules")
+
+    rectangles = color_rectangles(labels)
+    shapes, inverse = np.unique(
+        np.stack([rectangles['width'], rectangles['length']], axis=1), axis=0, return_inverse=True
+    )
+    groups = []
+    for index, (width, length) in enumerate(shapes):
+        group = rectangles[inverse.ravel() == index]
+        offsets = _decompose(int(width), int(length), sizes)
+        plates = np.zeros((len(group), len(offsets)), dtype=PLATE_DTYPE)
+        plates['x'] = group['x'][:, None] + offsets[:, 0]
+        plates['y'] = group['y'][:, None] + offsets[:, 1]
+        plates['width'] = offsets[:, 2]
+        plates['length'] = offsets[:, 3]
+        plates['label'] = group['label'][:, None]
+        groups.append(plates.ravel())
+
+    plates = np.concatenate(groups) if groups else np.zeros(0, dtype=PLATE_DTYPE)
+    return plates[np.lexsort((plates['x'], plates['y']))]
+
+
+def part_counts(plates: np.ndarray) -> List[Dict]:
+    """
+    Liste des pièces : nombre de plaques par taille et par étiquette.
+
+    Returns:
+        List[Dict]: {"width", "length", "label", "quantity"}, par quantité décroissante
+    """
+    if len(plates) == 0:
+        return []
+    keys = np.stack([
+        np.minimum(plates['width'], plates['length']),
+        np.maximum(plates['width'], plates['length']),
+        plates['label'],
+    ], axis=1)
+    parts, quantities = np.unique(keys, axis=0, return_counts=True)
+    order = np.argsort(-quantities, kind='stable')
+    return [
+        {"width": int(w), "length": int(l), "label": int(label), "quantity": int(quantity)}
+        for (w, l, label), quantity in zip(parts[order], quantities[order])
+    ]
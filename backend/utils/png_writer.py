@@ -0,0 +1,84 @@
+import struct
+import zlib
+from typing import BinaryIO
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Taille maximale des blocs IDAT écrits
+IDAT_CHUNK_SIZE = 1024 * 1024
+
+
+class PngStreamWriter:
+    """
+    Écriture d'une image PNG RGB 8 bits par bandes de lignes.
+
+    Les lignes sont compressées et écrites au fur et à mesure : la mémoire
+    utilisée ne dépend que de la hauteur des bandes, pas de celle de l'image.
+    """
+
+    def __init__(self, file: BinaryIO, width: int, height: int, compression: int = 6):
+        """
+        Args:
+            file: Fichier binaire ouvert en écriture
+            width: Largeur de l'image
+            height: Hauteur de l'image
+            compression: Niveau de compression zlib (0-9)
+        """
+        self.file = file
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(compression)
+        self._pending = bytearray()
+
+        self.file.write(PNG_SIGNATURE)
+        # Profondeur 8 bits, type de couleur 2 (RGB), sans entrelacement
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def write_rows(self, rows: np.ndarray):
+        """
+        Ajoute des lignes à l'image.
+
+        Args:
+            rows: Tableau (lignes, largeur, 3) en uint8, dans l'ordre RGB
+
+        Raises:
+            ValueError: Si les lignes n'ont pas la largeur de l'image ou dépassent sa hauteur
+        """
+        if rows.shape[1:] != (self.width, 3):
+            raise ValueError(f"Lignes de forme {rows.shape} pour une image de largeur {self.width}")
+        if self.rows_written + rows.shape[0] > self.height:
+            raise ValueError("Plus de lignes que la hauteur de l'image")
+
+        # Chaque ligne est précédée de son type de filtre (0 : aucun)
+        scanlines = np.zeros((rows.shape[0], self.width * 3 + 1), dtype=np.uint8)
+        scanlines[:, 1:] = rows.reshape(rows.shape[0], -1)
+        self._pending += self._compressor.compress(scanlines.tobytes())
+        self.rows_written += rows.shape[0]
+        self._flush(IDAT_CHUNK_SIZE)
+
+    def close(self):
+        """
+        Termine l'image.
+
+        Raises:
+            ValueError: Si toutes les lignes n'ont pas été écrites
+        """
+        if self.rows_written != self.height:
+            raise ValueError(f"{self.rows_written} lignes écrites sur {self.height}")
+        self._pending += self._compressor.flush()
+        self._flush(1)
+        self._write_chunk(b"IEND", b"")
+
+    def _flush(self, min_size: int):
+        while len(self._pending) >= min_size:
+            self._write_chunk(b"IDAT", bytes(self._pending[:IDAT_CHUNK_SIZE]))
+            del self._pending[:IDAT_CHUNK_SIZE]
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(chunk_type)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
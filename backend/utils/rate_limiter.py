@@ -24,21 +24,23 @@ class RateLimiter:
     
     async def acquire(self):
         """Acquiert un slot pour un appel API"""
-        async with self._lock:
-            now = time.time()
-            
-            # Nettoyage des timestamps expirés
-            self.timestamps = [ts for ts in self.timestamps if now - ts < self.period]
-            
-            if len(self.timestamps) >= self.calls:
+        while True:
+            async with self._lock:
+                now = time.time()
+                
+                # Nettoyage des timestamps expirés
+                self.timestamps = [ts for ts in self.timestamps if now - ts < self.period]
+                
+                if len(self.timestamps) < self.calls:
+                    self.timestamps.append(now)
+                    return
+                
                 # Calcul du temps d'attente
                 wait_time = self.timestamps[0] + self.period - now
-                if wait_time > 0:
-                    logger.warning(f"Rate limit atteint, attente de {wait_time:.2f} secondes")
-                    await asyncio.sleep(wait_time)
-                    return await self.acquire()
             
-            self.timestamps.append(now)
+            # Attente hors du verrou : asyncio.Lock n'est pas réentrant
+            logger.warning(f"Rate limit atteint, attente de {wait_time:.2f} secondes")
+            await asyncio.sleep(max(wait_time, 0))
     
     def __call__(self, func):
         """Décorateur pour limiter le taux d'appels d'une fonction"""
@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+# Taille des blocs lus depuis la requête
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Taille des blocs passés à SHA-256 lors d'un hachage de fichier
+HASH_BUFFER_SIZE = 16 * 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Exception levée lorsqu'un fichier reçu dépasse la taille autorisée"""
+    def __init__(self, max_size: int):
+        super().__init__(f"Fichier trop volumineux. Taille maximale: {max_size / 1024 / 1024:.0f}MB")
+        self.max_size = max_size
+
+
+@dataclass
+class StoredUpload:
+    """Fichier reçu et écrit sur disque."""
+    path: Path
+    size: int
+    sha256: str
+
+
+def _write_chunk(f: BinaryIO, hasher, chunk: bytes):
+    """Hache et écrit un bloc ; exécuté hors de la boucle d'événements."""
+    hasher.update(chunk)
+    f.write(chunk)
+
+
+async def save_upload(upload: UploadFile, destination: Path,
+                      chunk_size: int = UPLOAD_CHUNK_SIZE,
+                      max_size: Optional[int] = None) -> StoredUpload:
+    """
+    Écrit un fichier reçu sur disque en calculant son empreinte au passage.
+
+    Le contenu n'est lu qu'une fois et jamais en entier en mémoire : chaque
+    bloc est haché puis écrit dans un thread, ce qui évite une seconde lecture
+    du fichier pour la clé de cache et ne bloque pas la boucle d'événements.
+
+    Args:
+        upload: Fichier reçu par l'endpoint
+        destination: Chemin du fichier à écrire
+        chunk_size: Taille des blocs lus depuis la requête
+        max_size: Taille maximale acceptée en octets
+
+    Returns:
+        StoredUpload: Chemin, taille et empreinte SHA-256 du fichier
+
+    Raises:
+        UploadTooLargeError: Si le fichier dépasse max_size ; le fichier partiel est supprimé
+    """
+    # Refus immédiat quand la taille est connue avant lecture
+    if max_size is not None and upload.size is not None and upload.size > max_size:
+        raise UploadTooLargeError(max_size)
+
+    hasher = hashlib.sha256()
+    size = 0
+
+    f = await asyncio.to_thread(open, destination, 'wb')
+    try:
+        while chunk := await upload.read(chunk_size):
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                raise UploadTooLargeError(max_size)
+            await asyncio.to_thread(_write_chunk, f, hasher, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(Path(destination).unlink, missing_ok=True)
+        raise
+    await asyncio.to_thread(f.close)
+
+    return StoredUpload(path=Path(destination), size=size, sha256=hasher.hexdigest())
+
+
+async def spool_upload(upload: UploadFile, resource_manager=None, prefix: str = "upload",
+                       max_size: Optional[int] = None) -> StoredUpload:
+    """
+    Écrit un fichier reçu dans un répertoire temporaire qui lui est propre.
+
+    Args:
+        upload: Fichier reçu par l'endpoint
+        resource_manager: Gestionnaire de ressources fournissant le répertoire
+            temporaire ; à défaut, le répertoire temporaire du système est utilisé
+        prefix: Préfixe du répertoire temporaire
+        max_size: Taille maximale acceptée en octets
+
+    Returns:
+        StoredUpload: Chemin, taille et empreinte SHA-256 du fichier
+
+    Raises:
+        UploadTooLargeError: Si le fichier dépasse max_size
+    """
+    # Un répertoire par requête : deux envois simultanés du même nom ne se mélangent pas
+    unique_prefix = f"{prefix}_{uuid.uuid4().hex[:12]}"
+    if resource_manager is not None:
+        directory = await resource_manager.get_temp_dir(unique_prefix)
+    else:
+        directory = Path(await asyncio.to_thread(tempfile.mkdtemp, prefix=f"{unique_prefix}_"))
+
+    # Seul le nom est conservé, jamais un chemin fourni par le client
+    filename = Path(upload.filename or "upload").name or "upload"
+
+    try:
+        return await save_upload(upload, directory / filename, max_size=max_size)
+    except BaseException:
+        await asyncio.to_thread(shutil.rmtree, directory, True)
+        raise
+
+
+async def discard_upload(stored: Union[StoredUpload, Path, str]):
+    """Supprime un fichier reçu par spool_upload et son répertoire temporaire."""
+    path = stored.path if isinstance(stored, StoredUpload) else Path(stored)
+    await asyncio.to_thread(shutil.rmtree, path.parent, True)
+
+
+def hash_file(path: Path, buffer_size: int = HASH_BUFFER_SIZE) -> str:
+    """
+    Calcule l'empreinte SHA-256 d'un fichier déjà présent sur disque.
+
+    Le fichier est projeté en mémoire et haché par grands blocs ; hashlib
+    relâche le GIL sur ces blocs, l'appel peut donc tourner dans un thread.
+
+    Args:
+        path: Chemin du fichier
+        buffer_size: Taille des blocs hachés
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return hasher.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, buffer_size):
+                    hasher.update(view[offset:offset + buffer_size])
+            finally:
+                view.release()
+    return hasher.hexdigest()
+
+
+async def hash_file_async(path: Path) -> str:
+    """Calcule l'empreinte d'un fichier dans un thread, sans bloquer la boucle."""
+    return await asyncio.to_thread(hash_file, path)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupError(RuntimeError):
+    """Exception levée lorsqu'un composant dont dépend une requête n'a pas pu être chargé"""
+    pass
+
+
+class _Component:
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.status = "pending"
+        self.value: Any = None
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.done = asyncio.Event()
+
+
+class Warmup:
+    """
+    Chargement des dépendances lourdes après le démarrage du serveur.
+
+    Les composants (imports de torch, modèles, services) sont enregistrés avec
+    leur fonction de chargement puis chargés dans l'ordre, dans un thread, par
+    une tâche de fond lancée au démarrage : le serveur accepte les connexions
+    immédiatement et /ready indique quand il peut traiter les requêtes. Une
+    requête qui a besoin d'un composant l'attend avec get().
+    """
+
+    def __init__(self):
+        self._components: Dict[str, _Component] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.started_at: Optional[float] = None
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Enregistre un composant et sa fonction de chargement (synchrone)."""
+        self._components[name] = _Component(name, loader)
+
+    def component(self, name: str):
+        """Décorateur équivalent à register."""
+        def decorator(loader):
+            self.register(name, loader)
+            return loader
+        return decorator
+
+    def start(self):
+        """Lance le chargement en tâche de fond ; sans effet s'il est déjà lancé."""
+        if self._task is None:
+            self.started_at = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def get(self, name: str) -> Any:
+        """
+        Retourne un composant, en attendant son chargement si nécessaire.
+
+        Le chargement est lancé s'il ne l'a pas encore été (scripts, tests).
+
+        Raises:
+            WarmupError: Si le chargement du composant a échoué
+        """
+        component = self._components[name]
+        self.start()
+        await component.done.wait()
+        if component.status == "failed":
+            raise WarmupError(f"Composant {name} indisponible: {component.error}")
+        return component.value
+
+    @property
+    def ready(self) -> bool:
+        return all(c.status == "ready" for c in self._components.values())
+
+    def report(self) -> Dict:
+        """État du chargement, exposé par l'endpoint /ready."""
+        return {
+            "ready": self.ready,
+            "components": {
+                c.name: {"status": c.status, "seconds": c.seconds, "error": c.error}
+                for c in self._components.values()
+            }
+        }
+
+    async def _run(self):
+        for component in self._components.values():
+            component.status = "loading"
+            start = time.perf_counter()
+            try:
+                component.value = await asyncio.to_thread(component.loader)
+                component.status = "ready"
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement de {component.name}: {str(e)}")
+                component.status = "failed"
+                component.error = str(e)
+            component.seconds = round(time.perf_counter() - start, 3)
+            component.done.set()
+            logger.info(f"Composant {component.name}: {component.status} en {component.seconds}s")